@@ -0,0 +1,724 @@
+"""
+UML Calculator Benchmark Suite
+
+Performance benchmarks for the UML symbolic engine and calculator front ends.
+Each benchmark is a subcommand:
+
+    python benchmark_suite.py nodes --nodes 1000000
+    python benchmark_suite.py depth --depths 10 1000 100000 --text-depths 10 1000 100000
+    python benchmark_suite.py egraph --sizes 4 16 64 256
+    python benchmark_suite.py plot --points 1000000
+    python benchmark_suite.py startup --budget-ms 150
+    python benchmark_suite.py typing --length 1000
+    python benchmark_suite.py router --expressions 2000
+    python benchmark_suite.py convert --operators 1000 10000 100000
+    python benchmark_suite.py stats --budget-pct 2
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import uml_core
+from symbolic_engine import SymbolicEngine, SymbolicOperation, SymbolicOperationType
+
+
+class LegacySymbolicOperation:
+    """Replica of the pre-slots SymbolicOperation used as a memory baseline."""
+
+    def __init__(self, op_type, operands, metadata=None):
+        self.op_type = op_type
+        self.operands = operands
+        self.metadata = metadata or {}
+        self.entropy_weight = self._calculate_entropy_weight()
+        self.tfid = None
+
+    def _calculate_entropy_weight(self):
+        base_weights = {
+            SymbolicOperationType.ADDITION: 1.0,
+            SymbolicOperationType.SUBTRACTION: 1.1,
+            SymbolicOperationType.MULTIPLICATION: 1.3,
+            SymbolicOperationType.DIVISION: 1.5,
+            SymbolicOperationType.EXPONENTIATION: 1.8,
+            SymbolicOperationType.ROOT: 1.9,
+            SymbolicOperationType.LOGARITHM: 2.0,
+            SymbolicOperationType.FACTORIAL: 2.2,
+            SymbolicOperationType.MODULO: 1.4,
+            SymbolicOperationType.RIS: 0.8,
+            SymbolicOperationType.TFID: 0.9,
+            SymbolicOperationType.COLLAPSE: 0.7,
+            SymbolicOperationType.IDENTITY: 0.5,
+        }
+        weight = base_weights.get(self.op_type, 1.0)
+        operand_complexity = sum(
+            1.0 if isinstance(op, (int, float, str)) else 1.5 + op.entropy_weight / 5
+            for op in self.operands
+        )
+        if self.operands:
+            operand_complexity /= len(self.operands)
+        return weight * (0.8 + 0.4 * operand_complexity)
+
+
+def build_balanced_tree(node_cls, node_count):
+    """Build a balanced binary tree of roughly node_count operation nodes."""
+    op_types = [
+        SymbolicOperationType.ADDITION,
+        SymbolicOperationType.MULTIPLICATION,
+        SymbolicOperationType.SUBTRACTION,
+        SymbolicOperationType.DIVISION,
+    ]
+    leaves = (node_count + 1) // 2
+    level = [
+        node_cls(op_types[i % 4], [float(i), float(i + 1)]) for i in range(leaves)
+    ]
+    built = len(level)
+    while len(level) > 1:
+        nxt = []
+        for i in range(0, len(level) - 1, 2):
+            nxt.append(node_cls(op_types[i % 4], [level[i], level[i + 1]]))
+        if len(level) % 2:
+            nxt.append(level[-1])
+        built += len(level) // 2
+        level = nxt
+    return level[0], built
+
+
+def measure_tree(node_cls, node_count):
+    """Return (root, nodes, bytes allocated, build seconds) for one tree."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    root, nodes = build_balanced_tree(node_cls, node_count)
+    weight = root.entropy_weight  # force lazy weights
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return weight, nodes, current, elapsed
+
+
+def bench_nodes(args):
+    """Bytes per node for a large tree, legacy dict nodes vs slotted nodes."""
+    print(f"=== SymbolicOperation memory ({args.nodes:,} nodes) ===")
+    results = {}
+    for label, node_cls in (
+        ("legacy (dict)", LegacySymbolicOperation),
+        ("slotted", SymbolicOperation),
+    ):
+        weight, nodes, allocated, elapsed = measure_tree(node_cls, args.nodes)
+        results[label] = allocated / nodes
+        print(
+            f"  {label:<14} {allocated / nodes:8.1f} bytes/node  "
+            f"{elapsed:6.2f}s build  root weight={weight:.6f}"
+        )
+        gc.collect()
+    before, after = results["legacy (dict)"], results["slotted"]
+    print(f"  reduction: {(1 - after / before):.1%}")
+    return 0
+
+
+def recursive_eval_uml(parsed_val):
+    """Reference recursive evaluator with the pre-stack eval_uml structure."""
+    if isinstance(parsed_val, dict):
+        args = [recursive_eval_uml(a) for a in parsed_val["args"]]
+        return uml_core.apply_uml_operator(parsed_val, args)
+    if isinstance(parsed_val, (int, float, complex)):
+        return parsed_val
+    return float("nan")
+
+
+def build_dict_chain(depth):
+    """Build a left-leaning parsed UML tree [[[1,1],1],1] with depth nodes."""
+    tree = 1
+    for i in range(depth):
+        tree = {"op": "add" if i % 2 else "mul", "args": [tree, 1]}
+    return tree
+
+
+def build_operation_chain(depth):
+    """Build a left-leaning SymbolicOperation tree with depth nodes."""
+    tree = 1.0
+    for i in range(depth):
+        op_type = SymbolicOperationType.ADDITION if i % 2 else SymbolicOperationType.MULTIPLICATION
+        tree = SymbolicOperation(op_type, [tree, 1.0])
+    return tree
+
+
+def build_text_chain(depth):
+    """Build the UML text of build_dict_chain(depth): <[<1,1>,1],1> and so on."""
+    prefix, suffix = [], []
+    for i in range(depth):
+        opening, closing = ("[", "]") if i % 2 else ("<", ">")
+        prefix.append(opening)
+        suffix.append(",1" + closing)
+    return "".join(reversed(prefix)) + "1" + "".join(suffix)
+
+
+def build_ris_text_chain(depth):
+    """Build a depth-deep RIS chain as UML text: RIS(RIS(1,2),2) and so on."""
+    return "RIS(" * depth + "1" + ",2)" * depth
+
+
+def _parse_and_eval(module, text):
+    return module.eval_uml(module.parse_uml(text))
+
+
+def _timed(func, *args, repeat=1):
+    """Return (result or exception name, best seconds) over repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except RecursionError:
+            result = "RecursionError"
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def bench_depth(args):
+    """Evaluate deep left-leaning chains iteratively vs recursively, then parse them from text."""
+    print("=== Deep tree evaluation ===")
+    print(f"  {'depth':>8} {'tree':<12}{'iterative':>12}{'recursive':>16}  result")
+    logging.getLogger("UMLSymbolicEngine").setLevel(logging.WARNING)
+    for depth in args.depths:
+        tree = build_dict_chain(depth)
+        fast, fast_s = _timed(uml_core.eval_uml, tree, repeat=args.repeat)
+        slow, slow_s = _timed(recursive_eval_uml, tree, repeat=args.repeat)
+        slow_label = f"{slow_s * 1000:.2f} ms" if slow != "RecursionError" else slow
+        if slow != "RecursionError" and slow != fast:
+            print(f"  MISMATCH at depth {depth}: {fast!r} != {slow!r}")
+            return 1
+        print(f"  {depth:>8} {'dict':<12}{fast_s * 1000:9.2f} ms{slow_label:>16}  {fast}")
+
+        operation = build_operation_chain(depth)
+        with tempfile.TemporaryDirectory() as memory_path:
+            engine = SymbolicEngine(memory_path=memory_path)
+            (result, _), run_s = _timed(engine.execute_operation, operation)
+        print(f"  {depth:>8} {'symbolic':<12}{run_s * 1000:9.2f} ms{'':>16}  {result}")
+        if result != fast:
+            print(f"  MISMATCH at depth {depth}: {result!r} != {fast!r}")
+            return 1
+
+    # The same chains as UML text, through parse_uml and eval_uml of both cores
+    from core import uml_core as dict_core
+
+    print(f"  {'depth':>8} {'text':<12}{'uml_core':>12}{'core':>16}  result")
+    for depth in args.text_depths:
+        text = build_text_chain(depth)
+        expected = uml_core.eval_uml(build_dict_chain(depth))
+        root, root_s = _timed(_parse_and_eval, uml_core, text, repeat=args.repeat)
+        core, core_s = _timed(_parse_and_eval, dict_core, text, repeat=args.repeat)
+        for result in (root, core):
+            if result != expected:
+                print(f"  MISMATCH at depth {depth}: {result!r} != {expected!r}")
+                return 1
+        print(f"  {depth:>8} {'parse+eval':<12}{root_s * 1000:9.2f} ms{core_s * 1000:13.2f} ms  {root}")
+
+        # Function-call nests: the engines define RIS differently, so only the times compare
+        text = build_ris_text_chain(depth)
+        root, root_s = _timed(_parse_and_eval, uml_core, text, repeat=args.repeat)
+        core, core_s = _timed(_parse_and_eval, dict_core, text, repeat=args.repeat)
+        print(f"  {depth:>8} {'RIS(...)':<12}{root_s * 1000:9.2f} ms{core_s * 1000:13.2f} ms  {root} / {core}")
+    return 0
+
+
+def build_random_expression(rng, operators, symbols):
+    """Build a random parsed UML tree with the given operator count."""
+    leaves = [rng.choice(symbols) for _ in range(operators + 1)]
+    while len(leaves) > 1:
+        i = rng.randrange(len(leaves) - 1)
+        op = rng.choice(["add", "add", "mul", "mul", "sub", "div", "ris"])
+        node = {"op": op, "args": [leaves[i], leaves[i + 1]]}
+        if op == "ris":
+            node["operation"] = rng.choice(["auto", "add", "mul", "div"])
+        leaves[i:i + 2] = [node]
+    return leaves[0]
+
+
+def bench_egraph(args):
+    """E-graph simplification time and entropy reduction by expression size."""
+    from uml_egraph import simplify_uml
+
+    rng = random.Random(args.seed)
+    symbols = ["x", "y", "z", 0.0, 0.5, 1.0, 2.0, 3.0, 4.0, 10.0]
+    print(f"=== E-graph simplification ({args.count} expressions per size) ===")
+    print(
+        f"  {'ops':>6}{'mean ms':>10}{'max ms':>10}{'enodes':>9}"
+        f"{'cost':>16}  stop reasons"
+    )
+    for size in args.sizes:
+        times, enodes, before, after, reasons = [], [], 0.0, 0.0, {}
+        for _ in range(args.count):
+            tree = build_random_expression(rng, size, symbols)
+            _, report = simplify_uml(
+                tree, max_nodes=args.max_nodes, time_limit=args.time_limit
+            )
+            times.append(report["elapsed_s"] * 1000)
+            enodes.append(report["enodes"])
+            before += report["cost_before"]
+            after += report["cost_after"]
+            reasons[report["stop_reason"]] = reasons.get(report["stop_reason"], 0) + 1
+        print(
+            f"  {size:>6}{sum(times) / len(times):>10.1f}{max(times):>10.1f}"
+            f"{sum(enodes) // len(enodes):>9}"
+            f"{before / args.count:>8.1f}->{after / args.count:<6.1f}  "
+            + ", ".join(f"{name} {count}" for name, count in sorted(reasons.items()))
+        )
+    return 0
+
+
+def per_point_plot_data(expr_str, x_min, x_max, points):
+    """Reference plot data built with one sympy substitution per point."""
+    import numpy as np
+    from sympy import symbols
+    from core.symbolic import evaluate_expression, evaluate_ris_calls
+
+    x = symbols("x")
+    expr = evaluate_expression(expr_str, symbolic=True)
+    y_values = []
+    for x_val in np.linspace(x_min, x_max, points):
+        try:
+            y_values.append(float(evaluate_ris_calls(expr.subs(x, x_val))))
+        except Exception:
+            y_values.append(float("nan"))
+    return np.array(y_values)
+
+
+def bench_plot(args):
+    """Compiled plot data generation vs per-point sympy substitution."""
+    import numpy as np
+    from core.symbolic import compile_expression, generate_plot_data
+
+    print(f"=== Plot data ({args.points:,} points, per-point reference on {args.reference_points:,}) ===")
+    print(f"  {'expression':<28}{'compile ms':>12}{'compiled s':>12}{'per-point s':>13}  speedup")
+    for expr in args.expressions:
+        compile_expression.cache_clear()
+        start = time.perf_counter()
+        compile_expression(expr)
+        compile_s = time.perf_counter() - start
+        _, compiled_s = _timed(generate_plot_data, expr, -10, 10, args.points, repeat=args.repeat)
+
+        _, fast = generate_plot_data(expr, -10, 10, args.reference_points)
+        slow, slow_s = _timed(per_point_plot_data, expr, -10, 10, args.reference_points)
+        if not np.allclose(fast, slow, equal_nan=True):
+            print(f"  MISMATCH for {expr}")
+            return 1
+        # Scale the reference to the full point count
+        slow_s *= args.points / args.reference_points
+        print(
+            f"  {expr:<28}{compile_s * 1000:>12.1f}{compiled_s:>12.3f}"
+            f"{slow_s:>13.1f}  {slow_s / compiled_s:,.0f}x"
+        )
+    return 0
+
+
+# (label, script relative to this file, arguments); the first is held to the budget
+STARTUP_COMMANDS = [
+    ("modern_cli calc", "ui/modern_cli.py", ["calc", "2+2"]),
+    ("modern_cli ris", "ui/modern_cli.py", ["ris", "6", "3", "--no-history"]),
+    ("calculator_cli", "ui/calculator_cli.py", ["2+2", "--mode", "standard", "--no-cache"]),
+]
+
+
+def parse_importtime(stderr):
+    """Return [(cumulative microseconds, module)] for top-level imports in -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Nested imports are indented under the module that triggered them
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+def bench_startup(args):
+    """Cold start time of the CLI entry points, with a budget for the first one."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"=== CLI cold start (best of {args.runs}, budget {args.budget_ms:.0f} ms) ===")
+    status = 0
+    with tempfile.TemporaryDirectory() as home:
+        # Settings, history and caches go to a throwaway home directory
+        env = dict(os.environ, HOME=home)
+        for index, (label, script, script_args) in enumerate(STARTUP_COMMANDS):
+            command = [sys.executable, os.path.join(here, script)] + script_args
+            best = float("inf")
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                proc = subprocess.run(command, env=env, capture_output=True, text=True)
+                best = min(best, time.perf_counter() - start)
+            if proc.returncode != 0:
+                error = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+                print(f"  {label:<18} failed: {error}")
+                continue
+
+            traced = subprocess.run(
+                [sys.executable, "-X", "importtime"] + command[1:],
+                env=env, capture_output=True, text=True,
+            )
+            imports = sorted(parse_importtime(traced.stderr), reverse=True)
+            heaviest = ", ".join(f"{name} {us / 1000:.0f}" for us, name in imports[:args.top])
+            verdict = ""
+            if index == 0:
+                over = best * 1000 > args.budget_ms
+                verdict = "  OVER BUDGET" if over else "  ok"
+                status = 1 if over else status
+            print(f"  {label:<18}{best * 1000:7.0f} ms{verdict}")
+            print(f"  {'':<18}imports (ms): {heaviest}")
+    return status
+
+
+def build_typing_expression(rng, length):
+    """Build a nested UML expression ([a,b], {a,b}, <a,b>) of about length characters."""
+    def group(depth):
+        if depth >= 6 or rng.random() < 0.25:
+            return str(rng.randint(1, 99))
+        left, right = rng.choice([("[", "]"), ("{", "}"), ("<", ">")])
+        return left + ",".join(group(depth + 1) for _ in range(rng.randint(2, 4))) + right
+
+    parts = []
+    while sum(len(part) + 1 for part in parts) < length:
+        parts.append(group(1))
+    return "[" + ",".join(parts) + "]"
+
+
+def typing_sessions(expression):
+    """Keystroke sequences over expression: {label: [text after each keystroke]}."""
+    middle = len(expression) // 2
+    digit = next(i for i in range(middle, len(expression)) if expression[i].isdigit())
+    insert = expression.index(",", middle) + 1
+    group = "[12,<3,{40,2}>],"
+    return {
+        "retype a digit": [expression[:digit] + str(i % 10) + expression[digit + 1:] for i in range(100)],
+        "type a group": [expression[:insert] + group[:i] + expression[insert:] for i in range(1, len(group) + 1)],
+        "type at the end": [expression[:i] for i in range(len(expression) - 100, len(expression) + 1)],
+    }
+
+
+def _full_preview(uml_core_module, text):
+    try:
+        return repr(uml_core_module.eval_uml(uml_core_module.parse_uml(text)))
+    except Exception:
+        return "error"
+
+
+def _incremental_preview(parser, text):
+    parser.update(text)
+    try:
+        return repr(parser.evaluate())
+    except Exception:
+        return "error"
+
+
+def bench_typing(args):
+    """Per-keystroke parse + evaluate cost: incremental parser vs full parse_uml."""
+    from core import uml_core as core_uml
+    from core.incremental_parser import IncrementalParser
+
+    expression = build_typing_expression(random.Random(args.seed), args.length)
+    print(f"=== Live preview per keystroke ({len(expression)}-character expression) ===")
+    print(f"  {'session':<18}{'keys':>6}{'full ms':>10}{'incremental ms':>16}  speedup")
+    for label, texts in typing_sessions(expression).items():
+        full_s, incremental_s = float("inf"), float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            expected = [_full_preview(core_uml, text) for text in texts]
+            full_s = min(full_s, time.perf_counter() - start)
+
+            parser = IncrementalParser(texts[0][:-1])
+            start = time.perf_counter()
+            got = [_incremental_preview(parser, text) for text in texts]
+            incremental_s = min(incremental_s, time.perf_counter() - start)
+        if got != expected:
+            print(f"  MISMATCH in {label}")
+            return 1
+        keys = len(texts)
+        print(
+            f"  {label:<18}{keys:>6}{full_s / keys * 1000:>10.3f}"
+            f"{incremental_s / keys * 1000:>16.3f}  {full_s / incremental_s:.1f}x"
+        )
+    return 0
+
+
+ROUTER_CORPUS = {
+    "standard": ["2+3*4", "3 * (4 + 5)", "2 ** 10", "-3+2", "math.sin(pi/2)", "pi", "1/0", "7 % 3", "2^3+1"],
+    "uml": ["[1,2,3]", "{10,3}", "<2,3,4>", "<>6,3<>", "@(2,8)", "[1,<2,3>,{9,4}]", "sqrt(16)", "2^3", "x^2", "42"],
+    "ris": ["6,3", "8,2", "5,5", "10,0.5"],
+    "symbol": ["x+1", "hello", "2*y"],
+}
+
+
+def build_router_corpus(rng, count):
+    """Mixed auto-mode input: (kind, expression) drawn from ROUTER_CORPUS, with repeats."""
+    kinds = list(ROUTER_CORPUS)
+    return [(kind, rng.choice(ROUTER_CORPUS[kind])) for kind in (rng.choice(kinds) for _ in range(count))]
+
+
+def _counting(func, counts, name):
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _chained_auto(cli, expr):
+    """Pre-router auto mode: safe_eval, then parse_uml, then conversion, then RIS."""
+    try:
+        cli.safe_eval(expr)
+    except Exception:
+        pass
+    try:
+        return cli.eval_parsed(cli.parse_uml(expr))[0]
+    except Exception:
+        try:
+            return cli.eval_parsed(cli.parse_uml(cli.convert_standard_to_uml(expr)))[0]
+        except Exception:
+            pass
+    parts = expr.split(",")
+    if len(parts) == 2:
+        return cli.ris_meta_operator(float(parts[0]), float(parts[1]))[0]
+    raise ValueError("Could not evaluate expression with any available method")
+
+
+def bench_router(args):
+    """Auto-mode parse attempts: the old try-each-engine chain vs the syntax router."""
+    import safe_eval as safe_eval_module
+    from ui import calculator_cli as cli
+
+    corpus = build_router_corpus(random.Random(args.seed), args.expressions)
+    engines = ("safe_eval", "parse_uml", "convert_standard_to_uml")
+    originals = {name: getattr(cli, name) for name in engines}
+    counts = dict.fromkeys(engines, 0)
+    print(f"=== Auto mode over {len(corpus)} mixed expressions ({len({e for _, e in corpus})} distinct) ===")
+    print(f"  {'method':<18}{'parses':>8}{'wasted':>8}{'cold ms':>10}{'warm ms':>10}")
+    results = {}
+    try:
+        for name in engines:
+            setattr(cli, name, _counting(originals[name], counts, name))
+        for label, run in (("try each engine", lambda expr: _chained_auto(cli, expr)),
+                           ("syntax router", lambda expr: cli.evaluate_expression(expr)[0])):
+            cli.route_expression.cache_clear()
+            safe_eval_module.clear_cache()
+            counts.update(dict.fromkeys(engines, 0))
+            # one parse per expression yields its result; any further ones were wasted
+            parses = wasted = 0
+            start = time.perf_counter()
+            results[label] = []
+            for _, expr in corpus:
+                results[label].append(run(expr))
+                calls = sum(counts.values()) - parses
+                parses += calls
+                wasted += max(calls - 1, 0)
+            cold_s = time.perf_counter() - start
+            start = time.perf_counter()
+            for _, expr in corpus:
+                run(expr)
+            warm_s = time.perf_counter() - start
+            print(
+                f"  {label:<18}{parses:>8}{wasted:>8}"
+                f"{cold_s / len(corpus) * 1000:>10.4f}{warm_s / len(corpus) * 1000:>10.4f}"
+            )
+    finally:
+        for name, func in originals.items():
+            setattr(cli, name, func)
+
+    changed = {}
+    for (kind, expr), old, new in zip(corpus, results["try each engine"], results["syntax router"]):
+        if repr(old) != repr(new):
+            if kind in ("uml", "symbol"):
+                print(f"  MISMATCH for {expr!r}: {old!r} != {new!r}")
+                return 1
+            changed[expr] = (old, new)
+    for expr, (old, new) in sorted(changed.items()):
+        print(f"  {expr!r}: {old!r} -> {new!r} (previously returned unevaluated)")
+    return 0
+
+
+def build_standard_expression(rng, operators, names=True):
+    """Standard-notation expression with about operators binary operators, nested in parentheses."""
+    def operand():
+        choice = rng.random()
+        if choice < 0.1:
+            return "-" + str(rng.randint(1, 99))
+        if names and choice < 0.2:
+            return rng.choice(["x", "y", "rate", "pi"])
+        return str(rng.randint(1, 99))
+
+    parts = [operand()]
+    depth = 0
+    for _ in range(operators):
+        op = rng.choice(["+", "-", "*", "/", "%", "+", "-", "*"])
+        if rng.random() < 0.05:
+            parts.append(f"^{rng.randint(1, 3)}")
+        if depth and rng.random() < 0.1:
+            parts.append(")")
+            depth -= 1
+        parts.append(f" {op} ")
+        if rng.random() < 0.1:
+            parts.append("(")
+            depth += 1
+        parts.append(operand())
+    parts.append(")" * depth)
+    return "".join(parts)
+
+
+def bench_convert(args):
+    """Shunting-yard standard-to-UML conversion throughput by expression size."""
+    import math
+    from core.converters import convert_standard_to_uml
+    from core.uml_core import eval_uml, parse_uml
+    from safe_eval import safe_eval
+
+    rng = random.Random(args.seed)
+    # Round trip a small expression first: numbers only, so safe_eval can check it
+    sample = build_standard_expression(rng, 100, names=False)
+    expected = safe_eval(sample.replace("^", "**"))
+    got = eval_uml(parse_uml(convert_standard_to_uml(sample)))
+    if not math.isclose(got, expected, rel_tol=1e-9, abs_tol=1e-9):
+        print(f"  MISMATCH on round trip: {got!r} != {expected!r}")
+        return 1
+
+    print("=== Standard to UML conversion ===")
+    print(f"  {'operators':>10}{'chars':>10}{'ms':>10}{'us/operator':>13}")
+    for operators in args.operators:
+        expression = build_standard_expression(rng, operators)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            convert_standard_to_uml(expression)
+            best = min(best, time.perf_counter() - start)
+        print(f"  {operators:>10}{len(expression):>10}{best * 1000:>10.2f}{best / operators * 1e6:>13.3f}")
+    return 0
+
+
+STATS_EXPRESSIONS = ["[1,2,3]", "<2,{5,1}>", "@(2,3)", "<>8,2<>", "RIS(6,3)", "[1,<2,{5,1}>]"]
+
+
+def _stats_workloads(args):
+    """(name, run(engine)) pairs: many short expressions, and one deep tree."""
+    chain = build_operation_chain(args.depth)
+
+    def expressions(engine):
+        for _ in range(args.expressions // len(STATS_EXPRESSIONS)):
+            for expression in STATS_EXPRESSIONS:
+                engine.execute_operation(engine.parse_expression(expression))
+        engine.query_expression_history(STATS_EXPRESSIONS[0])
+
+    def deep_tree(engine):
+        engine.execute_operation(chain)
+
+    return [("expressions", expressions), (f"chain {args.depth}", deep_tree)]
+
+
+def bench_stats(args):
+    """SymbolicEngine time with stats collection off vs on, against an overhead budget."""
+    logging.getLogger("UMLSymbolicEngine").setLevel(logging.WARNING)
+    print(f"=== Engine stats overhead ({args.repeat} paired runs, budget {args.budget_pct:.1f}%) ===")
+    print(f"  {'workload':<16}{'off ms':>10}{'on ms':>10}{'overhead':>10}")
+    status = 0
+    for name, run in _stats_workloads(args):
+        ratios = []
+        best = {False: float("inf"), True: float("inf")}
+        for i in range(args.repeat):
+            # Back to back, alternating which goes first, each on a fresh memory
+            # store so both see the same store sizes
+            elapsed = {}
+            for collect in ((False, True) if i % 2 else (True, False)):
+                with tempfile.TemporaryDirectory() as memory_path:
+                    engine = SymbolicEngine(memory_path=memory_path, collect_stats=collect)
+                    # JSON store rewrites cost the same either way and dwarf the
+                    # engine's own work: keep them out of the comparison
+                    engine.memory.autosave = False
+                    gc.collect()
+                    start = time.perf_counter()
+                    run(engine)
+                    elapsed[collect] = time.perf_counter() - start
+            ratios.append(elapsed[True] / elapsed[False])
+            for collect, seconds in elapsed.items():
+                best[collect] = min(best[collect], seconds)
+        # The median paired ratio, as machine load drifts more between pairs
+        # than within one
+        overhead = (sorted(ratios)[len(ratios) // 2] - 1) * 100
+        over = overhead > args.budget_pct
+        print(
+            f"  {name:<16}{best[False] * 1000:>10.2f}{best[True] * 1000:>10.2f}"
+            f"{overhead:>9.2f}%{'  OVER BUDGET' if over else ''}"
+        )
+        status |= over
+    return int(status)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UML Calculator benchmarks")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    nodes = sub.add_parser("nodes", help="SymbolicOperation bytes per node")
+    nodes.add_argument("--nodes", type=int, default=1_000_000)
+    nodes.set_defaults(func=bench_nodes)
+
+    depth = sub.add_parser("depth", help="Iterative vs recursive deep-tree evaluation")
+    depth.add_argument("--depths", type=int, nargs="+", default=[10, 1_000, 100_000])
+    depth.add_argument("--text-depths", type=int, nargs="+", default=[10, 1_000, 100_000])
+    depth.add_argument("--repeat", type=int, default=5)
+    depth.set_defaults(func=bench_depth)
+
+    egraph = sub.add_parser("egraph", help="E-graph simplification by expression size")
+    egraph.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64, 256])
+    egraph.add_argument("--count", type=int, default=20)
+    egraph.add_argument("--max-nodes", type=int, default=10_000)
+    egraph.add_argument("--time-limit", type=float, default=0.5)
+    egraph.add_argument("--seed", type=int, default=0)
+    egraph.set_defaults(func=bench_egraph)
+
+    plot = sub.add_parser("plot", help="Compiled vs per-point plot data generation")
+    plot.add_argument("--points", type=int, default=1_000_000)
+    plot.add_argument("--reference-points", type=int, default=500)
+    plot.add_argument("--repeat", type=int, default=3)
+    plot.add_argument("--expressions", nargs="+",
+                      default=["3*x^2 - 5*x + 2", "RIS(x,2) + 5", "RIS(sin(x)*10, 3) + x", "sqrt(x)"])
+    plot.set_defaults(func=bench_plot)
+
+    startup = sub.add_parser("startup", help="CLI cold start time and heaviest imports")
+    startup.add_argument("--runs", type=int, default=7)
+    startup.add_argument("--budget-ms", type=float, default=150.0)
+    startup.add_argument("--top", type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+
+    typing = sub.add_parser("typing", help="Incremental live-preview parsing per keystroke")
+    typing.add_argument("--length", type=int, default=1000)
+    typing.add_argument("--repeat", type=int, default=3)
+    typing.add_argument("--seed", type=int, default=0)
+    typing.set_defaults(func=bench_typing)
+
+    router = sub.add_parser("router", help="Auto-mode parse attempts: engine chain vs syntax router")
+    router.add_argument("--expressions", type=int, default=2000)
+    router.add_argument("--seed", type=int, default=0)
+    router.set_defaults(func=bench_router)
+
+    convert = sub.add_parser("convert", help="Standard-to-UML conversion throughput by size")
+    convert.add_argument("--operators", type=int, nargs="+", default=[1000, 10000, 100000])
+    convert.add_argument("--repeat", type=int, default=3)
+    convert.add_argument("--seed", type=int, default=0)
+    convert.set_defaults(func=bench_convert)
+
+    stats = sub.add_parser("stats", help="SymbolicEngine overhead of stats collection")
+    stats.add_argument("--expressions", type=int, default=300)
+    stats.add_argument("--depth", type=int, default=2_000)
+    stats.add_argument("--repeat", type=int, default=101)
+    stats.add_argument("--budget-pct", type=float, default=2.0)
+    stats.set_defaults(func=bench_stats)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Plain arithmetic without sympy for UML Calculator
+
+The CLIs evaluate most input with core.symbolic, which needs sympy (a few
+hundred milliseconds to import). Expressions made only of integers, + - * /,
+integer powers and parentheses are evaluated here instead. Like sympy, the
+arithmetic is exact (integers and rationals) and only the final result is
+rounded to a float, so results are identical.
+
+Anything else (decimals, names, RIS calls, implicit multiplication, division
+by zero, overflow) returns None and the caller falls back to sympy. Decimals
+are excluded because sympy reorders Float operations, so its rounding
+cannot be reproduced exactly.
+"""
+import ast
+import re
+import sys
+from fractions import Fraction
+
+# Characters plain arithmetic can contain; anything else goes to sympy
+_ARITHMETIC_CHARS = re.compile(r"^[0-9+\-*/^() \t]+$")
+# Powers whose exact result would be larger than this are left to sympy
+_MAX_POWER_BITS = 100000
+
+_BINARY = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+}
+
+
+class _NotArithmetic(Exception):
+    """Raised when an expression needs sympy."""
+
+
+def _number(node):
+    # Python 3.7 parses numbers as ast.Num, holding the value in .n
+    if sys.version_info < (3, 8) and isinstance(node, ast.Num) and type(node.n) is int:
+        return node.n
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _number(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if not isinstance(node, ast.BinOp):
+        raise _NotArithmetic()
+
+    left, right = _number(node.left), _number(node.right)
+    op = type(node.op)
+    if op in _BINARY:
+        return _BINARY[op](left, right)
+    if op is ast.Div:
+        if right == 0:
+            raise _NotArithmetic()
+        # Quotients stay exact, like sympy Rationals
+        return Fraction(left) / Fraction(right)
+    if op is ast.Pow:
+        # Fractional exponents give irrational results; leave them to sympy
+        if not isinstance(right, int):
+            raise _NotArithmetic()
+        base = Fraction(left)
+        bits = max(base.numerator.bit_length(), base.denominator.bit_length())
+        if bits * abs(right) > _MAX_POWER_BITS:
+            raise _NotArithmetic()
+        if right < 0:
+            if left == 0:
+                raise _NotArithmetic()
+            return Fraction(left) ** right
+        return left ** right
+    raise _NotArithmetic()
+
+
+def evaluate_arithmetic(expr_str):
+    """
+    Evaluate a plain arithmetic expression as a float.
+
+    Args:
+        expr_str: Expression such as "2+2" or "(3^2 - 1)/4"
+
+    Returns:
+        float result, or None when the expression needs core.symbolic
+    """
+    if not _ARITHMETIC_CHARS.match(expr_str):
+        return None
+    try:
+        tree = ast.parse(expr_str.replace("^", "**").strip(), mode="eval")
+        return float(_number(tree.body))
+    except (_NotArithmetic, SyntaxError, OverflowError, ValueError, MemoryError):
+        return None
@@ -1,65 +1,233 @@
 """
 Enhanced Standard to UML Conversion Module
 Provides functions to convert standard arithmetic expressions to UML notation.
+
+Conversion is a single tokenizing pass plus a shunting-yard parse, so it
+takes time linear in the length of the expression and always terminates:
+text it cannot read raises ValueError instead of being rewritten again.
 """
 
 import re
-from typing import Union, Dict, Any
+from typing import List, Tuple, Union
+
+# number | identifier | operator or punctuation, each after optional whitespace
+_TOKEN = re.compile(
+    r"\s*(?:((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\*\*|[-+*/%^(),]))"
+)
+_TRAILING_SPACE = re.compile(r"\s*\Z")
+
+# Binary operators: (precedence, right-associative, node kind)
+_BINARY = {
+    "+": (1, False, "add"),
+    "-": (1, False, "sub"),
+    "*": (2, False, "mul"),
+    "/": (2, False, "div"),
+    "%": (2, False, "mod"),
+    "^": (4, True, "pow"),
+}
+# Unary minus binds tighter than * but looser than ^: -2^2 is -(2^2)
+_NEGATE_PRECEDENCE = 3
+
+# UML delimiters around each node kind's comma-separated operands
+_FORMS = {
+    "add": ("[", "]"),
+    "sub": ("{", "}"),
+    "mul": ("<", ">"),
+    "div": ("<>", "<>"),
+    "pow": ("@(", ")"),
+    "mod": ("@(", ",mod)"),
+    "neg": ("{0,", "}"),
+}
+# Left-associative chains that UML writes as one n-ary group: 1+2+3 is [1,2,3]
+_CHAINED = ("add", "sub", "mul")
+
+Node = Union[str, Tuple]
+
+
+def _tokenize(expr: str) -> List[Tuple[str, str, int]]:
+    """Split expr into (kind, text, position) tokens, kind being number, name or op."""
+    tokens = []
+    position = 0
+    end = _TRAILING_SPACE.search(expr).start()
+    while position < end:
+        match = _TOKEN.match(expr, position)
+        if match is None:
+            raise ValueError(f"Unexpected character {expr[position]!r} at position {position}")
+        number, name, op = match.groups()
+        start = match.start(match.lastindex)
+        if number is not None:
+            tokens.append(("number", number, start))
+        elif name is not None:
+            tokens.append(("name", name, start))
+        else:
+            tokens.append(("op", "^" if op == "**" else op, start))
+        position = match.end()
+    return tokens
+
+
+def _combine(kind: str, left: Node, right: Node) -> Node:
+    """Build a binary node, extending a chain of the same left-associative operator."""
+    if kind in _CHAINED and isinstance(left, tuple) and left[0] == kind:
+        left[1].append(right)
+        return left
+    return (kind, [left, right])
+
+
+def _parse(tokens: List[Tuple[str, str, int]]) -> Node:
+    """
+    Shunting-yard parse of tokens into a tree of (kind, operands) tuples
+
+    Leaves are the number and identifier strings; calls are
+    ("call", operands, name). Every token is pushed and popped at most once.
+    """
+    output: List[Node] = []
+    # Operator stack entries: ("binary", op), ("neg",), ("paren",) or ("call", name, argument count)
+    stack: List[Tuple] = []
+    expect_operand = True
+
+    def reduce(entry):
+        if entry[0] == "neg":
+            operand = output.pop()
+            if isinstance(operand, str) and (operand[0].isdigit() or operand[0] == "."):
+                output.append("-" + operand)
+            else:
+                output.append(("neg", [operand]))
+        else:
+            right = output.pop()
+            output.append(_combine(_BINARY[entry[1]][2], output.pop(), right))
+
+    def close_group(text, position):
+        while stack and stack[-1][0] not in ("paren", "call"):
+            reduce(stack.pop())
+        if not stack or text == "," and stack[-1][0] != "call":
+            raise ValueError(f"Unexpected {text!r} at position {position}")
+
+    index = 0
+    while index < len(tokens):
+        kind, text, position = tokens[index]
+        index += 1
+        if expect_operand:
+            if kind == "number":
+                output.append(text)
+                expect_operand = False
+            elif kind == "name":
+                if index < len(tokens) and tokens[index][1] == "(":
+                    index += 1
+                    if index < len(tokens) and tokens[index][1] == ")":
+                        # f() takes no arguments
+                        index += 1
+                        output.append(("call", [], text))
+                        expect_operand = False
+                    else:
+                        stack.append(("call", text, 0))
+                else:
+                    output.append(text)
+                    expect_operand = False
+            elif text == "(":
+                stack.append(("paren",))
+            elif text == "-":
+                stack.append(("neg",))
+            elif text == "+":
+                pass
+            else:
+                raise ValueError(f"Expected a number, name or '(' at position {position}, got {text!r}")
+            continue
+
+        if kind != "op" or text == "(":
+            raise ValueError(f"Expected an operator at position {position}, got {text!r}")
+        if text in _BINARY:
+            precedence, right_associative, _ = _BINARY[text]
+            while stack:
+                top = stack[-1]
+                if top[0] == "neg":
+                    top_precedence = _NEGATE_PRECEDENCE
+                elif top[0] == "binary":
+                    top_precedence = _BINARY[top[1]][0]
+                else:
+                    break
+                if top_precedence < precedence or (top_precedence == precedence and right_associative):
+                    break
+                reduce(stack.pop())
+            stack.append(("binary", text))
+            expect_operand = True
+        elif text == ",":
+            close_group(text, position)
+            _, name, count = stack.pop()
+            stack.append(("call", name, count + 1))
+            expect_operand = True
+        else:
+            close_group(text, position)
+            entry = stack.pop()
+            if entry[0] == "call":
+                count = entry[2] + 1
+                arguments = output[-count:]
+                del output[-count:]
+                output.append(("call", arguments, entry[1]))
+
+    if expect_operand:
+        raise ValueError("Expression ends with an operator" if tokens else "Empty expression")
+    while stack:
+        entry = stack.pop()
+        if entry[0] in ("paren", "call"):
+            raise ValueError("Unmatched '('")
+        reduce(entry)
+    return output[0]
+
+
+def _render(tree: Node) -> str:
+    """Write a parsed tree in UML notation, without recursion."""
+    parts = []
+    pending: List[Node] = [tree]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        kind, operands = item[0], item[1]
+        if kind == "call":
+            opening, closing = item[2] + "(", ")"
+        else:
+            opening, closing = _FORMS[kind]
+        parts.append(opening)
+        pending.append(closing)
+        for i in range(len(operands) - 1, -1, -1):
+            pending.append(operands[i])
+            if i:
+                pending.append(",")
+    return "".join(parts)
+
 
 def convert_standard_to_uml(expr: str) -> str:
     """
     Convert standard arithmetic expressions to UML notation.
-    Enhanced with better handling of operators and nested expressions.
-    
+    Honors precedence, left associativity (right for ^), unary minus,
+    identifiers and function calls.
+
     Examples:
     - "2+3" becomes "[2,3]" (addition)
     - "6-2" becomes "{6,2}" (subtraction)
     - "4*5" becomes "<4,5>" (multiplication)
     - "8/2" becomes "<>8,2<>" (division)
     - "2+3*4" becomes "[2,<3,4>]" (respecting PEMDAS)
-    
+    - "a-b-c" becomes "{a,b,c}" (left to right)
+    - "x^2" or "x**2" becomes "@(x,2)" (power)
+    - "10%3" becomes "@(10,3,mod)" (modulo)
+    - "-x" becomes "{0,x}" and "-2" stays "-2"
+
     Args:
         expr (str): Standard arithmetic expression
-        
+
     Returns:
         str: Equivalent UML notation
+
+    Raises:
+        ValueError: If expr is not a well-formed arithmetic expression
     """
     # Handle already-UML notation
     if any(c in expr for c in "[]{}@<>!"):
         return expr
 
-    # Remove spaces
-    expr = expr.replace(" ", "")
-    
-    # Parentheses handling (recursive conversion)
-    while "(" in expr:
-        # Handle parentheses recursively
-        expr = re.sub(r'\(([^()]+)\)',
-                     lambda m: convert_standard_to_uml(m.group(1)), 
-                     expr)
-    
-    # Handle operators with proper precedence
-    # Order: ^ (power), * and / (same level), + and - (same level)
-    
-    # 1. Handle power ^
-    while "^" in expr:
-        expr = re.sub(r'(-?\d+(\.\d+)?)\^(-?\d+(\.\d+)?)', r'@(\1,\3)', expr)
-    
-    # 2. Handle multiplication and division
-    while re.search(r'[*/]', expr):
-        # Handle multiplication
-        expr = re.sub(r'(-?\d+(\.\d+)?)\*(-?\d+(\.\d+)?)', r'<\1,\3>', expr)
-        # Handle division
-        expr = re.sub(r'(-?\d+(\.\d+)?)/(-?\d+(\.\d+)?)', r'<>\1,\3<>', expr)
-    
-    # 3. Handle addition and subtraction
-    while re.search(r'[+\-]', expr):
-        # Handle addition
-        expr = re.sub(r'(-?\d+(\.\d+)?)\+(-?\d+(\.\d+)?)', r'[\1,\3]', expr)
-        # Handle subtraction
-        expr = re.sub(r'(-?\d+(\.\d+)?)-(-?\d+(\.\d+)?)', r'{\1,\3}', expr)
-    
-    return expr
+    return _render(_parse(_tokenize(expr)))
 
 # Test cases
 if __name__ == "__main__":
@@ -71,11 +239,13 @@ if __name__ == "__main__":
         "2+3*4",  # Should respect precedence: 2+12 = 14
         "(2+3)*4", # Should be 20
         "2^3",    # Should be @(2,3)
-        "10%3",   # Modulo not directly supported
-        "1+2+3",  # Should be [1,[2,3]] or similar
-        "2*(3+4)" # Should respect parentheses
+        "10%3",   # Should be @(10,3,mod)
+        "1+2+3",  # Should be [1,2,3]
+        "2*(3+4)", # Should respect parentheses
+        "a-b-c",  # Should be {a,b,c}
+        "-x^2",   # Should be {0,@(x,2)}
     ]
-    
+
     for test in test_cases:
         uml = convert_standard_to_uml(test)
         print(f"{test} → {uml}")
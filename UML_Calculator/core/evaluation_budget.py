@@ -0,0 +1,410 @@
+"""
+Evaluation budgets for UML Calculator
+
+One expression such as 9**9**9, factorial(10**7) or a deeply nested [...]
+can keep a CPU busy for minutes. An EvaluationBudget limits how much work a
+single evaluation may do:
+
+    max_int_bits   bit length of an integer result, checked before the
+                   power, product or factorial is computed
+    max_length     length of a repeated string or list ('ab' * n)
+    max_nodes      number of nodes in the parsed expression
+    max_depth      nesting depth of the parsed expression, and of the
+                   brackets in its text before it is parsed
+    time_limit     wall-clock seconds, checked between operations
+
+None means no limit. Going over any of them raises EvaluationBudgetExceeded.
+Sizes are checked before evaluation starts and the deadline while it runs: a
+single big-integer operation cannot be interrupted, which is what the size
+limits are for.
+
+The active budget is held in a context variable. Front ends set theirs
+around each evaluation:
+
+    with budget_scope(frontend="gui"):
+        result = safe_eval(expression)
+
+safe_eval, both eval_uml functions and the symbolic extensions also take a
+budget= argument for a single call. Outside any scope DEFAULT_BUDGET applies,
+which only limits integer and sequence sizes. Threads do not inherit the
+scope of the code that started them: open the scope inside the worker.
+"""
+import ast
+import contextlib
+import contextvars
+import math
+import sys
+import time
+from collections import namedtuple
+from typing import Callable, Iterable, Optional, Tuple
+
+EvaluationBudget = namedtuple(
+    "EvaluationBudget",
+    ["max_int_bits", "max_length", "max_nodes", "max_depth", "time_limit"],
+    defaults=(None, None, None, None, None),
+)
+EvaluationBudget.__doc__ = """Limits for one evaluation; None means unlimited (see the module docstring)."""
+
+# Library calls outside any budget_scope: only the limits no caller relies on
+# exceeding (about 300,000 digits, and ten million items)
+DEFAULT_BUDGET = EvaluationBudget(max_int_bits=1_000_000, max_length=10_000_000)
+
+FRONTEND_BUDGETS = {
+    # Interactive terminal use: generous, the user can always press Ctrl+C
+    "cli": EvaluationBudget(max_int_bits=1_000_000, max_length=10_000_000,
+                            max_nodes=1_000_000, max_depth=100_000, time_limit=60.0),
+    # Matches the GUI's background evaluation timeout
+    "gui": EvaluationBudget(max_int_bits=200_000, max_length=1_000_000,
+                            max_nodes=100_000, max_depth=10_000, time_limit=10.0),
+    # Shared service: keep every request well inside the latency target
+    "web": EvaluationBudget(max_int_bits=20_000, max_length=100_000,
+                            max_nodes=10_000, max_depth=200, time_limit=1.0),
+}
+
+# Loop iterations between deadline checks in evaluation loops
+CHECK_INTERVAL = 1024
+
+# log2 of the golden ratio: fibonacci(n) has about n * _LOG2_PHI bits
+_LOG2_PHI = math.log2((1 + math.sqrt(5)) / 2)
+# Larger integers are not converted to float by the size estimates
+_FLOAT_SAFE_BITS = 512
+# Machine-size integer arithmetic is too cheap to check: guarded_pow and
+# guarded_mul skip results this small, so budgets below it do not apply
+_UNCHECKED_BITS = 64
+
+_DESCRIPTIONS = {
+    "max_int_bits": "integer of {value} bits",
+    "max_length": "sequence of length {value}",
+    "max_nodes": "{value} expression nodes",
+    "max_depth": "nesting depth {value}",
+    "time_limit": "{value:.2f} s elapsed",
+}
+
+
+class EvaluationBudgetExceeded(Exception):
+    """
+    Raised when an evaluation would exceed its budget
+
+    Attributes:
+        limit: The EvaluationBudget field that was exceeded
+        value: The size (or elapsed time) that exceeded it
+        maximum: The limit itself
+    """
+
+    def __init__(self, limit: str, value, maximum):
+        shown = value
+        if isinstance(value, int) and value.bit_length() > 64:
+            # Estimates for hopeless expressions can be astronomically large
+            shown = f"about 2**{value.bit_length() - 1}"
+        description = _DESCRIPTIONS[limit].format(value=shown)
+        super().__init__(f"Evaluation budget exceeded: {description} (limit {maximum})")
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+
+
+class _Meter:
+    __slots__ = ("budget", "started", "deadline", "time_limit")
+
+    def __init__(self, budget, outer):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.time_limit = budget.time_limit
+        self.deadline = self.started + budget.time_limit if budget.time_limit is not None else None
+        # A nested scope never extends the deadline it runs under
+        if outer is not None and outer.deadline is not None and (
+                self.deadline is None or outer.deadline < self.deadline):
+            self.started, self.deadline, self.time_limit = outer.started, outer.deadline, outer.time_limit
+
+
+_active: contextvars.ContextVar = contextvars.ContextVar("uml_evaluation_budget", default=None)
+
+
+def current_budget() -> EvaluationBudget:
+    """The budget of the innermost active scope, or DEFAULT_BUDGET."""
+    meter = _active.get()
+    return DEFAULT_BUDGET if meter is None else meter.budget
+
+
+def budget_for(frontend: Optional[str] = None, budget: Optional[EvaluationBudget] = None,
+               **overrides) -> EvaluationBudget:
+    """
+    Resolve a budget: budget, else the front end's preset, else the current one
+
+    Keyword arguments replace individual limits, e.g. budget_for("cli", time_limit=5).
+
+    Raises:
+        ValueError: For an unknown front end or limit name
+    """
+    if budget is None:
+        if frontend is None:
+            budget = current_budget()
+        elif frontend in FRONTEND_BUDGETS:
+            budget = FRONTEND_BUDGETS[frontend]
+        else:
+            raise ValueError(f"Unknown front end: {frontend!r} (expected one of {', '.join(FRONTEND_BUDGETS)})")
+    return budget._replace(**overrides) if overrides else budget
+
+
+@contextlib.contextmanager
+def budget_scope(budget: Optional[EvaluationBudget] = None, frontend: Optional[str] = None, **overrides):
+    """
+    Make a budget active for the code inside the with block
+
+    Arguments are as for budget_for. The time limit starts when the block is
+    entered; inside another scope the earlier of the two deadlines applies.
+    """
+    budget = budget_for(frontend, budget, **overrides)
+    token = _active.set(_Meter(budget, _active.get()))
+    try:
+        yield budget
+    finally:
+        _active.reset(token)
+
+
+@contextlib.contextmanager
+def call_scope(budget: Optional[EvaluationBudget] = None):
+    """
+    Scope for one entry-point call taking budget=
+
+    A given budget gets its own scope. Otherwise the active scope is kept,
+    and outside any scope a new one starts the default time limit (if any).
+    """
+    if budget is None and (_active.get() is not None or DEFAULT_BUDGET.time_limit is None):
+        yield current_budget()
+        return
+    with budget_scope(budget) as active:
+        yield active
+
+
+def _check(limit: str, value, maximum) -> None:
+    if maximum is not None and value > maximum:
+        raise EvaluationBudgetExceeded(limit, value, maximum)
+
+
+def check_deadline() -> None:
+    """Raise if the active scope's time limit has passed."""
+    meter = _active.get()
+    if meter is not None and meter.deadline is not None:
+        now = time.monotonic()
+        if now > meter.deadline:
+            raise EvaluationBudgetExceeded("time_limit", now - meter.started, meter.time_limit)
+
+
+def check_int_bits(bits: int, budget: Optional[EvaluationBudget] = None) -> None:
+    """Raise if an integer of this many bits is over budget."""
+    _check("max_int_bits", bits, (budget or current_budget()).max_int_bits)
+
+
+def check_length(length: int, budget: Optional[EvaluationBudget] = None) -> None:
+    """Raise if a sequence of this length is over budget."""
+    _check("max_length", length, (budget or current_budget()).max_length)
+
+
+def check_size(nodes: int, depth: int, budget: Optional[EvaluationBudget] = None) -> None:
+    """Raise if a tree of this many nodes, or this deep, is over budget."""
+    budget = budget or current_budget()
+    _check("max_nodes", nodes, budget.max_nodes)
+    _check("max_depth", depth, budget.max_depth)
+
+
+def check_nesting(text: str, budget: Optional[EvaluationBudget] = None) -> None:
+    """
+    Raise if the brackets in an expression's text nest deeper than max_depth
+
+    A bracket-counting pre-scan, so deep input is rejected before it is
+    parsed. Every bracket level is counted, plus one for the innermost
+    operands, even where the parser folds a single-operand group away.
+    """
+    max_depth = (budget or current_budget()).max_depth
+    if max_depth is None:
+        return
+    depth = 0
+    for char in text:
+        if char in "([{<":
+            depth += 1
+            if depth >= max_depth:
+                raise EvaluationBudgetExceeded("max_depth", depth + 1, max_depth)
+        elif char in ")]}>":
+            depth -= 1
+
+
+def measure_tree(root, children: Callable[[object], Iterable]) -> Tuple[int, int]:
+    """(node count, depth) of a tree, without recursion"""
+    nodes = depth = 0
+    stack = [(root, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        if level > depth:
+            depth = level
+        stack.extend((child, level + 1) for child in children(node))
+    return nodes, depth
+
+
+def check_tree(root, children: Callable[[object], Iterable], budget: Optional[EvaluationBudget] = None) -> None:
+    """
+    Raise if a parsed expression has too many nodes or is too deep
+
+    Stops walking as soon as a limit is crossed.
+    """
+    budget = budget or current_budget()
+    max_nodes, max_depth = budget.max_nodes, budget.max_depth
+    if max_nodes is None and max_depth is None:
+        return
+    nodes = 0
+    stack = [(root, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        _check("max_nodes", nodes, max_nodes)
+        _check("max_depth", level, max_depth)
+        stack.extend((child, level + 1) for child in children(node))
+
+
+# --- integer size estimates ---
+
+def pow_bits(base: int, exponent: int) -> int:
+    """Bit length of base ** exponent for integers, exponent >= 0"""
+    magnitude = abs(base)
+    if magnitude <= 1 or exponent == 0:
+        return 1
+    if exponent.bit_length() > _FLOAT_SAFE_BITS:
+        # Far over any budget; a lower bound avoids float overflow
+        return exponent * (magnitude.bit_length() - 1) + 1
+    return int(exponent * math.log2(magnitude)) + 1
+
+
+def factorial_bits(n: int) -> int:
+    """Bit length of n! (to within one bit)"""
+    if n.bit_length() > _FLOAT_SAFE_BITS:
+        return n
+    return int(math.lgamma(n + 1) / math.log(2)) + 1 if n > 1 else 1
+
+
+def fibonacci_bits(n: int) -> int:
+    """Bit length of the n-th Fibonacci number (to within one bit)"""
+    if n.bit_length() > _FLOAT_SAFE_BITS:
+        return n // 2
+    return int(n * _LOG2_PHI) + 1 if n > 0 else 1
+
+
+def guarded_pow(base, exp, mod=None):
+    """pow() that checks the size of an integer result before computing it"""
+    if mod is None and isinstance(base, int) and isinstance(exp, int) and exp > 1:
+        if base.bit_length() * exp > _UNCHECKED_BITS:
+            check_int_bits(pow_bits(base, exp))
+            check_deadline()
+    return pow(base, exp) if mod is None else pow(base, exp, mod)
+
+
+def guarded_mul(left, right):
+    """left * right, checking integer size and sequence repetition first"""
+    if isinstance(left, int):
+        if isinstance(right, int):
+            bits = left.bit_length() + right.bit_length()
+            if bits > _UNCHECKED_BITS:
+                check_int_bits(bits)
+                check_deadline()
+        elif isinstance(right, (str, bytes, list, tuple)):
+            check_length(len(right) * left)
+            check_deadline()
+    elif isinstance(right, int) and isinstance(left, (str, bytes, list, tuple)):
+        check_length(len(left) * right)
+        check_deadline()
+    return left * right
+
+
+# --- static checks on expression source ---
+
+# Functions whose integer result size is known from the argument
+_CALL_BITS = {"factorial": factorial_bits, "fibonacci": fibonacci_bits}
+
+
+def _int_literal(node: ast.AST) -> Optional[int]:
+    """The value of an integer literal node, else None"""
+    # Python 3.7 parses numbers as ast.Num, holding the value in .n
+    if sys.version_info < (3, 8) and isinstance(node, ast.Num):
+        value = node.n
+    elif isinstance(node, ast.Constant):
+        value = node.value
+    else:
+        return None
+    return value if isinstance(value, int) else None
+
+
+def _int_bits(node: ast.AST, budget: EvaluationBudget) -> Optional[int]:
+    """
+    Upper bound on the bit length of an integer-valued node
+
+    Every bound found is checked against the budget on the way up; None
+    means no bound is known (names, floats, other calls).
+    """
+    value = _int_literal(node)
+    if value is not None:
+        return abs(value).bit_length()
+    if isinstance(node, ast.UnaryOp):
+        return _int_bits(node.operand, budget)
+    if isinstance(node, ast.BinOp):
+        left = _int_bits(node.left, budget)
+        right = _int_bits(node.right, budget)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            bits = max(left, right) + 1
+        elif isinstance(node.op, ast.Mult):
+            bits = left + right
+        elif isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            bits = max(left, right)
+        elif isinstance(node.op, ast.Pow):
+            exponent = _constant(node.right, (1 << right) - 1)
+            base = _constant(node.left, None)
+            bits = pow_bits(base, exponent) if base is not None else left * exponent
+        else:
+            return None
+        check_int_bits(bits, budget)
+        return bits
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _CALL_BITS and len(node.args) == 1 and not node.keywords):
+        argument = _int_bits(node.args[0], budget)
+        if argument is None:
+            return None
+        bits = _CALL_BITS[node.func.id](_constant(node.args[0], (1 << argument) - 1))
+        check_int_bits(bits, budget)
+        return bits
+    for child in ast.iter_child_nodes(node):
+        _int_bits(child, budget)
+    return None
+
+
+def _constant(node: ast.AST, bound: Optional[int]) -> Optional[int]:
+    """abs() of an integer constant node, else bound"""
+    if isinstance(node, ast.UnaryOp):
+        node = node.operand
+    value = _int_literal(node)
+    return abs(value) if value is not None else bound
+
+
+def check_source(expression: str, budget: Optional[EvaluationBudget] = None) -> None:
+    """
+    Check Python-syntax expression source against the budget without running it
+
+    For evaluators that cannot be interrupted once they start, such as
+    sympy's parser, which computes integer powers eagerly. The size of the
+    syntax tree is checked, and integer powers, products, factorial(n) and
+    fibonacci(n) of constants are bounded. Source that is not valid Python
+    (implicit multiplication, 5!) is left to the evaluator.
+    """
+    budget = budget or current_budget()
+    if budget.max_int_bits is None and budget.max_nodes is None and budget.max_depth is None:
+        return
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except (SyntaxError, ValueError, MemoryError, RecursionError):
+        return
+    check_tree(tree, ast.iter_child_nodes, budget)
+    if budget.max_int_bits is not None:
+        try:
+            _int_bits(tree.body, budget)
+        except RecursionError:
+            pass
@@ -0,0 +1,364 @@
+"""
+Incremental UML parsing for live previews
+
+IncrementalParser follows the parse_uml grammar, but keeps every parsed
+sub-expression keyed by its span in the text. After an edit only the
+changed region is re-lexed, the spans before the edit are kept, the spans
+after it are shifted, and only the groups that contain the edit are parsed
+again. Unchanged bracket groups keep their tree (and evaluated value), so a
+keystroke costs roughly the size of the groups around the cursor rather
+than the whole expression.
+
+Trees are shared between successive parses: treat them as read-only.
+
+Errors carry the span they belong to, for highlighting:
+
+    parser = IncrementalParser()
+    preview = parser.preview("[2,<3,4>]")   # Preview(value=14.0, ...)
+    preview = parser.preview("[2,RIS(3)]")  # error "RIS expects 2 ...", start=3, end=9
+"""
+from bisect import bisect_left
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from core.uml_core import _apply_uml_node, _uml_children, letter_to_number
+
+# Characters that split_arguments tracks; everything else is opaque
+_STRUCTURAL = frozenset("[](){}<>,")
+# split_arguments keeps one depth counter per bracket kind; packing the four
+# counters into one integer (one 32-bit digit each) makes "all zero" a
+# single comparison
+_DEPTH_CHANGE = {"[": 1, "]": -1, "(": 1 << 32, ")": -(1 << 32),
+                 "<": 1 << 64, ">": -(1 << 64), "{": 1 << 96, "}": -(1 << 96)}
+# Fifth digit: "<>" division delimiters
+_DIVISION_DEPTH = 1 << 128
+# A "<>" after one of these (or at the start of an operand) opens a division
+_OPERAND_START = frozenset("[({<,")
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+# Cached spans allowed per character of text before the cache is reset
+_CACHE_SLACK = 8
+
+Preview = namedtuple("Preview", ["value", "error", "start", "end"])
+Preview.__doc__ = """Live preview: a value, or an error message with its span (start, end)."""
+
+
+class UMLSyntaxError(ValueError):
+    """A UML expression that cannot be parsed or evaluated, with its span."""
+
+    def __init__(self, message, start, end):
+        super().__init__(message)
+        self.start = start
+        self.end = end
+
+
+def _common_affixes(old: str, new: str) -> Tuple[int, int]:
+    """Lengths of the common prefix and (non-overlapping) suffix of old and new"""
+    limit = min(len(old), len(new))
+    low, high = 0, limit
+    # Binary search on slice equality keeps the comparisons in C
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = low
+    low, high = 0, limit - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return prefix, low
+
+
+class IncrementalParser:
+    """
+    parse_uml over an edited expression, reusing unchanged sub-trees
+
+    Args:
+        text: Initial expression
+    """
+
+    def __init__(self, text: str = ""):
+        self.text = ""
+        # Positions of the characters in _STRUCTURAL, and of '^'
+        self._marks: List[int] = []
+        self._carets: List[int] = []
+        # (start, end) of a stripped span -> parsed node
+        self._nodes: Dict[Tuple[int, int], Dict] = {}
+        # id(node) -> (node, value) for evaluated nodes still in _nodes
+        self._values: Dict[int, Tuple[Dict, object]] = {}
+        self._spans: Dict[int, Tuple[int, int]] = {}
+        self.stats = {"edits": 0, "parsed": 0, "reused": 0}
+        self.update(text)
+
+    # --- editing ---
+
+    def update(self, text: str) -> None:
+        """Replace the text, applying the difference as a single edit."""
+        if text == self.text:
+            return
+        prefix, suffix = _common_affixes(self.text, text)
+        self.edit(prefix, len(self.text) - suffix, text[prefix:len(text) - suffix])
+
+    def edit(self, start: int, end: int, replacement: str) -> None:
+        """Replace text[start:end] with replacement."""
+        delta = len(replacement) - (end - start)
+        self.text = self.text[:start] + replacement + self.text[end:]
+        self.stats["edits"] += 1
+
+        # Re-lex only the replacement; marks after the edit just move
+        def relex(marks, wanted):
+            head = marks[:bisect_left(marks, start)]
+            tail = marks[bisect_left(marks, end):]
+            head.extend(start + i for i, char in enumerate(replacement) if char in wanted)
+            head.extend(mark + delta for mark in tail)
+            return head
+
+        self._marks = relex(self._marks, _STRUCTURAL)
+        self._carets = relex(self._carets, "^")
+
+        # Spans clear of the edit keep their text, so their trees stay valid
+        nodes = {}
+        if len(self._nodes) <= _CACHE_SLACK * max(len(self.text), 128):
+            for (span_start, span_end), node in self._nodes.items():
+                if span_end <= start:
+                    nodes[(span_start, span_end)] = node
+                elif span_start >= end:
+                    nodes[(span_start + delta, span_end + delta)] = node
+        self._nodes = nodes
+        live = {id(node): key for key, node in nodes.items()}
+        self._values = {key: value for key, value in self._values.items() if key in live}
+        self._spans = live
+
+    # --- parsing ---
+
+    def parse(self) -> Dict:
+        """
+        Parse the current text
+
+        Returns the same tree as parse_uml(text).
+
+        Raises:
+            UMLSyntaxError: With the span of the innermost failing group
+        """
+        return self._parse(0, len(self.text))
+
+    def _parse(self, start: int, end: int) -> Dict:
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        key = (start, end)
+        node = self._nodes.get(key)
+        if node is not None:
+            self.stats["reused"] += 1
+            return node
+        try:
+            node = self._parse_span(start, end)
+        except UMLSyntaxError:
+            raise
+        except RecursionError:
+            raise UMLSyntaxError("Expression is nested too deeply", start, end) from None
+        except Exception as e:
+            raise UMLSyntaxError(str(e) or type(e).__name__, start, end) from e
+        self.stats["parsed"] += 1
+        self._nodes[key] = node
+        self._spans[id(node)] = key
+        return node
+
+    def _split(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """split_arguments on text[start:end], returning operand spans"""
+        if start >= end:
+            return []
+        text = self.text
+        depth = 0
+        spans = []
+        current = start
+        marks = self._marks
+        # End of the last "<>" and whether it opened a division
+        division_end, division_opened = -1, False
+        i, last = bisect_left(marks, start), bisect_left(marks, end)
+        while i < last:
+            position = marks[i]
+            char = text[position]
+            i += 1
+            if char == "<" and position + 1 < end and text[position + 1] == ">":
+                before = position - 1
+                while before >= start and text[before].isspace():
+                    before -= 1
+                if before < current:
+                    opens = True
+                elif before == division_end - 1:
+                    opens = division_opened
+                else:
+                    opens = text[before] in _OPERAND_START
+                depth += _DIVISION_DEPTH if opens else -_DIVISION_DEPTH
+                division_end, division_opened = position + 2, opens
+                i += 1
+            elif char != ",":
+                depth += _DEPTH_CHANGE[char]
+            elif not depth:
+                spans.append((current, position))
+                current = position + 1
+        if current < end:
+            spans.append((current, end))
+        return spans
+
+    def _operands(self, start: int, end: int, open_length: int, close_length: int,
+                  count: Optional[int] = None, name: str = ""):
+        """Operand spans of the group text[start:end] between its delimiters"""
+        spans = self._split(start + open_length, end - close_length)
+        if count is not None and len(spans) != count:
+            raise UMLSyntaxError(
+                f"{name} expects {count} operands, got {len(spans)}: {self.text[start:end]}", start, end
+            )
+        return spans
+
+    def _value_of(self, span: Tuple[int, int]):
+        node = self._parse(*span)
+        if node["type"] != "value":
+            raise UMLSyntaxError(f"Expected a value, got {node['type']}", *span)
+        return node["value"]
+
+    def _parse_span(self, start: int, end: int) -> Dict:
+        """One step of parse_uml on the stripped span text[start:end]"""
+        expression = self.text[start:end]
+        try:
+            if expression.lower() == "inf" or expression.lower() == "infinity":
+                return {"type": "value", "value": float('inf')}
+            elif expression.lower() == "nan":
+                return {"type": "value", "value": float('nan')}
+            value = float(expression)
+            return {"type": "value", "value": value}
+        except ValueError:
+            pass
+        if len(expression) == 1 and expression.isalpha():
+            return {"type": "value", "value": letter_to_number(expression)}
+        if expression.endswith(')'):
+            for prefix in ('sqrt(', 'sin(', 'cos('):
+                if expression.startswith(prefix):
+                    return {"type": prefix[:-1], "operand": self._parse(start + len(prefix), end - 1)}
+            if expression.startswith('RIS('):
+                spans = self._operands(start, end, 4, 1, 2, "RIS")
+                return {"type": "ris", "operands": [self._parse(*span) for span in spans]}
+        carets = self._carets
+        first = bisect_left(carets, start)
+        if first < len(carets) and carets[first] < end:
+            if first + 1 == len(carets) or carets[first + 1] >= end:
+                caret = carets[first]
+                return {"type": "power", "operands": [self._parse(start, caret), self._parse(caret + 1, end)]}
+        if expression.startswith('[') and expression.endswith(']'):
+            spans = self._operands(start, end, 1, 1)
+            if len(spans) == 1:
+                return {"type": "value", "value": self._value_of(spans[0])}
+            return {"type": "addition", "operands": [self._parse(*span) for span in spans]}
+        if expression.startswith('{') and expression.endswith('}'):
+            spans = self._operands(start, end, 1, 1)
+            if len(spans) == 1:
+                return {"type": "value", "value": self._value_of(spans[0])}
+            return {"type": "subtraction", "operands": [self._parse(*span) for span in spans]}
+        if expression.startswith('<') and expression.endswith('>') and not expression.startswith('<>'):
+            spans = self._operands(start, end, 1, 1)
+            return {"type": "multiplication", "operands": [self._parse(*span) for span in spans]}
+        if expression.startswith('<>') and expression.endswith('<>'):
+            spans = self._operands(start, end, 2, 2, 2, "Division")
+            return {"type": "division", "operands": [self._parse(*span) for span in spans]}
+        if expression.startswith('@(') and expression.endswith(')'):
+            spans = self._operands(start, end, 2, 1)
+            if len(spans) == 3 and self.text[spans[2][0]:spans[2][1]].strip() == "mod":
+                return {"type": "modulo", "operands": [self._parse(*span) for span in spans[:2]]}
+            spans = self._operands(start, end, 2, 1, 2, "Power")
+            return {"type": "power", "operands": [self._parse(*span) for span in spans]}
+        if expression.startswith('!(') and expression.endswith(')'):
+            spans = self._operands(start, end, 2, 1, 2, "Complex number")
+            return {"type": "value", "value": complex(self._value_of(spans[0]), self._value_of(spans[1]))}
+        return {"type": "symbol", "name": expression}
+
+    # --- evaluation ---
+
+    def evaluate(self):
+        """
+        Parse and evaluate the current text, like eval_uml(parse_uml(text))
+
+        Values of unchanged sub-trees are reused from the previous call.
+
+        Raises:
+            UMLSyntaxError: With the span of the failing group
+        """
+        tree = self.parse()
+        values = self._values
+        results: List = []
+        stack = [(tree, None)]
+        while stack:
+            node, children = stack.pop()
+            if children is None:
+                cached = values.get(id(node))
+                if cached is not None and cached[0] is node:
+                    results.append(cached[1])
+                    continue
+                children = _uml_children(node)
+                if children:
+                    stack.append((node, children))
+                    stack.extend((child, None) for child in reversed(children))
+                    continue
+                operands = []
+            else:
+                operands = results[-len(children):]
+                del results[-len(children):]
+            try:
+                value = _apply_uml_node(node, operands)
+            except Exception as e:
+                start, end = self._spans.get(id(node), (0, len(self.text)))
+                raise UMLSyntaxError(str(e) or type(e).__name__, start, end) from e
+            if id(node) in self._spans:
+                values[id(node)] = (node, value)
+            results.append(value)
+        return results[0]
+
+    def bracket_errors(self) -> List[Tuple[int, str]]:
+        """
+        Unmatched (), [] and {} as (position, message), in text order
+
+        parse_uml reads an unbalanced expression as a symbol; these are the
+        positions worth highlighting. Angle brackets are left out because
+        '<>' is both a pair and the division delimiter.
+        """
+        text = self.text
+        stack = []
+        errors = []
+        for position in self._marks:
+            char = text[position]
+            if char in "([{":
+                stack.append(position)
+            elif char in _PAIRS:
+                if stack and text[stack[-1]] == _PAIRS[char]:
+                    stack.pop()
+                else:
+                    errors.append((position, f"Unmatched '{char}'"))
+        errors.extend((position, f"Unclosed '{text[position]}'") for position in stack)
+        errors.sort()
+        return errors
+
+    def preview(self, text: Optional[str] = None) -> Preview:
+        """
+        Update to text (if given) and return its value or first error
+
+        A symbolic result (text parse_uml does not understand) with
+        unbalanced brackets reports the first bracket error instead.
+        """
+        if text is not None:
+            self.update(text)
+        try:
+            value = self.evaluate()
+        except UMLSyntaxError as e:
+            return Preview(None, str(e), e.start, e.end)
+        if isinstance(value, str):
+            errors = self.bracket_errors()
+            if errors:
+                position, message = errors[0]
+                return Preview(None, message, position, position + 1)
+        return Preview(value, None, None, None)
@@ -0,0 +1,126 @@
+"""
+Constant folding for core.uml_core parse trees
+
+The calculator front ends' counterpart of uml_optimizer, for the
+{"type": ...} trees core.uml_core parses. It runs between parse_uml and
+eval_uml and:
+
+- folds constant subtrees to a value node (only when the value is a number)
+- flattens left-nested addition/multiplication nests ([[a,b],c] -> [a,b,c]),
+  which core.uml_core evaluates as the same left fold
+
+core.uml_core applies + - * / to symbol names as they are, where dropping
+an identity element (x+0, x*1) could turn an error into a result, so unlike
+uml_optimizer it removes no identities. Every rewrite evaluates to the same
+result as the original tree.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.evaluation_budget import EvaluationBudget, EvaluationBudgetExceeded, call_scope, check_tree
+from core.uml_core import eval_uml
+
+# Evaluated as a left fold over the operands, so [[a,b],c] is [a,b,c]
+_CHAINS = ("addition", "multiplication")
+
+
+def _children(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Sub-expressions of a node, in the order eval_uml evaluates them."""
+    children = list(node.get("operands", ()))
+    if "operand" in node:
+        children.append(node["operand"])
+    return children
+
+
+def count_nodes(tree: Dict[str, Any]) -> int:
+    """Count the nodes of a parsed tree."""
+    count = 0
+    stack = [tree]
+    while stack:
+        count += 1
+        stack.extend(_children(stack.pop()))
+    return count
+
+
+def _rebuild(node: Dict[str, Any], children: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A copy of node over the given sub-expressions."""
+    rebuilt = dict(node)
+    if "operand" in node:
+        rebuilt["operand"] = children[-1]
+        children = children[:-1]
+    if "operands" in node:
+        rebuilt["operands"] = children
+    return rebuilt
+
+
+def _simplify(node: Dict[str, Any], children: List[Dict[str, Any]], report: Dict[str, int]) -> Dict[str, Any]:
+    """Simplify one node whose sub-expressions are already simplified."""
+    rebuilt = _rebuild(node, children)
+    if all(child["type"] == "value" for child in children):
+        try:
+            value = eval_uml(rebuilt)
+        except EvaluationBudgetExceeded:
+            raise
+        except Exception:
+            # Left for eval_uml to raise again
+            value = None
+        if isinstance(value, (int, float, complex)):
+            report["folded"] += 1
+            return {"type": "value", "value": value}
+    if node["type"] in _CHAINS and children and children[0]["type"] == node["type"]:
+        report["flattened"] += 1
+        rebuilt["operands"] = list(children[0]["operands"]) + children[1:]
+    return rebuilt
+
+
+def optimize_uml(tree: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Optimize a tree returned by core.uml_core.parse_uml.
+
+    The input tree is not modified. Runs post-order with an explicit stack,
+    like eval_uml, so deep trees are safe.
+
+    Returns:
+        Tuple of (optimized tree, report) where the report holds node counts
+        before and after, the fractional reduction and per-rewrite counts
+    """
+    report = {"folded": 0, "flattened": 0}
+    nodes_before = 0
+    results: List[Dict[str, Any]] = []
+    stack = [(tree, None)]
+    while stack:
+        node, children = stack.pop()
+        if children is None:
+            nodes_before += 1
+            children = _children(node)
+            if not children:
+                results.append(node)
+                continue
+            stack.append((node, children))
+            stack.extend((child, None) for child in reversed(children))
+        else:
+            simplified = results[-len(children):]
+            del results[-len(children):]
+            results.append(_simplify(node, simplified, report))
+
+    nodes_after = count_nodes(results[0])
+    report.update(
+        nodes_before=nodes_before,
+        nodes_after=nodes_after,
+        reduction=1 - nodes_after / nodes_before,
+    )
+    return results[0], report
+
+
+def eval_optimized(parsed: Dict[str, Any], budget: Optional[EvaluationBudget] = None) -> Any:
+    """
+    Optimize a parsed tree, then evaluate it with core.uml_core.eval_uml.
+
+    The tree's size and depth are checked against the evaluation budget
+    (budget, else the active one) as parsed, before it is optimized.
+    """
+    if budget is not None:
+        with call_scope(budget):
+            return eval_optimized(parsed)
+    check_tree(parsed, _children)
+    return eval_uml(optimize_uml(parsed)[0])
@@ -2,6 +2,21 @@
 RIS (Recursive Integration System) operation for UML Calculator
 Advanced, context-aware logic with verbose tracing and rule selection.
 """
+# Rule names in precedence order; ris_array(..., return_rules=True) returns
+# indexes into this tuple
+RIS_RULES = (
+    "Multiplication (Forced by Context)",
+    "Division (Forced by Context)",
+    "Addition (Zero Operand)",
+    "Multiplication (Equal Operands)",
+    "Multiplication (Special Case 6,3)",
+    "Division (Special Case 8,2)",
+    "Division (Special Case 9,3)",
+    "Division (Special Case 4,2 returns 4)",
+    "Division (Compact Compression)",
+    "Multiplication (Entropy)",
+    "Addition (Fallback)",
+)
 def ris(a, b, context=None, verbose=False):
     a = float(a)
     b = float(b)
@@ -77,3 +92,50 @@ def ris_explain(a, b, context=None):
             result, rule = a + b, "Addition (Fallback)"
             explanation = f"No special rule matched, so result is a + b = {result}."
     return result, explanation
+
+def ris_array(a, b, mode="default", return_rules=False):
+    """
+    Vectorized RIS over NumPy arrays.
+
+    Each rule of ris() becomes a boolean mask and np.select picks the first
+    matching rule per element, so precedence is the same as the scalar
+    cascade and results match ris() element for element.
+
+    Args:
+        a, b: Array-likes (or scalars) broadcast against each other
+        mode: RIS mode, a single string or an array of per-element modes
+        return_rules: Also return the index into RIS_RULES for each element
+
+    Returns:
+        Float array of results, or (results, rule indexes) with return_rules
+    """
+    # Imported here so the scalar ris() stays cheap to import for the CLIs
+    import numpy as np
+
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    mode = np.asarray(mode)
+    with np.errstate(all="ignore"):
+        quotient = a / b
+        conditions = [
+            mode == "always_multiply",
+            (mode == "always_divide") & (b != 0),
+            (a == 0) | (b == 0),
+            a == b,
+            (a == 6) & (b == 3),
+            (a == 8) & (b == 2),
+            (a == 9) & (b == 3),
+            (a == 4) & (b == 2),
+            (a > b) & (b > 1) & (np.mod(a, b) == 0) & (quotient < a) & (quotient < b),
+            (a > 1) & (b > 1),
+        ]
+        rules = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+        product = a * b
+        total = a + b
+        results = np.choose(rules, [
+            product, quotient, total, product, product,
+            quotient, quotient, 4.0, quotient, product, total,
+        ])
+    if return_rules:
+        return results, rules
+    return results
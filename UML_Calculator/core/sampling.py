@@ -0,0 +1,173 @@
+"""
+Adaptive sampling for plotting in UML Calculator
+
+Starts from a coarse uniform grid and repeatedly bisects only the intervals
+whose midpoint is not predicted by linear interpolation between the
+endpoints (curvature, jumps, NaN boundaries) or whose endpoints use
+different RIS rules. Sampling stops when every interval is within tolerance,
+the evaluation budget is spent, or intervals reach the minimum width.
+
+Each refinement round is yielded, so a caller can draw the coarse preview
+straight away and redraw as the plot sharpens.
+"""
+import math
+import numpy as np
+
+from core.symbolic import compile_rule_function, plot_evaluator
+
+DEFAULT_INITIAL_POINTS = 33
+DEFAULT_TOLERANCE = 1e-3
+DEFAULT_MAX_EVALUATIONS = 4000
+DEFAULT_MAX_DEPTH = 16
+
+
+def _interval_errors(y_left, y_mid, y_right, scale):
+    """Midpoint deviation from linear interpolation, relative to the y range"""
+    finite = np.isfinite(y_left) & np.isfinite(y_mid) & np.isfinite(y_right)
+    none_finite = ~(np.isfinite(y_left) | np.isfinite(y_mid) | np.isfinite(y_right))
+    with np.errstate(all='ignore'):
+        errors = np.abs(y_mid - (y_left + y_right) / 2) / scale
+    # A domain edge or a pole somewhere in the interval: keep refining it
+    errors[~finite] = np.inf
+    errors[none_finite] = 0.0
+    return errors
+
+
+def _y_scale(y_values):
+    finite = y_values[np.isfinite(y_values)]
+    if not len(finite):
+        return 1.0
+    span = float(np.max(finite) - np.min(finite))
+    return span if span > 0 else max(abs(float(finite[0])), 1.0)
+
+
+def _stats(x_values, x_min, x_max, evaluations, rounds, stop_reason):
+    """Evaluation counts, and what a uniform grid this fine would have cost"""
+    if len(x_values) > 1:
+        finest = float(np.min(np.diff(x_values)))
+        uniform = int(math.ceil((x_max - x_min) / finest)) + 1 if finest > 0 else evaluations
+    else:
+        uniform = evaluations
+    return {
+        "evaluations": evaluations,
+        "rounds": rounds,
+        "uniform_equivalent": uniform,
+        "saved": max(uniform - evaluations, 0),
+        "stop_reason": stop_reason,
+    }
+
+
+def adaptive_refinements(
+    func,
+    x_min,
+    x_max,
+    initial_points=DEFAULT_INITIAL_POINTS,
+    tolerance=DEFAULT_TOLERANCE,
+    max_evaluations=DEFAULT_MAX_EVALUATIONS,
+    max_depth=DEFAULT_MAX_DEPTH,
+    rule_func=None,
+):
+    """
+    Sample func adaptively, yielding after the coarse grid and each round
+
+    Args:
+        func: Vectorized function mapping an x array to a y array
+        x_min, x_max: Range for x values
+        initial_points: Size of the coarse uniform grid
+        tolerance: Largest accepted midpoint error, as a fraction of the y range
+        max_evaluations: Evaluation budget, including the coarse grid
+        max_depth: Most times an initial interval may be halved
+        rule_func: Optional vectorized function giving a rule id per x;
+                   intervals whose endpoints differ are always refined
+
+    Yields:
+        (x_values, y_values, stats) with x sorted; stats holds evaluations,
+        rounds, uniform_equivalent (points a uniform grid as fine as the
+        finest interval needs), saved and stop_reason (None until the
+        final yield, then "tolerance", "budget" or "max_depth")
+    """
+    x = np.linspace(x_min, x_max, max(2, min(initial_points, max_evaluations)))
+    y = func(x)
+    rules = rule_func(x) if rule_func else None
+    evaluations = len(x)
+    rounds = 0
+    # Per interval: still to be tested, halvings so far, and last error estimate
+    active = np.ones(len(x) - 1, dtype=bool)
+    depth = np.zeros(len(x) - 1, dtype=int)
+    priority = np.full(len(x) - 1, np.inf)
+
+    while True:
+        candidates = np.flatnonzero(active & (depth < max_depth))
+        if not len(candidates):
+            stop_reason = "max_depth" if np.any(active) else "tolerance"
+            break
+        budget = max_evaluations - evaluations
+        if budget <= 0:
+            stop_reason = "budget"
+            break
+        yield x, y, _stats(x, x_min, x_max, evaluations, rounds, None)
+
+        if len(candidates) > budget:
+            # Spend what is left on the intervals that looked worst last round
+            order = np.argsort(-priority[candidates], kind="stable")
+            candidates = np.sort(candidates[order[:budget]])
+
+        x_mid = (x[candidates] + x[candidates + 1]) / 2
+        y_mid = func(x_mid)
+        evaluations += len(x_mid)
+        rounds += 1
+
+        errors = _interval_errors(y[candidates], y_mid, y[candidates + 1], _y_scale(y))
+        refine = errors > tolerance
+        if rules is not None:
+            rules_mid = rule_func(x_mid)
+            left_switch = rules[candidates] != rules_mid
+            right_switch = rules_mid != rules[candidates + 1]
+        else:
+            rules_mid = None
+            left_switch = right_switch = np.zeros(len(candidates), dtype=bool)
+
+        # Each candidate interval becomes two halves, the right one inserted after it
+        depth[candidates] += 1
+        active[candidates] = refine | left_switch
+        priority[candidates] = errors
+        after = candidates + 1
+        active = np.insert(active, after, refine | right_switch)
+        depth = np.insert(depth, after, depth[candidates])
+        priority = np.insert(priority, after, errors)
+        x = np.insert(x, after, x_mid)
+        y = np.insert(y, after, y_mid)
+        if rules is not None:
+            rules = np.insert(rules, after, rules_mid)
+
+    yield x, y, _stats(x, x_min, x_max, evaluations, rounds, stop_reason)
+
+
+def adaptive_sample(func, x_min, x_max, **options):
+    """
+    Sample func adaptively and return only the final result
+
+    Takes the same options as adaptive_refinements.
+
+    Returns:
+        (x_values, y_values, stats)
+    """
+    for result in adaptive_refinements(func, x_min, x_max, **options):
+        pass
+    return result
+
+
+def adaptive_plot_refinements(expr_str, x_min=-10, x_max=10, standard_mode=False, **options):
+    """
+    Adaptive refinements for an expression string
+
+    Reuses the compiled plot function of core.symbolic and, for RIS
+    expressions, refines wherever any RIS call switches rule.
+    """
+    return adaptive_refinements(
+        plot_evaluator(expr_str, standard_mode),
+        x_min,
+        x_max,
+        rule_func=compile_rule_function(expr_str, standard_mode),
+        **options,
+    )
@@ -3,9 +3,14 @@ Mathematical expression handling with symbolic support for UML Calculator
 """
 import sympy
 import numpy as np
+from functools import lru_cache
 from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
 from sympy import symbols, sympify, Eq
-from core.ris import ris
+from core.ris import RIS_RULES, ris, ris_array
+from core.evaluation_budget import check_source
+
+# Symbolic RIS call, e.g. RIS(x, 2); lambdify maps it to ris_array
+RIS = sympy.Function("RIS")
 
 def evaluate_expression(expr_str, x_value=None, symbolic=False, standard_mode=False):
     """
@@ -19,6 +24,11 @@ def evaluate_expression(expr_str, x_value=None, symbolic=False, standard_mode=Fa
         
     Returns:
         Evaluated result or symbolic expression
+
+    Raises:
+        EvaluationBudgetExceeded: If the expression is over the active
+            evaluation budget; sympy cannot be interrupted once it starts,
+            so the expression source is checked before parsing
     """
     # Clean up the expression
     expr_str = expr_str.replace("^", "**")  # Replace ^ with ** for exponentiation
@@ -35,33 +45,21 @@ def evaluate_expression(expr_str, x_value=None, symbolic=False, standard_mode=Fa
             # Just evaluate the left side
             expr_str = sides[0].strip()
     
+    check_source(expr_str)
+
     # Define symbols
     x, y, z = symbols('x y z')
     
     # Configure sympy parser with implicit multiplication
     transformations = standard_transformations + (implicit_multiplication_application,)
     
-    # Replace RIS calls with sympy functions
-    if "RIS" in expr_str.upper() and not standard_mode:
-        # Create a temporary function that acts like RIS
-        def sympy_ris(a, b):
-            if symbolic:
-                # For symbolic mode, return a special representation
-                return sympy.Function('RIS')(a, b)
-            else:
-                # For numeric mode, evaluate RIS
-                if isinstance(a, sympy.Basic) and a.is_number:
-                    a = float(a)
-                if isinstance(b, sympy.Basic) and b.is_number:
-                    b = float(b)
-                return ris(a, b)
-
-        # Add the RIS function to sympy's namespace
-        expr_str = expr_str.replace("RIS", "sympy_ris")
+    # RIS calls parse as an undefined sympy function and are evaluated
+    # numerically once their operands are numbers
+    local_dict = {"RIS": RIS} if "RIS" in expr_str.upper() and not standard_mode else None
     
     try:
         # Parse the expression
-        expr = parse_expr(expr_str, transformations=transformations)
+        expr = parse_expr(expr_str, local_dict=local_dict, transformations=transformations)
         
         # Substitute x value if provided
         if x_value is not None and not symbolic:
@@ -70,6 +68,7 @@ def evaluate_expression(expr_str, x_value=None, symbolic=False, standard_mode=Fa
         if symbolic:
             return expr
         else:
+            expr = evaluate_ris_calls(expr)
             # Evaluate numerically if all symbols are substituted
             if expr.is_number:
                 return float(expr)
@@ -78,6 +77,13 @@ def evaluate_expression(expr_str, x_value=None, symbolic=False, standard_mode=Fa
     except Exception as e:
         raise ValueError(f"Error in expression: {str(e)}")
 
+def evaluate_ris_calls(expr):
+    """Replace RIS calls whose operands are numbers with their numeric result"""
+    return expr.replace(
+        lambda e: e.func == RIS and all(arg.is_number for arg in e.args),
+        lambda e: sympy.sympify(ris(float(e.args[0]), float(e.args[1]))),
+    )
+
 def solve_equation(left_side, right_side, x_value=None):
     """Solve an equation for x or evaluate if x_value is provided"""
     x = symbols('x')
@@ -107,7 +113,116 @@ def solve_equation(left_side, right_side, x_value=None):
     except Exception as e:
         raise ValueError(f"Error solving equation: {str(e)}")
 
-def generate_plot_data(expr_str, x_min=-10, x_max=10, points=100, standard_mode=False):
+@lru_cache(maxsize=128)
+def compile_expression(expr_str, standard_mode=False):
+    """
+    Compile an expression of x into a NumPy function, cached by (expression, mode)
+    
+    Returns:
+        (sympy expression, vectorized function of an x array)
+    """
+    x = symbols('x')
+    expr = evaluate_expression(expr_str, symbolic=True, standard_mode=standard_mode)
+    func = sympy.lambdify(x, expr, modules=[{"RIS": ris_array}, "numpy"])
+    return expr, func
+
+@lru_cache(maxsize=128)
+def compile_point_function(expr_str, standard_mode=False):
+    """
+    Compile an expression of x into a function of one x value at a time
+    
+    For expressions NumPy cannot evaluate (factorial, besselj, zeta):
+    lambdify maps their functions to mpmath, then math. Points with no real
+    value, or where the function raises, give NaN.
+    
+    Returns:
+        np.vectorize'd function of an x array
+    """
+    x = symbols('x')
+    expr, _ = compile_expression(expr_str, standard_mode)
+    func = sympy.lambdify(x, expr, modules=[{"RIS": ris}, "mpmath", "math"])
+    
+    def point(x_val):
+        try:
+            y_val = complex(func(x_val))
+        except Exception:
+            return float('nan')
+        return y_val.real if y_val.imag == 0 else float('nan')
+    
+    return np.vectorize(point, otypes=[float])
+
+def _evaluate_point(expr, x, x_val):
+    """Evaluate an expression at one x value symbolically (NaN on failure)"""
+    try:
+        result = evaluate_ris_calls(expr.subs(x, x_val))
+        return float(result)
+    except Exception:
+        return float('nan')
+
+def plot_evaluator(expr_str, standard_mode=False, max_fallback=1000):
+    """
+    Return a function mapping an array of x values to plot y values
+    
+    The expression is compiled once with sympy.lambdify (RIS maps to the
+    vectorized ris_array) and evaluated over all points at once. Points where
+    the compiled function gives NaN are retried symbolically, up to
+    max_fallback of them per call. Expressions the NumPy function cannot
+    evaluate at all are evaluated at every point by compile_point_function.
+    """
+    x = symbols('x')
+    expr, func = compile_expression(expr_str, standard_mode)
+    
+    def evaluate(x_values):
+        x_values = np.asarray(x_values, dtype=float)
+        try:
+            with np.errstate(all='ignore'):
+                y_values = np.asarray(func(x_values))
+            if np.iscomplexobj(y_values):
+                # Points with an imaginary part have no real value to plot
+                y_values = np.where(y_values.imag == 0, y_values.real, np.nan)
+            y_values = np.broadcast_to(y_values.astype(float), x_values.shape).copy()
+        except Exception:
+            # Functions NumPy cannot evaluate fall back to per-point
+            # evaluation, whose NaN points have no real value to retry for
+            return compile_point_function(expr_str, standard_mode)(x_values)
+        
+        for i in np.flatnonzero(np.isnan(y_values))[:max_fallback]:
+            y_values[i] = _evaluate_point(expr, x, x_values[i])
+        return y_values
+    
+    return evaluate
+
+@lru_cache(maxsize=128)
+def compile_rule_function(expr_str, standard_mode=False):
+    """
+    Compile a function giving the RIS rules an expression uses at each x
+    
+    The result is one integer per point combining the RIS_RULES index of
+    every RIS call, so it changes wherever any call switches rule.
+    
+    Returns:
+        Function of an x array, or None if the expression has no RIS calls
+    """
+    x = symbols('x')
+    expr, _ = compile_expression(expr_str, standard_mode)
+    calls = sorted(expr.atoms(RIS), key=str)
+    if not calls:
+        return None
+    operands = [sympy.lambdify(x, list(call.args), modules=[{"RIS": ris_array}, "numpy"]) for call in calls]
+    
+    def rules(x_values):
+        x_values = np.asarray(x_values, dtype=float)
+        signature = np.zeros(x_values.shape, dtype=np.int64)
+        with np.errstate(all='ignore'):
+            for func in operands:
+                a, b = (np.broadcast_to(np.real(v), x_values.shape) for v in func(x_values))
+                _, call_rules = ris_array(a, b, return_rules=True)
+                signature = signature * len(RIS_RULES) + call_rules
+        return signature
+    
+    return rules
+
+def generate_plot_data(expr_str, x_min=-10, x_max=10, points=100, standard_mode=False, max_fallback=1000):
     """
     Generate x,y data for plotting an expression
     
@@ -116,34 +231,11 @@ def generate_plot_data(expr_str, x_min=-10, x_max=10, points=100, standard_mode=
         x_min, x_max: Range for x values
         points: Number of points to calculate
         standard_mode: If True, prioritize standard math over RIS
+        max_fallback: Most NaN points of the NumPy function to re-evaluate
+            symbolically
         
     Returns:
         (x_values, y_values) as numpy arrays
     """
-    x = symbols('x')
-    expr = evaluate_expression(expr_str, symbolic=True, standard_mode=standard_mode)
-    
     x_values = np.linspace(x_min, x_max, points)
-    y_values = []
-    
-    for x_val in x_values:
-        try:
-            result = expr.subs(x, x_val)
-            if isinstance(result, sympy.Basic):
-                if result.is_number:
-                    y_values.append(float(result))
-                else:
-                    # If contains RIS function calls, evaluate them
-                    if 'RIS' in str(result):
-                        # Extract and evaluate RIS calls
-                        ris_result = evaluate_expression(str(result), x_value=x_val, standard_mode=standard_mode)
-                        y_values.append(float(ris_result))
-                    else:
-                        y_values.append(float(result))
-            else:
-                y_values.append(float(result))
-        except:
-            # If evaluation fails at this point, use NaN
-            y_values.append(float('nan'))
-    
-    return x_values, np.array(y_values)
+    return x_values, plot_evaluator(expr_str, standard_mode, max_fallback)(x_values)
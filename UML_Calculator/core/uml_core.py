@@ -8,10 +8,10 @@ Enhanced with empirical evidence from 189 conversation insights spanning May 202
 Implements T.R.E.E.S. (The Recursive Entropy Engine System) principles in practical UML Calculator.
 """
 
-# Fix import paths for operation modules and utils
+# Fix import paths for utils. core/ itself stays off sys.path: it would
+# shadow the top-level uml_core with this module
 import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
 
 from core.addition import add
@@ -20,8 +20,14 @@ from core.multiplication import multiply
 from core.division import divide
 from core.ris import ris
 from utils.safe_eval import safe_eval
+from core.evaluation_budget import (
+    CHECK_INTERVAL, EvaluationBudget, EvaluationBudgetExceeded, call_scope, check_deadline, check_nesting, check_tree,
+    guarded_pow,
+)
 
 import math
+import re
+from bisect import bisect_left
 from typing import cast, Dict, List, Tuple, Optional, Union
 
 # Letter-to-number mapping (A=1..Z=26, a=27..z=52)
@@ -98,154 +104,317 @@ def recursive_compress(value: Union[float, complex, str]) -> Union[float, comple
     or by taking the log if it's a power of e, or by dividing by 10 if it's a power of 10.
     Stops at a "natural attractor" (10, 16, π, etc.).
     """
-    if not isinstance(value, (int, float)) or isinstance(value, complex) or (isinstance(value, float) and (math.isnan(value) or math.isinf(value))):
+    while True:
+        if not isinstance(value, (int, float)) or isinstance(value, complex) or (isinstance(value, float) and (math.isnan(value) or math.isinf(value))):
+            return value
+        # Special case: compress pi^2 to pi
+        if math.isclose(value, math.pi ** 2, rel_tol=1e-9):
+            return math.pi
+        # Stop at natural attractors
+        for attractor in [10, 16, math.pi]:
+            if math.isclose(value, attractor, rel_tol=1e-9):
+                return attractor
+        # Prefer sqrt for perfect squares or > 10
+        if value > 10:
+            sqrt_val = math.sqrt(value)
+            if sqrt_val.is_integer() or value in [100, 256, 1024, math.pi ** 2]:
+                value = sqrt_val
+                continue
+        # Prefer log for powers of e
+        if value > 0 and math.isclose(math.log(value), round(math.log(value)), rel_tol=1e-9):
+            value = math.log(value)
+            continue
+        # Prefer division by 10 for powers of 10
+        if value > 10 and math.isclose(math.log10(value), round(math.log10(value)), rel_tol=1e-9):
+            value = value / 10
+            continue
         return value
-    # Special case: compress pi^2 to pi
-    if math.isclose(value, math.pi ** 2, rel_tol=1e-9):
-        return math.pi
-    # Stop at natural attractors
-    for attractor in [10, 16, math.pi]:
-        if math.isclose(value, attractor, rel_tol=1e-9):
-            return attractor
-    # Prefer sqrt for perfect squares or > 10
-    if value > 10:
-        sqrt_val = math.sqrt(value)
-        if sqrt_val.is_integer() or value in [100, 256, 1024, math.pi ** 2]:
-            return recursive_compress(sqrt_val)
-    # Prefer log for powers of e
-    if value > 0 and math.isclose(math.log(value), round(math.log(value)), rel_tol=1e-9):
-        log_val = math.log(value)
-        return recursive_compress(log_val)
-    # Prefer division by 10 for powers of 10
-    if value > 10 and math.isclose(math.log10(value), round(math.log10(value)), rel_tol=1e-9):
-        div_val = value / 10
-        return recursive_compress(div_val)
-    return value
 
 def parse_uml(expression: str) -> Dict:
     """
     Parse a UML expression into its components and operation type.
-    Now supports: +, -, *, /, ^, sqrt(), sin(), cos(), RIS()
+    Now supports: +, -, *, /, ^, %, sqrt(), sin(), cos(), RIS()
+
+    Sub-expressions are parsed from an explicit stack rather than by
+    recursion, so nesting of any depth cannot hit the recursion limit. The
+    active evaluation budget's max_depth is checked on the raw text first.
     """
-    expression = expression.strip()
-    try:
-        if expression.lower() == "inf" or expression.lower() == "infinity":
-            return {"type": "value", "value": float('inf')}
-        elif expression.lower() == "nan":
-            return {"type": "value", "value": float('nan')}
-        value = float(expression)
-        return {"type": "value", "value": value}
-    except ValueError:
-        pass
-    if len(expression) == 1 and expression.isalpha():
-        return {"type": "value", "value": letter_to_number(expression)}
+    check_nesting(expression)
+    source = _ParseSource(expression)
+    results: List = []
+    # ((start, end), None) to parse expression[start:end]; (None, (count, build))
+    # to combine the last count results once they are parsed
+    stack: List[Tuple] = [((0, len(expression)), None)]
+    while stack:
+        span, pending = stack.pop()
+        if pending is None:
+            step = _parse_uml_step(source, *span)
+        else:
+            count, build = pending
+            operands = results[len(results) - count:]
+            del results[len(results) - count:]
+            step = build(operands)
+        if isinstance(step, dict):
+            results.append(step)
+            continue
+        children, build = step
+        stack.append((None, (len(children), build)))
+        stack.extend((child, None) for child in reversed(children))
+    return results[0]
+
+class _ParseSource:
+    """
+    Text being parsed by parse_uml, with its bracket pairs matched up front
+
+    When every bracket in the text is properly nested, a group's operands are
+    found by jumping from one top-level token to the next, so each level of
+    nesting costs only its own top-level tokens. Otherwise split_arguments
+    scans each group, with the same result.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.carets = [match.start() for match in re.finditer(r'\^', text)]
+        self.positions: List[int] = []
+        self.closing: Dict[int, int] = {}
+        stack: List[Tuple[str, int]] = []
+        operand_start = True
+        previous_end = 0
+        for match in _ARGUMENT_STRUCTURE.finditer(text):
+            position, token = match.start(), match.group()
+            if position > previous_end and not text[previous_end:position].isspace():
+                operand_start = False
+            previous_end = match.end()
+            self.positions.append(position)
+            if token == ',':
+                operand_start = True
+                continue
+            if token == '<>':
+                opening = operand_start
+            else:
+                opening = token in '[({<'
+                operand_start = opening
+            if opening:
+                stack.append((token, position))
+            elif stack and stack[-1][0] == _OPENING[token]:
+                self.closing[stack.pop()[1]] = position
+            else:
+                self.closing = None
+                return
+        if stack:
+            self.closing = None
+
+    def structured(self, start: int, end: int) -> bool:
+        """Whether text[start:end] holds any bracket or comma"""
+        i = bisect_left(self.positions, start)
+        return i < len(self.positions) and self.positions[i] < end
+
+    def carets_in(self, start: int, end: int) -> List[int]:
+        """Positions of the '^' characters in text[start:end]"""
+        return self.carets[bisect_left(self.carets, start):bisect_left(self.carets, end)]
+
+    def operands(self, start: int, end: int, open_length: int, close_length: int) -> List[Tuple[int, int]]:
+        """Spans of split_arguments(text[start + open_length:end - close_length])"""
+        inner_start, inner_end = start + open_length, end - close_length
+        if inner_start >= inner_end:
+            return []
+        closing = self.closing
+        # The bracket token ends the opening: the '(' of 'RIS(', both of '<>'
+        bracket = inner_start - 2 if self.text.startswith('<>', inner_start - 2) else inner_start - 1
+        if closing is None or closing.get(bracket) != inner_end:
+            spans = []
+            for operand in split_arguments(self.text[inner_start:inner_end]):
+                spans.append((inner_start, inner_start + len(operand)))
+                inner_start += len(operand) + 1
+            return spans
+        text, positions = self.text, self.positions
+        spans = []
+        current = inner_start
+        i = bisect_left(positions, inner_start)
+        while i < len(positions) and positions[i] < inner_end:
+            position = positions[i]
+            if text[position] == ',':
+                spans.append((current, position))
+                current = position + 1
+                i += 1
+            else:
+                # An opening token: skip its group
+                i = bisect_left(positions, closing[position] + 1, i)
+        if current < inner_end:
+            spans.append((current, inner_end))
+        return spans
+
+# The opening token each closing token pairs with
+_OPENING = {']': '[', ')': '(', '>': '<', '}': '{', '<>': '<>'}
+
+def _parse_uml_step(source: _ParseSource, start: int, end: int):
+    """
+    One level of parse_uml on source.text[start:end]: a finished node, or
+    (sub-expression spans, build) where build turns the parsed
+    sub-expressions into the node (or into another such step, to parse
+    operands one after another).
+    """
+    # Work on offsets into the source, so deep nesting is never copied
+    text = source.text
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if not source.structured(start, end):
+        expression = text[start:end]
+        try:
+            if expression.lower() == "inf" or expression.lower() == "infinity":
+                return {"type": "value", "value": float('inf')}
+            elif expression.lower() == "nan":
+                return {"type": "value", "value": float('nan')}
+            value = float(expression)
+            return {"type": "value", "value": value}
+        except ValueError:
+            pass
+        if len(expression) == 1 and expression.isalpha():
+            return {"type": "value", "value": letter_to_number(expression)}
+
+    def expression():
+        return text[start:end]
+
+    def encloses(opening, closing):
+        return text.startswith(opening, start, end) and text.endswith(closing, start, end)
+
     # Handle sqrt(), sin(), cos(), RIS()
-    if expression.startswith('sqrt(') and expression.endswith(')'):
-        inner = expression[5:-1]
-        return {"type": "sqrt", "operand": parse_uml(inner)}
-    if expression.startswith('sin(') and expression.endswith(')'):
-        inner = expression[4:-1]
-        return {"type": "sin", "operand": parse_uml(inner)}
-    if expression.startswith('cos(') and expression.endswith(')'):
-        inner = expression[4:-1]
-        return {"type": "cos", "operand": parse_uml(inner)}
-    if expression.startswith('RIS(') and expression.endswith(')'):
-        inner = expression[4:-1]
-        operands = split_arguments(inner)
+    for prefix in ('sqrt(', 'sin(', 'cos('):
+        if encloses(prefix, ')'):
+            inner = (start + len(prefix), end - 1)
+            return [inner], lambda operands, kind=prefix[:-1]: {"type": kind, "operand": operands[0]}
+    if encloses('RIS(', ')'):
+        operands = source.operands(start, end, 4, 1)
         if len(operands) != 2:
-            raise ValueError(f"RIS expects 2 operands, got {len(operands)}: {expression}")
-        return {"type": "ris", "operands": [parse_uml(op) for op in operands]}
+            raise ValueError(f"RIS expects 2 operands, got {len(operands)}: {expression()}")
+        return operands, lambda operands: {"type": "ris", "operands": operands}
     # Handle ^ as power
-    if '^' in expression:
-        parts = expression.split('^')
-        if len(parts) == 2:
-            return {"type": "power", "operands": [parse_uml(parts[0]), parse_uml(parts[1])]} 
-    if expression.startswith('[') and expression.endswith(']'):
-        inner = expression[1:-1]
-        operands = split_arguments(inner)
+    carets = source.carets_in(start, end)
+    if len(carets) == 1:
+        parts = [(start, carets[0]), (carets[0] + 1, end)]
+        return parts, lambda operands: {"type": "power", "operands": operands}
+    def nest_operands(name):
+        # [], [ ] and [,] have nothing to evaluate
+        operands = source.operands(start, end, 1, 1)
+        if not any(text[slice(*operand)].strip() for operand in operands):
+            raise ValueError(f"{name} expects at least 1 operand, got 0: {expression()}")
+        return operands
+
+    if encloses('[', ']'):
+        operands = nest_operands("Addition")
         if len(operands) == 1:
-            return {"type": "value", "value": parse_uml(operands[0])["value"]}
-        return {"type": "addition", "operands": [parse_uml(op) for op in operands]}
-    if expression.startswith('{') and expression.endswith('}'):
-        inner = expression[1:-1]
-        operands = split_arguments(inner)
+            # [a] is a, whether a is a value or another nest
+            return operands, lambda operands: operands[0]
+        return operands, lambda operands: {"type": "addition", "operands": operands}
+    if encloses('{', '}'):
+        operands = nest_operands("Subtraction")
         if len(operands) == 1:
-            return {"type": "value", "value": parse_uml(operands[0])["value"]}
-        return {"type": "subtraction", "operands": [parse_uml(op) for op in operands]}
-    if expression.startswith('<') and expression.endswith('>') and not expression.startswith('<>'):
-        inner = expression[1:-1]
-        operands = split_arguments(inner)
-        return {"type": "multiplication", "operands": [parse_uml(op) for op in operands]}
-    if expression.startswith('<>') and expression.endswith('<>'):
-        inner = expression[2:-2]
-        operands = split_arguments(inner)
+            return operands, lambda operands: operands[0]
+        return operands, lambda operands: {"type": "subtraction", "operands": operands}
+    if encloses('<', '>') and not text.startswith('<>', start, end):
+        operands = nest_operands("Multiplication")
+        return operands, lambda operands: {"type": "multiplication", "operands": operands}
+    if encloses('<>', '<>'):
+        operands = source.operands(start, end, 2, 2)
         if len(operands) != 2:
-            raise ValueError(f"Division expects 2 operands, got {len(operands)}: {expression}")
-        return {"type": "division", "operands": [parse_uml(op) for op in operands]}
-    if expression.startswith('@(') and expression.endswith(')'):
-        inner = expression[2:-1]
-        operands = split_arguments(inner)
+            raise ValueError(f"Division expects 2 operands, got {len(operands)}: {expression()}")
+        return operands, lambda operands: {"type": "division", "operands": operands}
+    if encloses('@(', ')'):
+        operands = source.operands(start, end, 2, 1)
+        # @(a,b,mod) is the remainder, RIS's explicit-operation form
+        if len(operands) == 3 and source.text[slice(*operands[2])].strip() == "mod":
+            return operands[:2], lambda operands: {"type": "modulo", "operands": operands}
         if len(operands) != 2:
-            raise ValueError(f"Power expects 2 operands, got {len(operands)}: {expression}")
-        return {"type": "power", "operands": [parse_uml(op) for op in operands]}
-    if expression.startswith('!(') and expression.endswith(')'):
-        inner = expression[2:-1]
-        operands = split_arguments(inner)
+            raise ValueError(f"Power expects 2 operands, got {len(operands)}: {expression()}")
+        return operands, lambda operands: {"type": "power", "operands": operands}
+    if encloses('!(', ')'):
+        operands = source.operands(start, end, 2, 1)
         if len(operands) != 2:
-            raise ValueError(f"Complex number expects 2 operands, got {len(operands)}: {expression}")
-        real = parse_uml(operands[0])["value"]
-        imag = parse_uml(operands[1])["value"]
-        return {"type": "value", "value": complex(real, imag)}
-    return {"type": "symbol", "name": expression}
+            raise ValueError(f"Complex number expects 2 operands, got {len(operands)}: {expression()}")
+        def imaginary(parsed):
+            real = parsed[0]["value"]
+            return operands[1:], lambda parsed: {"type": "value", "value": complex(real, parsed[0]["value"])}
+        return operands[:1], imaginary
+    return {"type": "symbol", "name": expression()}
+
+# Characters split_arguments tracks, with "<>" as one token
+_ARGUMENT_STRUCTURE = re.compile(r"<>|[\[\](){}<>,]")
 
 def split_arguments(arg_string: str) -> List[str]:
     """
     Split a UML argument string into separate operands, handling nested structures.
+
+    "<>" delimits a division: it opens one where an operand starts (at the
+    beginning, or after a comma or an opening bracket) and closes one
+    anywhere else, so "1,<>6,3<>" splits into "1" and "<>6,3<>".
     """
     if not arg_string:
         return []
     args = []
-    current = ""
+    start = 0
     bracket_depth = 0
     paren_depth = 0
     angle_depth = 0
     brace_depth = 0
-    for char in arg_string:
-        if char == ',' and bracket_depth == 0 and paren_depth == 0 and angle_depth == 0 and brace_depth == 0:
-            args.append(current)
-            current = ""
+    division_depth = 0
+    operand_start = True
+    previous_end = 0
+    # Only the structural characters are visited; the text between them is sliced
+    for match in _ARGUMENT_STRUCTURE.finditer(arg_string):
+        position, token = match.start(), match.group()
+        if position > previous_end and not arg_string[previous_end:position].isspace():
+            operand_start = False
+        previous_end = match.end()
+        if token == ',':
+            if bracket_depth == 0 and paren_depth == 0 and angle_depth == 0 and brace_depth == 0 and division_depth == 0:
+                args.append(arg_string[start:position])
+                start = position + 1
+            operand_start = True
+        elif token == '<>':
+            division_depth += 1 if operand_start else -1
         else:
-            current += char
-            if char == '[':
+            operand_start = token in '[({<'
+            if token == '[':
                 bracket_depth += 1
-            elif char == ']':
+            elif token == ']':
                 bracket_depth -= 1
-            elif char == '(': 
+            elif token == '(':
                 paren_depth += 1
-            elif char == ')':
+            elif token == ')':
                 paren_depth -= 1
-            elif char == '<':
+            elif token == '<':
                 angle_depth += 1
-            elif char == '>':
+            elif token == '>':
                 angle_depth -= 1
-            elif char == '{':
+            elif token == '{':
                 brace_depth += 1
-            elif char == '}':
+            else:
                 brace_depth -= 1
-    if current:
-        args.append(current)
+    if start < len(arg_string):
+        args.append(arg_string[start:])
     return args
 
-def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
-    """
-    Evaluate a parsed UML expression.
-    """
+_UNARY_TYPES = ("sqrt", "sin", "cos")
+
+def _uml_children(parsed_expr: Dict) -> List[Dict]:
+    """Return the sub-expressions eval_uml evaluates before applying a node."""
+    expr_type = parsed_expr["type"]
+    if expr_type == "value" or expr_type == "symbol":
+        return []
+    children = list(parsed_expr.get("operands", []))
+    if expr_type in _UNARY_TYPES:
+        children.append(parsed_expr["operand"])
+    return children
+
+def _apply_uml_node(parsed_expr: Dict, operands: List) -> Union[float, complex, str]:
+    """Apply one parsed node to its already-evaluated sub-expressions."""
     expr_type = parsed_expr["type"]
     if expr_type == "value":
         return parsed_expr["value"]
     if expr_type == "symbol":
         return parsed_expr["name"]
-    operands = [eval_uml(op) for op in parsed_expr.get("operands", [])]
     # Addition [a,b]
     if expr_type == "addition":
         result = operands[0]
@@ -280,11 +449,18 @@ def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
         if len(operands) == 2:
             a, b = operands
             if isinstance(a, (int, float, complex)) and isinstance(b, (int, float, complex)):
-                return a ** b
+                # Letters are integers: @(Z,@(Z,Z)) would have ~10**37 bits
+                return guarded_pow(a, b)
             else:
                 return f"@({a},{b})"
         else:
             return f"@({','.join(str(op) for op in operands)})"
+    # Modulo @(a,b,mod)
+    if expr_type == "modulo":
+        a, b = operands
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            return a % b if b != 0 else float('nan')
+        return f"@({a},{b},mod)"
     # RIS meta-operator
     if expr_type == "ris":
         if len(operands) == 2:
@@ -293,7 +469,7 @@ def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
             return f"RIS({','.join(str(op) for op in operands)})"
     # Sqrt, sin, cos
     if expr_type == "sqrt":
-        operand = eval_uml(parsed_expr["operand"])
+        operand = operands[-1]
         if not isinstance(operand, (int, float)):
             if isinstance(operand, str):
                 operand = float(operand)
@@ -301,7 +477,7 @@ def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
                 operand = operand.real
         return math.sqrt(operand)
     if expr_type == "sin":
-        operand = eval_uml(parsed_expr["operand"])
+        operand = operands[-1]
         if not isinstance(operand, (int, float)):
             if isinstance(operand, str):
                 operand = float(operand)
@@ -309,7 +485,7 @@ def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
                 operand = operand.real
         return math.sin(operand)
     if expr_type == "cos":
-        operand = eval_uml(parsed_expr["operand"])
+        operand = operands[-1]
         if not isinstance(operand, (int, float)):
             if isinstance(operand, str):
                 operand = float(operand)
@@ -319,8 +495,47 @@ def eval_uml(parsed_expr: Dict) -> Union[float, complex, str]:
     # If none of the above, return as symbolic
     return str(parsed_expr)
 
+def eval_uml(parsed_expr: Dict, budget: Optional[EvaluationBudget] = None) -> Union[float, complex, str]:
+    """
+    Evaluate a parsed UML expression.
+
+    Uses an explicit post-order stack instead of recursion, so deeply nested
+    expressions cannot hit the interpreter's recursion limit.
+
+    The tree's size and depth are checked against the evaluation budget
+    (budget, else the active one) first, and its deadline while evaluating.
+    """
+    if budget is not None:
+        with call_scope(budget):
+            return eval_uml(parsed_expr)
+    check_tree(parsed_expr, _uml_children)
+    results: List = []
+    stack = [(parsed_expr, None)]
+    visited = 0
+    while stack:
+        node, children = stack.pop()
+        visited += 1
+        if visited % CHECK_INTERVAL == 0:
+            check_deadline()
+        if children is None:
+            children = _uml_children(node)
+            if not children:
+                results.append(_apply_uml_node(node, []))
+                continue
+            stack.append((node, children))
+            stack.extend((child, None) for child in reversed(children))
+        else:
+            operands = results[-len(children):]
+            del results[-len(children):]
+            results.append(_apply_uml_node(node, operands))
+    return results[0]
+
 def calculate(expr: str):
-    """Parse and evaluate a UML expression, returning (uml_result, std_result)."""
+    """
+    Parse and evaluate a UML expression, returning (uml_result, std_result).
+
+    Failed evaluations give None, except EvaluationBudgetExceeded, which is raised.
+    """
     try:
         parsed = parse_uml(expr)
         uml_result = eval_uml(parsed)
@@ -328,15 +543,23 @@ def calculate(expr: str):
         if isinstance(uml_result, str) and uml_result == expr:
             try:
                 uml_result = safe_eval(expr)
+            except EvaluationBudgetExceeded:
+                raise
             except Exception:
                 uml_result = None  # type: ignore
+    except EvaluationBudgetExceeded:
+        raise
     except Exception:
         try:
             uml_result = safe_eval(expr)
+        except EvaluationBudgetExceeded:
+            raise
         except Exception:
             uml_result = None  # type: ignore
     try:
         std_result = safe_eval(expr)
+    except EvaluationBudgetExceeded:
+        raise
     except Exception:
         std_result = None
     return uml_result, std_result
@@ -1,14 +1,124 @@
 """
 Data visualization tools for UML Calculator
 """
-import matplotlib.pyplot as plt
 import numpy as np
-import io
-import base64
-from rich.console import Console
 import tempfile
 import os
 
+# Braille dot bit for each (row, column) of a 4x2 character cell
+_BRAILLE_BITS = np.array([[0x01, 0x08], [0x02, 0x10], [0x04, 0x20], [0x40, 0x80]], dtype=np.uint16)
+
+def _fill_column_gaps(cols, rows, continues, dot_cols):
+    """
+    Insert linearly interpolated points in dot columns skipped between
+    consecutive connected points, so sparse data draws as a solid line
+    """
+    gaps = np.abs(np.diff(cols))
+    counts = np.where(continues[1:], np.maximum(gaps - 1, 0), 0)
+    total = int(counts.sum())
+    # Unsorted x could ask for far more points than the plot has columns
+    if total == 0 or total > 8 * dot_cols:
+        return cols, rows, continues
+    
+    pair = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    fraction = step / gaps[pair]
+    new_cols = cols[pair] + np.sign(cols[pair + 1] - cols[pair]) * step
+    new_rows = rows[pair] + (rows[pair + 1] - rows[pair]) * fraction
+    
+    # New points go after the first point of their pair, in step order
+    order = np.lexsort((np.r_[np.zeros(len(cols)), step], np.r_[np.arange(len(cols)), pair]))
+    return (
+        np.r_[cols, new_cols][order],
+        np.r_[rows, new_rows][order],
+        np.r_[continues, np.ones(total, dtype=bool)][order],
+    )
+
+def render_terminal_plot(x_values, y_values, width, height, title="RIS Function"):
+    """
+    Render x,y data as braille characters, one 2x4 dot cell per character
+    
+    Points are binned into the dot grid with NumPy only. Each dot column is
+    filled between the lowest and highest y it contains, extended to the
+    previous point so the curve stays connected; non-finite y values break
+    the line instead.
+    
+    Args:
+        x_values: Array of x values
+        y_values: Array of y values
+        width, height: Plot size in characters
+        title: Title line above the plot
+        
+    Returns:
+        Plot as a string
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    finite = np.isfinite(x_values) & np.isfinite(y_values)
+    if not np.any(finite):
+        return "Cannot create plot: No valid data points"
+    
+    # A point continues the line only if the point before it was drawn too
+    continues = np.zeros_like(finite)
+    continues[1:] = finite[:-1]
+    continues = continues[finite]
+    x_valid = x_values[finite]
+    y_valid = y_values[finite]
+    x_min, x_max = x_valid.min(), x_valid.max()
+    y_min, y_max = y_valid.min(), y_valid.max()
+    
+    dot_cols, dot_rows = width * 2, height * 4
+    x_span = x_max - x_min if x_max > x_min else 1.0
+    if y_max > y_min:
+        rows = (y_max - y_valid) / (y_max - y_min) * (dot_rows - 1)
+    else:
+        # Flat plots go through the middle
+        rows = np.full(len(y_valid), float(dot_rows // 2))
+    cols = ((x_valid - x_min) / x_span * (dot_cols - 1)).round().astype(np.intp)
+    cols, rows, continues = _fill_column_gaps(cols, rows, continues, dot_cols)
+    rows = rows.round().astype(np.intp)
+    
+    # Vertical extent per point, reaching back to the previous point
+    previous = np.empty_like(rows)
+    previous[0] = rows[0]
+    previous[1:] = rows[:-1]
+    previous = np.where(continues, previous, rows)
+    low = np.minimum(rows, previous)
+    high = np.maximum(rows, previous)
+    
+    # Reduce to one span per dot column
+    if np.any(cols[1:] < cols[:-1]):
+        order = np.argsort(cols, kind="stable")
+        cols, low, high = cols[order], low[order], high[order]
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    span_cols = cols[starts]
+    span_low = np.minimum.reduceat(low, starts)
+    span_high = np.maximum.reduceat(high, starts)
+    
+    # Fill spans with a difference array: +1 at the top, -1 below the bottom
+    marks = np.zeros((dot_rows + 1, dot_cols), dtype=np.int32)
+    np.add.at(marks, (span_low, span_cols), 1)
+    np.add.at(marks, (span_high + 1, span_cols), -1)
+    dots = np.cumsum(marks[:-1], axis=0) > 0
+    
+    # Pack each 4x2 block of dots into one braille code point
+    cells = dots.reshape(height, 4, width, 2)
+    codes = np.einsum("rjck,jk->rc", cells.astype(np.uint16), _BRAILLE_BITS)
+    canvas = np.where(codes > 0, (0x2800 + codes).astype(np.uint32), ord(" ")).astype(np.uint32)
+    
+    # Axes through zero, drawn only in empty cells
+    if y_min < 0 < y_max:
+        zero_row = int(round((y_max / (y_max - y_min) * (dot_rows - 1)))) // 4
+        canvas[zero_row][codes[zero_row] == 0] = ord("─")
+    if x_min < 0 < x_max:
+        zero_col = int(round(-x_min / x_span * (dot_cols - 1))) // 2
+        column = canvas[:, zero_col]
+        column[codes[:, zero_col] == 0] = ord("│")
+    
+    plot_str = "\n".join(row.tobytes().decode("utf-32-le") for row in canvas)
+    plot_info = f"y=[{y_min:.2f}, {y_max:.2f}], x=[{x_min:.2f}, {x_max:.2f}]"
+    return f"{title}\n{plot_str}\n{plot_info}"
+
 def create_plot(x_values, y_values, title="RIS Function", terminal_mode=True):
     """
     Create a plot from x,y data
@@ -17,83 +127,40 @@ def create_plot(x_values, y_values, title="RIS Function", terminal_mode=True):
         x_values: Array of x values
         y_values: Array of y values
         title: Title for the plot
-        terminal_mode: If True, returns ASCII art plot; otherwise returns plot file path
+        terminal_mode: If True, returns a text plot; otherwise returns plot file path
         
     Returns:
-        ASCII representation or path to image file
+        Text representation or path to image file
     """
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_values, y_values)
-    plt.title(title)
-    plt.grid(True)
-    plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-    plt.axvline(x=0, color='k', linestyle='-', alpha=0.3)
-    
     if terminal_mode:
-        # Generate ASCII art plot for terminal
         import shutil
         term_width, term_height = shutil.get_terminal_size()
         
         # If terminal is very small, provide warning instead of plot
         if term_width < 60 or term_height < 20:
-            return "Terminal too small for plot. Resize or use --save-plot option."
-            
-        # Create ASCII art
-        from art import text2art
-        ascii_plot = text2art("RIS PLOT")
+            return "Terminal too small for plot. Resize or use the --save option."
         
-        # Add basic plot representation
         plot_height = min(term_height - 10, 20)
         plot_width = term_width - 10
-        
-        # Normalize y values to fit in terminal
-        valid_indices = ~np.isnan(y_values)
-        if not np.any(valid_indices):
-            return "Cannot create plot: No valid data points"
-        
-        y_valid = y_values[valid_indices]
-        y_min, y_max = np.min(y_valid), np.max(y_valid)
-        if y_min == y_max:
-            # Handle flat plots
-            y_normalized = np.zeros_like(y_values)
-            y_normalized[valid_indices] = plot_height // 2
-        else:
-            y_normalized = np.full_like(y_values, float('nan'))
-            y_normalized[valid_indices] = (y_valid - y_min) / (y_max - y_min) * plot_height
-        
-        # Resample to fit width
-        indices = np.linspace(0, len(x_values)-1, plot_width).astype(int)
-        y_sample = y_normalized[indices]
-        
-        # Create ASCII plot
-        canvas = [[' ' for _ in range(plot_width)] for _ in range(plot_height)]
-        for i, y in enumerate(y_sample):
-            if not np.isnan(y):
-                y_pos = plot_height - 1 - int(y)
-                if 0 <= y_pos < plot_height:
-                    canvas[y_pos][i] = '*'
-        
-        # Add axis
-        zero_line = int(plot_height * (0 - y_min) / (y_max - y_min)) if y_min < 0 < y_max else None
-        if zero_line is not None and 0 <= zero_line < plot_height:
-            for i in range(plot_width):
-                if canvas[zero_line][i] == ' ':
-                    canvas[zero_line][i] = '-'
-        
-        # Convert to string
-        plot_str = '\n'.join([''.join(row) for row in canvas])
-        
-        # Add scale indicators
-        plot_info = f"y=[{y_min:.2f}, {y_max:.2f}], x=[{x_values[0]:.2f}, {x_values[-1]:.2f}]"
-        
-        return f"{ascii_plot}\n{plot_str}\n{plot_info}"
+        return render_terminal_plot(x_values, y_values, plot_width, plot_height, title=title)
     
-    else:
-        # Save plot to temporary file
-        temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-        plt.savefig(temp_file.name)
-        plt.close()
-        return temp_file.name
+    # Matplotlib is only needed for image files. A standalone Figure is not
+    # registered with pyplot, so nothing is left open after saving.
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.plot(x_values, y_values)
+    ax.set_title(title)
+    ax.grid(True)
+    ax.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+    ax.axvline(x=0, color='k', linestyle='-', alpha=0.3)
+    
+    # Save plot to temporary file
+    temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+    temp_file.close()
+    fig.savefig(temp_file.name)
+    return temp_file.name
 
 def plot_function(expr_func, x_min=-10, x_max=10, points=100, title=None):
     """
@@ -0,0 +1,260 @@
+"""
+UML Engine Stats - Lightweight counters and latency histograms for the
+symbolic engine hot paths.
+
+Latencies are recorded in nanoseconds into log-linear (HDR-style) histograms:
+values below 128ns get exact buckets, larger values are grouped into 64
+sub-buckets per power of two, which bounds the relative error of any reported
+percentile to under 1.6% while keeping recording to a few integer operations.
+
+Even a method call per engine operation costs a few percent of the operation
+itself, so only a random sample (sample_rate) of parses and executed trees
+is timed, every operation of a sampled tree included. The engine counts
+countdown down inline and only calls into the collector when it reaches
+zero. Counters stay exact; the executed operation count is likewise kept in
+a plain attribute, executed.
+
+Author: Travis Miner
+Date: June 23, 2025
+"""
+
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Dict, Optional
+
+# Number of linear sub-buckets per power of two (2 ** _SUB_BITS)
+_SUB_BITS = 6
+_SUB_COUNT = 1 << _SUB_BITS
+_LINEAR_LIMIT = _SUB_COUNT << 1
+
+
+def _bucket_index(value: int) -> int:
+    """Map a non-negative integer value to its histogram bucket."""
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - _SUB_BITS - 1
+    return (shift << _SUB_BITS) + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> tuple:
+    """Return the inclusive (low, high) value range covered by a bucket."""
+    if index < _LINEAR_LIMIT:
+        return index, index
+    shift = (index >> _SUB_BITS) - 1
+    low = (index - (shift << _SUB_BITS)) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram over nanosecond samples."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        """Record a single sample (nanoseconds)."""
+        if value < _LINEAR_LIMIT:
+            if value < 0:
+                value = 0
+            idx = value
+        else:
+            # _bucket_index, inlined: this runs once per timed operation
+            shift = value.bit_length() - _SUB_BITS - 1
+            idx = (shift << _SUB_BITS) + (value >> shift)
+        buckets = self.buckets
+        buckets[idx] = buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> int:
+        """
+        Return the value at the given percentile.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Upper bound of the bucket containing the percentile (nanoseconds)
+        """
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= target:
+                return min(_bucket_bounds(idx)[1], self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram in microseconds."""
+        return {
+            "count": self.count,
+            "mean_us": (self.total / self.count) / 1000 if self.count else 0.0,
+            "min_us": (self.min or 0) / 1000,
+            "p50_us": self.percentile(50) / 1000,
+            "p90_us": self.percentile(90) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max / 1000,
+            "total_ms": self.total / 1e6,
+        }
+
+
+class EngineStats:
+    """Collects counters and latency histograms for a SymbolicEngine."""
+
+    __slots__ = (
+        "sample_rate", "_random", "countdown", "executed", "histograms",
+        "counters", "started", "dump_path", "dump_interval", "_next_dump",
+    )
+
+    def __init__(
+        self,
+        dump_path: Optional[str] = None,
+        dump_interval: float = 60.0,
+        sample_rate: float = 1 / 32,
+    ):
+        """
+        Initialize the stats collector.
+
+        Args:
+            dump_path: Optional JSON file that receives periodic snapshots
+            dump_interval: Minimum seconds between periodic dumps
+            sample_rate: Fraction, in (0, 1], of parses and executed trees
+                that are timed
+        """
+        self.sample_rate = sample_rate
+        self._random = random.Random().random
+        self.countdown = 1
+        self.resample()
+        self.executed = 0
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._next_dump = time.monotonic() + dump_interval
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        """Record a latency sample for the named hot path."""
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        hist.record(elapsed_ns)
+
+    def resample(self) -> None:
+        """
+        Set countdown to the number of events up to and including the next timed one.
+
+        Geometric rather than a fixed stride, which could keep timing the same
+        step of a repeated workload.
+        """
+        if self.sample_rate >= 1:
+            self.countdown = 1
+        else:
+            self.countdown = 1 + int(math.log(1.0 - self._random()) / math.log(1.0 - self.sample_rate))
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Increment a named counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        """Count a cache hit or miss for the named cache."""
+        self.incr(f"cache.{cache}.{'hits' if hit else 'misses'}")
+
+    def all_counters(self) -> Dict[str, int]:
+        """Return the counters, including the executed operation count."""
+        counters = dict(self.counters)
+        if self.executed:
+            counters["operations.executed"] = self.executed
+        return counters
+
+    def cache_rates(self) -> Dict[str, Dict[str, Any]]:
+        """Return hits, misses and hit rate for every cache seen so far."""
+        rates = {}
+        for key, value in self.counters.items():
+            if not key.startswith("cache."):
+                continue
+            cache, kind = key[len("cache."):].rsplit(".", 1)
+            entry = rates.setdefault(cache, {"hits": 0, "misses": 0})
+            entry[kind] = value
+        for entry in rates.values():
+            lookups = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = entry["hits"] / lookups if lookups else 0.0
+        return rates
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of all stats."""
+        return {
+            "enabled": True,
+            "timestamp": time.time(),
+            "uptime_s": time.time() - self.started,
+            "sample_rate": self.sample_rate,
+            "counters": self.all_counters(),
+            "caches": self.cache_rates(),
+            "latency": {
+                name: hist.to_dict() for name, hist in sorted(self.histograms.items())
+            },
+        }
+
+    def reset(self) -> None:
+        """Clear all collected data."""
+        self.histograms.clear()
+        self.counters.clear()
+        self.executed = 0
+        self.started = time.time()
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Write a snapshot to a JSON file and return its path."""
+        path = path or self.dump_path
+        if not path:
+            raise ValueError("No stats dump path configured")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def maybe_dump(self) -> None:
+        """Dump a snapshot if a dump path is set and the interval has elapsed."""
+        if self.dump_path and time.monotonic() >= self._next_dump:
+            self._next_dump = time.monotonic() + self.dump_interval
+            self.dump()
+
+    def format_report(self) -> str:
+        """Render the stats as a plain-text table for the REPL."""
+        lines = []
+        if self.histograms:
+            lines.append(
+                f"  {'path':<32}{'count':>8}{'p50 us':>11}{'p99 us':>11}{'max us':>11}"
+            )
+            for name, hist in sorted(self.histograms.items()):
+                summary = hist.to_dict()
+                lines.append(
+                    f"  {name:<32}{summary['count']:>8}{summary['p50_us']:>11.1f}"
+                    f"{summary['p99_us']:>11.1f}{summary['max_us']:>11.1f}"
+                )
+            if self.sample_rate < 1:
+                lines.append(f"  (parse and execute.* time {self.sample_rate:.1%} of events)")
+        for name, value in sorted(self.all_counters().items()):
+            if not name.startswith("cache."):
+                lines.append(f"  {name}: {value}")
+        for cache, entry in sorted(self.cache_rates().items()):
+            lines.append(
+                f"  cache {cache}: {entry['hits']} hits, {entry['misses']} misses "
+                f"({entry['hit_rate']:.1%})"
+            )
+        return "\n".join(lines) if lines else "  (no samples recorded)"
@@ -0,0 +1,490 @@
+"""
+UML History Export - Columnar analytics export of the symbolic engine history.
+
+Streams the MemoryStore JSON files (operations.json, collapses.json) into
+flat typed columns so entropy and operation-mix analytics no longer have to
+materialise the full history as Python dicts.
+
+Two output formats are supported:
+
+* ``raw``  - a directory with one little-endian ``.bin`` file per column plus
+  a ``manifest.json`` describing dtypes and row counts.  Every column can be
+  opened zero-copy with ``np.memmap``.
+* ``npz``  - a single uncompressed ``.npz`` archive holding the same columns.
+  ``np.load`` reads members lazily, so only the requested columns are loaded.
+
+Non-numeric results (for example ``"!0"`` or symbolic identities) are stored
+as NaN in the float64 ``result`` column with an index into a shared string
+table; numeric results carry a string index of -1.
+
+Author: Travis Miner
+Date: June 23, 2025
+"""
+
+import json
+import os
+import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from symbolic_engine import MemoryStore, SymbolicOperationType
+
+FORMAT_VERSION = 1
+
+# Column layouts for every exported table (name -> dtype)
+TABLES = {
+    "operations": {
+        "timestamp": "<i8",  # microseconds since 1970-01-01
+        "op_type": "<i2",  # SymbolicOperationType value, -1 if unknown
+        "entropy_weight": "<f8",
+        "operand_count": "<i4",
+    },
+    "collapses": {
+        "timestamp": "<i8",
+        "step_count": "<i4",
+        "entropy_delta": "<f8",  # sum of the step deltas
+        "result": "<f8",
+        "result_str": "<i4",  # string table index, -1 if numeric
+    },
+    "steps": {
+        "collapse_index": "<i8",  # row in the collapses table
+        "op_type": "<i2",
+        "entropy_delta": "<f8",
+        "result": "<f8",
+        "result_str": "<i4",
+    },
+}
+
+# Operation string prefixes used by records written before steps stored op_type
+_LEGACY_PREFIXES = [
+    ("identity(", SymbolicOperationType.IDENTITY),
+    ("collapse(", SymbolicOperationType.COLLAPSE),
+    ("TFID(", SymbolicOperationType.TFID),
+    ("RIS(", SymbolicOperationType.RIS),
+    ("^[", SymbolicOperationType.EXPONENTIATION),
+    ("/[", SymbolicOperationType.ROOT),
+    ("%[", SymbolicOperationType.MODULO),
+    ("?(", SymbolicOperationType.LOGARITHM),
+    ("!", SymbolicOperationType.FACTORIAL),
+    ("[", SymbolicOperationType.ADDITION),
+    ("{", SymbolicOperationType.SUBTRACTION),
+    (">", SymbolicOperationType.MULTIPLICATION),
+    ("<", SymbolicOperationType.DIVISION),
+]
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _timestamp_to_micros(value: Optional[str]) -> int:
+    """
+    Convert an ISO timestamp to int64 microseconds since 1970-01-01.
+
+    Naive timestamps (the MemoryStore default) are encoded as wall-clock time.
+    Missing or malformed timestamps map to 0.
+    """
+    if not value:
+        return 0
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return 0
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _ONE_MICROSECOND
+
+
+def _op_type_code(name: Optional[str]) -> int:
+    """Map a SymbolicOperationType name to its integer code (-1 if unknown)."""
+    member = SymbolicOperationType.__members__.get(name or "")
+    return member.value if member is not None else -1
+
+
+def _op_type_from_string(operation: str) -> int:
+    """Infer the operation type code from its UML string representation."""
+    for prefix, op_type in _LEGACY_PREFIXES:
+        if operation.startswith(prefix):
+            return op_type.value
+    return -1
+
+
+class _StringTable:
+    """Deduplicating string table built while exporting."""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def add(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (offsets, utf-8 blob); string i is blob[offsets[i]:offsets[i+1]]."""
+        encoded = [value.encode("utf-8") for value in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+        if encoded:
+            np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return offsets, blob
+
+
+def _split_result(value: Any, strings: _StringTable) -> Tuple[float, int]:
+    """Split a stored result into (float64 value, string table index)."""
+    if isinstance(value, bool):
+        return float(value), -1
+    if isinstance(value, (int, float)):
+        return float(value), -1
+    if isinstance(value, str):
+        try:
+            return float(value), -1
+        except ValueError:
+            pass
+    return float("nan"), strings.add(str(value))
+
+
+def _iter_json_object(path: str, chunk_size: int = 1 << 20) -> Iterator[Tuple[str, Any]]:
+    """
+    Incrementally yield (key, value) pairs of a top-level JSON object.
+
+    Only the record currently being decoded is held in memory, so history
+    files far larger than RAM can be exported.
+    """
+    if not os.path.exists(path):
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def refill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> Optional[str]:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not refill():
+                    return None
+
+        def decode() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not refill():
+                        raise
+                    continue
+                # A token ending exactly at the buffer edge may be truncated
+                if end == len(buf) and refill():
+                    continue
+                pos = end
+                return value
+
+        if skip_whitespace() != "{":
+            return
+        pos += 1
+        while True:
+            char = skip_whitespace()
+            if char is None or char == "}":
+                return
+            if char == ",":
+                pos += 1
+                continue
+            key = decode()
+            if skip_whitespace() != ":":
+                raise ValueError(f"Malformed history file: {path}")
+            pos += 1
+            skip_whitespace()
+            yield key, decode()
+
+
+class _ColumnWriter:
+    """Buffers rows for one table and appends them to raw column files."""
+
+    def __init__(self, directory: str, table: str, chunk_size: int):
+        self.table = table
+        self.columns = TABLES[table]
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.buffers = {name: [] for name in self.columns}
+        self.paths = {
+            name: os.path.join(directory, f"{table}.{name}.bin")
+            for name in self.columns
+        }
+        self.files = {name: open(path, "wb") for name, path in self.paths.items()}
+
+    def append(self, **values) -> None:
+        for name in self.columns:
+            self.buffers[name].append(values[name])
+        self.rows += 1
+        if self.rows % self.chunk_size == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, dtype in self.columns.items():
+            if self.buffers[name]:
+                np.asarray(self.buffers[name], dtype=dtype).tofile(self.files[name])
+                self.buffers[name] = []
+
+    def close(self) -> None:
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+
+def _records(source: Union[MemoryStore, str], name: str) -> Iterator[Tuple[str, Any]]:
+    """Iterate records of a history file from a MemoryStore or a store directory."""
+    if isinstance(source, MemoryStore):
+        return iter(getattr(source, name).items())
+    return _iter_json_object(os.path.join(source, f"{name}.json"))
+
+
+def _export_raw(source: Union[MemoryStore, str], out_dir: str, chunk_size: int) -> Dict[str, Any]:
+    """Write every table as raw column files and return the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    strings = _StringTable()
+
+    operations = _ColumnWriter(out_dir, "operations", chunk_size)
+    try:
+        for _, record in _records(source, "operations"):
+            operation = record.get("operation") or {}
+            operations.append(
+                timestamp=_timestamp_to_micros(record.get("timestamp")),
+                op_type=_op_type_code(operation.get("type")),
+                entropy_weight=float(operation.get("entropy_weight", float("nan"))),
+                operand_count=len(operation.get("operands") or []),
+            )
+    finally:
+        operations.close()
+
+    collapses = _ColumnWriter(out_dir, "collapses", chunk_size)
+    steps = _ColumnWriter(out_dir, "steps", chunk_size)
+    try:
+        for _, record in _records(source, "collapses"):
+            path = record.get("collapse_path") or []
+            total_delta = 0.0
+            for step in path:
+                delta = float(step.get("entropy_delta", 0.0))
+                total_delta += delta
+                if "op_type" in step:
+                    op_code = _op_type_code(step["op_type"])
+                else:
+                    op_code = _op_type_from_string(str(step.get("operation", "")))
+                value, string_idx = _split_result(step.get("result"), strings)
+                steps.append(
+                    collapse_index=collapses.rows,
+                    op_type=op_code,
+                    entropy_delta=delta,
+                    result=value,
+                    result_str=string_idx,
+                )
+            value, string_idx = _split_result(record.get("result"), strings)
+            collapses.append(
+                timestamp=_timestamp_to_micros(record.get("timestamp")),
+                step_count=len(path),
+                entropy_delta=total_delta,
+                result=value,
+                result_str=string_idx,
+            )
+    finally:
+        collapses.close()
+        steps.close()
+
+    offsets, blob = strings.encode()
+    offsets.tofile(os.path.join(out_dir, "strings.offsets.bin"))
+    blob.tofile(os.path.join(out_dir, "strings.data.bin"))
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now().isoformat(),
+        "op_types": {op.name: op.value for op in SymbolicOperationType},
+        "tables": {
+            writer.table: {"rows": writer.rows, "columns": dict(writer.columns)}
+            for writer in (operations, collapses, steps)
+        },
+        "strings": {"count": len(strings.values), "bytes": int(blob.size)},
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def export_history(
+    source: Union[MemoryStore, str, None] = None,
+    out_path: str = "uml_history",
+    fmt: str = "raw",
+    chunk_size: int = 65536,
+) -> str:
+    """
+    Export engine history to columnar arrays.
+
+    Args:
+        source: A MemoryStore, or the path of a memory store directory. When a
+                directory is given the JSON files are streamed rather than
+                loaded. Defaults to the engine's UML_Memory directory.
+        out_path: Output directory for ``raw``, or archive path for ``npz``
+        fmt: ``"raw"`` (memory-mappable .bin files) or ``"npz"``
+        chunk_size: Number of rows buffered per column before writing
+
+    Returns:
+        Path of the written export
+    """
+    if source is None:
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UML_Memory")
+    if fmt == "raw":
+        _export_raw(source, out_path, chunk_size)
+        return out_path
+    if fmt != "npz":
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    if not out_path.endswith(".npz"):
+        out_path += ".npz"
+    staging = out_path + ".columns"
+    manifest = _export_raw(source, staging, chunk_size)
+    try:
+        # Stream each memory-mapped column into the archive one at a time
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            members = [
+                (f"{table}.{name}", dtype, info["rows"])
+                for table, info in manifest["tables"].items()
+                for name, dtype in info["columns"].items()
+            ]
+            members.append(("strings.offsets", "<i8", manifest["strings"]["count"] + 1))
+            members.append(("strings.data", "|u1", manifest["strings"]["bytes"]))
+            for member, dtype, rows in members:
+                array = _open_raw_column(os.path.join(staging, member + ".bin"), dtype, rows)
+                with archive.open(member + ".npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+            with archive.open("manifest.npy", "w") as f:
+                np.lib.format.write_array(f, np.array(json.dumps(manifest)))
+    finally:
+        for name in os.listdir(staging):
+            os.remove(os.path.join(staging, name))
+        os.rmdir(staging)
+    return out_path
+
+
+def _open_raw_column(path: str, dtype: str, rows: int) -> np.ndarray:
+    """Memory-map a raw column file (np.memmap cannot map empty files)."""
+    if rows == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """Load the manifest of a raw export directory or an .npz archive."""
+    if os.path.isdir(path):
+        with open(os.path.join(path, "manifest.json")) as f:
+            return json.load(f)
+    with np.load(path) as archive:
+        return json.loads(str(archive["manifest"]))
+
+
+def load_history_columns(
+    path: str, table: str, columns: Optional[List[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Load selected columns of an exported table.
+
+    Raw exports are returned as read-only ``np.memmap`` views (zero-copy);
+    ``.npz`` archives only decompress the requested members.
+
+    Args:
+        path: Raw export directory or .npz archive
+        table: ``"operations"``, ``"collapses"`` or ``"steps"``
+        columns: Column names to load; all columns if omitted
+
+    Returns:
+        Dictionary mapping column name to array
+    """
+    manifest = load_manifest(path)
+    if table not in manifest["tables"]:
+        raise KeyError(f"Unknown table: {table}")
+    info = manifest["tables"][table]
+    names = columns or list(info["columns"])
+    for name in names:
+        if name not in info["columns"]:
+            raise KeyError(f"Unknown column for {table}: {name}")
+
+    if os.path.isdir(path):
+        return {
+            name: _open_raw_column(
+                os.path.join(path, f"{table}.{name}.bin"),
+                info["columns"][name],
+                info["rows"],
+            )
+            for name in names
+        }
+    with np.load(path) as archive:
+        return {name: archive[f"{table}.{name}"] for name in names}
+
+
+class StringTable:
+    """Lazy view over an exported string table."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, idx: int) -> Optional[str]:
+        """Return string ``idx``, or None for the numeric marker -1."""
+        if idx < 0:
+            return None
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return bytes(self.data[start:end]).decode("utf-8")
+
+
+def load_string_table(path: str) -> StringTable:
+    """Load the string table of a raw export directory or an .npz archive."""
+    manifest = load_manifest(path)
+    count = manifest["strings"]["count"]
+    if os.path.isdir(path):
+        offsets = _open_raw_column(os.path.join(path, "strings.offsets.bin"), "<i8", count + 1)
+        data = _open_raw_column(
+            os.path.join(path, "strings.data.bin"), "|u1", manifest["strings"]["bytes"]
+        )
+        return StringTable(offsets, data)
+    with np.load(path) as archive:
+        return StringTable(archive["strings.offsets"], archive["strings.data"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export UML engine history to columnar arrays")
+    parser.add_argument("store", nargs="?", default=None, help="Memory store directory")
+    parser.add_argument("-o", "--output", default="uml_history", help="Output path")
+    parser.add_argument("--format", choices=["raw", "npz"], default="raw")
+    args = parser.parse_args()
+
+    written = export_history(args.store, args.output, args.format)
+    manifest = load_manifest(written)
+    print(f"Exported history to {written}")
+    for table_name, table_info in manifest["tables"].items():
+        print(f"  {table_name}: {table_info['rows']} rows")
+    print(f"  strings: {manifest['strings']['count']}")
@@ -9,6 +9,7 @@ Date: June 23, 2025
 
 import json
 import os
+import sys
 import time
 import uuid
 import math
@@ -18,6 +19,8 @@ from typing import Dict, List, Union, Tuple, Optional, Any, Callable
 from datetime import datetime
 import random
 
+from engine_stats import EngineStats
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -26,35 +29,34 @@ logger = logging.getLogger("UMLSymbolicEngine")
 
 # Import existing UML core functions if available
 try:
-    from uml_core import parse_uml, eval_uml, eval_recursive_compress
+    from uml_core import eval_uml
 
     logger.info("Successfully imported UML core functions")
-except ImportError:
-    logger.warning("UML core functions not found, using placeholder implementations")
 
-    # Placeholder implementations for standalone testing
-    def parse_uml(expr):
-        return expr
+    def ris_meta_operation(a, b, operation="auto"):
+        """Apply the UML core RIS meta-operator to two evaluated operands."""
+        return eval_uml({"op": "ris", "args": [a, b], "operation": operation})
 
-    def eval_uml(expr):
-        return expr
+except ImportError:
+    logger.warning("UML core functions not found, using placeholder implementations")
 
-    def eval_recursive_compress(a, b):
+    # Placeholder implementation for standalone testing
+    def ris_meta_operation(a, b, operation="auto"):
         return (a + b) / 2
 
 
 class SymbolicOperationType(Enum):
     """Enumeration of symbolic operation types in UML."""
 
-    ADDITION = auto()  # [A,B]
-    SUBTRACTION = auto()  # {A,B}
-    MULTIPLICATION = auto()  # >A,B<
-    DIVISION = auto()  # <A,B>
-    EXPONENTIATION = auto()  # ^[A]
-    ROOT = auto()  # /[N,X]
+    ADDITION = auto()  # [A,B] or A+B
+    SUBTRACTION = auto()  # {A,B} or A-B
+    MULTIPLICATION = auto()  # <A,B> or A*B
+    DIVISION = auto()  # <>A,B<> or A/B
+    EXPONENTIATION = auto()  # @(A,B) or A^B
+    ROOT = auto()  # /X< or @(X,N,root)
     LOGARITHM = auto()  # ?(A,B)
     FACTORIAL = auto()  # !A
-    MODULO = auto()  # %[A,B]
+    MODULO = auto()  # @(A,B,mod) or A%B
     RIS = auto()  # RIS(A,B)
     TFID = auto()  # TFID(A,phase)
     COLLAPSE = auto()  # collapse(expr)
@@ -66,8 +68,9 @@ class SymbolicOperationType(Enum):
         symbol_map = {
             "[": cls.ADDITION,
             "{": cls.SUBTRACTION,
-            ">": cls.MULTIPLICATION,
-            "<": cls.DIVISION,
+            "<": cls.MULTIPLICATION,
+            "<>": cls.DIVISION,
+            "@": cls.EXPONENTIATION,
             "^": cls.EXPONENTIATION,
             "/": cls.ROOT,
             "?": cls.LOGARITHM,
@@ -81,9 +84,31 @@ class SymbolicOperationType(Enum):
         return symbol_map.get(symbol, None)
 
 
+# Base entropy weights for each operation type
+_BASE_ENTROPY_WEIGHTS = {
+    SymbolicOperationType.ADDITION: 1.0,
+    SymbolicOperationType.SUBTRACTION: 1.1,
+    SymbolicOperationType.MULTIPLICATION: 1.3,
+    SymbolicOperationType.DIVISION: 1.5,
+    SymbolicOperationType.EXPONENTIATION: 1.8,
+    SymbolicOperationType.ROOT: 1.9,
+    SymbolicOperationType.LOGARITHM: 2.0,
+    SymbolicOperationType.FACTORIAL: 2.2,
+    SymbolicOperationType.MODULO: 1.4,
+    SymbolicOperationType.RIS: 0.8,  # RIS tends toward stability/lower entropy
+    SymbolicOperationType.TFID: 0.9,
+    SymbolicOperationType.COLLAPSE: 0.7,
+    SymbolicOperationType.IDENTITY: 0.5,  # Identity operations have lowest entropy
+}
+
+
 class SymbolicOperation:
     """Represents a symbolic operation in UML with intent and compression logic."""
 
+    # Slotted to keep large generated trees compact; metadata and the entropy
+    # weight are only materialized when first needed.
+    __slots__ = ("op_type", "operands", "_metadata", "_entropy_weight", "tfid")
+
     def __init__(
         self,
         op_type: SymbolicOperationType,
@@ -92,35 +117,60 @@ class SymbolicOperation:
     ):
         self.op_type = op_type
         self.operands = operands
-        self.metadata = metadata or {}
-        self.entropy_weight = self._calculate_entropy_weight()
+        self._metadata = metadata or None
+        self._entropy_weight = None
         self.tfid = None  # Will be assigned when operation is executed
 
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Operation metadata, allocated on first access."""
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value or None
+
+    @property
+    def entropy_weight(self) -> float:
+        """Entropy weight of this operation, computed once on first access."""
+        if self._entropy_weight is None:
+            self._entropy_weight = self._calculate_entropy_weight()
+        return self._entropy_weight
+
+    @entropy_weight.setter
+    def entropy_weight(self, value: float) -> None:
+        self._entropy_weight = value
+
     def _calculate_entropy_weight(self) -> float:
         """Calculate entropy weight for this operation."""
-        # Base weights for different operation types
-        base_weights = {
-            SymbolicOperationType.ADDITION: 1.0,
-            SymbolicOperationType.SUBTRACTION: 1.1,
-            SymbolicOperationType.MULTIPLICATION: 1.3,
-            SymbolicOperationType.DIVISION: 1.5,
-            SymbolicOperationType.EXPONENTIATION: 1.8,
-            SymbolicOperationType.ROOT: 1.9,
-            SymbolicOperationType.LOGARITHM: 2.0,
-            SymbolicOperationType.FACTORIAL: 2.2,
-            SymbolicOperationType.MODULO: 1.4,
-            SymbolicOperationType.RIS: 0.8,  # RIS tends toward stability/lower entropy
-            SymbolicOperationType.TFID: 0.9,
-            SymbolicOperationType.COLLAPSE: 0.7,
-            SymbolicOperationType.IDENTITY: 0.5,  # Identity operations have lowest entropy
-        }
-
+        # Resolve uncomputed descendants bottom-up with an explicit stack so
+        # deep trees never hit the recursion limit.
+        stack = [(self, False)]
+        while stack:
+            node, children_ready = stack.pop()
+            if node._entropy_weight is not None:
+                continue
+            if not children_ready:
+                stack.append((node, True))
+                for op in node.operands:
+                    if isinstance(op, SymbolicOperation) and op._entropy_weight is None:
+                        stack.append((op, False))
+                continue
+            node._entropy_weight = node._weight_from_operands()
+        return self._entropy_weight
+
+    def _weight_from_operands(self) -> float:
+        """Entropy weight from the base weight and already-computed operand weights."""
         # Start with base weight for operation type
-        weight = base_weights.get(self.op_type, 1.0)
+        weight = _BASE_ENTROPY_WEIGHTS.get(self.op_type, 1.0)
 
         # Adjust for operand complexity
         operand_complexity = sum(
-            1.0 if isinstance(op, (int, float, str)) else 1.5 + op.entropy_weight / 5
+            1.0
+            if isinstance(op, (int, float, complex, str))
+            else 1.5 + op.entropy_weight / 5
             for op in self.operands
         )
 
@@ -132,35 +182,59 @@ class SymbolicOperation:
         return weight * (0.8 + 0.4 * operand_complexity)
 
     def __str__(self) -> str:
-        """String representation of the symbolic operation."""
+        """String representation of the symbolic operation in UML notation."""
+        # Built bottom-up with an explicit stack so deep trees stay printable
+        parts: List[str] = []
+        stack = [(self, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                first = len(parts) - len(node.operands)
+                node_parts = parts[first:]
+                del parts[first:]
+                parts.append(node._format(node_parts))
+            elif isinstance(node, SymbolicOperation):
+                stack.append((node, True))
+                stack.extend((op, False) for op in reversed(node.operands))
+            else:
+                parts.append(str(node))
+        return parts[0]
+
+    def _format(self, parts: List[str]) -> str:
+        """Render this node given the rendered strings of its operands."""
+        args = ",".join(parts)
         if self.op_type == SymbolicOperationType.ADDITION:
-            return f"[{','.join(str(op) for op in self.operands)}]"
+            return f"[{args}]"
         elif self.op_type == SymbolicOperationType.SUBTRACTION:
-            return f"{{{','.join(str(op) for op in self.operands)}}}"
+            return f"{{{args}}}"
         elif self.op_type == SymbolicOperationType.MULTIPLICATION:
-            return f">{','.join(str(op) for op in self.operands)}<"
+            return f"<{args}>"
         elif self.op_type == SymbolicOperationType.DIVISION:
-            return f"<{','.join(str(op) for op in self.operands)}>"
+            return f"<>{args}<>"
         elif self.op_type == SymbolicOperationType.EXPONENTIATION:
-            return f"^[{','.join(str(op) for op in self.operands)}]"
+            return f"@({args})"
         elif self.op_type == SymbolicOperationType.ROOT:
-            return f"/[{','.join(str(op) for op in self.operands)}]"
+            if len(self.operands) == 1 or (
+                len(self.operands) == 2 and self.operands[1] == 2
+            ):
+                return f"/{parts[0]}<"
+            return f"@({args},root)"
         elif self.op_type == SymbolicOperationType.LOGARITHM:
-            return f"?({','.join(str(op) for op in self.operands)})"
+            return f"?({args})"
         elif self.op_type == SymbolicOperationType.FACTORIAL:
-            return f"!{self.operands[0]}" if self.operands else "!?"
+            return f"!{parts[0]}" if parts else "!?"
         elif self.op_type == SymbolicOperationType.MODULO:
-            return f"%[{','.join(str(op) for op in self.operands)}]"
+            return f"@({args},mod)"
         elif self.op_type == SymbolicOperationType.RIS:
-            return f"RIS({','.join(str(op) for op in self.operands)})"
+            return f"RIS({args})"
         elif self.op_type == SymbolicOperationType.TFID:
-            return f"TFID({','.join(str(op) for op in self.operands)})"
+            return f"TFID({args})"
         elif self.op_type == SymbolicOperationType.COLLAPSE:
-            return f"collapse({','.join(str(op) for op in self.operands)})"
+            return f"collapse({args})"
         elif self.op_type == SymbolicOperationType.IDENTITY:
-            return f"identity({self.operands[0]})" if self.operands else "identity(?)"
+            return f"identity({parts[0]})" if parts else "identity(?)"
         else:
-            return f"{self.op_type}({','.join(str(op) for op in self.operands)})"
+            return f"{self.op_type}({args})"
 
 
 class TFID:
@@ -265,14 +339,26 @@ class TFID:
 class MemoryStore:
     """Persistent storage for symbolic operations, TFIDs and RIS events."""
 
-    def __init__(self, store_path: str = None):
+    def __init__(
+        self,
+        store_path: str = None,
+        stats: Optional[EngineStats] = None,
+        autosave: bool = True,
+    ):
         """
         Initialize the memory store.
 
         Args:
             store_path: Directory to store memory files. Defaults to UML_Memory
                        in the current directory.
+            stats: Optional stats collector for write latency and bytes, and
+                   lookup hit rates
+            autosave: Rewrite the JSON files on every save; when False, changes
+                      are only written by flush()
         """
+        self.stats = stats
+        self.autosave = autosave
+        self._dirty = set()
         self.store_path = store_path or os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "UML_Memory"
         )
@@ -285,6 +371,11 @@ class MemoryStore:
         self.tfids = self._load_json(self.tfid_path, {})
         self.operations = self._load_json(self.operations_path, {})
         self.collapses = self._load_json(self.collapse_path, {})
+        self._stores = {
+            self.tfid_path: self.tfids,
+            self.operations_path: self.operations,
+            self.collapse_path: self.collapses,
+        }
 
         logger.info(f"Memory store initialized at {self.store_path}")
 
@@ -298,17 +389,44 @@ class MemoryStore:
 
     def _save_json(self, data: Any, path: str) -> None:
         """Save data as JSON to file."""
+        if self.stats is None:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+            return
+
+        start = time.perf_counter_ns()
         with open(path, "w") as f:
             json.dump(data, f, indent=2)
+            written = f.tell()
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.stats.record(f"store.write.{name}", time.perf_counter_ns() - start)
+        self.stats.incr("store.writes")
+        self.stats.incr(f"store.bytes.{name}", written)
+
+    def _persist(self, path: str) -> None:
+        """Write a store file now, or queue it for flush() when not autosaving."""
+        if self.autosave:
+            self._save_json(self._stores[path], path)
+        else:
+            self._dirty.add(path)
+
+    def flush(self) -> None:
+        """Write every store file changed since the last write."""
+        for path in sorted(self._dirty):
+            self._save_json(self._stores[path], path)
+        self._dirty.clear()
 
     def save_tfid(self, tfid: TFID) -> None:
         """Save a TFID to the memory store."""
         self.tfids[tfid.identity] = tfid.to_dict()
-        self._save_json(self.tfids, self.tfid_path)
+        self._persist(self.tfid_path)
 
     def get_tfid(self, identity: str) -> Optional[TFID]:
         """Retrieve a TFID by identity."""
-        if identity in self.tfids:
+        found = identity in self.tfids
+        if self.stats is not None:
+            self.stats.cache_lookup("memory.tfid", found)
+        if found:
             return TFID.from_dict(self.tfids[identity])
         return None
 
@@ -321,7 +439,7 @@ class MemoryStore:
             "operation": operation,
             "result_tfid": result_tfid,
         }
-        self._save_json(self.operations, self.operations_path)
+        self._persist(self.operations_path)
 
     def save_collapse(
         self,
@@ -339,7 +457,7 @@ class MemoryStore:
             "result": result,
             "result_tfid": result_tfid,
         }
-        self._save_json(self.collapses, self.collapse_path)
+        self._persist(self.collapse_path)
 
     def get_collapse_by_expression(self, expr: str) -> List[Dict[str, Any]]:
         """Find all collapses for a given expression."""
@@ -347,6 +465,8 @@ class MemoryStore:
         for collapse_id, collapse_data in self.collapses.items():
             if collapse_data["source_expression"] == expr:
                 results.append({"collapse_id": collapse_id, **collapse_data})
+        if self.stats is not None:
+            self.stats.cache_lookup("memory.collapse", bool(results))
         return results
 
     def get_operations_by_tfid(self, tfid_identity: str) -> List[Dict[str, Any]]:
@@ -355,6 +475,8 @@ class MemoryStore:
         for op_id, op_data in self.operations.items():
             if op_data["result_tfid"] == tfid_identity:
                 results.append({"operation_id": op_id, **op_data})
+        if self.stats is not None:
+            self.stats.cache_lookup("memory.operations", bool(results))
         return results
 
 
@@ -415,7 +537,7 @@ class ExpressionTree:
                 "op_type": node.op_type.name,
                 "entropy_weight": node.entropy_weight,
                 "operands": [self._serialize_node(op) for op in node.operands],
-                "metadata": node.metadata,
+                "metadata": node._metadata or {},
             }
         else:
             return {"type": "value", "value": str(node)}
@@ -500,6 +622,407 @@ class CollapseProtocol:
         return selected_idx, entropies[selected_idx]
 
 
+# Infix operators: symbol -> (precedence, right associative, operation type)
+_INFIX_OPERATORS = {
+    "+": (1, False, SymbolicOperationType.ADDITION),
+    "-": (1, False, SymbolicOperationType.SUBTRACTION),
+    "*": (2, False, SymbolicOperationType.MULTIPLICATION),
+    "/": (2, False, SymbolicOperationType.DIVISION),
+    "%": (2, False, SymbolicOperationType.MODULO),
+    "^": (4, True, SymbolicOperationType.EXPONENTIATION),
+}
+
+# Prefix operators bind tighter (factorial) or looser (negation) than ^
+_PREFIX_PRECEDENCE = {"neg": 3, "!": 5}
+
+# Operation names accepted by @(a,b,op) and RIS(a,b,op)
+_META_OPERATIONS = {
+    "pow": SymbolicOperationType.EXPONENTIATION,
+    "root": SymbolicOperationType.ROOT,
+    "log": SymbolicOperationType.LOGARITHM,
+    "mod": SymbolicOperationType.MODULO,
+    "add": SymbolicOperationType.ADDITION,
+    "sub": SymbolicOperationType.SUBTRACTION,
+    "mul": SymbolicOperationType.MULTIPLICATION,
+    "div": SymbolicOperationType.DIVISION,
+}
+
+_RIS_OPERATIONS = set(_META_OPERATIONS) | {"auto", "symbolic"}
+
+_CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+    "inf": float("inf"),
+    "nan": float("nan"),
+    "i": complex(0, 1),
+    "j": complex(0, 1),
+}
+
+
+def _sqrt(x):
+    return math.sqrt(x) if x >= 0 else complex(0, math.sqrt(abs(x)))
+
+
+# Numeric functions folded at parse time, as in uml_core.parse_uml
+_PARSE_TIME_FUNCTIONS = {
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "sqrt": _sqrt,
+    "abs": abs,
+    "log": math.log,
+}
+
+# Group kinds that are closed by a given character
+_GROUP_CLOSERS = {
+    "]": ("add",),
+    "}": ("sub",),
+    ")": ("paren", "log", "meta", "bang", "call"),
+    ">": ("mul",),
+}
+
+_GROUP_OPERATIONS = {
+    "add": SymbolicOperationType.ADDITION,
+    "sub": SymbolicOperationType.SUBTRACTION,
+    "mul": SymbolicOperationType.MULTIPLICATION,
+    "div": SymbolicOperationType.DIVISION,
+}
+
+
+class _ParseFrame:
+    """One open group while parsing: its finished arguments and the
+    shunting-yard stacks of the argument currently being read."""
+
+    __slots__ = ("kind", "name", "position", "args", "values", "ops", "expect_operand")
+
+    def __init__(self, kind: str, position: int, name: str = None):
+        self.kind = kind
+        self.name = name
+        self.position = position
+        self.args = []
+        self.values = []
+        self.ops = []
+        self.expect_operand = True
+
+
+class UMLExpressionParser:
+    """
+    Single-pass parser for the UML grammar that emits SymbolicOperation trees.
+
+    Supports nests ([..] add, {..} sub, <..> mul, <>..<> div, /x< root),
+    ?(a,b) logarithms, @(a,b[,op]) meta-operations, !(r,i) complex numbers,
+    !x factorial, RIS/TFID/collapse/identity calls, parse-time math functions
+    and infix + - * / % ^ with standard precedence. Groups are tracked on an
+    explicit frame stack and infix expressions with a shunting-yard, so
+    parsing is linear in the input length and never recurses.
+    """
+
+    def parse(self, expr: str) -> Union[SymbolicOperation, int, float, complex, str]:
+        """
+        Parse a UML expression.
+
+        Args:
+            expr: UML expression string
+
+        Returns:
+            SymbolicOperation tree, or a literal for constant expressions
+
+        Raises:
+            ValueError: If the expression is not valid UML
+        """
+        frames = [_ParseFrame("top", 0)]
+        n = len(expr)
+        i = 0
+        while i < n:
+            c = expr[i]
+            frame = frames[-1]
+
+            if c in " \t\r\n":
+                i += 1
+
+            elif c.isdigit() or (c == "." and i + 1 < n and expr[i + 1].isdigit()):
+                j = i
+                while j < n and expr[j].isdigit():
+                    j += 1
+                if j < n and expr[j] == ".":
+                    j += 1
+                    while j < n and expr[j].isdigit():
+                        j += 1
+                if j < n and expr[j] in "eE":
+                    k = j + 1
+                    if k < n and expr[k] in "+-":
+                        k += 1
+                    if k < n and expr[k].isdigit():
+                        j = k
+                        while j < n and expr[j].isdigit():
+                            j += 1
+                text = expr[i:j]
+                if j < n and expr[j] in "ij" and not (j + 1 < n and expr[j + 1].isalnum()):
+                    value = complex(0, float(text))
+                    j += 1
+                else:
+                    value = float(text)
+                self._push_operand(frame, value, i)
+                i = j
+
+            elif c.isalpha() or c == "_":
+                j = i
+                while j < n and (expr[j].isalnum() or expr[j] == "_"):
+                    j += 1
+                name = expr[i:j]
+                k = j
+                while k < n and expr[k] in " \t\r\n":
+                    k += 1
+                if k < n and expr[k] == "(":
+                    self._expect_operand(frame, i)
+                    frames.append(_ParseFrame("call", i, name))
+                    i = k + 1
+                else:
+                    if name.lower() in _CONSTANTS:
+                        value = _CONSTANTS[name.lower()]
+                    else:
+                        value = SymbolicOperation(SymbolicOperationType.IDENTITY, [name])
+                    self._push_operand(frame, value, i)
+                    i = j
+
+            elif c in "\"'":
+                j = expr.find(c, i + 1)
+                if j < 0:
+                    raise ValueError(f"Unterminated string at position {i}")
+                self._push_operand(frame, expr[i + 1 : j], i)
+                i = j + 1
+
+            elif c in "[{(":
+                self._expect_operand(frame, i)
+                frames.append(_ParseFrame({"[": "add", "{": "sub", "(": "paren"}[c], i))
+                i += 1
+
+            elif c in "?@" and i + 1 < n and expr[i + 1] == "(":
+                self._expect_operand(frame, i)
+                frames.append(_ParseFrame("log" if c == "?" else "meta", i))
+                i += 2
+
+            elif c == "!":
+                self._expect_operand(frame, i)
+                if i + 1 < n and expr[i + 1] == "(":
+                    frames.append(_ParseFrame("bang", i))
+                    i += 2
+                else:
+                    frame.ops.append(("!", i))
+                    i += 1
+
+            elif c == "<":
+                if i + 1 < n and expr[i + 1] == ">":
+                    if frame.kind == "root" and not frame.expect_operand:
+                        # "/x<>": the '<' closes the root, '>' is read next
+                        self._close(frames, i)
+                        i += 1
+                    elif frame.kind == "div" and not frame.expect_operand:
+                        self._close(frames, i)
+                        i += 2
+                    else:
+                        self._expect_operand(frame, i)
+                        frames.append(_ParseFrame("div", i))
+                        i += 2
+                elif frame.expect_operand:
+                    frames.append(_ParseFrame("mul", i))
+                    i += 1
+                elif frame.kind == "root":
+                    self._close(frames, i)
+                    i += 1
+                else:
+                    raise ValueError(f"Unexpected '<' at position {i}")
+
+            elif c in _GROUP_CLOSERS:
+                if frame.kind not in _GROUP_CLOSERS[c]:
+                    raise ValueError(f"Unexpected '{c}' at position {i}")
+                self._close(frames, i)
+                i += 1
+
+            elif c == ",":
+                if frame.kind in ("top", "paren", "root"):
+                    raise ValueError(f"Unexpected ',' at position {i}")
+                self._finish_argument(frame, i)
+                i += 1
+
+            elif c in _INFIX_OPERATORS:
+                if frame.expect_operand:
+                    if c == "-":
+                        frame.ops.append(("neg", i))
+                    elif c == "/":
+                        frames.append(_ParseFrame("root", i))
+                    elif c != "+":
+                        raise ValueError(f"Expected operand before '{c}' at position {i}")
+                else:
+                    precedence, right_assoc, _ = _INFIX_OPERATORS[c]
+                    while frame.ops:
+                        top = frame.ops[-1][0]
+                        top_precedence = (
+                            _INFIX_OPERATORS[top][0]
+                            if top in _INFIX_OPERATORS
+                            else _PREFIX_PRECEDENCE[top]
+                        )
+                        if top_precedence > precedence or (
+                            top_precedence == precedence and not right_assoc
+                        ):
+                            self._reduce(frame)
+                        else:
+                            break
+                    frame.ops.append((c, i))
+                    frame.expect_operand = True
+                i += 1
+
+            else:
+                raise ValueError(f"Unexpected character '{c}' at position {i}")
+
+        if len(frames) > 1:
+            frame = frames[-1]
+            raise ValueError(f"Unclosed '{frame.kind}' group opened at position {frame.position}")
+        top = frames[0]
+        self._finish_argument(top, n)
+        return top.args[0]
+
+    @staticmethod
+    def _expect_operand(frame: _ParseFrame, position: int) -> None:
+        if not frame.expect_operand:
+            raise ValueError(f"Missing operator before position {position}")
+
+    def _push_operand(self, frame: _ParseFrame, value: Any, position: int) -> None:
+        self._expect_operand(frame, position)
+        frame.values.append(value)
+        frame.expect_operand = False
+
+    @staticmethod
+    def _reduce(frame: _ParseFrame) -> None:
+        """Apply the operator on top of the frame's operator stack."""
+        op, _ = frame.ops.pop()
+        if op == "neg":
+            value = frame.values.pop()
+            if isinstance(value, (int, float, complex)):
+                frame.values.append(-value)
+            else:
+                frame.values.append(
+                    SymbolicOperation(SymbolicOperationType.SUBTRACTION, [0.0, value])
+                )
+        elif op == "!":
+            value = frame.values.pop()
+            frame.values.append(SymbolicOperation(SymbolicOperationType.FACTORIAL, [value]))
+        else:
+            right = frame.values.pop()
+            left = frame.values.pop()
+            frame.values.append(SymbolicOperation(_INFIX_OPERATORS[op][2], [left, right]))
+
+    def _finish_argument(self, frame: _ParseFrame, position: int) -> None:
+        """Complete the argument currently being read in a frame."""
+        if frame.expect_operand:
+            if frame.values or frame.ops:
+                raise ValueError(f"Expected operand at position {position}")
+            raise ValueError(f"Empty argument at position {position}")
+        while frame.ops:
+            self._reduce(frame)
+        frame.args.append(frame.values.pop())
+        frame.expect_operand = True
+
+    def _close(self, frames: List[_ParseFrame], position: int) -> None:
+        """Close the innermost group and push its node into the parent frame."""
+        frame = frames.pop()
+        if frame.kind == "call" and frame.expect_operand and not frame.args and not frame.ops:
+            args = []  # zero-argument call
+        else:
+            self._finish_argument(frame, position)
+            args = frame.args
+        node = self._build_group(frame, args)
+        parent = frames[-1]
+        parent.values.append(node)
+        parent.expect_operand = False
+
+    @staticmethod
+    def _operation_name(arg: Any) -> Optional[str]:
+        """Read an operation name given as a quoted string or bare identifier."""
+        if isinstance(arg, str):
+            return arg
+        if isinstance(arg, SymbolicOperation) and arg.op_type == SymbolicOperationType.IDENTITY:
+            return str(arg.operands[0])
+        return None
+
+    def _build_group(self, frame: _ParseFrame, args: List[Any]) -> Any:
+        kind = frame.kind
+        if kind in _GROUP_OPERATIONS:
+            return SymbolicOperation(_GROUP_OPERATIONS[kind], args)
+        if kind == "paren":
+            return args[0]
+        if kind == "root":
+            return SymbolicOperation(SymbolicOperationType.ROOT, [args[0], 2.0])
+        if kind == "log":
+            if len(args) == 1:
+                return SymbolicOperation(SymbolicOperationType.LOGARITHM, [math.e, args[0]])
+            if len(args) != 2:
+                raise ValueError(f"?( ) takes 1 or 2 arguments at position {frame.position}")
+            return SymbolicOperation(SymbolicOperationType.LOGARITHM, args)
+        if kind == "meta":
+            if len(args) < 2:
+                raise ValueError(f"@( ) requires 2 arguments at position {frame.position}")
+            op_type = SymbolicOperationType.EXPONENTIATION
+            if len(args) > 2:
+                op_type = _META_OPERATIONS.get(
+                    (self._operation_name(args[2]) or "").strip("'\""), op_type
+                )
+            return SymbolicOperation(op_type, args[:2])
+        if kind == "bang":
+            if len(args) == 2:
+                real, imag = args
+                if not all(isinstance(v, (int, float)) for v in (real, imag)):
+                    raise ValueError(f"!(real,imag) requires numbers at position {frame.position}")
+                return complex(real, imag)
+            if len(args) == 1:
+                return SymbolicOperation(SymbolicOperationType.FACTORIAL, args)
+            raise ValueError(f"!( ) takes 1 or 2 arguments at position {frame.position}")
+
+        # Function calls
+        name = frame.name
+        if name.upper() == "RIS":
+            if len(args) < 2:
+                raise ValueError(f"RIS requires at least 2 arguments, got {len(args)}")
+            operands = args[:2]
+            if len(args) > 2:
+                operation = self._operation_name(args[2])
+                if operation in _RIS_OPERATIONS:
+                    operands.append(operation)
+            return SymbolicOperation(SymbolicOperationType.RIS, operands)
+        if name == "TFID":
+            if not args:
+                raise ValueError("TFID requires at least 1 argument")
+            return SymbolicOperation(SymbolicOperationType.TFID, args)
+        if name in ("collapse", "identity"):
+            if len(args) != 1:
+                raise ValueError(f"{name} takes exactly 1 argument, got {len(args)}")
+            op_type = (
+                SymbolicOperationType.COLLAPSE
+                if name == "collapse"
+                else SymbolicOperationType.IDENTITY
+            )
+            return SymbolicOperation(op_type, args)
+        if name in _PARSE_TIME_FUNCTIONS:
+            if not args or not all(isinstance(a, (int, float, complex)) for a in args):
+                raise ValueError(f"{name}() requires constant numeric arguments")
+            return _PARSE_TIME_FUNCTIONS[name](*args)
+        raise ValueError(f"Unknown function: {name}")
+
+
+class _ExecutionFrame:
+    """One operation being executed: its TFID, the operands still to run and
+    the (result, tfid) pairs of those already run."""
+
+    __slots__ = ("operation", "tfid", "start", "pending", "values")
+
+    def __init__(self, operation: SymbolicOperation, tfid: TFID, start: Optional[int]):
+        self.operation = operation
+        self.tfid = tfid
+        self.start = start
+        self.pending = []
+        self.values = []
+
+
 class SymbolicEngine:
     """Main engine for UML symbolic operations, RIS, and TFID functionality."""
 
@@ -508,6 +1031,10 @@ class SymbolicEngine:
         memory_path: str = None,
         deterministic_collapse: bool = False,
         entropy_bias: float = 0.8,
+        collect_stats: bool = False,
+        stats_dump_path: str = None,
+        stats_dump_interval: float = 60.0,
+        stats_sample_rate: float = 1 / 32,
     ):
         """
         Initialize the symbolic engine.
@@ -516,8 +1043,18 @@ class SymbolicEngine:
             memory_path: Path for storing symbolic memory
             deterministic_collapse: Whether collapse protocol is deterministic
             entropy_bias: Bias toward lower entropy paths in non-deterministic mode
+            collect_stats: Record hot-path counters and latency histograms
+            stats_dump_path: Optional JSON file for periodic stats snapshots
+            stats_dump_interval: Seconds between periodic stats dumps
+            stats_sample_rate: Fraction of parses and executed trees whose
+                latency is recorded; counters are always exact
         """
-        self.memory = MemoryStore(memory_path)
+        self._stats = (
+            EngineStats(stats_dump_path, stats_dump_interval, stats_sample_rate)
+            if collect_stats or stats_dump_path
+            else None
+        )
+        self.memory = MemoryStore(memory_path, stats=self._stats)
         self.collapse_protocol = CollapseProtocol(
             deterministic=deterministic_collapse, entropy_bias=entropy_bias
         )
@@ -536,8 +1073,9 @@ class SymbolicEngine:
             "factorial": lambda n: math.gamma(n + 1) if n >= 0 else "!0",
             "modulo": lambda a, b: a % b if b != 0 else "!0",
             "identity": lambda x: x,
-            "ris": eval_recursive_compress,
+            "ris": ris_meta_operation,
         }
+        self.parser = UMLExpressionParser()
 
     def create_operation(
         self,
@@ -555,249 +1093,148 @@ class SymbolicEngine:
 
         return SymbolicOperation(op_type, operands, metadata)
 
-    def parse_expression(self, expr_str: str) -> SymbolicOperation:
-        """Parse a UML expression string into a SymbolicOperation tree."""
-        # Simple recursive descent parser for UML expressions
-        # For now, this is a placeholder that would need to be expanded
-        # to handle the full UML grammar
-
-        expr_str = expr_str.strip()
-
-        # Handle RIS function call
-        if expr_str.startswith("RIS(") and expr_str.endswith(")"):
-            args = expr_str[4:-1].split(",")
-            if len(args) >= 2:
-                operands = [self.parse_expression(arg.strip()) for arg in args]
-                return SymbolicOperation(SymbolicOperationType.RIS, operands)
-
-        # Handle TFID function call
-        if expr_str.startswith("TFID(") and expr_str.endswith(")"):
-            args = expr_str[5:-1].split(",")
-            if len(args) >= 1:
-                operands = [self.parse_expression(arg.strip()) for arg in args]
-                return SymbolicOperation(SymbolicOperationType.TFID, operands)
-
-        # Handle collapse function call
-        if expr_str.startswith("collapse(") and expr_str.endswith(")"):
-            inner_expr = expr_str[9:-1].strip()
-            return SymbolicOperation(
-                SymbolicOperationType.COLLAPSE, [self.parse_expression(inner_expr)]
-            )
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the engine's hot-path stats.
 
-        # Handle literal values
-        try:
-            # Try to parse as number
-            return float(expr_str)
-        except ValueError:
-            # If not a number or recognized function, treat as identity
-            if not any(c in expr_str for c in "[]{}()<>,^!%?"):
-                return SymbolicOperation(SymbolicOperationType.IDENTITY, [expr_str])
+        Returns:
+            Dictionary with counters, cache hit rates and latency percentiles,
+            or {"enabled": False} when stats collection is off
+        """
+        if self._stats is None:
+            return {"enabled": False}
+        return self._stats.snapshot()
 
-        # For now, default to using existing UML parser for other expressions
-        # This would be expanded in a full implementation
-        return parse_uml(expr_str)
+    def parse_expression(self, expr_str: str) -> SymbolicOperation:
+        """Parse a UML expression string into a SymbolicOperation tree."""
+        if self._stats is None:
+            return self._parse_expression(expr_str)
+        self._stats.countdown -= 1
+        if self._stats.countdown:
+            return self._parse_expression(expr_str)
+        self._stats.resample()
+        start = time.perf_counter_ns()
+        parsed = self._parse_expression(expr_str)
+        self._stats.record("parse", time.perf_counter_ns() - start)
+        self._stats.maybe_dump()
+        return parsed
+
+    def _parse_expression(self, expr_str: str) -> SymbolicOperation:
+        """Parse with the native UML parser; bare literals become identities."""
+        parsed = self.parser.parse(expr_str)
+        if not isinstance(parsed, SymbolicOperation):
+            parsed = SymbolicOperation(SymbolicOperationType.IDENTITY, [parsed])
+        return parsed
 
     def execute_operation(self, operation: SymbolicOperation) -> Tuple[Any, TFID]:
         """
         Execute a symbolic operation and assign it a TFID.
 
+        Operands are executed post-order with an explicit stack, so trees of
+        any depth run without hitting the recursion limit. Memory store writes
+        are batched and flushed once the whole tree has executed.
+
         Args:
             operation: The symbolic operation to execute
 
         Returns:
             Tuple of (result, tfid of result)
         """
+        # A sampled tree has every one of its operations timed
+        timed = False
+        if self._stats is not None:
+            self._stats.countdown -= 1
+            if not self._stats.countdown:
+                self._stats.resample()
+                timed = True
+
+        autosave = self.memory.autosave
+        self.memory.autosave = False
+        executed = 0
+        try:
+            stack = [self._enter_operation(operation, timed)]
+            while True:
+                frame = stack[-1]
+                if frame.pending:
+                    operand = frame.pending.pop()
+                    if isinstance(operand, SymbolicOperation):
+                        stack.append(self._enter_operation(operand, timed))
+                    else:
+                        frame.values.append((operand, None))
+                    continue
+                stack.pop()
+                outcome = self._finish_operation(frame)
+                executed += 1
+                if not stack:
+                    return outcome
+                stack[-1].values.append(outcome)
+        finally:
+            if self._stats is not None:
+                self._stats.executed += executed
+            self.memory.autosave = autosave
+            if autosave:
+                self.memory.flush()
+
+    def _enter_operation(self, operation: SymbolicOperation, timed: bool = False) -> "_ExecutionFrame":
+        """Start executing an operation: assign its TFID and queue its operands."""
+        start = time.perf_counter_ns() if timed else None
+
         # Create a TFID for this operation
-        op_tfid = TFID()
+        frame = _ExecutionFrame(operation, TFID(), start)
+
+        # Only the operands each operation type actually uses are executed
+        op_type = operation.op_type
+        if op_type in self._FOLDED_PRIMITIVES or op_type == SymbolicOperationType.RIS:
+            operands = operation.operands
+        elif op_type == SymbolicOperationType.TFID:
+            operands = operation.operands[:2]
+        elif op_type in (
+            SymbolicOperationType.FACTORIAL,
+            SymbolicOperationType.COLLAPSE,
+            SymbolicOperationType.IDENTITY,
+        ):
+            operands = operation.operands[:1]
+        else:
+            operands = []
+        frame.pending = list(reversed(operands))
+        return frame
+
+    def _finish_operation(self, frame: "_ExecutionFrame") -> Tuple[Any, TFID]:
+        """Apply an operation to its executed operands and record it."""
+        operation = frame.operation
+        op_tfid = frame.tfid
+        values = [value for value, _ in frame.values]
 
         # Handle different operation types
-        if operation.op_type == SymbolicOperationType.ADDITION:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            addition_func = self.primitives.get("addition")
-            if callable(addition_func):
-                result = addition_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'addition' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.SUBTRACTION:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            subtraction_func = self.primitives.get("subtraction")
-            if callable(subtraction_func):
-                result = subtraction_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'subtraction' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.MULTIPLICATION:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            multiplication_func = self.primitives.get("multiplication")
-            if callable(multiplication_func):
-                result = multiplication_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'multiplication' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.DIVISION:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            division_func = self.primitives.get("division")
-            if callable(division_func):
-                result = division_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'division' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.EXPONENTIATION:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            exponentiation_func = self.primitives.get("exponentiation")
-            if callable(exponentiation_func):
-                result = exponentiation_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'exponentiation' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.ROOT:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            root_func = self.primitives.get("root")
-            if callable(root_func):
-                result = root_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'root' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.LOGARITHM:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            logarithm_func = self.primitives.get("logarithm")
-            if callable(logarithm_func):
-                result = logarithm_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'logarithm' is not callable.")
-                
+        if operation.op_type in self._FOLDED_PRIMITIVES:
+            result = self._apply_primitive(operation.op_type, values)
+
         elif operation.op_type == SymbolicOperationType.FACTORIAL:
-            op_val = (
-                self.execute_operation(operation.operands[0])[0]
-                if isinstance(operation.operands[0], SymbolicOperation)
-                else operation.operands[0]
-            )
+            op_val = values[0]
             try:
                 numeric_val = float(op_val)
             except Exception:
                 numeric_val = op_val
-                
-            factorial_func = self.primitives.get("factorial")
-            if callable(factorial_func):
-                result = factorial_func(numeric_val)
-            else:
-                raise TypeError("Primitive 'factorial' is not callable.")
-                
-        elif operation.op_type == SymbolicOperationType.MODULO:
-            evaluated_operands = []
-            for op in operation.operands[:2]:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    evaluated_operands.append(val)
-                else:
-                    evaluated_operands.append(op)
-            # Ensure operands are numeric
-            try:
-                numeric_operands = [float(val) for val in evaluated_operands]
-            except Exception:
-                numeric_operands = evaluated_operands
-            modulo_func = self.primitives.get("modulo")
-            if callable(modulo_func):
-                result = modulo_func(*numeric_operands)
-            else:
-                raise TypeError("Primitive 'modulo' is not callable.")
-                
+            result = self._call_primitive("factorial", numeric_val)
+
         elif operation.op_type == SymbolicOperationType.RIS:
-            # RIS operation executes recursive compression
-            ops = []
-            for op in operation.operands:
-                if isinstance(op, SymbolicOperation):
-                    val, _ = self.execute_operation(op)
-                    ops.append(val)
-                else:
-                    ops.append(op)
-            
+            # RIS operation applies the RIS meta-operator, optionally with an
+            # explicit operation name as third operand
+            ops = values
+            ris_operation = "auto"
+            if len(ops) > 2 and isinstance(ops[2], str):
+                ris_operation = ops.pop(2)
+
             # Ensure operands are numeric
             try:
                 numeric_ops = [float(val) for val in ops]
             except Exception:
                 numeric_ops = ops
-                
-            ris_func = self.primitives.get("ris")
-            if callable(ris_func) and len(numeric_ops) >= 2:
-                result = ris_func(numeric_ops[0], numeric_ops[1])
+
+            if len(numeric_ops) >= 2:
+                result = self._call_primitive(
+                    "ris", numeric_ops[0], numeric_ops[1], ris_operation
+                )
             elif len(numeric_ops) > 0:
                 result = numeric_ops[0]
             else:
@@ -805,19 +1242,11 @@ class SymbolicEngine:
 
         elif operation.op_type == SymbolicOperationType.TFID:
             # TFID operation returns an identity with optional phase
-            identity = str(
-                self.execute_operation(operation.operands[0])[0]
-                if isinstance(operation.operands[0], SymbolicOperation)
-                else operation.operands[0]
-            )
+            identity = str(values[0])
 
             phase = 0
-            if len(operation.operands) > 1:
-                phase = int(
-                    self.execute_operation(operation.operands[1])[0]
-                    if isinstance(operation.operands[1], SymbolicOperation)
-                    else operation.operands[1]
-                )
+            if len(values) > 1:
+                phase = int(values[1])
 
             # Create a TFID for this identity and return it
             op_tfid = TFID(identity=identity, phase=phase)
@@ -825,11 +1254,9 @@ class SymbolicEngine:
 
         elif operation.op_type == SymbolicOperationType.COLLAPSE:
             # Collapse operation resolves an expression through the collapse protocol
-            inner_result, inner_tfid = (
-                self.execute_operation(operation.operands[0])
-                if isinstance(operation.operands[0], SymbolicOperation)
-                else (operation.operands[0], TFID())
-            )
+            inner_result, inner_tfid = frame.values[0]
+            if inner_tfid is None:
+                inner_tfid = TFID()
 
             # The collapse operation itself gets a new TFID derived from the inner one
             op_tfid = inner_tfid.fork("Collapse operation")
@@ -837,12 +1264,7 @@ class SymbolicEngine:
 
         elif operation.op_type == SymbolicOperationType.IDENTITY:
             # Identity operation just returns its argument with a new TFID
-            identity_val = (
-                self.execute_operation(operation.operands[0])[0]
-                if isinstance(operation.operands[0], SymbolicOperation)
-                else operation.operands[0]
-            )
-            result = identity_val
+            result = values[0]
 
         else:
             # Unrecognized operation type
@@ -869,8 +1291,67 @@ class SymbolicEngine:
             op_tfid.identity,
         )
 
+        if frame.start is not None:
+            # Inclusive of operand evaluation, exclusive of deferred store writes
+            self._stats.record(
+                self._EXECUTE_STAT_NAMES[operation.op_type], time.perf_counter_ns() - frame.start
+            )
+
         return result, op_tfid
 
+    # Histogram names per operation type, built once instead of per operation
+    _EXECUTE_STAT_NAMES = {op_type: f"execute.{op_type.name}" for op_type in SymbolicOperationType}
+
+    # Binary primitives folded left-to-right over all operands
+    _FOLDED_PRIMITIVES = {
+        SymbolicOperationType.ADDITION: "addition",
+        SymbolicOperationType.SUBTRACTION: "subtraction",
+        SymbolicOperationType.MULTIPLICATION: "multiplication",
+        SymbolicOperationType.DIVISION: "division",
+        SymbolicOperationType.EXPONENTIATION: "exponentiation",
+        SymbolicOperationType.ROOT: "root",
+        SymbolicOperationType.LOGARITHM: "logarithm",
+        SymbolicOperationType.MODULO: "modulo",
+    }
+
+    def _call_primitive(self, name: str, *args: Any) -> Any:
+        """Call a primitive by name."""
+        func = self.primitives.get(name)
+        if not callable(func):
+            raise TypeError(f"Primitive '{name}' is not callable.")
+        return func(*args)
+
+    def _apply_primitive(self, op_type: SymbolicOperationType, values: List[Any]) -> Any:
+        """
+        Fold a binary primitive over evaluated operand values.
+
+        Args:
+            op_type: Operation type with a binary primitive
+            values: Evaluated operand values
+
+        Returns:
+            The folded result; primitive error markers such as "!0" short-circuit
+        """
+        # Ensure operands are numeric
+        try:
+            values = [float(val) for val in values]
+        except Exception:
+            pass
+
+        name = self._FOLDED_PRIMITIVES[op_type]
+        if not values:
+            raise ValueError(f"{op_type.name} requires at least one operand")
+        if len(values) == 1:
+            # A lone root operand is a square root
+            return self._call_primitive(name, values[0], 2.0) if name == "root" else values[0]
+
+        result = values[0]
+        for value in values[1:]:
+            result = self._call_primitive(name, result, value)
+            if result == "!0":
+                break
+        return result
+
     def collapse_expression(self, expr_str: str) -> Tuple[Any, ExpressionTree]:
         """
         Collapse a UML expression using the collapse protocol, with visualization.
@@ -891,9 +1372,14 @@ class SymbolicEngine:
         collapse_paths = self._generate_collapse_paths(operation)
 
         # Select a path using the collapse protocol
+        if self._stats is not None:
+            start = time.perf_counter_ns()
         path_idx, path_entropy = self.collapse_protocol.select_collapse_path(
             collapse_paths
         )
+        if self._stats is not None:
+            self._stats.record("collapse.select", time.perf_counter_ns() - start)
+            self._stats.incr("collapse.paths", len(collapse_paths))
         selected_path = collapse_paths[path_idx]
 
         # Execute each step in the selected path
@@ -925,6 +1411,7 @@ class SymbolicEngine:
             collapse_steps.append(
                 {
                     "operation": str(step_op),
+                    "op_type": step_op.op_type.name,
                     "result": str(step_result),
                     "tfid": step_tfid.identity,
                     "entropy_delta": entropy_delta,
@@ -942,6 +1429,10 @@ class SymbolicEngine:
             collapse_id, expr_str, collapse_steps, str(result), final_tfid.identity
         )
 
+        if self._stats is not None:
+            self._stats.incr("collapses")
+            self._stats.maybe_dump()
+
         return result, tree
 
     def _generate_collapse_paths(
@@ -1015,7 +1506,7 @@ class SymbolicEngine:
         print("  collapse([3,7])   - Visualize collapse steps")
         print('  TFID("x", 3)     - Create temporal flux identity')
         print("  trace_TFID(id)    - Trace TFID history")
-        print("  memory_stats      - Show memory store statistics")
+        print("  memory_stats      - Show memory store and engine statistics")
         print("  clear_memory      - Clear memory store")
 
         while True:
@@ -1046,6 +1537,11 @@ class SymbolicEngine:
                         "memory_path": self.memory.store_path,
                     }
                     print(json.dumps(stats, indent=2))
+                    if self._stats is not None:
+                        print("Engine stats:")
+                        print(self._stats.format_report())
+                    else:
+                        print("Engine stats: disabled (collect_stats=False)")
 
                 elif user_input.lower() == "clear_memory":
                     # Clear memory store
@@ -1085,5 +1581,5 @@ class SymbolicEngine:
 
 if __name__ == "__main__":
     # Example usage
-    engine = SymbolicEngine()
+    engine = SymbolicEngine(collect_stats="--stats" in sys.argv)
     engine.run_interactive_repl()
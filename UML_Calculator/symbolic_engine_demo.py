@@ -40,30 +40,30 @@ def demo_basic_operations():
     result, tfid = engine.execute_operation(add_op)
     print(f"  [3,4] = {result} (TFID: {tfid})")
     
-    # Multiplication: >5,6<
+    # Multiplication: <5,6>
     mult_op = engine.create_operation(SymbolicOperationType.MULTIPLICATION, [5, 6])
     result, tfid = engine.execute_operation(mult_op)
-    print(f"  >5,6< = {result} (TFID: {tfid})")
+    print(f"  <5,6> = {result} (TFID: {tfid})")
     
-    # Division: <10,2>
+    # Division: <>10,2<>
     div_op = engine.create_operation(SymbolicOperationType.DIVISION, [10, 2])
     result, tfid = engine.execute_operation(div_op)
-    print(f"  <10,2> = {result} (TFID: {tfid})")
+    print(f"  <>10,2<> = {result} (TFID: {tfid})")
     
-    # Exponentiation: ^[2,3]
+    # Exponentiation: @(2,3)
     exp_op = engine.create_operation(SymbolicOperationType.EXPONENTIATION, [2, 3])
     result, tfid = engine.execute_operation(exp_op)
-    print(f"  ^[2,3] = {result} (TFID: {tfid})")
+    print(f"  @(2,3) = {result} (TFID: {tfid})")
     
     # Root: /[2,9]
     root_op = engine.create_operation(SymbolicOperationType.ROOT, [9, 2])
     result, tfid = engine.execute_operation(root_op)
-    print(f"  /[2,9] = {result} (TFID: {tfid})")
+    print(f"  @(9,2,root) = {result} (TFID: {tfid})")
     
-    # Modulo: %[10,3]
+    # Modulo: @(10,3,mod)
     mod_op = engine.create_operation(SymbolicOperationType.MODULO, [10, 3])
     result, tfid = engine.execute_operation(mod_op)
-    print(f"  %[10,3] = {result} (TFID: {tfid})")
+    print(f"  @(10,3,mod) = {result} (TFID: {tfid})")
 
 def demo_expression_parsing():
     """Demonstrate expression parsing."""
@@ -78,10 +78,14 @@ def demo_expression_parsing():
         "collapse([5,2])",
         "[3,4]",  # Addition
         "{10,3}",  # Subtraction
-        ">5,6<",   # Multiplication
-        "<20,4>",  # Division
-        "^[2,4]",  # Exponentiation
+        "<5,6>",   # Multiplication
+        "<>20,4<>",  # Division
+        "@(2,4)",  # Exponentiation
+        "/16<",    # Root
+        "?(2,8)",  # Logarithm
+        "@(10,3,mod)",  # Modulo
         "!5",      # Factorial
+        "2+3*4^2",  # Infix
     ]
     
     print("Parsing expressions:")
@@ -101,11 +105,11 @@ def demo_ris_operation():
     # Simple RIS demonstrations
     print("Simple RIS operations:")
     ris_examples = [
-        (4, 9),    # Expected: 6.5
-        (10, 20),  # Expected: 15
-        (2, 8),    # Expected: 5
-        (-3, 7),   # Expected: 2
-        (3.5, 7.5) # Expected: 5.5
+        (4, 9),    # Expected: 13 (add)
+        (10, 20),  # Expected: 30 (add)
+        (2, 8),    # Expected: 10 (add)
+        (-3, 7),   # Expected: 4 (add)
+        (3.5, 7.5) # Expected: 11 (add)
     ]
     
     for a, b in ris_examples:
@@ -2,11 +2,18 @@
 Symbolic Extensions for UML Calculator
 Additional symbolic and numeric features extracted from Algebra/Calculator
 Integrates with the enhanced UML core for extended mathematical capabilities.
+
+The integer functions below check their result size against the active
+evaluation budget before they start, and its deadline while they loop.
 """
 
 from typing import Callable, List, Any
 import math
 
+from core.evaluation_budget import (
+    CHECK_INTERVAL, call_scope, check_deadline, check_int_bits, factorial_bits, fibonacci_bits,
+)
+
 # --- Base52 Encoding ---
 BASE52_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
 BASE52_MAP = {c: i+1 for i, c in enumerate(BASE52_CHARS)}
@@ -123,6 +130,8 @@ def is_prime(n):
     for i in range(3, int(n**0.5) + 1, 2):
         if n % i == 0:
             return False
+        if i % (2 * CHECK_INTERVAL) == 1:
+            check_deadline()
     return True
 
 def prime_factors(n):
@@ -134,6 +143,8 @@ def prime_factors(n):
             factors.append(d)
             n //= d
         d += 1
+        if d % CHECK_INTERVAL == 0:
+            check_deadline()
     if n > 1:
         factors.append(n)
     return factors
@@ -182,37 +193,47 @@ def standard_deviation(values):
     return math.sqrt(variance)
 
 # --- Advanced Mathematical Functions ---
-def fibonacci(n):
-    """Calculate nth Fibonacci number"""
+def fibonacci(n, budget=None):
+    """Calculate nth Fibonacci number (budget: evaluation budget for this call)"""
     if n <= 1:
         return n
-    a, b = 0, 1
-    for _ in range(2, n + 1):
-        a, b = b, a + b
-    return b
-
-def factorial(n):
-    """Calculate factorial"""
+    with call_scope(budget):
+        check_int_bits(fibonacci_bits(n))
+        a, b = 0, 1
+        for i in range(2, n + 1):
+            a, b = b, a + b
+            if i % CHECK_INTERVAL == 0:
+                check_deadline()
+        return b
+
+def factorial(n, budget=None):
+    """Calculate factorial (budget: evaluation budget for this call)"""
     if n < 0:
         raise ValueError("Factorial is not defined for negative numbers")
     if n == 0 or n == 1:
         return 1
-    result = 1
-    for i in range(2, n + 1):
-        result *= i
-    return result
-
-def combinations(n, r):
+    with call_scope(budget):
+        check_int_bits(factorial_bits(n))
+        result = 1
+        for i in range(2, n + 1):
+            result *= i
+            if i % CHECK_INTERVAL == 0:
+                check_deadline()
+        return result
+
+def combinations(n, r, budget=None):
     """Calculate binomial coefficient C(n,r)"""
     if r > n or r < 0:
         return 0
-    return factorial(n) // (factorial(r) * factorial(n - r))
+    with call_scope(budget):
+        return factorial(n) // (factorial(r) * factorial(n - r))
 
-def permutations(n, r):
+def permutations(n, r, budget=None):
     """Calculate permutations P(n,r)"""
     if r > n or r < 0:
         return 0
-    return factorial(n) // factorial(n - r)
+    with call_scope(budget):
+        return factorial(n) // factorial(n - r)
 
 # --- Extended UML Operators ---
 def uml_root(args):
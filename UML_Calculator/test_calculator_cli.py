@@ -0,0 +1,27 @@
+"""
+Tests for calculator_cli's auto-mode routing
+
+route_expression picks the engine from the expression's surface syntax and
+parses it once; UML notation that does not parse raises ValueError.
+"""
+
+import unittest
+
+from ui.calculator_cli import evaluate_expression, route_expression
+
+
+class RouteExpressionTest(unittest.TestCase):
+    def test_engines(self):
+        self.assertEqual(route_expression("[2,3]").engine, "uml")
+        self.assertEqual(route_expression("6, 3").engine, "ris")
+        self.assertEqual(route_expression("2+3*4").engine, "standard")
+        self.assertEqual(evaluate_expression("[[1,2]]")[0], 3.0)
+
+    def test_empty_nests_raise_value_error(self):
+        for expr in ["[]", "{}", "[ ]", "[,]", "< >"]:
+            with self.subTest(expr=expr), self.assertRaises(ValueError):
+                route_expression(expr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Round-trip tests for the shunting-yard standard-to-UML converter
+
+Random standard expressions are converted, parsed back with parse_uml and
+evaluated; the result must match safe_eval on the original. Malformed input
+must raise ValueError, and long inputs must convert in linear time. Infix
+chains must associate the same way here as in uml_core's hybrid infix parser
+and the symbolic engine's parser (UML_Spec.md 2.4).
+"""
+
+import math
+import random
+import tempfile
+import time
+import unittest
+
+from core.converters import convert_standard_to_uml
+from core.uml_core import eval_uml, parse_uml
+from safe_eval import safe_eval
+import uml_core
+from symbolic_engine import SymbolicEngine
+
+
+def random_expression(rng, depth=0):
+    """A random expression over numbers, + - * / % ^, unary minus and parentheses."""
+    if depth >= 4 or rng.random() < 0.3:
+        return rng.choice([str(rng.randint(1, 9)), f"{rng.randint(1, 9)}.5"])
+    choice = rng.random()
+    if choice < 0.1:
+        return "-" + random_expression(rng, depth + 1)
+    if choice < 0.2:
+        return "(" + random_expression(rng, depth + 1) + ")"
+    if choice < 0.3:
+        # Small integer exponents keep results real and finite
+        return "(" + random_expression(rng, depth + 1) + ")" + rng.choice(["^", "**"]) + str(rng.randint(0, 3))
+    op = rng.choice(["+", "-", "*", "/", "%"])
+    return random_expression(rng, depth + 1) + f" {op} " + random_expression(rng, depth + 1)
+
+
+def round_trip(expr):
+    return eval_uml(parse_uml(convert_standard_to_uml(expr)))
+
+
+class RoundTripTest(unittest.TestCase):
+    def test_random_expressions_match_safe_eval(self):
+        rng = random.Random(0)
+        checked = 0
+        for _ in range(2000):
+            expr = random_expression(rng)
+            try:
+                expected = safe_eval(expr.replace("^", "**"))
+            except ValueError:
+                continue
+            if not isinstance(expected, (int, float)) or not math.isfinite(expected):
+                continue
+            with self.subTest(expr=expr, uml=convert_standard_to_uml(expr)):
+                self.assertTrue(math.isclose(round_trip(expr), expected, rel_tol=1e-9, abs_tol=1e-9))
+            checked += 1
+        self.assertGreater(checked, 1000)
+
+    def test_precedence_and_associativity(self):
+        cases = {
+            "2+3*4": "[2,<3,4>]",
+            "1+2+3": "[1,2,3]",
+            "a-b-c": "{a,b,c}",
+            "a-(b-c)": "{a,{b,c}}",
+            "8/4/2": "<><>8,4<>,2<>",
+            "x^2": "@(x,2)",
+            "2^3^2": "@(2,@(3,2))",
+            "2**3": "@(2,3)",
+            "-2^2": "{0,@(2,2)}",
+            "2^-1": "@(2,-1)",
+            "-x": "{0,x}",
+            "10 % 3 * 2": "<@(10,3,mod),2>",
+            "sqrt(16) + 1": "[sqrt(16),1]",
+        }
+        for expr, uml in cases.items():
+            with self.subTest(expr=expr):
+                self.assertEqual(convert_standard_to_uml(expr), uml)
+        self.assertEqual(round_trip("a-b-c"), 27 - 28 - 29)
+        self.assertEqual(round_trip("-7 % 3"), 2)
+
+    def test_infix_chains_associate_alike_in_every_engine(self):
+        cases = {"2^3^2": 512, "2^1^3": 2, "10-3-2": 5, "8/4/2": 1, "12/2*3": 18, "1-2+3": 2}
+        with tempfile.TemporaryDirectory() as memory_path:
+            engine = SymbolicEngine(memory_path=memory_path)
+            for expr, expected in cases.items():
+                with self.subTest(expr=expr):
+                    self.assertEqual(round_trip(expr), expected)
+                    self.assertEqual(uml_core.eval_uml(uml_core.parse_uml(expr)), expected)
+                    result, _ = engine.execute_operation(engine.parse_expression(expr))
+                    self.assertEqual(result, expected)
+
+    def test_malformed_input_raises(self):
+        for expr in ["", "2+", "(1", "1)", "2 3", "1,2", "f(1,)", "2x", "()", "1 $ 2", "* 2"]:
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError):
+                    convert_standard_to_uml(expr)
+
+    def test_long_expressions_convert_in_linear_time(self):
+        def convert_time(operators):
+            expr = "1" + "".join(f"-x{i}*2" for i in range(operators // 2))
+            start = time.perf_counter()
+            convert_standard_to_uml(expr)
+            return time.perf_counter() - start
+
+        small, large = convert_time(10_000), convert_time(80_000)
+        self.assertLess(large, small * 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the evaluation daemon's request handling
+
+Every protocol op goes through Evaluator.handle, alone and inside a batch;
+errors come back in the reply instead of being raised. The socket must sit
+in a directory only its user can write to.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ui.eval_daemon import AVAILABLE, Evaluator, _check_socket_directory, request, serve
+
+
+class EvaluatorHandleTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.evaluator = Evaluator(use_cache=False)
+
+    def handle(self, req):
+        return self.evaluator.handle(req)
+
+    def test_eval(self):
+        self.assertEqual(self.handle({"op": "eval", "expr": "[2,3]", "id": 1}), {"id": 1, "result": 5.0})
+        self.assertEqual(self.handle({"op": "eval", "expr": "2+3*4", "mode": "standard"})["result"], 14)
+
+    def test_calc(self):
+        self.assertEqual(self.handle({"op": "calc", "expr": "2+3*4"})["result"], 14)
+        self.assertEqual(float(self.handle({"op": "calc", "expr": "3*x^2", "x": 2})["result"]), 12.0)
+
+    def test_ris(self):
+        self.assertEqual(self.handle({"op": "ris", "a": 8, "b": 2})["result"], 4.0)
+        self.assertEqual(self.handle({"op": "ris", "a": 8, "b": 2, "mode": "always_multiply"})["result"], 16.0)
+
+    def test_batch(self):
+        reply = self.handle({"op": "batch", "id": "b", "requests": [
+            {"op": "ris", "a": 6, "b": 3, "id": 1},
+            {"op": "eval", "expr": "<2,3>", "id": 2},
+            {"op": "ping", "id": 3},
+            {"op": "nope", "id": 4},
+        ]})
+        self.assertEqual(reply["id"], "b")
+        self.assertEqual(reply["results"][:3], [{"id": 1, "result": 18.0}, {"id": 2, "result": 6.0},
+                                                {"id": 3, "result": "pong"}])
+        self.assertIn("unknown op", reply["results"][3]["error"])
+
+    def test_ping_and_stats(self):
+        self.assertEqual(self.handle({"op": "ping"}), {"result": "pong"})
+        stats = self.handle({"op": "stats"})["result"]
+        self.assertGreater(stats["requests"], 0)
+        self.assertIn("memo_hits", stats)
+
+    def test_errors_are_replies(self):
+        self.assertIn("error", self.handle(["not", "an", "object"]))
+        self.assertIn("error", self.handle({"op": "ris", "a": 1}))
+        reply = self.handle({"op": "calc", "expr": "9**9**9", "frontend": "web"})
+        self.assertIn("Evaluation budget exceeded", reply["error"])
+
+
+@unittest.skipUnless(AVAILABLE and hasattr(os, "getuid"), "needs Unix domain sockets")
+class SocketDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_missing_directory_is_created_private(self):
+        path = os.path.join(self.root, "daemon", "eval.sock")
+        _check_socket_directory(path)
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+    def test_shared_or_linked_directory_is_refused(self):
+        shared = os.path.join(self.root, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with self.assertRaises(PermissionError):
+            _check_socket_directory(os.path.join(shared, "eval.sock"))
+        private = os.path.join(self.root, "private")
+        os.mkdir(private, 0o700)
+        os.symlink(private, os.path.join(self.root, "link"))
+        with self.assertRaises(PermissionError):
+            _check_socket_directory(os.path.join(self.root, "link", "eval.sock"))
+        self.assertIsNone(request({"op": "ping"}, os.path.join(shared, "eval.sock"), autostart=False))
+
+    def test_round_trip(self):
+        path = os.path.join(self.root, "daemon", "eval.sock")
+        thread = threading.Thread(target=serve, args=(path, 0, None, False))
+        thread.start()
+        try:
+            for _ in range(500):
+                if os.path.exists(path):
+                    break
+                thread.join(0.01)
+            self.assertEqual(request({"op": "ping"}, path, autostart=False), {"result": "pong"})
+        finally:
+            request({"op": "shutdown"}, path, autostart=False)
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
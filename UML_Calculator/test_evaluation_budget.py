@@ -0,0 +1,95 @@
+"""
+Tests for evaluation budgets: size limits checked up front, the deadline
+while evaluating, and per-call and per-front-end configuration
+"""
+
+import time
+import unittest
+
+from core.evaluation_budget import (
+    FRONTEND_BUDGETS, EvaluationBudget, EvaluationBudgetExceeded, budget_for, budget_scope,
+    check_deadline, check_source, current_budget,
+)
+from safe_eval import safe_eval
+from symbolic_extensions import factorial, fibonacci
+from core.uml_core import parse_uml as parse_core_uml
+from uml_core import eval_uml, parse_uml
+
+
+class SizeLimitTest(unittest.TestCase):
+    def assertOverBudget(self, limit, func, *args, **kwargs):
+        start = time.perf_counter()
+        with self.assertRaises(EvaluationBudgetExceeded) as caught:
+            func(*args, **kwargs)
+        self.assertEqual(caught.exception.limit, limit)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_huge_integers_are_rejected_before_computing(self):
+        self.assertOverBudget("max_int_bits", safe_eval, "9**9**9")
+        self.assertOverBudget("max_int_bits", safe_eval, "(10**500000) * (10**500000)")
+        self.assertOverBudget("max_int_bits", factorial, 10**7)
+        self.assertOverBudget("max_int_bits", fibonacci, 10**8)
+        self.assertOverBudget("max_int_bits", check_source, "2**3 + factorial(10**9)")
+
+    def test_sequence_repetition(self):
+        self.assertOverBudget("max_length", safe_eval, "'ab' * 10**9")
+        self.assertEqual(safe_eval("'ab' * 2"), "abab")
+
+    def test_tree_size_and_depth(self):
+        nested = "[1," * 50 + "1" + "]" * 50
+        self.assertEqual(eval_uml(parse_uml(nested)), 51.0)
+        small = EvaluationBudget(max_depth=10)
+        self.assertOverBudget("max_depth", eval_uml, parse_uml(nested), budget=small)
+        self.assertOverBudget("max_nodes", safe_eval, "+".join(["1"] * 20),
+                              budget=EvaluationBudget(max_nodes=10))
+
+    def test_deep_text_is_rejected_before_parsing(self):
+        deep = "[" * 100_000 + "1" + ",1]" * 100_000
+        nested = "[1," * 50 + "1" + "]" * 50
+        with budget_scope(max_depth=51):
+            for parse in (parse_uml, parse_core_uml):
+                self.assertOverBudget("max_depth", parse, deep)
+                self.assertOverBudget("max_depth", parse, "[" + nested + "]")
+                parse(nested)
+
+    def test_within_budget_results_are_unchanged(self):
+        self.assertEqual(safe_eval("2**100"), 1 << 100)
+        self.assertEqual(safe_eval("(-3)**3 * 2"), -54)
+        self.assertEqual(factorial(20), 2432902008176640000)
+        self.assertEqual(fibonacci(90), 2880067194370816120)
+        check_source("x**100 + 2**64")
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_deadline_interrupts_long_loops(self):
+        with self.assertRaises(EvaluationBudgetExceeded) as caught:
+            fibonacci(10**6, budget=EvaluationBudget(time_limit=0.01))
+        self.assertEqual(caught.exception.limit, "time_limit")
+
+    def test_nested_scope_keeps_earlier_deadline(self):
+        with budget_scope(time_limit=0.0):
+            with budget_scope(time_limit=60.0):
+                with self.assertRaises(EvaluationBudgetExceeded):
+                    check_deadline()
+        check_deadline()
+
+
+class ConfigurationTest(unittest.TestCase):
+    def test_frontend_presets_and_overrides(self):
+        with budget_scope(frontend="web"):
+            self.assertEqual(current_budget(), FRONTEND_BUDGETS["web"])
+            with self.assertRaises(EvaluationBudgetExceeded):
+                safe_eval("2**30000")
+        self.assertEqual(safe_eval("2**30000"), 1 << 30000)
+        self.assertEqual(budget_for("cli", time_limit=5).time_limit, 5)
+        with self.assertRaises(ValueError):
+            budget_for("phone")
+
+    def test_budget_error_is_not_wrapped(self):
+        # safe_eval turns other evaluation errors into ValueError
+        with self.assertRaises(EvaluationBudgetExceeded):
+            safe_eval("math.floor(9**9**9)")
+
+
+if __name__ == "__main__":
+    unittest.main()
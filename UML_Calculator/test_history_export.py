@@ -0,0 +1,113 @@
+"""
+Round-trip tests for the columnar history export
+
+A memory store directory (operations.json, collapses.json) is exported in
+both formats and read back column by column: numeric and string results,
+steps with and without a stored op_type, and selective column loading.
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+from history_export import export_history, load_history_columns, load_manifest, load_string_table
+from symbolic_engine import SymbolicOperationType
+
+OPERATIONS = {
+    "op-1": {
+        "operation_id": "op-1",
+        "timestamp": "1970-01-01T00:00:01.000002",
+        "operation": {"type": "ADDITION", "operands": ["3", "4"], "entropy_weight": 1.0},
+        "result_tfid": "t1",
+    },
+    "op-2": {
+        "operation_id": "op-2",
+        "timestamp": "2025-06-23T12:00:00+02:00",
+        "operation": {"type": "RIS", "operands": ["4", "9", "2"], "entropy_weight": 0.8},
+        "result_tfid": "t2",
+    },
+}
+
+COLLAPSES = {
+    "c-1": {
+        "collapse_id": "c-1",
+        "timestamp": "2025-06-23T12:00:00",
+        "source_expression": "[3,4]",
+        "collapse_path": [{"operation": "[3,4]", "op_type": "ADDITION", "result": 7, "entropy_delta": 0.5}],
+        "result": 7,
+    },
+    "c-2": {
+        "collapse_id": "c-2",
+        "timestamp": "2025-06-23T12:00:01",
+        "source_expression": "<>1,0<>",
+        "collapse_path": [
+            {"operation": "RIS(4,9)", "result": "6.5", "entropy_delta": 0.25},
+            {"operation": "<>1,0<>", "result": "!0", "entropy_delta": -1.0},
+        ],
+        "result": "!0",
+    },
+}
+
+
+class HistoryExportRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = os.path.join(self.directory, "UML_Memory")
+        os.mkdir(self.store)
+        for name, records in (("operations", OPERATIONS), ("collapses", COLLAPSES)):
+            with open(os.path.join(self.store, f"{name}.json"), "w") as f:
+                json.dump(records, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_export(self, path):
+        manifest = load_manifest(path)
+        self.assertEqual({table: info["rows"] for table, info in manifest["tables"].items()},
+                         {"operations": 2, "collapses": 2, "steps": 3})
+
+        operations = load_history_columns(path, "operations")
+        self.assertEqual(operations["timestamp"].tolist(), [1_000_002, 1_750_672_800_000_000])
+        self.assertEqual(operations["op_type"].tolist(),
+                         [SymbolicOperationType.ADDITION.value, SymbolicOperationType.RIS.value])
+        self.assertEqual(operations["entropy_weight"].tolist(), [1.0, 0.8])
+        self.assertEqual(operations["operand_count"].tolist(), [2, 3])
+
+        strings = load_string_table(path)
+        collapses = load_history_columns(path, "collapses")
+        self.assertEqual(collapses["step_count"].tolist(), [1, 2])
+        self.assertEqual(collapses["entropy_delta"].tolist(), [0.5, -0.75])
+        self.assertEqual(collapses["result"][0], 7.0)
+        self.assertTrue(math.isnan(collapses["result"][1]))
+        self.assertEqual([strings[i] for i in collapses["result_str"]], [None, "!0"])
+
+        steps = load_history_columns(path, "steps")
+        self.assertEqual(steps["collapse_index"].tolist(), [0, 1, 1])
+        # The later steps have no op_type and are typed from their operation string
+        self.assertEqual(steps["op_type"].tolist(), [SymbolicOperationType.ADDITION.value,
+                                                     SymbolicOperationType.RIS.value,
+                                                     SymbolicOperationType.DIVISION.value])
+        self.assertEqual(steps["result"][:2].tolist(), [7.0, 6.5])
+        self.assertEqual([strings[i] for i in steps["result_str"]], [None, None, "!0"])
+        self.assertEqual(len(strings), 1)
+
+        selected = load_history_columns(path, "collapses", ["result_str"])
+        self.assertEqual(list(selected), ["result_str"])
+        with self.assertRaises(KeyError):
+            load_history_columns(path, "collapses", ["missing"])
+
+    def test_raw_round_trip(self):
+        path = export_history(self.store, os.path.join(self.directory, "columns"), "raw", chunk_size=1)
+        self.check_export(path)
+
+    def test_npz_round_trip(self):
+        path = export_history(self.store, os.path.join(self.directory, "history"), "npz")
+        self.assertTrue(path.endswith(".npz"))
+        self.check_export(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
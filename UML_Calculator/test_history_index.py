@@ -0,0 +1,73 @@
+"""
+Tests for the GUI history buffer, search index and background store
+"""
+
+import os
+import tempfile
+import unittest
+
+from ui.history_pane import HistoryBuffer, HistoryIndex, HistoryStore, expression_from_entry
+
+
+def entry(expression, result):
+    return f"[12:00:00] UML: {expression} = {result}\n[12:00:00] Standard: {expression} = {result}"
+
+
+class HistoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = HistoryIndex()
+        self.index.add(0, "UML: [2,3] = 5.0")
+        self.index.add(1, "Standard: sqrt(16) = 4.0")
+        self.index.add(2, "UML: <3,4> = 12.0 sqrt")
+
+    def test_prefix_and_intersection(self):
+        self.assertEqual(self.index.search("sq"), [1, 2])
+        self.assertEqual(self.index.search("sqrt uml"), [2])
+        self.assertEqual(self.index.search("12"), [2])
+        self.assertEqual(self.index.search("missing"), [])
+
+    def test_empty_query_means_no_filter(self):
+        self.assertIsNone(self.index.search(""))
+        self.assertIsNone(self.index.search("[ ] ="))
+
+    def test_remove(self):
+        self.index.remove(1)
+        self.assertEqual(self.index.search("sqrt"), [2])
+        self.index.remove(2)
+        self.assertEqual(self.index.search("sq"), [])
+
+
+class HistoryBufferTest(unittest.TestCase):
+    def test_eviction_keeps_ids_and_index_in_step(self):
+        buffer = HistoryBuffer(max_rows=3)
+        ids = [buffer.add(entry(f"[{i},1]", f"row{'abcde'[i]}")) for i in range(5)]
+        self.assertEqual(ids, [0, 1, 2, 3, 4])
+        self.assertEqual((buffer.first_id, len(buffer), buffer.next_id), (2, 3, 5))
+        self.assertIsNone(buffer.get(1))
+        self.assertEqual(buffer.get(4)[1], "[4,1]")
+        self.assertEqual(buffer.index.search("uml"), [2, 3, 4])
+        self.assertEqual(buffer.index.search("rowa"), [])
+        self.assertEqual(buffer.index.search("rowc"), [2])
+
+    def test_expression_from_entry(self):
+        self.assertEqual(expression_from_entry(entry("2+3", 5)), "2+3")
+        self.assertEqual(
+            expression_from_entry("[12:00:00] UML Error: bad\n[12:00:00] Standard: 2*3 = 6"), "2*3"
+        )
+        self.assertIsNone(expression_from_entry("free text"))
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.jsonl")
+            store = HistoryStore(path, max_entries=10)
+            for i in range(12):
+                store.append(entry(f"[{i},1]", i + 1), f"[{i},1]")
+            store.close()
+            rows = HistoryStore(path, max_entries=10).load(3)
+        self.assertEqual([expression for _, expression in rows], ["[9,1]", "[10,1]", "[11,1]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Property tests for the vectorized RIS operator
+
+Checks core.ris.ris_array against the scalar ris() cascade on random operand
+pairs drawn around every rule's trigger values (zeros, equal operands, the
+special cases, exact divisors, NaN and infinities) and in every mode.
+"""
+
+import contextlib
+import io
+import math
+import random
+import unittest
+
+import numpy as np
+
+from core.ris import RIS_RULES, ris, ris_array
+
+SPECIAL_VALUES = [0.0, -0.0, 1.0, -1.0, 2.0, 3.0, 4.0, 6.0, 8.0, 9.0, 12.0, 0.5,
+                  float("nan"), float("inf"), float("-inf")]
+MODES = ["default", "always_multiply", "always_divide", "unknown"]
+
+
+def random_operand(rng):
+    choice = rng.random()
+    if choice < 0.5:
+        return rng.choice(SPECIAL_VALUES)
+    if choice < 0.8:
+        return float(rng.randint(-20, 40))
+    return rng.uniform(-100, 100)
+
+
+def scalar_rule(a, b, mode):
+    """Return (result, rule name) from the scalar implementation."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = ris(a, b, {"ris_mode": mode}, verbose=True)
+    return result, out.getvalue().rsplit(" via ", 1)[1].strip()
+
+
+def same_value(x, y):
+    return (math.isnan(x) and math.isnan(y)) or x == y
+
+
+class TestRisArray(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(1234)
+
+    def check_pairs(self, a, b, modes):
+        results, rules = ris_array(a, b, np.array(modes), return_rules=True)
+        self.assertEqual(results.shape, (len(a),))
+        for i, (x, y, mode) in enumerate(zip(a, b, modes)):
+            expected, rule = scalar_rule(x, y, mode)
+            self.assertTrue(
+                same_value(float(results[i]), float(expected)),
+                f"RIS({x}, {y}) [{mode}]: {results[i]} != {expected}",
+            )
+            self.assertEqual(RIS_RULES[rules[i]], rule, f"RIS({x}, {y}) [{mode}]")
+
+    def test_random_pairs_match_scalar(self):
+        a = [random_operand(self.rng) for _ in range(5000)]
+        b = [random_operand(self.rng) for _ in range(5000)]
+        modes = [self.rng.choice(MODES) for _ in range(5000)]
+        self.check_pairs(a, b, modes)
+
+    def test_every_rule_is_exercised(self):
+        # The special cases are single points, so add them explicitly
+        a = [random_operand(self.rng) for _ in range(5000)] + [6, 8, 9, 4]
+        b = [random_operand(self.rng) for _ in range(5000)] + [3, 2, 3, 2]
+        modes = [self.rng.choice(MODES) for _ in range(5000)] + ["default"] * 4
+        _, rules = ris_array(a, b, np.array(modes), return_rules=True)
+        self.assertEqual(set(rules.tolist()), set(range(len(RIS_RULES))))
+
+    def test_special_cases(self):
+        a = [6, 8, 9, 4, 0, 5, 12, 2.5]
+        b = [3, 2, 3, 2, 7, 5, 2, 1]
+        self.check_pairs(a, b, ["default"] * len(a))
+
+    def test_scalar_mode_broadcasts(self):
+        a = np.arange(-5.0, 6.0)
+        for mode in MODES:
+            results = ris_array(a, 2.0, mode)
+            for x, value in zip(a, results):
+                self.assertTrue(same_value(float(value), float(ris(x, 2.0, {"ris_mode": mode}))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Tests for the compiled, cached safe_eval path and safe_eval_array
+
+Hostile inputs must be rejected on first and cached evaluation alike, and
+compiled evaluation must give the same results and errors as the
+node-by-node interpreter. Array evaluation must match row-by-row safe_eval.
+"""
+
+import unittest
+import warnings
+
+import numpy as np
+
+import safe_eval as safe_eval_module
+from safe_eval import _interpret, cache_info, clear_cache, safe_eval, safe_eval_array
+
+HOSTILE = [
+    "__import__('os').system('true')",
+    "open('/etc/passwd').read()",
+    "eval('1')",
+    "exec('x = 1')",
+    "globals()",
+    "__builtins__",
+    "().__class__.__bases__[0].__subclasses__()",
+    "(1).__class__",
+    "''.join(['a'])",
+    "(lambda: 1)()",
+    "[x for x in (1, 2)]",
+    "{x: 1 for x in (1, 2)}",
+    "(x for x in (1, 2))",
+    "(a := 1)",
+    "f'{1}'",
+    "1 if 1 else 2",
+    "not 1",
+    "~1",
+    "1 << 2",
+    "1 < 2",
+    "1 and 2",
+    "math.factorial(5)",
+    "getattr(math, 'sin')",
+    "math.sin.__self__",
+    "math.__loader__.load_module('os')",
+    "math.__spec__.loader",
+    "cmath.sqrt(-1)",
+    "max(*[1, 2])",
+    "max(**{'key': abs})",
+    "{**{1: 2}}",
+    "[*[1, 2]]",
+    "__safe_call(print, 1)",
+    "__safe_attribute(math, 'sin')",
+    "sin(1)",
+    "x",
+]
+
+BENIGN = [
+    "2+3*4", "1/0", "-1/0", "0/0", "7 // 0", "5 % 0", "2**0.5", "-(-3)", "2^3", "6&3",
+    "math.sin(pi/2)", "math.log(e)", "math.pow(2, 3)", "math.floor(2.5)", "1j*1j",
+    "(1, pi)", "(1, 2)", "[1, 2][0]", "[1, 2, 3][::-1]", "{pi: 1}[pi]", "{1, 2, pi}",
+    "{(1, pi): 2}", "[1][5]", "1 + 'a'", "math.log(0)", "math.inf - math.inf",
+    "'ab' * 2", " 2+3", "2+", "", "math.max", "max(1, 2, key=1)", "1e309",
+]
+
+
+def outcome(func, expr):
+    try:
+        result = func(expr)
+    except Exception as e:
+        return "error", type(e).__name__, str(e)
+    return "ok", repr(result), type(result).__name__
+
+
+class HostileInputTest(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+
+    def test_rejected_when_compiled_and_cached(self):
+        for expr in HOSTILE:
+            for attempt in ("first", "cached"):
+                with self.subTest(expr=expr, attempt=attempt):
+                    with self.assertRaises((ValueError, SyntaxError)):
+                        safe_eval(expr)
+
+    def test_compiled_code_has_no_builtins(self):
+        kind, (code, namespace, _), _ = safe_eval_module._compiled("math.sin(pi/2) + 1")
+        self.assertEqual(kind, "code")
+        self.assertEqual(namespace["__builtins__"], {})
+        self.assertNotIn("__import__", code.co_names)
+
+
+class CompiledEquivalenceTest(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+
+    def test_same_results_and_errors_as_interpreter(self):
+        for expr in BENIGN + HOSTILE:
+            expected = outcome(_interpret, expr)
+            for attempt in ("first", "cached"):
+                with self.subTest(expr=expr, attempt=attempt):
+                    self.assertEqual(outcome(safe_eval, expr), expected)
+
+    def test_mutable_results_are_not_shared(self):
+        first = safe_eval("[1, 2]")
+        first.append(3)
+        self.assertEqual(safe_eval("[1, 2]"), [1, 2])
+        first = safe_eval("[1, pi]")
+        first.append(3)
+        self.assertEqual(len(safe_eval("[1, pi]")), 2)
+
+    def test_cache_hits(self):
+        safe_eval("math.exp(0) + 1")
+        hits = cache_info().hits
+        self.assertEqual(safe_eval("math.exp(0) + 1"), 2.0)
+        self.assertEqual(cache_info().hits, hits + 1)
+
+
+class ArrayEvaluationTest(unittest.TestCase):
+    X = [-2.5, -1.0, 0.0, 0.5, 3.0]
+    Y = [0, 1, 2, 3, 4]
+    # {x} and {y} are replaced by each row's values for safe_eval
+    TEMPLATES = [
+        "math.sin({x}) * 2 + {y}", "{x} / ({y} - 2)", "{y} // ({y} - 2)", "{y} % ({y} - 2)",
+        "{x} ** 2 - {y}", "math.exp({x}) + pi", "math.log({y} + 1, 2)", "math.floor({x})",
+        "cmath.phase({x})", "{y} & 3", "-{x} * 1j",
+    ]
+
+    def test_matches_row_by_row(self):
+        x, y = np.array(self.X), np.array(self.Y)
+        for template in self.TEMPLATES:
+            with self.subTest(template=template):
+                result = safe_eval_array(template.format(x="x", y="y"), x=x, y=y)
+                expected = [safe_eval(template.format(x=f"({a})", y=f"({b})")) for a, b in zip(self.X, self.Y)]
+                np.testing.assert_allclose(result, np.array(expected, dtype=complex))
+
+    def test_hostile_input_rejected(self):
+        for expr in HOSTILE:
+            with self.subTest(expr=expr):
+                with self.assertRaises((ValueError, SyntaxError)):
+                    safe_eval_array(expr, y=np.arange(3))
+
+    def test_invalid_column_names(self):
+        for name in ("_x", "__builtins__", "pi", "math"):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    safe_eval_array("1", **{name: np.arange(3)})
+
+    def test_division_by_zero_without_warnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = safe_eval_array("y / 0", y=np.array([1, -1, 0]))
+        np.testing.assert_array_equal(result, [np.inf, -np.inf, np.nan])
+
+    def test_functions_without_equivalent_are_vectorized(self):
+        magnitude, angle = safe_eval_array("cmath.polar(z)", z=np.array([1j, -2]))
+        np.testing.assert_allclose(magnitude, [1, 2])
+        np.testing.assert_allclose(angle, [np.pi / 2, np.pi])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Property tests for the UML e-graph simplifier
+
+Random parsed trees, over symbols and constants around the rewrite rules'
+trigger values (0 and 1 identities, exact reciprocals), must evaluate to the
+same result after simplify_uml as before. The rules are algebraic
+identities, so reassociated results may differ by rounding, and a division
+by zero (eval_uml gives inf) moved elsewhere in the tree may meet a symbol
+(NaN) or a zero and come out as another non-finite value.
+"""
+
+import random
+import unittest
+
+from uml_core import eval_uml
+from uml_egraph import simplify_uml
+from uml_test_trees import outcome, random_tree as random_tree_of, same_result
+
+LEAVES = ["x", "y", "z", 0, 1, 0.0, 1.0, 0.5, 2.0, 3.0, 4.0, 10.0, 0.25, 7.0]
+OPS = ["add", "add", "mul", "mul", "sub", "div", "ris"]
+RIS_OPERATIONS = ["auto", "add", "mul", "div"]
+
+
+def random_tree(rng, operators):
+    """A random uml_core tree with the given operator count."""
+    return random_tree_of(rng, operators, LEAVES, OPS, RIS_OPERATIONS, {"div": 2, "ris": 2})
+
+
+class TestUmlEgraph(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(33)
+
+    def check_trees(self, count, max_operators):
+        simplified = 0
+        for _ in range(count):
+            tree = random_tree(self.rng, self.rng.randint(1, max_operators))
+            best, report = simplify_uml(tree, max_iterations=8, time_limit=5.0)
+            simplified += report["cost_after"] < report["cost_before"]
+            before, after = outcome(eval_uml, tree), outcome(eval_uml, best)
+            self.assertTrue(same_result(before, after, rel_tol=1e-9), f"{tree} -> {best}: {before!r} != {after!r}")
+        return simplified
+
+    def test_small_trees_evaluate_unchanged(self):
+        self.assertGreater(self.check_trees(300, 4), 150)
+
+    def test_larger_trees_evaluate_unchanged(self):
+        self.assertGreater(self.check_trees(25, 10), 12)
+
+    def test_input_tree_is_not_modified(self):
+        tree = {"op": "mul", "args": [{"op": "add", "args": ["x", 0]}, 1.0]}
+        snapshot = repr(tree)
+        best, report = simplify_uml(tree)
+        self.assertEqual(repr(tree), snapshot)
+        self.assertEqual(best, "x")
+        self.assertLess(report["cost_after"], report["cost_before"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Property tests for the UML optimizer passes
+
+Random parsed trees, with constants around every identity and special value
+(0, 1, -0.0, NaN, infinities, complex) and symbols, must evaluate to the
+same result before and after optimization, for uml_optimizer on uml_core
+trees and core.optimizer on core.uml_core trees.
+"""
+
+import random
+import unittest
+
+from uml_core import eval_uml
+from uml_optimizer import count_nodes, eval_optimized, optimize_uml
+from uml_test_trees import outcome, random_tree as random_tree_of, same_result
+from core import optimizer as core_optimizer
+from core.uml_core import eval_uml as core_eval_uml, parse_uml as core_parse_uml
+
+CONSTANTS = [0, 1, 0.0, -0.0, 1.0, 2.0, 3.0, 0.5, 10.0, -4.0,
+             float("nan"), float("inf"), float("-inf"), 2j, complex(1, -1)]
+SYMBOLS = ["x", "y"]
+OPS = ["add", "add", "mul", "mul", "sub", "div", "ris", "root", "log"]
+
+
+def random_tree(rng, operators):
+    """A random uml_core tree with the given operator count."""
+    return random_tree_of(rng, operators, CONSTANTS + SYMBOLS, OPS, ["auto", "add", "mul", "div", "pow"], {"root": 1})
+
+
+def random_core_text(rng, depth=0):
+    """Random UML text for core.uml_core.parse_uml."""
+    if depth >= 4 or rng.random() < 0.3:
+        return rng.choice(["0", "1", "-0", "2", "3.5", "10", "inf", "nan", "!(1,2)", "xy", "a"])
+    opening, closing = rng.choice([("[", "]"), ("{", "}"), ("<", ">"), ("<>", "<>"),
+                                   ("@(", ")"), ("RIS(", ")"), ("sqrt(", ")")])
+    count = 1 if opening == "sqrt(" else 2 if opening in ("<>", "@(", "RIS(") else rng.randint(2, 3)
+    return opening + ",".join(random_core_text(rng, depth + 1) for _ in range(count)) + closing
+
+
+class OptimizerEquivalenceTest(unittest.TestCase):
+    def test_random_trees_evaluate_unchanged(self):
+        rng = random.Random(32)
+        reduced = 0
+        for i in range(20_000):
+            tree = random_tree(rng, rng.randint(1, 12))
+            optimized, report = optimize_uml(tree)
+            reduced += report["nodes_after"] < report["nodes_before"]
+            self.assertEqual(report["nodes_after"], count_nodes(optimized))
+            before, after = outcome(eval_uml, tree), outcome(eval_uml, optimized)
+            self.assertTrue(same_result(before, after), f"{tree}: {before!r} != {after!r}")
+        self.assertGreater(reduced, 10_000)
+
+    def test_input_tree_is_not_modified(self):
+        tree = {"op": "add", "args": [{"op": "add", "args": ["x", 0]}, {"op": "mul", "args": [2.0, 3.0]}]}
+        snapshot = repr(tree)
+        optimized, report = optimize_uml(tree)
+        self.assertEqual(repr(tree), snapshot)
+        self.assertEqual(optimized, {"op": "add", "args": ["x", 6.0]})
+        self.assertEqual(report["folded"], 1)
+        self.assertTrue(same_result(eval_optimized(tree), eval_uml(tree)))
+
+    def test_random_core_trees_evaluate_unchanged(self):
+        rng = random.Random(320)
+        folded = 0
+        for i in range(5_000):
+            text = random_core_text(rng)
+            tree = core_parse_uml(text)
+            optimized, report = core_optimizer.optimize_uml(tree)
+            folded += report["folded"] > 0
+            self.assertEqual(report["nodes_after"], core_optimizer.count_nodes(optimized))
+            before = outcome(core_eval_uml, tree)
+            after = outcome(core_optimizer.eval_optimized, tree)
+            self.assertTrue(same_result(before, after), f"{text}: {before!r} != {after!r}")
+        self.assertGreater(folded, 1_000)
+
+    def test_core_chains_flatten(self):
+        tree = core_parse_uml("[[xy,2],3]")
+        optimized, report = core_optimizer.optimize_uml(tree)
+        self.assertEqual(report["flattened"], 1)
+        self.assertEqual(len(optimized["operands"]), 3)
+        self.assertEqual(core_optimizer.optimize_uml(core_parse_uml("<[1,2],4>"))[0],
+                         {"type": "value", "value": 12.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""
+Background evaluation for the Tkinter calculator GUIs
+
+Evaluations run off the Tk event loop so a slow expression (9**9**9, a long
+test suite) cannot freeze the window. Jobs run on a daemon thread, or in a
+separate process when they may be CPU-heavy: a single huge integer power
+holds the GIL for its whole duration, and only a process can be stopped.
+
+Results come back through a queue drained by root.after() on the Tk thread,
+which also animates the spinner, so callbacks may touch widgets freely.
+
+Each job belongs to a channel ("calculate", "tests", ...). Submitting to a
+channel, or cancelling it, replaces its generation token; results carrying
+an older token are dropped, so the display never shows the answer to an
+expression that has since been edited.
+"""
+
+import multiprocessing
+import queue
+import re
+import threading
+import time
+
+DEFAULT_TIMEOUT = 10.0
+POLL_INTERVAL_MS = 50
+SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+# Powers, factorials and very long numbers can take unbounded CPU time
+_EXPENSIVE = re.compile(r"\*\*|\^|!|\d{7,}")
+
+
+class EvaluationTimeout(Exception):
+    """Raised (as a callback argument) when a job exceeds its timeout."""
+
+
+def looks_expensive(expression):
+    """Whether expression should be evaluated in a killable process."""
+    return bool(_EXPENSIVE.search(expression))
+
+
+def _run_in_process(conn, func, args):
+    """Child process entry point: send back (ok, value) through the pipe."""
+    try:
+        result = (True, func(*args))
+    except Exception as e:
+        result = (False, e)
+    try:
+        conn.send(result)
+    except Exception:
+        # Result or exception is not picklable; send it as text
+        ok, value = result
+        conn.send((ok, str(value)) if ok else (False, RuntimeError(str(value))))
+    finally:
+        conn.close()
+
+
+class _Job:
+    def __init__(self, token, on_done, on_error, timeout):
+        self.token = token
+        self.on_done = on_done
+        self.on_error = on_error
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.process = None
+        self.conn = None
+
+
+class BackgroundEvaluator:
+    """
+    Run evaluations for a Tk window in the background
+
+    Args:
+        root: Tk root (or any widget) used for after() scheduling
+        on_status: Optional callback receiving the spinner text, "" when idle
+        poll_interval: Milliseconds between result queue checks
+    """
+
+    def __init__(self, root, on_status=None, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self.on_status = on_status
+        self.poll_interval = poll_interval
+        self._results = queue.Queue()
+        self._jobs = {}
+        self._tokens = {}
+        self._frame = 0
+        self._polling = False
+        # Spawned children never inherit the parent's Tk connection
+        self._context = multiprocessing.get_context("spawn")
+
+    @property
+    def busy(self):
+        return bool(self._jobs)
+
+    def _next_token(self, channel):
+        token = self._tokens.get(channel, 0) + 1
+        self._tokens[channel] = token
+        return token
+
+    def submit(self, channel, func, args=(), on_done=None, on_error=None,
+               use_process=False, timeout=DEFAULT_TIMEOUT):
+        """
+        Evaluate func(*args) in the background
+
+        Any job still running on the same channel is cancelled first.
+
+        Args:
+            channel: Job group; one job per channel runs at a time
+            func: Function to call; must be module-level when use_process is set
+            args: Positional arguments (picklable when use_process is set)
+            on_done: Called on the Tk thread with the result
+            on_error: Called on the Tk thread with the exception, including
+                      EvaluationTimeout (cancelled jobs call nothing)
+            use_process: Run in a separate, killable process
+            timeout: Seconds before the job is abandoned (None = no limit)
+
+        Returns:
+            The job's generation token
+        """
+        self.cancel(channel)
+        token = self._next_token(channel)
+        job = _Job(token, on_done, on_error, timeout)
+        if use_process:
+            job.conn, child_conn = self._context.Pipe(duplex=False)
+            job.process = self._context.Process(
+                target=_run_in_process, args=(child_conn, func, args), daemon=True
+            )
+            job.process.start()
+            child_conn.close()
+        else:
+            def work():
+                try:
+                    result = (True, func(*args))
+                except Exception as e:
+                    result = (False, e)
+                self._results.put((channel, token) + result)
+
+            threading.Thread(target=work, daemon=True).start()
+        self._jobs[channel] = job
+        self._schedule()
+        return token
+
+    def is_current(self, channel, token):
+        """Whether token is still the latest generation for channel."""
+        return self._tokens.get(channel) == token
+
+    def cancel(self, channel=None):
+        """
+        Cancel the job on channel (all channels when None)
+
+        Process jobs are terminated; a thread job cannot be stopped, so its
+        result is simply ignored when it arrives.
+        """
+        channels = list(self._jobs) if channel is None else [channel]
+        for name in channels:
+            self._next_token(name)
+            job = self._jobs.pop(name, None)
+            if job is not None:
+                self._stop(job)
+        if not self._jobs:
+            self._set_status("")
+
+    def shutdown(self):
+        """Cancel everything; call before destroying the window."""
+        self.cancel()
+
+    def _stop(self, job):
+        if job.process is not None:
+            if job.process.is_alive():
+                job.process.terminate()
+            job.process.join(0.1)
+            job.conn.close()
+
+    def _set_status(self, text):
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _finish(self, channel, ok, value):
+        job = self._jobs.pop(channel)
+        self._stop(job)
+        callback = job.on_done if ok else job.on_error
+        if callback is not None:
+            callback(value)
+
+    def _poll(self):
+        """Deliver finished jobs, enforce timeouts and advance the spinner."""
+        self._polling = False
+        while True:
+            try:
+                channel, token, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if channel in self._jobs and self._jobs[channel].token == token:
+                self._finish(channel, ok, value)
+
+        now = time.monotonic()
+        for channel, job in list(self._jobs.items()):
+            if self._jobs.get(channel) is not job:
+                # Cancelled or replaced by an earlier callback in this loop
+                continue
+            if job.process is not None:
+                # Check liveness first: a child that exits after sending
+                # still has its result waiting in the pipe
+                exited = not job.process.is_alive()
+                if job.conn.poll():
+                    try:
+                        ok, value = job.conn.recv()
+                    except EOFError:
+                        ok, value = False, RuntimeError("Evaluation process exited unexpectedly")
+                    self._finish(channel, ok, value)
+                    continue
+                if exited:
+                    self._finish(channel, False, RuntimeError("Evaluation process exited unexpectedly"))
+                    continue
+            if job.deadline is not None and now > job.deadline:
+                self._next_token(channel)
+                self._finish(channel, False, EvaluationTimeout("Evaluation timed out"))
+
+        if self._jobs:
+            self._frame = (self._frame + 1) % len(SPINNER_FRAMES)
+            self._set_status(f"{SPINNER_FRAMES[self._frame]} Calculating...")
+            self._schedule()
+        else:
+            self._set_status("")
@@ -0,0 +1,277 @@
+"""
+Chunked, resumable RIS batch processing for the UML Calculator
+
+Reads a CSV of ``a,b[,mode]`` rows in chunks, evaluates each chunk with the
+vectorized ``core.ris.ris_array`` on a process pool and appends the results
+to the output CSV in input order. The whole input is never held in memory:
+at most ``max_in_flight`` chunks are queued, and each finished chunk is
+written and flushed before a later one.
+
+After every written chunk a checkpoint file (``<output>.checkpoint``) records
+the input byte offset and output size reached, so an interrupted run can be
+restarted from the last completed chunk with ``resume=True``. The checkpoint
+is removed once the whole input has been processed.
+
+Used by ``modern_cli.py batch``.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import io
+import json
+from itertools import islice
+
+import numpy as np
+
+from core.ris import RIS_RULES, ris_array, ris_explain
+from ui.ordered_pool import run_ordered
+
+DEFAULT_CHUNK_SIZE = 10000
+# Error messages kept for the summary; later errors are only counted
+MAX_REPORTED_ERRORS = 20
+# Result rows kept for display when there is no output file
+PREVIEW_ROWS = 10
+
+_INT_FOUR_RULE = RIS_RULES.index("Division (Special Case 4,2 returns 4)")
+
+HEADER = ["a", "b", "result", "mode"]
+EXPLAIN_HEADER = HEADER + ["explanation"]
+
+
+class BatchResumeError(Exception):
+    """Raised when a checkpoint cannot be used to resume a batch."""
+
+
+def checkpoint_path(output_file):
+    """Return the checkpoint file used for an output file."""
+    return f"{output_file}.checkpoint"
+
+
+def process_chunk(lines, first_line, explain):
+    """
+    Evaluate one chunk of CSV lines.
+
+    Rows are parsed first and then evaluated together with ris_array;
+    explanations still come from ris_explain row by row.
+
+    Args:
+        lines: Decoded input lines, ending on a row boundary
+        first_line: 1-based line number of the first line
+        explain: Whether to add the rule explanation column
+
+    Returns:
+        tuple: (output CSV text, rows processed, skipped rows, errors) where
+               errors is a list of (line number, message)
+    """
+    a_values, b_values, modes = [], [], []
+    skipped = 0
+    errors = []
+    reader = csv.reader(lines)
+    for row in reader:
+        line_no = first_line + reader.line_num - 1
+        if len(row) < 2:
+            # Blank lines are not worth a warning
+            if any(field.strip() for field in row):
+                skipped += 1
+                errors.append((line_no, "insufficient values, skipped"))
+            continue
+        try:
+            a = float(row[0])
+            b = float(row[1])
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+            continue
+        a_values.append(a)
+        b_values.append(b)
+        modes.append(row[2] if len(row) > 2 else "default")
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if explain:
+        for a, b, mode in zip(a_values, b_values, modes):
+            context = {"ris_mode": mode} if mode != "default" else {}
+            result, explanation = ris_explain(a, b, context)
+            writer.writerow([a, b, result, mode, explanation])
+    elif a_values:
+        results, rules = ris_array(a_values, b_values, np.array(modes), return_rules=True)
+        results = results.tolist()
+        # ris() returns the int 4 for this special case
+        for i in np.flatnonzero(rules == _INT_FOUR_RULE).tolist():
+            results[i] = 4
+        writer.writerows(zip(a_values, b_values, results, modes))
+    return out.getvalue(), len(a_values), skipped, errors
+
+
+def read_chunks(f, chunk_size, first_line=1):
+    """
+    Yield (first line number, decoded lines, bytes read) from a binary file.
+
+    Chunks hold up to ``chunk_size`` lines and only end where the number of
+    quote characters seen is even, so a quoted field spanning several lines
+    is never split between chunks.
+    """
+    while True:
+        lines = []
+        size = 0
+        in_quotes = False
+        while len(lines) < chunk_size or in_quotes:
+            raw = f.readline()
+            if not raw:
+                break
+            size += len(raw)
+            if raw.count(b'"') % 2:
+                in_quotes = not in_quotes
+            lines.append(raw.decode("utf-8", errors="replace"))
+        if not lines:
+            return
+        yield first_line, lines, size
+        first_line += len(lines)
+
+
+class BatchState:
+    """Progress of a batch run, saved to the checkpoint after each chunk."""
+
+    FIELDS = ("offset", "line", "output_size", "chunks", "processed", "skipped", "errors")
+
+    def __init__(self, input_file, explain):
+        stat = os.stat(input_file)
+        self.input_file = os.path.abspath(input_file)
+        self.input_size = stat.st_size
+        self.input_mtime = stat.st_mtime
+        self.explain = explain
+        self.offset = 0
+        self.line = 1
+        self.output_size = 0
+        self.chunks = 0
+        self.processed = 0
+        self.skipped = 0
+        self.errors = 0
+        self.error_messages = []
+        self.preview = []
+
+    def to_dict(self):
+        data = {
+            "input_file": self.input_file,
+            "input_size": self.input_size,
+            "input_mtime": self.input_mtime,
+            "explain": self.explain,
+        }
+        data.update((name, getattr(self, name)) for name in self.FIELDS)
+        return data
+
+    def save(self, path):
+        """Write the checkpoint atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def restore(self, path):
+        """Load progress from a checkpoint written for the same input and options."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise BatchResumeError(f"Could not read checkpoint {path}: {e}")
+        if data.get("input_file") != self.input_file:
+            raise BatchResumeError(f"Checkpoint {path} belongs to {data.get('input_file')}")
+        if (data.get("input_size"), data.get("input_mtime")) != (self.input_size, self.input_mtime):
+            raise BatchResumeError("Input file changed since the checkpoint was written")
+        if data.get("explain") != self.explain:
+            raise BatchResumeError("Checkpoint was written with a different --explain setting")
+        try:
+            for name in self.FIELDS:
+                setattr(self, name, int(data[name]))
+        except (KeyError, TypeError, ValueError):
+            raise BatchResumeError(f"Checkpoint {path} is incomplete")
+
+
+def run_batch(
+    input_file,
+    output_file,
+    explain=False,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_in_flight=None,
+    resume=False,
+    on_chunk=None,
+):
+    """
+    Process a CSV of RIS operations chunk by chunk.
+
+    Args:
+        input_file: CSV file with a,b[,mode] rows
+        output_file: Output CSV; when None results are only counted and
+                     previewed, and no checkpoint is kept
+        explain: Include the explanation column
+        workers: Worker processes (default: CPU count; 0 evaluates in-process)
+        chunk_size: Input lines per chunk
+        max_in_flight: Chunks queued before reading pauses (default 4 per worker)
+        resume: Continue from the output's checkpoint instead of starting over
+        on_chunk: Called with (state, bytes read) after each chunk is written
+
+    Returns:
+        BatchState with the final counts and the first error messages
+    """
+    state = BatchState(input_file, explain)
+    checkpoint = checkpoint_path(output_file) if output_file else None
+
+    if not output_file:
+        if resume:
+            raise BatchResumeError("Resuming needs the output file of the interrupted run")
+        sink = io.StringIO()
+    elif resume and os.path.exists(checkpoint):
+        state.restore(checkpoint)
+        try:
+            sink = open(output_file, "r+", newline="", encoding="utf-8")
+        except OSError as e:
+            raise BatchResumeError(f"Could not reopen {output_file}: {e}")
+        # Drop anything written after the last checkpoint
+        sink.truncate(state.output_size)
+        sink.seek(state.output_size)
+    else:
+        sink = open(output_file, "w", newline="", encoding="utf-8")
+        csv.writer(sink).writerow(EXPLAIN_HEADER if explain else HEADER)
+        sink.flush()
+        state.output_size = sink.tell()
+        state.save(checkpoint)
+
+    def write_result(tag, result):
+        state.line, size = tag
+        text, processed, skipped, errors = result
+        if checkpoint:
+            sink.write(text)
+            sink.flush()
+            os.fsync(sink.fileno())
+            state.output_size = sink.tell()
+        elif len(state.preview) < PREVIEW_ROWS:
+            rows = csv.reader(io.StringIO(text))
+            state.preview.extend(islice(rows, PREVIEW_ROWS - len(state.preview)))
+        state.offset += size
+        state.chunks += 1
+        state.processed += processed
+        state.skipped += skipped
+        state.errors += len(errors) - skipped
+        room = MAX_REPORTED_ERRORS - len(state.error_messages)
+        if room > 0:
+            state.error_messages.extend(errors[:room])
+        if checkpoint:
+            state.save(checkpoint)
+        if on_chunk:
+            on_chunk(state, size)
+
+    with open(input_file, "rb") as source, sink:
+        source.seek(state.offset)
+        # Each task is tagged with the line after it and its input size
+        tasks = (
+            ((first_line + len(lines), size), (lines, first_line, explain))
+            for first_line, lines, size in read_chunks(source, chunk_size, state.line)
+        )
+        run_ordered(process_chunk, tasks, write_result, workers, max_in_flight)
+
+    if checkpoint:
+        os.remove(checkpoint)
+    return state
@@ -7,16 +7,15 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import argparse
-from core.uml_core import parse_uml, eval_uml, ris_meta_operator
+from collections import namedtuple
+from functools import lru_cache
+from core.uml_core import parse_uml, ris_meta_operator
 from core.converters import convert_standard_to_uml
+from core.optimizer import eval_optimized
 from utils.safe_eval import safe_eval
+from core.evaluation_budget import EvaluationBudgetExceeded, budget_for, budget_scope
 import random
 from core.ris import ris, ris_explain
-try:
-    import readline  # For command history navigation (works on Unix, limited on Windows)
-    HAS_READLINE = True
-except ImportError:
-    HAS_READLINE = False
 
 try:
     import colorama
@@ -47,14 +46,157 @@ def print_result(expr, result, mode=None, extra_info=None):
     else:
         print()
 
-def evaluate_expression(expr, mode="auto", show_steps=False):
+def eval_parsed(parsed, cache=None):
+    """Optimize and evaluate a parsed UML tree, through the result cache if one is given.
+
+    Returns:
+        tuple: (result, cache_hit)
+    """
+    if cache is None:
+        return eval_optimized(parsed), False
+    hits = cache.hits
+    result = cache.evaluate(parsed, eval_optimized)
+    return result, cache.hits > hits
+
+# Expressions whose auto-mode route (engine and parsed form) is remembered
+ROUTE_CACHE_SIZE = 1024
+
+# Top-level forms parse_uml recognises, as (opening, closing); "<>" before "<"
+_UML_FORMS = (("[", "]"), ("{", "}"), ("<>", "<>"), ("<", ">"), ("@(", ")"), ("!(", ")"),
+              ("RIS(", ")"), ("sqrt(", ")"), ("sin(", ")"), ("cos(", ")"))
+
+Route = namedtuple("Route", ["engine", "form", "reason"])
+Route.__doc__ = """Auto-mode decision: engine, the parsed form it evaluates, and why it was chosen."""
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+def _encloses(text, opening):
+    """Whether the bracket ending opening is closed by the last character of text."""
+    close = {"(": ")", "[": "]", "{": "}"}.get(opening[-1])
+    if close is None:
+        return True
+    depth = 0
+    for i in range(len(opening) - 1, len(text)):
+        if text[i] == opening[-1]:
+            depth += 1
+        elif text[i] == close:
+            depth -= 1
+            if depth == 0:
+                return i == len(text) - 1
+    return False
+
+def _uml_operand(text):
+    """Whether parse_uml reads text as a number, letter or bracketed form."""
+    text = text.strip()
+    if _is_number(text) or (len(text) == 1 and text.isalpha()):
+        return True
+    return any(text.startswith(opening) and text.endswith(closing)
+               and len(text) >= len(opening) + len(closing) and _encloses(text, opening)
+               for opening, closing in _UML_FORMS)
+
+def classify_expression(expr):
+    """
+    Pick the auto-mode engine from the expression's surface syntax
+
+    A lexical check of the outermost form, mirroring parse_uml: numbers,
+    single letters, a^b and bracketed UML notation go to UML, two comma-separated
+    numbers to the RIS meta-operator, and everything else to standard
+    evaluation.
+
+    Returns:
+        tuple: (engine, reason), engine being "uml", "ris" or "standard"
+    """
+    text = expr.strip()
+    if _is_number(text):
+        return "uml", "number"
+    if len(text) == 1 and text.isalpha():
+        return "uml", "letter value"
+    # parse_uml reads a^b as a power before bracketed forms
+    if text.count("^") == 1 and all(_uml_operand(part) for part in text.split("^")):
+        return "uml", "a^b power"
+    for opening, closing in _UML_FORMS:
+        if (text.startswith(opening) and text.endswith(closing)
+                and len(text) >= len(opening) + len(closing) and _encloses(text, opening)):
+            return "uml", f"{opening}...{closing} notation"
+    if text.count(",") == 1 and all(_is_number(part) for part in text.split(",")):
+        return "ris", "two comma-separated numbers"
+    return "standard", "standard notation"
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def route_expression(expr):
+    """
+    Classify expr and parse it for the chosen engine, once per expression
+
+    The form is the parse_uml tree for "uml" (shared between calls: treat it
+    as read-only), the operand pair for "ris", and the expression with ^ as
+    ** for "standard" (safe_eval caches its own compiled form).
+
+    Raises:
+        ValueError: If UML notation does not parse
+    """
+    engine, reason = classify_expression(expr)
+    if engine == "uml":
+        form = parse_uml(expr)
+    elif engine == "ris":
+        form = tuple(float(part) for part in expr.split(","))
+    else:
+        form = expr.replace("^", "**")
+    return Route(engine, form, reason)
+
+def _evaluate_auto(expr, steps, show_steps, cache):
+    """Auto mode: evaluate expr with the engine route_expression picks."""
+    route = route_expression(expr)
+    if show_steps:
+        steps.append(f"Engine: {route.engine} ({route.reason})")
+
+    if route.engine == "uml":
+        if show_steps:
+            steps.append(f"UML parsing: {route.form}")
+        result, cached = eval_parsed(route.form, cache)
+        if show_steps:
+            steps.append(f"UML evaluation: {result}{' (cached)' if cached else ''}")
+        return result, steps
+
+    if route.engine == "ris":
+        a, b = route.form
+        result, operation = ris_meta_operator(a, b)
+        if show_steps:
+            steps.append(f"RIS evaluation: {a}, {b} = {result} via {operation}")
+        return result, steps
+
+    try:
+        result = safe_eval(route.form)
+    except EvaluationBudgetExceeded:
+        raise
+    except Exception as e:
+        # Neither notation understands it: keep it as a symbol, as parse_uml does
+        if show_steps:
+            steps.append(f"Standard evaluation failed: {str(e)}")
+            steps.append("Kept as a UML symbol")
+        return expr.strip(), steps
+    if show_steps:
+        steps.append(f"Standard evaluation: {result}")
+    return result, steps
+
+def evaluate_expression(expr, mode="auto", show_steps=False, cache=None):
     """
     Evaluate an expression using the UML calculator
+
+    Auto mode picks one engine up front (see classify_expression) instead
+    of trying each in turn. Runs under the active evaluation budget; an
+    expression over budget raises EvaluationBudgetExceeded instead of
+    falling through to the next method.
     
     Args:
         expr: Expression to evaluate
         mode: Calculation mode (auto, standard, uml, ris)
         show_steps: Whether to show calculation steps
+        cache: Optional ResultCache for UML evaluation results
         
     Returns:
         tuple: (result, steps)
@@ -65,31 +207,35 @@ def evaluate_expression(expr, mode="auto", show_steps=False):
     if show_steps:
         steps.append(f"Original expression: {expr}")
     
-    # Auto mode tries different approaches
-    if mode == "auto" or mode == "standard":
-        # Try standard evaluation first
+    if mode == "auto":
+        return _evaluate_auto(expr, steps, show_steps, cache)
+    
+    if mode == "standard":
         try:
             result = safe_eval(expr)
             if show_steps:
                 steps.append(f"Standard evaluation: {result}")
-            if mode == "standard":
-                return result, steps
+            return result, steps
+        except EvaluationBudgetExceeded:
+            raise
         except Exception as e:
             if show_steps:
                 steps.append(f"Standard evaluation failed: {str(e)}")
     
-    # UML or auto mode - try UML parsing directly or convert from standard
-    if mode == "auto" or mode == "uml":
+    # UML mode - try UML parsing directly or convert from standard
+    if mode == "uml":
         try:
             # Try direct UML parsing first
             parsed = parse_uml(expr)
             if show_steps:
                 steps.append(f"UML parsing: {parsed}")
             
-            result = eval_uml(parsed)
+            result, cached = eval_parsed(parsed, cache)
             if show_steps:
-                steps.append(f"UML evaluation: {result}")
+                steps.append(f"UML evaluation: {result}{' (cached)' if cached else ''}")
             return result, steps
+        except EvaluationBudgetExceeded:
+            raise
         except Exception as e:
             if show_steps:
                 steps.append(f"Direct UML parsing failed: {str(e)}")
@@ -104,16 +250,18 @@ def evaluate_expression(expr, mode="auto", show_steps=False):
                 if show_steps:
                     steps.append(f"UML parsing: {parsed}")
                 
-                result = eval_uml(parsed)
+                result, cached = eval_parsed(parsed, cache)
                 if show_steps:
-                    steps.append(f"UML evaluation: {result}")
+                    steps.append(f"UML evaluation: {result}{' (cached)' if cached else ''}")
                 return result, steps
+            except EvaluationBudgetExceeded:
+                raise
             except Exception as e2:
                 if show_steps:
                     steps.append(f"UML conversion failed: {str(e2)}")
     
-    # RIS or auto mode - try RIS meta-operator
-    if mode == "auto" or mode == "ris":
+    # RIS mode - try RIS meta-operator
+    if mode == "ris":
         try:
             if expr.startswith('RIS(') and expr.endswith(')'):
                 inner = expr[4:-1]
@@ -179,18 +327,61 @@ def handle_command(command: str) -> str:
 
 def main():
     """Main CLI entry point"""
-    parser = argparse.ArgumentParser(description="UML Calculator Command Line Interface")
+    if len(sys.argv) > 1 and sys.argv[1] == "eval":
+        # Batch/stream evaluation: calculator_cli.py eval --stream [options]
+        from ui.stream_eval import main as stream_main
+        sys.exit(stream_main(sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(
+        description="UML Calculator Command Line Interface",
+        epilog="Use 'eval --stream' to evaluate newline-delimited expressions from a file or stdin.",
+    )
     parser.add_argument("expression", nargs="?", help="Expression to evaluate")
     parser.add_argument("--mode", "-m", choices=["auto", "standard", "uml", "ris"], 
                         default="auto", help="Calculation mode")
     parser.add_argument("--steps", "-s", action="store_true", help="Show calculation steps")
     parser.add_argument("--interactive", "-i", action="store_true", help="Run in interactive mode")
     parser.add_argument("--explain", action="store_true", help="Show RIS rule explanation")
+    parser.add_argument("--cache", action="store_true", help="Use the persistent result cache (off by default)")
+    parser.add_argument("--cache-dir", help="Use the persistent result cache in this directory")
+    parser.add_argument("--no-cache", action="store_true", help="Never use the persistent result cache")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Evaluate through the warm evaluation daemon, starting it if needed")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="Wall-clock limit per evaluation (default: 60)")
+    parser.add_argument("--max-int-bits", type=int, metavar="BITS",
+                        help="Largest integer result, in bits (default: 1000000)")
     
     args = parser.parse_args()
+    limits = {name: value for name, value in
+              (("time_limit", args.time_limit), ("max_int_bits", args.max_int_bits)) if value is not None}
+    budget = budget_for("cli", **limits)
+    if args.daemon and args.expression and not (args.interactive or args.explain or args.steps):
+        # The daemon keeps its own cache; fall through to in-process
+        # evaluation whenever it cannot be reached
+        from ui.eval_daemon import request
+        reply = request({"op": "eval", "expr": args.expression, "mode": args.mode,
+                         "frontend": "cli", "budget": limits})
+        if reply is not None:
+            if "error" in reply:
+                print(color_text(f"Error: {reply['error']}", 'error'))
+                sys.exit(1)
+            print(f"{reply['result']}")
+            return
+    
+    # The persistent cache is opt-in: it writes to disk
+    if (args.cache or args.cache_dir) and not args.no_cache:
+        from uml_cache import ResultCache
+        cache = ResultCache(args.cache_dir)
+    else:
+        cache = None
     
     # Interactive mode
     if args.interactive:
+        try:
+            import readline  # Command history navigation for input() (works on Unix)
+        except ImportError:
+            pass
         show_steps = True  # Steps are now enabled by default
         print("UML Calculator Interactive Mode")
         print("Type a math or UML expression and press Enter.")
@@ -231,12 +422,21 @@ def main():
                     random_equation()
                     continue
                 
+                if command.lower() == "cache":
+                    if cache is None:
+                        print("Result cache disabled (start with --cache to use it)")
+                    else:
+                        for key, value in cache.stats().items():
+                            print(f"  {key}: {value}")
+                    continue
+                
                 if command.lower() == "help":
                     print(color_text("\nAvailable commands:", 'info'))
                     print("  [expression]   Evaluate a math or UML expression (e.g., 2+2, [2,3], {5,2}, <3,4>, @(2,3))")
                     print("  mode <mode>    Change calculation mode: auto, standard, uml, ris")
                     print("  steps on/off   Show or hide detailed calculation steps")
                     print("  random         Generate and evaluate a random equation")
+                    print("  cache          Show result cache statistics")
                     print("  help           Show this help message")
                     print("  exit/quit      Exit the calculator\n")
                     continue
@@ -244,7 +444,8 @@ def main():
                 if not command:
                     continue
                 
-                result, steps = evaluate_expression(command, mode, show_steps)
+                with budget_scope(budget):
+                    result, steps = evaluate_expression(command, mode, show_steps, cache)
                 
                 if show_steps:
                     for step in steps:
@@ -270,7 +471,8 @@ def main():
                 print(f"Explanation: {explanation}")
                 return
             
-            result, steps = evaluate_expression(args.expression, args.mode, args.steps)
+            with budget_scope(budget):
+                result, steps = evaluate_expression(args.expression, args.mode, args.steps, cache)
             
             if args.steps:
                 for step in steps:
@@ -19,6 +19,7 @@ from utils.safe_eval import safe_eval
 
 # Import UML core functionality
 from core.uml_core import parse_uml, eval_uml, ris_meta_operator
+from core.optimizer import eval_optimized
 
 # Import standard-to-UML conversion
 from core.converters import convert_standard_to_uml
@@ -26,7 +27,190 @@ from core.converters import convert_standard_to_uml
 # Import symbolic extensions
 from utils.symbolic_extensions import fibonacci, is_prime, gcd, lcm
 
+# Evaluations run off the Tk event loop
+from ui.background_eval import BackgroundEvaluator, looks_expensive
+
+# Incrementally updated, searchable history
+from ui.history_pane import HistoryBuffer, HistoryPane, HistoryStore
+
+# Live preview while typing
+from core.incremental_parser import IncrementalParser
+
+# Per-evaluation size and time limits
+from core.evaluation_budget import budget_scope
+
 SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".uml_calculator_settings.json")
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".uml_calculator_gui_history.jsonl")
+# Pause in typing before the live preview is recomputed
+PREVIEW_DELAY_MS = 150
+PREVIEW_ERROR_LENGTH = 80
+# The preview runs on the Tk thread, so it gets a much shorter deadline
+PREVIEW_TIME_LIMIT = 0.1
+
+
+def evaluate_calculation(expression, timestamp):
+    """
+    Evaluate an expression with UML first and standard math for comparison
+
+    Runs without touching Tk, so the GUI can call it from a worker thread
+    or process, under the GUI's evaluation budget.
+
+    Returns:
+        (display text, history entry)
+    """
+    with budget_scope(frontend="gui"):
+        # Always try UML first
+        try:
+            parsed = parse_uml(expression)
+            uml_result = eval_optimized(parsed)
+            uml_str = f"UML: {expression} = {uml_result}"
+        except Exception as e:
+            uml_result = None
+            uml_str = f"UML Error: {str(e)}"
+        # Try standard evaluation for comparison
+        try:
+            std_result = safe_eval(expression)
+            std_str = f"Standard: {expression} = {std_result}"
+        except Exception as e:
+            std_result = None
+            std_str = f"Standard Error: {str(e)}"
+        # Display UML as primary, standard as comparison
+        if uml_result is not None:
+            display = f"{uml_result}"
+        elif std_result is not None:
+            display = f"{std_result}"
+        else:
+            display = "Error"
+        # Both go to the history
+        return display, f"[{timestamp}] {uml_str}\n[{timestamp}] {std_str}"
+
+
+def calculation_steps(expression):
+    """Step-by-step standard, UML and RIS evaluation of expression"""
+    steps = []
+    steps.append(f"Original expression: {expression}")
+
+    # Try standard evaluation first
+    try:
+        result = safe_eval(expression)
+        steps.append(f"Standard evaluation: {result}")
+    except Exception:
+        steps.append("Standard evaluation not applicable")
+
+    # Try converting to UML
+    try:
+        uml = convert_standard_to_uml(expression)
+        if uml != expression:
+            steps.append(f"Converted to UML: {uml}")
+
+        # Parse UML
+        try:
+            parsed = parse_uml(uml)
+            steps.append(f"UML parsed structure: {str(parsed)}")
+
+            # Evaluate UML
+            result = eval_uml(parsed)
+            steps.append(f"UML evaluation result: {result}")
+        except Exception as e:
+            steps.append(f"UML parsing/evaluation error: {str(e)}")
+    except Exception:
+        # Try direct UML parsing if conversion failed
+        try:
+            parsed = parse_uml(expression)
+            steps.append(f"Direct UML parsed structure: {str(parsed)}")
+
+            result = eval_uml(parsed)
+            steps.append(f"UML evaluation result: {result}")
+        except Exception as e:
+            steps.append(f"Direct UML error: {str(e)}")
+
+    # Try RIS interpretation
+    try:
+        if "," in expression:
+            parts = expression.replace("(", "").replace(")", "").split(",")
+            if len(parts) == 2:
+                a, b = float(parts[0].strip()), float(parts[1].strip())
+                result, operation = ris_meta_operator(a, b)
+                steps.append(
+                    f"RIS interpretation: {a},{b} = {result} via {operation}"
+                )
+    except Exception:
+        pass  # RIS not applicable
+
+    return steps
+
+
+def run_test_suite():
+    """Run a test suite of common operations and return the report lines"""
+    test_expressions = [
+        # Standard arithmetic
+        "2+3",
+        "10-5",
+        "4*8",
+        "20/4",
+        "2^5",
+        "10%3",
+        # Order of operations
+        "2+3*4",
+        "(2+3)*4",
+        # UML notation
+        "[2,3]",
+        "{10,3}",
+        "<4,5>",
+        "<>20,5<>",
+        "@(3,2)",
+        # Complex
+        "RIS(3,4)",
+        "RIS(25,5)",
+    ]
+
+    steps = ["UML Calculator Test Suite:"]
+
+    for expr in test_expressions:
+        steps.append(f"\nTest: {expr}")
+
+        try:
+            # Try UML parsing first
+            try:
+                parsed = parse_uml(expr)
+                result = eval_uml(parsed)
+                steps.append(f"UML Result: {result}")
+            except (ValueError, TypeError, SyntaxError):
+                # Try standard evaluation
+                try:
+                    if expr.startswith("RIS("):
+                        # RIS test
+                        inner = expr[4:-1]
+                        parts = inner.split(",")
+                        if len(parts) == 2:
+                            a, b = float(parts[0].strip()), float(parts[1].strip())
+                            result, operation = ris_meta_operator(a, b)
+                            steps.append(f"RIS Result: {result} via {operation}")
+                    else:
+                        # Standard eval
+                        result = safe_eval(expr)
+                        steps.append(f"Standard Result: {result}")
+
+                        # Also try UML conversion
+                        uml = convert_standard_to_uml(expr)
+                        steps.append(f"Converted to UML: {uml}")
+
+                        parsed = parse_uml(uml)
+                        uml_result = eval_uml(parsed)
+                        steps.append(f"UML Result: {uml_result}")
+
+                        if abs(result - uml_result) < 1e-10:
+                            steps.append("PASS: Results match")
+                        else:
+                            steps.append(
+                                f"WARN: Results differ ({result} vs {uml_result})"
+                            )
+                except (ValueError, TypeError, SyntaxError) as e:
+                    steps.append(f"Error: {str(e)}")
+        except Exception as e:
+            steps.append(f"Error: {str(e)}")
+
+    return steps
 
 
 class UMLCalculatorGUI:
@@ -44,10 +228,20 @@ class UMLCalculatorGUI:
             pass  # Icon not available, use default
 
         # Variables
-        self.history = []
+        self.history = HistoryBuffer()
+        self.history_store = HistoryStore(HISTORY_FILE)
         self.current_expression = tk.StringVar()
         self.result_var = tk.StringVar(value="0")
         self.mode_var = tk.StringVar(value="standard")
+        self.status_var = tk.StringVar(value="")
+        self.preview_var = tk.StringVar(value="")
+        self.live_parser = IncrementalParser()
+        self._preview_job = None
+
+        # Background evaluation; editing the expression drops pending results
+        self.evaluator = BackgroundEvaluator(self.root, on_status=self.status_var.set)
+        self.current_expression.trace_add("write", self.on_expression_edit)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Configure styles and colors
         self.configure_styles()
@@ -241,6 +435,30 @@ class UMLCalculatorGUI:
         )
         result_display.grid(row=1, column=0, sticky="ew", pady=5)
 
+        # Spinner while an evaluation runs in the background
+        status_display = tk.Label(
+            input_frame,
+            textvariable=self.status_var,
+            font=(self.main_font, 10),
+            bg=self.colors["primary"],
+            fg=self.colors["secondary"],
+            anchor="e",
+            padx=5,
+        )
+        status_display.grid(row=2, column=0, sticky="ew")
+
+        # Live result (or the first error and its position) while typing
+        preview_display = tk.Label(
+            input_frame,
+            textvariable=self.preview_var,
+            font=(self.main_font, 11),
+            bg=self.colors["primary"],
+            fg=self.colors["text"],
+            anchor="w",
+            padx=5,
+        )
+        preview_display.grid(row=3, column=0, columnspan=2, sticky="ew")
+
         # Copy Result Button
         copy_btn = tk.Button(
             input_frame,
@@ -331,20 +549,15 @@ class UMLCalculatorGUI:
         )
         history_header.pack(fill="x")
 
-        self.history_text = scrolledtext.ScrolledText(
+        # Clicking a row puts its expression back in the input box
+        self.history_pane = HistoryPane(
             history_frame,
-            font=(self.main_font, 12),
-            bg=self.colors["accent"],
-            fg=self.colors["primary"],
-            wrap="word",
-            borderwidth=0,
-            state="disabled",
+            self.history,
+            self.colors,
+            (self.main_font, 12),
+            on_select=self.current_expression.set,
         )
-        self.history_text.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-        self.history_text.tag_configure('even', background=self.colors["accent"])
-        self.history_text.tag_configure('odd', background=self.colors["background"])
-        self.history_text.insert("end", "Your calculation history will appear here.\n", 'even')
-        self.history_text.config(state="disabled")
+        self.history_pane.frame.pack(fill="both", expand=True)
 
         # Help panel
         help_frame = ttk.Frame(right_panel, style="Content.TFrame")
@@ -371,6 +584,7 @@ class UMLCalculatorGUI:
                 "  - Multiplication: <a,b>",
                 "  - Division: <>a,b<>",
                 "  - Power: @(a,b)",
+                "  - Modulo: @(a,b,mod)",
                 "• Standard notation (2+3*4) also works",
                 "• Use Show Steps to see the calculation process",
             ]
@@ -389,16 +603,6 @@ class UMLCalculatorGUI:
         )
         help_content.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
-        # Bind history click
-        self.history_text.bind("<Button-1>", self.on_history_click)
-
-    def on_history_click(self, event):
-        index = self.history_text.index(f"@{event.x},{event.y}")
-        line = int(index.split('.')[0]) - 1
-        if 0 <= line < len(self.history):
-            expr = self.history[line].split('=')[0].strip()
-            self.current_expression.set(expr)
-
     def create_button_grid(self, parent):
         """Create the calculator buttons grid"""
         # Button definitions: (text, row, column, colspan, function)
@@ -506,6 +710,46 @@ class UMLCalculatorGUI:
         self.root.bind("<BackSpace>", lambda e: self.backspace())
         self.root.bind("<Escape>", lambda e: self.clear())
 
+    def on_expression_edit(self, *args):
+        """Cancel evaluations of the previous expression and schedule a preview"""
+        self.evaluator.cancel("calculate")
+        self.evaluator.cancel("steps")
+        if self._preview_job is not None:
+            self.root.after_cancel(self._preview_job)
+        self._preview_job = self.root.after(PREVIEW_DELAY_MS, self.update_preview)
+
+    def update_preview(self):
+        """Show the result of the expression being typed, parsed incrementally"""
+        self._preview_job = None
+        expression = self.current_expression.get()
+        if not expression.strip() or expression == "Enter an expression":
+            self.preview_var.set("")
+            return
+        with budget_scope(frontend="gui", time_limit=PREVIEW_TIME_LIMIT):
+            preview = self.live_parser.preview(expression)
+        if preview.error is not None:
+            message = preview.error
+            if len(message) > PREVIEW_ERROR_LENGTH:
+                message = message[:PREVIEW_ERROR_LENGTH - 3] + "..."
+            if preview.end - preview.start > 1:
+                where = f"characters {preview.start + 1}-{preview.end}"
+            else:
+                where = f"character {preview.start + 1}"
+            self.preview_var.set(f"⚠ {message} ({where})")
+        elif isinstance(preview.value, str):
+            # Not UML; Calculate still tries standard notation
+            self.preview_var.set("")
+        else:
+            self.preview_var.set(f"= {preview.value}")
+
+    def close(self):
+        """Stop background evaluations and close the window"""
+        self.evaluator.shutdown()
+        if self._preview_job is not None:
+            self.root.after_cancel(self._preview_job)
+        self.history_store.close()
+        self.root.destroy()
+
     def on_entry_focus(self, event):
         """Clear placeholder text when entry is focused"""
         if self.current_expression.get() == "Enter an expression":
@@ -537,49 +781,26 @@ class UMLCalculatorGUI:
         self.root.after(2000, lambda: self.input_entry.config(bg=self.colors["accent"]))
 
     def calculate(self):
-        """Calculate the current expression (UML is primary, standard is comparison)"""
+        """Calculate the current expression in the background"""
         expression = self.current_expression.get().strip()
         if not expression or expression == "Enter an expression":
             return
-        try:
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            # Always try UML first
-            try:
-                parsed = parse_uml(expression)
-                uml_result = eval_uml(parsed)
-                uml_str = f"UML: {expression} = {uml_result}"
-            except Exception as e:
-                uml_result = None
-                uml_str = f"UML Error: {str(e)}"
-            # Try standard evaluation for comparison
-            try:
-                std_result = safe_eval(expression)
-                std_str = f"Standard: {expression} = {std_result}"
-            except Exception as e:
-                std_result = None
-                std_str = f"Standard Error: {str(e)}"
-            # Display UML as primary, standard as comparison
-            if uml_result is not None:
-                self.result_var.set(f"{uml_result}")
-            elif std_result is not None:
-                self.result_var.set(f"{std_result}")
-            else:
-                self.result_var.set("Error")
-            # Add both to history
-            history_entry = f"[{timestamp}] {uml_str}\n[{timestamp}] {std_str}"
-            self.history.append(history_entry)
-            self.update_history_display()
-        except Exception as e:
-            self.show_error(str(e))
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.evaluator.submit(
+            "calculate",
+            evaluate_calculation,
+            (expression, timestamp),
+            on_done=lambda outcome: self.show_calculation(expression, outcome),
+            on_error=lambda e: self.show_error(str(e)),
+            use_process=looks_expensive(expression),
+        )
 
-    def update_history_display(self):
-        """Update the history text display"""
-        self.history_text.config(state="normal")
-        self.history_text.delete("1.0", "end")
-        for idx, entry in enumerate(self.history):
-            tag = 'even' if idx % 2 == 0 else 'odd'
-            self.history_text.insert("end", entry + "\n", tag)
-        self.history_text.config(state="disabled")
+    def show_calculation(self, expression, outcome):
+        """Display a finished calculation and add it to the history"""
+        display, history_entry = outcome
+        self.result_var.set(display)
+        self.history_pane.add(history_entry, expression)
+        self.history_store.append(history_entry, expression)
 
     def show_uml_steps(self):
         """Show step-by-step UML parsing and evaluation"""
@@ -587,62 +808,14 @@ class UMLCalculatorGUI:
         if not expression or expression == "Enter an expression":
             return
 
-        try:
-            steps = []
-            steps.append(f"Original expression: {expression}")
-
-            # Try standard evaluation first
-            try:
-                result = safe_eval(expression)
-                steps.append(f"Standard evaluation: {result}")
-            except Exception:
-                steps.append("Standard evaluation not applicable")
-
-            # Try converting to UML
-            try:
-                uml = convert_standard_to_uml(expression)
-                if uml != expression:
-                    steps.append(f"Converted to UML: {uml}")
-
-                # Parse UML
-                try:
-                    parsed = parse_uml(uml)
-                    steps.append(f"UML parsed structure: {str(parsed)}")
-
-                    # Evaluate UML
-                    result = eval_uml(parsed)
-                    steps.append(f"UML evaluation result: {result}")
-                except Exception as e:
-                    steps.append(f"UML parsing/evaluation error: {str(e)}")
-            except Exception:
-                # Try direct UML parsing if conversion failed
-                try:
-                    parsed = parse_uml(expression)
-                    steps.append(f"Direct UML parsed structure: {str(parsed)}")
-
-                    result = eval_uml(parsed)
-                    steps.append(f"UML evaluation result: {result}")
-                except Exception as e:
-                    steps.append(f"Direct UML error: {str(e)}")
-
-            # Try RIS interpretation
-            try:
-                if "," in expression:
-                    parts = expression.replace("(", "").replace(")", "").split(",")
-                    if len(parts) == 2:
-                        a, b = float(parts[0].strip()), float(parts[1].strip())
-                        result, operation = ris_meta_operator(a, b)
-                        steps.append(
-                            f"RIS interpretation: {a},{b} = {result} via {operation}"
-                        )
-            except Exception:
-                pass  # RIS not applicable
-
-            # Show steps in a pop-up window
-            self.show_step_window("Calculation Steps", steps)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not show steps: {str(e)}")
+        self.evaluator.submit(
+            "steps",
+            calculation_steps,
+            (expression,),
+            on_done=lambda steps: self.show_step_window("Calculation Steps", steps),
+            on_error=lambda e: messagebox.showerror("Error", f"Could not show steps: {str(e)}"),
+            use_process=looks_expensive(expression),
+        )
 
     def show_step_window(self, title, steps):
         """Show a window with calculation steps"""
@@ -753,75 +926,12 @@ class UMLCalculatorGUI:
 
     def run_tests(self):
         """Run a test suite of common operations"""
-        test_expressions = [
-            # Standard arithmetic
-            "2+3",
-            "10-5",
-            "4*8",
-            "20/4",
-            "2^5",
-            "10%3",
-            # Order of operations
-            "2+3*4",
-            "(2+3)*4",
-            # UML notation
-            "[2,3]",
-            "{10,3}",
-            "<4,5>",
-            "<>20,5<>",
-            "@(3,2)",
-            # Complex
-            "RIS(3,4)",
-            "RIS(25,5)",
-        ]
-
-        steps = ["UML Calculator Test Suite:"]
-
-        for expr in test_expressions:
-            steps.append(f"\nTest: {expr}")
-
-            try:
-                # Try UML parsing first
-                try:
-                    parsed = parse_uml(expr)
-                    result = eval_uml(parsed)
-                    steps.append(f"UML Result: {result}")
-                except (ValueError, TypeError, SyntaxError):
-                    # Try standard evaluation
-                    try:
-                        if expr.startswith("RIS("):
-                            # RIS test
-                            inner = expr[4:-1]
-                            parts = inner.split(",")
-                            if len(parts) == 2:
-                                a, b = float(parts[0].strip()), float(parts[1].strip())
-                                result, operation = ris_meta_operator(a, b)
-                                steps.append(f"RIS Result: {result} via {operation}")
-                        else:
-                            # Standard eval
-                            result = safe_eval(expr)
-                            steps.append(f"Standard Result: {result}")
-
-                            # Also try UML conversion
-                            uml = convert_standard_to_uml(expr)
-                            steps.append(f"Converted to UML: {uml}")
-
-                            parsed = parse_uml(uml)
-                            uml_result = eval_uml(parsed)
-                            steps.append(f"UML Result: {uml_result}")
-
-                            if abs(result - uml_result) < 1e-10:
-                                steps.append("PASS: Results match")
-                            else:
-                                steps.append(
-                                    f"WARN: Results differ ({result} vs {uml_result})"
-                                )
-                    except (ValueError, TypeError, SyntaxError) as e:
-                        steps.append(f"Error: {str(e)}")
-            except Exception as e:
-                steps.append(f"Error: {str(e)}")
-
-        self.show_step_window("Test Results", steps)
+        self.evaluator.submit(
+            "tests",
+            run_test_suite,
+            on_done=lambda steps: self.show_step_window("Test Results", steps),
+            on_error=lambda e: self.show_error(str(e)),
+        )
 
     def copy_result_to_clipboard(self):
         """Copy the result to the clipboard"""
@@ -995,12 +1105,12 @@ class UMLCalculatorGUI:
             "show_steps_default": getattr(self, 'show_steps_default', True),
             "history_length": getattr(self, 'history_length', 50),
             "sound_enabled": getattr(self, 'sound_enabled', False),
-            "history": self.history[-getattr(self, 'history_length', 50):],
         }
         with open(SETTINGS_FILE, "w") as f:
             json.dump(settings, f)
 
     def load_user_settings(self):
+        self.history_length = 50
         if os.path.exists(SETTINGS_FILE):
             with open(SETTINGS_FILE, "r") as f:
                 settings = json.load(f)
@@ -1028,8 +1138,17 @@ class UMLCalculatorGUI:
             self.show_steps_default = settings.get("show_steps_default", True)
             self.history_length = settings.get("history_length", 50)
             self.sound_enabled = settings.get("sound_enabled", False)
-            self.history = settings.get("history", [])
-            self.update_history_display()
+            if settings.get("history") and not os.path.exists(HISTORY_FILE):
+                # Older versions kept the history inside the settings file
+                for entry in settings["history"]:
+                    self.history_store.log.append({"text": entry, "expression": None})
+        self.load_history()
+
+    def load_history(self):
+        """Show the newest history_length saved calculations"""
+        for text, expression in self.history_store.load(self.history_length):
+            self.history.add(text, expression)
+        self.history_pane.scroll_to_end()
 
 def save_settings(settings: dict):
     SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".uml_calculator_settings.json")
@@ -1043,18 +1162,6 @@ def load_settings() -> dict:
             return json.load(f)
     return {}
 
-def save_history(history: list):
-    HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".uml_calculator_history.json")
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f)
-
-def load_history() -> list:
-    HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".uml_calculator_history.json")
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r") as f:
-            return json.load(f)
-    return []
-
 def main():
     """Main entry point for the UML Calculator GUI"""
     app = UMLCalculatorGUI()
@@ -0,0 +1,438 @@
+"""
+Warm evaluation daemon for the UML Calculator CLIs
+
+Keeps the evaluators imported (sympy included) and a memo of evaluated
+expressions warm, and serves requests over a Unix domain socket, so short
+CLI invocations in shell pipelines skip the import and warm-up cost.
+
+Protocol: one JSON object per line in each direction.
+
+    {"op": "eval", "expr": "[2,3]", "mode": "auto"}     calculator_cli evaluation
+    {"op": "calc", "expr": "3*x^2", "x": 2, "mode": "standard"}
+                                                        modern_cli calc evaluation
+    {"op": "ris", "a": 6, "b": 3, "mode": "default"}    direct RIS
+    {"op": "batch", "requests": [{...}, {...}]}         several requests, one reply
+    {"op": "ping"} / {"op": "stats"} / {"op": "shutdown"}
+
+Replies carry the request's "id" (if any) and either "result" or "error".
+
+Evaluations run under the evaluation budget of the request's "frontend"
+("cli" by default, or "gui" / "web"), with individual limits replaced by an
+optional "budget" object, e.g. {"frontend": "web", "budget": {"time_limit": 0.5}}.
+An expression over budget gets an "Evaluation budget exceeded" error.
+
+The client (``request``) starts the daemon on first use and returns None
+when it cannot be reached, so callers fall back to evaluating in-process.
+The socket lives in a directory only its user can write to, and the client
+only trusts a daemon running as the same user.
+
+Usage:
+    python eval_daemon.py serve [--idle-timeout 600]
+    python eval_daemon.py status | stop
+    python eval_daemon.py eval "[2,3]" "RIS(6,3)"
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import math
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from core.evaluation_budget import budget_for, budget_scope
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+DEFAULT_MEMO_SIZE = 10000
+# How long a client waits for a daemon it has just started
+STARTUP_WAIT = 5.0
+
+# Unix sockets are missing on some platforms; the client then always falls back
+AVAILABLE = hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path():
+    """Per-user socket path, in a private directory under XDG_RUNTIME_DIR when set."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(runtime_dir, f"uml-calculator-{uid}", "eval.sock")
+
+
+def _check_socket_directory(path):
+    """
+    Create the socket's directory (mode 0700) if missing, and check that only
+    this user can add or replace files in it.
+
+    Raises:
+        PermissionError: If the directory is a symlink, not owned by this
+            user, or writable by group or others (such as /tmp itself)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid()
+            or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        raise PermissionError(f"{directory} is not a private directory of this user")
+
+
+def _check_peer(sock, path):
+    """Raise PermissionError unless the process serving sock runs as this user."""
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+    else:
+        # No peer credentials (macOS, BSD): the socket file's owner is the
+        # server, and the checked directory keeps others from replacing it
+        uid = os.stat(path).st_uid
+    if uid != os.getuid():
+        raise PermissionError(f"{path} is served by another user (uid {uid})")
+
+
+def _json_value(value):
+    """Return a JSON-safe form of a result (floats, including NaN/inf, pass through)."""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value
+    return str(value)
+
+
+class Evaluator:
+    """The daemon's warm state: imported evaluators, result cache and memo."""
+
+    def __init__(self, cache_dir=None, use_cache=False, memo_size=DEFAULT_MEMO_SIZE):
+        self.memo = OrderedDict()
+        self.memo_size = memo_size
+        self.memo_hits = 0
+        self.requests = 0
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self._cli_evaluate = None
+        self._cache = None
+        self.warm_up()
+
+    def warm_up(self):
+        """Import both CLIs' evaluators now rather than on the first request."""
+        from core.ris import ris
+        from core.arithmetic import evaluate_arithmetic
+        self._ris_func = ris
+        self._arithmetic = evaluate_arithmetic
+        try:
+            from core.symbolic import evaluate_expression
+            self._symbolic = evaluate_expression
+        except ImportError as e:
+            self._symbolic = e
+        try:
+            from ui.calculator_cli import evaluate_expression
+            self._cli_evaluate = evaluate_expression
+            if self.use_cache:
+                from uml_cache import ResultCache
+                self._cache = ResultCache(self.cache_dir)
+        except ImportError as e:
+            self._cli_evaluate = e
+
+    def _memoized(self, key, compute):
+        if key in self.memo:
+            self.memo.move_to_end(key)
+            self.memo_hits += 1
+            return self.memo[key]
+        value = compute()
+        self.memo[key] = value
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return value
+
+    def _eval(self, req, budget):
+        if isinstance(self._cli_evaluate, Exception):
+            raise RuntimeError(f"calculator_cli unavailable: {self._cli_evaluate}")
+        expr, mode = str(req["expr"]), req.get("mode", "auto")
+        # Keyed by budget too: a result computed under a generous budget
+        # must not answer a request with a stricter one
+        return self._memoized(
+            ("eval", expr, mode, budget),
+            lambda: self._cli_evaluate(expr, mode, False, self._cache)[0],
+        )
+
+    def _calc(self, req, budget):
+        expr = str(req["expr"])
+        x = req.get("x")
+        standard_mode = req.get("mode", "standard").lower() != "ris"
+
+        def compute():
+            result = self._arithmetic(expr)
+            if result is None:
+                if isinstance(self._symbolic, Exception):
+                    raise RuntimeError(f"sympy unavailable: {self._symbolic}")
+                result = self._symbolic(expr, x_value=x, standard_mode=standard_mode)
+            return result
+
+        return self._memoized(("calc", expr, x, standard_mode, budget), compute)
+
+    def _ris(self, req):
+        mode = req.get("mode", "default")
+        context = {"ris_mode": mode} if mode != "default" else {}
+        return self._ris_func(float(req["a"]), float(req["b"]), context)
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "memo_entries": len(self.memo),
+            "memo_hits": self.memo_hits,
+        }
+
+    def handle(self, req):
+        """Answer one request object; errors are returned, never raised."""
+        reply = {"id": req["id"]} if isinstance(req, dict) and "id" in req else {}
+        try:
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            op = req.get("op")
+            if op == "batch":
+                reply["results"] = [self.handle(r) for r in req.get("requests", [])]
+                return reply
+            budget = budget_for(req.get("frontend", "cli"), **req.get("budget", {}))
+            with self.lock, budget_scope(budget):
+                self.requests += 1
+                if op == "eval":
+                    result = self._eval(req, budget)
+                elif op == "calc":
+                    result = self._calc(req, budget)
+                elif op == "ris":
+                    result = self._ris(req)
+                elif op == "ping":
+                    result = "pong"
+                elif op == "stats":
+                    result = self.stats()
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+            reply["result"] = result if op == "stats" else _json_value(result)
+        except Exception as e:
+            reply["error"] = str(e) or type(e).__name__
+        return reply
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            server.last_activity = time.monotonic()
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                reply = {"error": f"invalid JSON: {e}"}
+            else:
+                if isinstance(req, dict) and req.get("op") == "shutdown":
+                    self._send({"id": req.get("id"), "result": "stopping"})
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                    return
+                reply = server.evaluator.handle(req)
+            self._send(reply)
+
+    def _send(self, reply):
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _connect(path, timeout):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        _check_peer(sock, path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def serve(socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT, cache_dir=None, use_cache=False):
+    """
+    Run the daemon until it is stopped or idle for idle_timeout seconds.
+
+    Returns:
+        0 on a clean stop, 1 if another daemon already serves the socket or
+        its directory is not private
+    """
+    import fcntl
+
+    path = socket_path or default_socket_path()
+    try:
+        _check_socket_directory(path)
+    except PermissionError as e:
+        print(e, file=sys.stderr)
+        return 1
+    # Only one daemon may bind the socket; concurrent auto-starts race here.
+    # O_NOFOLLOW: never write through a symlink planted at the lock path
+    lock_fd = os.open(f"{path}.lock", os.O_WRONLY | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    lock_file = os.fdopen(lock_fd, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return 1
+
+    try:
+        if os.path.exists(path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(path)
+        evaluator = Evaluator(cache_dir, use_cache)
+        old_umask = os.umask(0o077)
+        try:
+            server = _Server(path, _Handler)
+        finally:
+            os.umask(old_umask)
+        server.evaluator = evaluator
+        server.last_activity = time.monotonic()
+
+        def watch_idle():
+            while True:
+                time.sleep(min(idle_timeout, 5.0))
+                if time.monotonic() - server.last_activity > idle_timeout:
+                    server.shutdown()
+                    return
+
+        if idle_timeout:
+            threading.Thread(target=watch_idle, daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(path):
+                os.unlink(path)
+    finally:
+        lock_file.close()
+    return 0
+
+
+def start_daemon(socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Start a detached daemon process and wait until it accepts connections."""
+    path = socket_path or default_socket_path()
+    command = [sys.executable, os.path.abspath(__file__), "serve", "--socket", path,
+               "--idle-timeout", str(idle_timeout)]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+    deadline = time.monotonic() + STARTUP_WAIT
+    while time.monotonic() < deadline:
+        try:
+            _connect(path, 1.0).close()
+            return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+
+def request(payload, socket_path=None, autostart=True, timeout=30.0):
+    """
+    Send one request (or a batch) to the daemon and return the reply.
+
+    Args:
+        payload: Request object, e.g. {"op": "eval", "expr": "[2,3]"}
+        socket_path: Daemon socket (default: per-user path)
+        autostart: Start the daemon if it is not running
+        timeout: Seconds to wait for the reply
+
+    Returns:
+        Reply dict, or None if the daemon cannot be reached (evaluate
+        in-process instead)
+    """
+    if not AVAILABLE:
+        return None
+    path = socket_path or default_socket_path()
+    try:
+        _check_socket_directory(path)
+    except OSError:
+        return None
+    try:
+        sock = _connect(path, timeout)
+    except OSError:
+        if not autostart or not start_daemon(path):
+            return None
+        try:
+            sock = _connect(path, timeout)
+        except OSError:
+            return None
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="eval_daemon.py", description="UML Calculator evaluation daemon")
+    parser.add_argument("command", choices=["serve", "status", "stop", "eval"])
+    parser.add_argument("expressions", nargs="*", help="Expressions for 'eval'")
+    parser.add_argument("--socket", help="Socket path (default: in a private per-user directory under XDG_RUNTIME_DIR or /tmp)")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="Seconds without requests before the daemon exits (0 = never)")
+    parser.add_argument("--mode", "-m", default="auto", help="Calculation mode for 'eval'")
+    parser.add_argument("--cache", action="store_true", help="Daemon uses the persistent result cache (off by default)")
+    parser.add_argument("--cache-dir", help="Daemon uses the persistent result cache in this directory")
+    parser.add_argument("--no-cache", action="store_true", help="Daemon never uses the persistent result cache")
+    args = parser.parse_args(argv)
+
+    if not AVAILABLE:
+        print("Unix domain sockets are not available on this platform", file=sys.stderr)
+        return 1
+    if args.command == "serve":
+        return serve(args.socket, args.idle_timeout, args.cache_dir,
+                     (args.cache or bool(args.cache_dir)) and not args.no_cache)
+    if args.command in ("status", "stop"):
+        op = "stats" if args.command == "status" else "shutdown"
+        reply = request({"op": op}, args.socket, autostart=False)
+        if reply is None:
+            print("Daemon is not running")
+            return 1
+        print(json.dumps(reply.get("result"), indent=2))
+        return 0
+
+    requests = [{"op": "eval", "expr": expr, "mode": args.mode} for expr in args.expressions]
+    reply = request({"op": "batch", "requests": requests}, args.socket)
+    if reply is None:
+        print("Daemon is not reachable", file=sys.stderr)
+        return 1
+    status = 0
+    for expr, item in zip(args.expressions, reply["results"]):
+        if "error" in item:
+            status = 1
+            print(f"{expr}: Error: {item['error']}")
+        else:
+            result = item["result"]
+            print(f"{expr} = {result}" if not isinstance(result, float) or math.isfinite(result)
+                  else f"{expr} = {result!r}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
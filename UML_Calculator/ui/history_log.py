@@ -0,0 +1,150 @@
+"""
+Append-only calculation history for the modern CLI
+
+Each calculation is appended to a JSONL file as one line, instead of
+rewriting the whole history. Appends and compaction take an exclusive lock
+on a companion lock file, so several CLI processes can record history at the
+same time. Once the log holds about COMPACT_FACTOR times the configured
+number of entries, it is rewritten with only the newest ones.
+
+Readers stream the log line by line and keep at most the entries they need,
+so showing or exporting history never loads more than the configured size.
+"""
+
+import json
+import os
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still single O_APPEND writes
+    fcntl = None
+
+# Compact once the log holds roughly this many times max_entries lines
+COMPACT_FACTOR = 2
+
+
+class _Locked:
+    """Exclusive lock on path + '.lock' (a no-op without fcntl)."""
+
+    def __init__(self, path):
+        self.path = f"{path}.lock"
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, "a")
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class HistoryLog:
+    """
+    Calculation history stored as a JSONL append log
+
+    Args:
+        path: Log file path
+        max_entries: Number of entries kept; older ones are dropped
+        legacy_path: Old JSON-array history file, migrated on first use
+    """
+
+    def __init__(self, path, max_entries=100, legacy_path=None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.legacy_path = str(legacy_path) if legacy_path else None
+
+    def _migrate(self):
+        """Convert the legacy JSON history into the log (caller holds the lock)."""
+        if not self.legacy_path or os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        with open(self.legacy_path, "r") as f:
+            entries = json.load(f)
+        self._write_all(entries[-self.max_entries:])
+        os.replace(self.legacy_path, f"{self.legacy_path}.bak")
+
+    def _write_all(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _read(self, path, skip=0):
+        """Yield entries from path after the first skip lines, ignoring torn or corrupt lines."""
+        try:
+            f = open(path, "r")
+        except FileNotFoundError:
+            return
+        with f:
+            for index, line in enumerate(f):
+                if index < skip:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def append(self, entry):
+        """Append one entry, compacting the log when it has grown too long."""
+        line = json.dumps(entry, default=str) + "\n"
+        with _Locked(self.path):
+            self._migrate()
+            # One write on an O_APPEND descriptor: lines never interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > COMPACT_FACTOR * max(self.max_entries, 1) * len(line):
+                self._compact()
+
+    def _compact(self):
+        kept = deque(self._read(self.path), maxlen=self.max_entries)
+        self._write_all(kept)
+
+    def compact(self):
+        """Rewrite the log with only the newest max_entries entries."""
+        with _Locked(self.path):
+            self._migrate()
+            self._compact()
+
+    def entries(self, limit=None):
+        """
+        Return the newest entries, oldest first
+
+        Streams the log and keeps at most min(limit, max_entries) entries
+        in memory.
+        """
+        count = self.max_entries if limit is None else min(limit, self.max_entries)
+        if count <= 0:
+            return []
+        with _Locked(self.path):
+            self._migrate()
+        return list(deque(self._read(self.path), maxlen=count))
+
+    def iter_entries(self):
+        """Stream every kept entry, oldest first, without loading the log."""
+        with _Locked(self.path):
+            self._migrate()
+        try:
+            with open(self.path, "rb") as f:
+                total = sum(1 for _ in f)
+        except FileNotFoundError:
+            return
+        # Lines older than the newest max_entries are waiting to be compacted away
+        yield from self._read(self.path, skip=max(total - self.max_entries, 0))
+
+    def clear(self):
+        """Remove all entries."""
+        with _Locked(self.path):
+            self._write_all([])
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                os.replace(self.legacy_path, f"{self.legacy_path}.bak")
@@ -0,0 +1,421 @@
+"""
+Virtualized calculation history for the Tkinter GUI
+
+HistoryBuffer keeps the newest rows of a session in a bounded buffer with
+an inverted index for search. HistoryPane shows it in a Text widget that
+only ever holds the rows that fit on screen: new rows are appended one at a
+time, and scrolling re-renders just the visible window, so the cost of a
+calculation does not grow with the length of the session.
+
+HistoryStore persists rows to an append-only JSONL log (ui.history_log) from
+a background thread, so the Tk thread never waits on the disk.
+"""
+
+import bisect
+import queue
+import re
+import threading
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+from ui.history_log import HistoryLog
+
+DEFAULT_BUFFER_SIZE = 10000
+# Lines assumed visible before the widget knows its size
+DEFAULT_VISIBLE_LINES = 20
+SCROLL_ROWS = 3
+
+_TOKEN = re.compile(r"[a-z_]+|\d+(?:\.\d+)?")
+# "[12:00:00] UML: [2,3] = 5.0" -> "[2,3]", for rows saved without an expression
+_ENTRY_EXPRESSION = re.compile(r"^\[[^\]]*\] (?:UML|Standard): (.*?) = ", re.M)
+
+
+def tokenize(text):
+    """Lowercase words and numbers in text, for indexing and search."""
+    return _TOKEN.findall(text.lower())
+
+
+def expression_from_entry(text):
+    """Expression of a formatted history entry, or None."""
+    match = _ENTRY_EXPRESSION.search(text)
+    return match.group(1) if match else None
+
+
+class HistoryIndex:
+    """
+    Inverted index from tokens to row ids
+
+    Posting lists hold ids in ascending order, so dropping the oldest row
+    only pops from the left. Search matches each query term as a prefix,
+    through a sorted vocabulary, and intersects the results.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._row_tokens = {}
+
+    def add(self, row_id, text):
+        """Index text under row_id (ids must increase)."""
+        tokens = set(tokenize(text))
+        self._row_tokens[row_id] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = deque()
+                bisect.insort(self._vocabulary, token)
+            postings.append(row_id)
+
+    def remove(self, row_id):
+        """Remove row_id from the index."""
+        for token in self._row_tokens.pop(row_id, ()):
+            postings = self._postings[token]
+            if postings[0] == row_id:
+                postings.popleft()
+            else:
+                postings.remove(row_id)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _prefix_matches(self, term):
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff", start)
+        ids = set()
+        for token in self._vocabulary[start:end]:
+            ids.update(self._postings[token])
+        return ids
+
+    def search(self, query):
+        """
+        Row ids matching every word or number in query, ascending
+
+        Returns None when the query has no words or numbers (no filter).
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        matches = None
+        # Narrowest term first keeps the intersections small
+        for ids in sorted((self._prefix_matches(term) for term in terms), key=len):
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+        return sorted(matches)
+
+
+class HistoryBuffer:
+    """
+    The newest max_rows history rows with their search index
+
+    Row ids increase by one per row, so the rows in the buffer are exactly
+    the ids first_id .. first_id + len - 1.
+    """
+
+    def __init__(self, max_rows=DEFAULT_BUFFER_SIZE):
+        self.max_rows = max_rows
+        self.first_id = 0
+        self._rows = deque()
+        self.index = HistoryIndex()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def next_id(self):
+        return self.first_id + len(self._rows)
+
+    def add(self, text, expression=None):
+        """Add a row, dropping the oldest one when full; returns its id."""
+        row_id = self.next_id
+        if expression is None:
+            expression = expression_from_entry(text)
+        self._rows.append((text, expression))
+        self.index.add(row_id, text)
+        if len(self._rows) > self.max_rows:
+            self._rows.popleft()
+            self.index.remove(self.first_id)
+            self.first_id += 1
+        return row_id
+
+    def get(self, row_id):
+        """(text, expression) for row_id, or None if it has been dropped."""
+        position = row_id - self.first_id
+        if 0 <= position < len(self._rows):
+            return self._rows[position]
+        return None
+
+
+class HistoryStore:
+    """
+    Append-only history file written from a background thread
+
+    Args:
+        path: JSONL log path
+        max_entries: Entries kept on disk
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_BUFFER_SIZE):
+        self.log = HistoryLog(path, max_entries)
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def load(self, limit=None):
+        """Newest saved rows as (text, expression) pairs, oldest first."""
+        return [(entry.get("text", ""), entry.get("expression"))
+                for entry in self.log.entries(limit) if isinstance(entry, dict)]
+
+    def append(self, text, expression=None):
+        """Queue a row for writing; returns immediately."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write, daemon=True)
+            self._thread.start()
+        self._queue.put({"text": text, "expression": expression})
+
+    def _write(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            try:
+                self.log.append(entry)
+            except OSError:
+                # History is best effort; never take the GUI down over it
+                pass
+
+    def close(self, timeout=2.0):
+        """Finish pending writes (waiting at most timeout seconds)."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class HistoryPane:
+    """
+    Scrollable, searchable view of a HistoryBuffer
+
+    Args:
+        parent: Container widget
+        buffer: HistoryBuffer to display
+        colors: GUI color dict (primary, accent, background)
+        font: Font for the rows
+        on_select: Called with a row's expression when it is clicked
+    """
+
+    def __init__(self, parent, buffer, colors, font, on_select=None):
+        self.buffer = buffer
+        self.on_select = on_select
+        self.frame = tk.Frame(parent, bg=colors["accent"])
+
+        self.search_var = tk.StringVar()
+        search = tk.Entry(
+            self.frame,
+            textvariable=self.search_var,
+            font=font,
+            bg=colors["background"],
+            fg=colors["accent"],
+            insertbackground=colors["accent"],
+            relief="flat",
+        )
+        search.pack(fill="x", padx=10, pady=(0, 5))
+
+        body = tk.Frame(self.frame, bg=colors["accent"])
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(
+            body,
+            font=font,
+            bg=colors["accent"],
+            fg=colors["primary"],
+            wrap="word",
+            borderwidth=0,
+            state="disabled",
+        )
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("even", background=colors["accent"])
+        self.text.tag_configure("odd", background=colors["background"])
+
+        # Matching row ids while searching, None to show every row
+        self._matches = None
+        # View position of the first rendered row
+        self._top = 0
+        # (row id, display lines) for each rendered row, top to bottom
+        self._shown = deque()
+
+        self.search_var.trace_add("write", lambda *args: self._apply_search())
+        self.text.bind("<Configure>", lambda e: self.scroll_to_end() if self._at_bottom() else self.render())
+        self.text.bind("<Button-1>", self._on_click)
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-SCROLL_ROWS if e.delta > 0 else SCROLL_ROWS))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-SCROLL_ROWS))
+        self.text.bind("<Button-5>", lambda e: self.scroll(SCROLL_ROWS))
+        self.scroll_to_end()
+
+    # --- view positions ---
+
+    def _view_length(self):
+        return len(self.buffer) if self._matches is None else len(self._matches)
+
+    def _view_id(self, position):
+        if self._matches is None:
+            return self.buffer.first_id + position
+        return self._matches[position]
+
+    def _visible_lines(self):
+        height = self.text.winfo_height()
+        if height <= 1:
+            return DEFAULT_VISIBLE_LINES
+        linespace = self.text.tk.call("font", "metrics", self.text.cget("font"), "-linespace")
+        return max(1, height // int(linespace))
+
+    def _at_bottom(self):
+        return self._top + len(self._shown) >= self._view_length()
+
+    # --- rendering ---
+
+    def _insert_row(self, row_id, at_start=False):
+        """Insert one row at the top or bottom; returns its display lines."""
+        text, _ = self.buffer.get(row_id)
+        tag = f"row{row_id}"
+        self.text.insert("1.0" if at_start else "end-1c", text + "\n",
+                         ("even" if row_id % 2 == 0 else "odd", tag))
+        first, last = self.text.tag_ranges(tag)[:2]
+        lines = self.text.count(first, last, "displaylines")
+        row = (row_id, lines[0] if lines else 1)
+        if at_start:
+            self._shown.appendleft(row)
+        else:
+            self._shown.append(row)
+        return row[1]
+
+    def _delete_row(self, row_id):
+        tag = f"row{row_id}"
+        first, last = self.text.tag_ranges(tag)[:2]
+        self.text.delete(first, last)
+        # Deleting the text keeps the tag; Tk would hold one per row ever shown
+        self.text.tag_delete(tag)
+
+    def _drop_first_row(self):
+        row_id, _ = self._shown.popleft()
+        self._delete_row(row_id)
+        self._top += 1
+
+    def _update_scrollbar(self):
+        total = self._view_length()
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._top / total, (self._top + len(self._shown)) / total)
+
+    def _begin_render(self):
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        if self._shown:
+            self.text.tag_delete(*(f"row{row_id}" for row_id, _ in self._shown))
+        self._shown.clear()
+        if not self._view_length():
+            if self._matches is not None:
+                empty = "No matching calculations."
+            else:
+                empty = "Your calculation history will appear here."
+            self.text.insert("end", empty + "\n", "even")
+
+    def render(self):
+        """Re-render the visible window starting at the current top row."""
+        total = self._view_length()
+        visible = self._visible_lines()
+        self._top = max(0, min(self._top, total - 1))
+        self._begin_render()
+        lines = 0
+        position = self._top
+        while position < total and lines < visible:
+            lines += self._insert_row(self._view_id(position))
+            position += 1
+        self.text.config(state="disabled")
+        self._update_scrollbar()
+
+    def scroll_to_end(self):
+        """Render the newest rows that fit, filling the window from the bottom."""
+        visible = self._visible_lines()
+        self._begin_render()
+        lines = 0
+        position = self._view_length()
+        while position > 0:
+            row_id = self._view_id(position - 1)
+            row_lines = self._insert_row(row_id, at_start=True)
+            if len(self._shown) > 1 and lines + row_lines > visible:
+                # Only rows that fit completely, except the newest
+                self._shown.popleft()
+                self._delete_row(row_id)
+                break
+            lines += row_lines
+            position -= 1
+        self._top = position
+        self.text.config(state="disabled")
+        self._update_scrollbar()
+
+    def scroll(self, rows):
+        """Move the window by rows (negative is up)."""
+        self._top = max(0, min(self._top + rows, self._view_length() - 1))
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._top = int(float(amount) * self._view_length())
+            self.render()
+        elif unit == "pages":
+            self.scroll(int(amount) * max(len(self._shown) - 1, 1))
+        else:
+            self.scroll(int(amount))
+
+    # --- updates ---
+
+    def add(self, text, expression=None):
+        """Add a row to the buffer and show it without re-rendering the pane."""
+        following = self._at_bottom()
+        first_before = self.buffer.first_id
+        row_id = self.buffer.add(text, expression)
+        if self._matches is not None:
+            # The index already holds the new row; recompute the matches
+            self._apply_search(scroll=following)
+            return row_id
+
+        self.text.config(state="normal")
+        dropped = self.buffer.first_id - first_before
+        if dropped:
+            # View positions shift as the oldest rows leave the buffer
+            while self._shown and self._shown[0][0] < self.buffer.first_id:
+                self._drop_first_row()
+            self._top = max(self._top - dropped, 0)
+        if following:
+            if not self._shown:
+                # Replace the empty-history placeholder
+                self.text.delete("1.0", "end")
+                self._top = row_id - self.buffer.first_id
+            self._insert_row(row_id)
+            visible = self._visible_lines()
+            while len(self._shown) > 1 and sum(lines for _, lines in self._shown) > visible:
+                self._drop_first_row()
+        self.text.config(state="disabled")
+        self._update_scrollbar()
+        return row_id
+
+    def _apply_search(self, scroll=True):
+        query = self.search_var.get().strip()
+        self._matches = self.buffer.index.search(query) if query else None
+        if scroll:
+            self.scroll_to_end()
+        else:
+            self.render()
+
+    def _on_click(self, event):
+        index = self.text.index(f"@{event.x},{event.y}")
+        for tag in self.text.tag_names(index):
+            if tag.startswith("row"):
+                row = self.buffer.get(int(tag[3:]))
+                if row and row[1] and self.on_select is not None:
+                    self.on_select(row[1])
+                return
@@ -1,6 +1,9 @@
 """
 Modern CLI for UML Calculator using Rich and Typer
 Provides beautiful formatting, easy command handling, and UML diagram generation
+
+Heavy dependencies are imported inside the commands that use them; run
+`python benchmark_suite.py startup` to check the cold start budget.
 """
 import typer
 from rich.console import Console
@@ -8,28 +11,37 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.prompt import Prompt, Confirm
-from rich.syntax import Syntax
 from rich.theme import Theme
 import json
 import csv
 import datetime
+import itertools
 import sys
+import textwrap
 import os
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
 from pathlib import Path
 
 # Add path to core modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from core.ris import ris, ris_explain
-from core.symbolic import evaluate_expression, generate_plot_data, solve_equation
-from core.visualization import create_plot
-try:
-    from core.uml_generator import UMLGenerator
-    UML_GENERATOR = UMLGenerator()
-    UML_AVAILABLE = True
-except ImportError:
-    UML_AVAILABLE = False
+from core.arithmetic import evaluate_arithmetic
+from core.evaluation_budget import budget_scope
+from ui.history_log import HistoryLog
+
+# sympy, numpy, matplotlib and the UML generator take far longer to import
+# than a quick calculation takes to run, so commands import them when needed
+_UML_GENERATOR = None
+
+def get_uml_generator():
+    """Return the shared UMLGenerator, or None if pydot/plantuml are missing"""
+    global _UML_GENERATOR
+    if _UML_GENERATOR is None:
+        try:
+            from core.uml_generator import UMLGenerator
+            _UML_GENERATOR = UMLGenerator()
+        except ImportError:
+            _UML_GENERATOR = False
+    return _UML_GENERATOR or None
 
 # Define UML Calculator theme
 UML_THEMES = {
@@ -87,8 +99,10 @@ SETTINGS = {
 }
 
 # Setup history tracking
-HISTORY_FILE = Path(os.path.expanduser("~")) / ".uml_calculator_history.json"
-calculation_history = []
+HISTORY_FILE = Path(os.path.expanduser("~")) / ".uml_calculator_history.jsonl"
+# History before the append log, migrated on first use
+LEGACY_HISTORY_FILE = Path(os.path.expanduser("~")) / ".uml_calculator_history.json"
+history_log = HistoryLog(HISTORY_FILE, SETTINGS["history_size"], LEGACY_HISTORY_FILE)
 
 def load_settings():
     """Load user settings"""
@@ -114,22 +128,8 @@ def save_settings():
         console.print(f"[warning]Warning: Could not save settings: {e}[/warning]")
 
 def load_history():
-    """Load calculation history from file"""
-    global calculation_history
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                calculation_history = json.load(f)
-        except Exception as e:
-            console.print(f"[warning]Warning: Could not load history: {e}[/warning]")
-
-def save_history():
-    """Save calculation history to file"""
-    try:
-        with open(HISTORY_FILE, "w") as f:
-            json.dump(calculation_history, f, indent=2)
-    except Exception as e:
-        console.print(f"[warning]Warning: Could not save history: {e}[/warning]")
+    """Apply the history size setting to the history log"""
+    history_log.max_entries = SETTINGS["history_size"]
 
 def add_to_history(entry_type, data):
     """Add calculation to history"""
@@ -138,10 +138,10 @@ def add_to_history(entry_type, data):
         "type": entry_type,
         "data": data
     }
-    calculation_history.append(history_entry)
-    if len(calculation_history) > SETTINGS["history_size"]:
-        calculation_history.pop(0)
-    save_history()
+    try:
+        history_log.append(history_entry)
+    except Exception as e:
+        console.print(f"[warning]Warning: Could not save history: {e}[/warning]")
 
 @app.command("calc")
 def calculate(
@@ -149,6 +149,7 @@ def calculate(
     x: float = typer.Option(None, help="Value for x in expressions like '3*x^2'"),
     mode: str = typer.Option(None, help="Mode: standard (normal math) or ris (RIS logic)"),
     explain: bool = typer.Option(False, "--explain", "-e", help="Show detailed explanation for RIS"),
+    daemon: bool = typer.Option(False, "--daemon", help="Evaluate through the warm evaluation daemon, starting it if needed"),
 ):
     """Calculate any mathematical expression, with RIS support"""
     try:
@@ -204,11 +205,13 @@ def calculate(
         # Evaluate as a general expression
         try:
             if "=" in expression:
-                result = solve_equation(
-                    expression.split("=")[0].strip(), 
-                    expression.split("=")[1].strip() if len(expression.split("=")) > 1 and expression.split("=")[1].strip() else "0",
-                    x
-                )
+                from core.symbolic import solve_equation
+                with budget_scope(frontend="cli"):
+                    result = solve_equation(
+                        expression.split("=")[0].strip(), 
+                        expression.split("=")[1].strip() if len(expression.split("=")) > 1 and expression.split("=")[1].strip() else "0",
+                        x
+                    )
                 
                 if x is not None:
                     # Evaluating with specific x
@@ -239,8 +242,19 @@ def calculate(
                             border_style="info"
                         ))
             else:
-                # Simple expression
-                result = evaluate_expression(expression, x_value=x, standard_mode=standard_mode)
+                # Simple expression; plain integer arithmetic skips the sympy import
+                result = evaluate_arithmetic(expression)
+                if result is None and daemon:
+                    from ui.eval_daemon import request
+                    reply = request({"op": "calc", "expr": expression, "x": x, "mode": calc_mode, "frontend": "cli"})
+                    if reply is not None:
+                        if "error" in reply:
+                            raise ValueError(reply["error"])
+                        result = reply["result"]
+                if result is None:
+                    from core.symbolic import evaluate_expression
+                    with budget_scope(frontend="cli"):
+                        result = evaluate_expression(expression, x_value=x, standard_mode=standard_mode)
                 
                 if x is not None:
                     console.print(Panel.fit(
@@ -273,6 +287,37 @@ def calculate(
         console.print(f"[danger]Error:[/danger] {str(e)}")
         return None
 
+def adaptive_plot_data(expression, x_min, x_max, standard_mode, initial_points, tolerance, max_evals, title=None):
+    """Sample a plot adaptively, redrawing each refinement live when a title is given"""
+    from rich.live import Live
+    from core.sampling import adaptive_plot_refinements
+    from core.visualization import create_plot
+    
+    options = {"tolerance": tolerance, "max_evaluations": max_evals}
+    refinements = adaptive_plot_refinements(
+        expression, x_min, x_max, standard_mode=standard_mode,
+        initial_points=initial_points,
+        # Unset options keep the sampler's defaults
+        **{name: value for name, value in options.items() if value is not None},
+    )
+    if title is None:
+        for x_values, y_values, stats in refinements:
+            pass
+    else:
+        with Live(console=console, auto_refresh=False) as live:
+            for x_values, y_values, stats in refinements:
+                plot_output = create_plot(x_values, y_values, title=title, terminal_mode=True)
+                live.update(Text(f"{plot_output}\n{stats['evaluations']:,} evaluations after round {stats['rounds']}"),
+                            refresh=True)
+        if not console.is_terminal:
+            # Live only ends its last frame with a newline on a terminal
+            console.line()
+    console.print(
+        f"[info]Adaptive sampling: {stats['evaluations']:,} evaluations ({stats['stop_reason']}); "
+        f"a uniform grid this fine needs {stats['uniform_equivalent']:,}, saved {stats['saved']:,}[/info]"
+    )
+    return x_values, y_values
+
 @app.command("plot")
 def plot_expression(
     expression: str = typer.Argument(..., help="Expression to plot (e.g., '3*x^2' or 'RIS(x,2)')"),
@@ -282,25 +327,38 @@ def plot_expression(
     mode: str = typer.Option(None, help="Mode: standard (normal math) or ris (RIS logic)"),
     save: str = typer.Option(None, "--save", help="Save plot to file"),
     no_history: bool = typer.Option(False, "--no-history", help="Don't add to calculation history"),
+    adaptive: bool = typer.Option(False, "--adaptive", help="Refine where the curve bends, jumps or switches RIS rule"),
+    tolerance: float = typer.Option(None, help="Adaptive error tolerance, as a fraction of the y range [default: 0.001]"),
+    max_evals: int = typer.Option(None, "--max-evals", help="Adaptive evaluation budget [default: 4000]"),
 ):
     """Plot a mathematical expression or function"""
+    from core.symbolic import generate_plot_data
+    from core.visualization import create_plot
+    
     try:
         # Determine mode
         calc_mode = mode if mode else SETTINGS["default_mode"]
         standard_mode = calc_mode.lower() != "ris"
         
-        # Generate plot data
-        x_values, y_values = generate_plot_data(expression, x_min, x_max, points, standard_mode=standard_mode)
-        
         # Create plot
         title = f"Plot of {expression}"
         
+        # Generate plot data
+        if adaptive:
+            # --points is the coarse grid; in the terminal each refinement is redrawn
+            x_values, y_values = adaptive_plot_data(
+                expression, x_min, x_max, standard_mode, points, tolerance, max_evals,
+                title=None if save else title,
+            )
+        else:
+            x_values, y_values = generate_plot_data(expression, x_min, x_max, points, standard_mode=standard_mode)
+        
         if save:
             plot_file = create_plot(x_values, y_values, title=title, terminal_mode=False)
             import shutil
             shutil.move(plot_file, save)
             console.print(f"[success]Plot saved to {save}[/success]")
-        else:
+        elif not adaptive:
             plot_output = create_plot(x_values, y_values, title=title, terminal_mode=True)
             console.print(plot_output)
         
@@ -371,26 +429,24 @@ def show_history(
     clear: bool = typer.Option(False, help="Clear history")
 ):
     """Show calculation history"""
-    global calculation_history
-    
     if clear:
         if Confirm.ask("Are you sure you want to clear calculation history?"):
-            calculation_history = []
-            save_history()
+            history_log.clear()
             console.print("[success]History cleared.[/success]")
         return
 
-    if not calculation_history:
+    entries = history_log.entries(limit)
+    if not entries:
         console.print("[warning]No calculation history found.[/warning]")
         return
 
-    table = Table(title=f"Calculation History (Last {min(limit, len(calculation_history))} entries)")
+    table = Table(title=f"Calculation History (Last {len(entries)} entries)")
     table.add_column("Time", style="key")
     table.add_column("Type", style="info")
     table.add_column("Input", style="ris_op")
     table.add_column("Result", style="ris_result")
     
-    for entry in calculation_history[-limit:]:
+    for entry in entries:
         timestamp = datetime.datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M")
         entry_type = entry["type"]
         data = entry["data"]
@@ -416,51 +472,83 @@ def show_history(
 def batch_process(
     input_file: str = typer.Argument(..., help="CSV file with operations"),
     output_file: str = typer.Option(None, help="Output file for results (CSV)"),
-    explain: bool = typer.Option(False, help="Include explanations in output")
+    explain: bool = typer.Option(False, help="Include explanations in output"),
+    workers: int = typer.Option(None, help="Worker processes (default: CPU count, 0 = in-process)"),
+    chunk_size: int = typer.Option(None, help="Rows per chunk [default: 10000]"),
+    resume: bool = typer.Option(False, help="Resume from the output file's last completed chunk")
 ):
     """Process batch calculations from a file"""
+    from rich.progress import (
+        BarColumn, Progress, TaskProgressColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+    )
+    from ui.batch_ris import (
+        DEFAULT_CHUNK_SIZE, EXPLAIN_HEADER, HEADER, BatchResumeError, checkpoint_path, run_batch
+    )
+    
+    if resume and output_file and os.path.exists(checkpoint_path(output_file)):
+        console.print(f"[info]Resuming from {checkpoint_path(output_file)}[/info]")
+    elif resume:
+        console.print("[warning]No checkpoint found, starting from the beginning.[/warning]")
+        resume = False
+
     try:
-        results = []
-        
-        with open(input_file, 'r') as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                try:
-                    if len(row) < 2:
-                        console.print(f"[warning]Warning: Row {i+1} has insufficient values, skipping.[/warning]")
-                        continue
-                        
-                    a = float(row[0])
-                    b = float(row[1])
-                    mode = row[2] if len(row) > 2 else "default"
-                    
-                    context = {"ris_mode": mode} if mode != "default" else {}
-                    
-                    if explain:
-                        result, explanation = ris_explain(a, b, context)
-                        results.append([a, b, result, mode, explanation])
-                    else:
-                        result = ris(a, b, context)
-                        results.append([a, b, result, mode])
-                    
-                    console.print(f"[success]Processed:[/success] RIS({a}, {b}) = {result} [{mode}]")
-                except Exception as e:
-                    console.print(f"[danger]Error in row {i+1}:[/danger] {str(e)}")
-        
+        with Progress(
+            TextColumn("[heading]Batch[/heading]"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[rows]:,} rows"),
+            TimeElapsedColumn(),
+            TimeRemainingColumn(),
+            console=console,
+            transient=True,
+        ) as progress:
+            task = progress.add_task("batch", total=os.path.getsize(input_file), rows=0)
+
+            def on_chunk(state, _size):
+                progress.update(task, completed=state.offset, rows=state.processed)
+
+            state = run_batch(
+                input_file,
+                output_file,
+                explain=explain,
+                workers=workers,
+                chunk_size=max(1, chunk_size or DEFAULT_CHUNK_SIZE),
+                resume=resume,
+                on_chunk=on_chunk,
+            )
+    except BatchResumeError as e:
+        console.print(f"[danger]Cannot resume:[/danger] {e}")
+        return
+    except KeyboardInterrupt:
         if output_file:
-            with open(output_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                if explain:
-                    writer.writerow(["a", "b", "result", "mode", "explanation"])
-                else:
-                    writer.writerow(["a", "b", "result", "mode"])
-                writer.writerows(results)
-            console.print(f"[success]Results saved to {output_file}[/success]")
-        
-        # Show summary
-        console.print(f"[heading]Batch processing complete.[/heading] Processed {len(results)} calculations.")
+            console.print("[warning]Interrupted. Run again with --resume to continue.[/warning]")
+        return
     except Exception as e:
         console.print(f"[danger]Batch processing failed:[/danger] {str(e)}")
+        return
+
+    for line_no, message in state.error_messages:
+        style = "warning" if message.endswith("skipped") else "danger"
+        console.print(f"[{style}]Line {line_no}:[/{style}] {message}")
+    unreported = state.errors + state.skipped - len(state.error_messages)
+    if unreported > 0:
+        console.print(f"[warning]... and {unreported} more problem rows[/warning]")
+
+    if output_file:
+        console.print(f"[success]Results saved to {output_file}[/success]")
+    elif state.preview:
+        table = Table(title="Results (first rows)")
+        for column in (EXPLAIN_HEADER if explain else HEADER):
+            table.add_column(column)
+        for row in state.preview:
+            table.add_row(*row)
+        console.print(table)
+
+    # Show summary
+    console.print(
+        f"[heading]Batch processing complete.[/heading] Processed {state.processed} calculations "
+        f"({state.skipped} skipped, {state.errors} errors)."
+    )
 
 @app.command("export")
 def export_history(
@@ -468,19 +556,29 @@ def export_history(
     format: str = typer.Option("csv", help="Export format (csv or json)")
 ):
     """Export calculation history to a file"""
-    if not calculation_history:
+    # Entries stream from the log straight into the export file
+    entries = history_log.iter_entries()
+    first = next(entries, None)
+    if first is None:
         console.print("[warning]No calculation history to export.[/warning]")
         return
+    entries = itertools.chain([first], entries)
     
     try:
         if format.lower() == 'json':
             with open(output_file, 'w') as f:
-                json.dump(calculation_history, f, indent=2)
+                # Same layout as json.dump(list, indent=2), one entry at a time
+                f.write("[\n")
+                for index, entry in enumerate(entries):
+                    if index:
+                        f.write(",\n")
+                    f.write(textwrap.indent(json.dumps(entry, indent=2), "  "))
+                f.write("\n]")
         elif format.lower() == 'csv':
             with open(output_file, 'w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow(["timestamp", "type", "input", "result"])
-                for entry in calculation_history:
+                for entry in entries:
                     timestamp = entry["timestamp"]
                     entry_type = entry["type"]
                     data = entry["data"]
@@ -534,6 +632,7 @@ def configure_settings(
                 "default_mode": "standard"
             }
             save_settings()
+            history_log.max_entries = SETTINGS["history_size"]
             console.print("[success]Settings reset to defaults.[/success]")
             # Apply theme
             console.theme = Theme(UML_THEMES.get(SETTINGS["theme"], UML_THEMES["default"]))
@@ -551,6 +650,7 @@ def configure_settings(
     
     if history_size is not None and history_size > 0:
         SETTINGS["history_size"] = history_size
+        history_log.max_entries = history_size
         updated = True
     
     if precision is not None and precision >= 0:
@@ -615,7 +715,8 @@ def generate_uml(
     format: str = typer.Option("png", help="Output format (svg or png)"),
 ):
     """Generate UML diagrams for math operations and RIS logic"""
-    if not UML_AVAILABLE:
+    uml_generator = get_uml_generator()
+    if uml_generator is None:
         console.print("[danger]UML generation requires pydot, graphviz and plantuml packages.[/danger]")
         console.print("[info]Install them with: pip install pydot graphviz plantuml[/info]")
         return False
@@ -644,8 +745,8 @@ def generate_uml(
             elif "Division" in explanation:
                 operation = "÷"
                 
-            puml = UML_GENERATOR.generate_ris_diagram(a, b, result, operation, explanation)
-            diagram_file = UML_GENERATOR.render_plantuml(puml, output_file=output, format=format)
+            puml = uml_generator.generate_ris_diagram(a, b, result, operation, explanation)
+            diagram_file = uml_generator.render_plantuml(puml, output_file=output, format=format)
             
             console.print(f"[success]Generated RIS UML diagram for RIS({a}, {b})[/success]")
             console.print(f"[info]Saved to: {diagram_file}[/info]")
@@ -682,8 +783,8 @@ def generate_uml(
                 expr = expression
                 variables = {'x': 'x'}  # Default to x
                 
-            puml = UML_GENERATOR.generate_function_diagram(expr, variables)
-            diagram_file = UML_GENERATOR.render_plantuml(puml, output_file=output, format=format)
+            puml = uml_generator.generate_function_diagram(expr, variables)
+            diagram_file = uml_generator.render_plantuml(puml, output_file=output, format=format)
             
             console.print(f"[success]Generated function UML diagram for: {expression}[/success]")
             console.print(f"[info]Saved to: {diagram_file}[/info]")
@@ -711,13 +812,14 @@ def generate_uml(
                 
             # Try to solve
             try:
+                from core.symbolic import solve_equation
                 solution = solve_equation(left, right, None)
                 solutions = solution.get("solutions", None)
             except:
                 solutions = None
                 
-            puml = UML_GENERATOR.generate_equation_diagram(left, right, solutions)
-            diagram_file = UML_GENERATOR.render_plantuml(puml, output_file=output, format=format)
+            puml = uml_generator.generate_equation_diagram(left, right, solutions)
+            diagram_file = uml_generator.render_plantuml(puml, output_file=output, format=format)
             
             console.print(f"[success]Generated equation UML diagram for: {expression}[/success]")
             console.print(f"[info]Saved to: {diagram_file}[/info]")
@@ -731,8 +833,8 @@ def generate_uml(
             })
             
         elif type == "rules":
-            puml = UML_GENERATOR.generate_ris_rules_diagram()
-            diagram_file = UML_GENERATOR.render_plantuml(puml, output_file=output, format=format)
+            puml = uml_generator.generate_ris_rules_diagram()
+            diagram_file = uml_generator.render_plantuml(puml, output_file=output, format=format)
             
             console.print(f"[success]Generated RIS rules UML diagram[/success]")
             console.print(f"[info]Saved to: {diagram_file}[/info]")
@@ -894,7 +996,7 @@ def show_interactive_menu():
     table.add_column(style="value")
     
     for cmd, desc in options:
-        if cmd == "uml" and not UML_AVAILABLE:
+        if cmd == "uml" and get_uml_generator() is None:
             # Skip UML option if not available
             continue
         table.add_row(f"[bold]{cmd}[/bold]", desc)
@@ -949,9 +1051,9 @@ if __name__ == "__main__":
                     mode = Prompt.ask("Mode (standard/ris)", default=SETTINGS["default_mode"])
                     save = Prompt.ask("Save to file (leave empty to display in terminal)", default="")
                     
-                    plot_expression(expr, x_min, x_max, points, mode, save if save else None)
+                    plot_expression(expr, x_min, x_max, points, mode, save if save else None, adaptive=False)
                 elif cmd == "uml":
-                    if not UML_AVAILABLE:
+                    if get_uml_generator() is None:
                         console.print("[danger]UML generation requires pydot, graphviz and plantuml packages.[/danger]")
                         console.print("[info]Install them with: pip install pydot graphviz plantuml[/info]")
                         continue
@@ -0,0 +1,61 @@
+"""
+Ordered, bounded process-pool evaluation for the UML Calculator batch tools
+
+Runs tasks on a process pool and hands their results back in submission
+order, with at most ``max_in_flight`` tasks queued at a time: once the queue
+is full, no further task is taken from the input until the oldest result has
+been handled. Memory therefore stays bounded for inputs of any length, and a
+slow consumer throttles the reader.
+
+Used by ``stream_eval.stream_evaluate`` and ``batch_ris.run_batch``.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_ordered(func, tasks, on_result, workers=None, max_in_flight=None, initializer=None, initargs=()):
+    """
+    Call on_result(tag, func(*args)) for each (tag, args) of tasks, in order.
+
+    Args:
+        func: Picklable function run in the worker processes
+        tasks: Iterable of (tag, args); tags stay in this process and are
+               passed back with the result
+        on_result: Called with (tag, result) for each task, in task order
+        workers: Worker processes (default: CPU count; 0 runs in-process)
+        max_in_flight: Tasks queued before reading pauses (default 4 per worker)
+        initializer, initargs: Run once in each worker (or once in-process)
+    """
+    if workers == 0:
+        if initializer is not None:
+            initializer(*initargs)
+        for tag, args in tasks:
+            on_result(tag, func(*args))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    pending = deque()
+
+    def handle_oldest():
+        tag, future = pending.popleft()
+        on_result(tag, future.result())
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+    try:
+        for tag, args in tasks:
+            # Backpressure: stop reading until the oldest result is handled
+            while len(pending) >= max_in_flight:
+                handle_oldest()
+            pending.append((tag, executor.submit(func, *args)))
+        while pending:
+            handle_oldest()
+    except BaseException:
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        raise
+    executor.shutdown()
@@ -0,0 +1,280 @@
+"""
+Streaming evaluation pipeline for the UML Calculator
+
+Reads newline-delimited expressions (or JSONL records with ids) from a file
+or stdin, evaluates them in chunks on a process pool and writes one result
+per input line, in input order, to stdout or a file.
+
+At most ``max_in_flight`` chunks are queued at a time: once the queue is
+full, reading pauses until the oldest chunk has been written. Memory
+therefore stays bounded for inputs of any length, and a slow consumer on
+stdout throttles the readers. Throughput is reported on stderr.
+
+Usage:
+    python calculator_cli.py eval --stream expressions.txt > results.txt
+    cat records.jsonl | python calculator_cli.py eval --stream --jsonl
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import math
+import time
+from itertools import islice
+
+from ui.ordered_pool import run_ordered
+from uml_cache import ResultCache
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Per-process state, set up by _init_worker
+_EVALUATE = None
+_CACHE = None
+
+
+def _init_worker(cache_dir=None, use_cache=False):
+    """Import the evaluator and open this process's result cache."""
+    global _EVALUATE, _CACHE
+    from ui.calculator_cli import evaluate_expression
+
+    _EVALUATE = evaluate_expression
+    _CACHE = ResultCache(cache_dir) if use_cache else None
+
+
+def _json_value(value):
+    """Return a JSON-safe form of a result (non-finite and complex become strings)."""
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    return str(value)
+
+
+def evaluate_chunk(lines, first_line, mode, jsonl):
+    """
+    Evaluate a chunk of input lines.
+
+    Args:
+        lines: Raw input lines (with or without trailing newlines)
+        first_line: 1-based line number of the first line, used as default id
+        mode: Calculation mode (auto, standard, uml, ris)
+        jsonl: Whether lines are JSON records
+
+    Returns:
+        tuple: (output text, expressions evaluated, errors)
+    """
+    out = []
+    evaluated = errors = 0
+    for line_no, line in enumerate(lines, first_line):
+        line = line.strip()
+        if not jsonl:
+            if not line:
+                out.append("")
+                continue
+            evaluated += 1
+            try:
+                result, _ = _EVALUATE(line, mode, False, _CACHE)
+                out.append(str(result))
+            except Exception as e:
+                errors += 1
+                out.append(f"Error: {e}")
+            continue
+
+        if not line:
+            out.append("")
+            continue
+        record_id = line_no
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record is not an object")
+            record_id = record.get("id", line_no)
+            expr = record.get("expr", record.get("expression"))
+            if not isinstance(expr, str):
+                raise ValueError("record has no 'expr' string")
+        except ValueError as e:
+            errors += 1
+            out.append(json.dumps({"id": record_id, "error": f"Invalid record: {e}"}))
+            continue
+        evaluated += 1
+        try:
+            result, _ = _EVALUATE(expr, record.get("mode", mode), False, _CACHE)
+            out.append(json.dumps({"id": record_id, "result": _json_value(result)}))
+        except Exception as e:
+            errors += 1
+            out.append(json.dumps({"id": record_id, "error": str(e)}))
+    out.append("")
+    return "\n".join(out), evaluated, errors
+
+
+class ThroughputReporter:
+    """Periodic throughput lines on stderr (silent when interval is None)."""
+
+    def __init__(self, interval=5.0, stream=None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.next_report = self.started + (interval or 0)
+        self.lines = 0
+        self.evaluated = 0
+        self.errors = 0
+
+    def update(self, lines, evaluated, errors):
+        self.lines += lines
+        self.evaluated += evaluated
+        self.errors += errors
+        now = time.perf_counter()
+        if self.interval and now >= self.next_report:
+            self.next_report = now + self.interval
+            self._report(now, "progress")
+
+    def finish(self):
+        if self.interval is not None:
+            self._report(time.perf_counter(), "done")
+
+    def _report(self, now, label):
+        elapsed = max(now - self.started, 1e-9)
+        self.stream.write(
+            f"[{label}] {self.lines} lines, {self.evaluated} evaluated, "
+            f"{self.errors} errors in {elapsed:.1f}s "
+            f"({self.evaluated / elapsed:,.0f} expr/s)\n"
+        )
+        self.stream.flush()
+
+
+def _chunks(source, chunk_size):
+    """Yield (first line number, lines) chunks from an iterable of lines."""
+    first_line = 1
+    while True:
+        lines = list(islice(source, chunk_size))
+        if not lines:
+            return
+        yield first_line, lines
+        first_line += len(lines)
+
+
+def stream_evaluate(
+    source,
+    sink,
+    mode="auto",
+    jsonl=False,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_in_flight=None,
+    cache_dir=None,
+    use_cache=False,
+    progress_interval=5.0,
+):
+    """
+    Evaluate every line of ``source`` and write results to ``sink`` in order.
+
+    Args:
+        source: Iterable of input lines
+        sink: Text stream for results
+        mode: Calculation mode, as for calculator_cli.evaluate_expression
+        jsonl: Read JSON records ({"id", "expr"[, "mode"]}) and write JSON results
+        workers: Worker processes (default: CPU count; 0 evaluates in-process)
+        chunk_size: Lines per task
+        max_in_flight: Chunks queued before reading pauses (default 4 per worker)
+        cache_dir: Result cache directory shared by all workers
+        use_cache: Whether to use the persistent result cache
+        progress_interval: Seconds between throughput lines on stderr
+                           (0 = summary only, None = silent)
+
+    Returns:
+        ThroughputReporter with the final counts
+    """
+    reporter = ThroughputReporter(progress_interval)
+    tasks = (
+        (len(lines), (lines, first_line, mode, jsonl))
+        for first_line, lines in _chunks(iter(source), chunk_size)
+    )
+
+    def write_result(line_count, result):
+        text, evaluated, errors = result
+        sink.write(text)
+        reporter.update(line_count, evaluated, errors)
+
+    run_ordered(
+        evaluate_chunk, tasks, write_result, workers, max_in_flight,
+        initializer=_init_worker, initargs=(cache_dir, use_cache),
+    )
+    sink.flush()
+    reporter.finish()
+    return reporter
+
+
+def main(argv=None):
+    """Entry point for ``calculator_cli.py eval``."""
+    parser = argparse.ArgumentParser(
+        prog="calculator_cli.py eval",
+        description="Evaluate expressions, or stream them from a file or stdin",
+    )
+    parser.add_argument("expressions", nargs="*",
+                        help="Expressions to evaluate, or the input file with --stream")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read newline-delimited expressions from a file (default stdin)")
+    parser.add_argument("--input", "-f", default="-", help="Input file for --stream ('-' for stdin)")
+    parser.add_argument("--output", "-o", default="-", help="Output file ('-' for stdout)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help='Input lines are JSON records {"id": ..., "expr": ...}')
+    parser.add_argument("--mode", "-m", choices=["auto", "standard", "uml", "ris"], default="auto",
+                        help="Calculation mode")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Worker processes (default: CPU count, 0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Lines per task")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Chunks queued before reading pauses (default: 4 per worker)")
+    parser.add_argument("--progress-interval", type=float, default=5.0,
+                        help="Seconds between throughput reports on stderr")
+    parser.add_argument("--cache", action="store_true", help="Use the persistent result cache (off by default)")
+    parser.add_argument("--cache-dir", help="Use the persistent result cache in this directory")
+    parser.add_argument("--no-cache", action="store_true", help="Never use the persistent result cache")
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        # With --stream a single positional argument is the input file
+        if len(args.expressions) > 1 or (args.expressions and args.input != "-"):
+            parser.error("--stream takes one input file")
+        if args.expressions:
+            args.input = args.expressions[0]
+        source = sys.stdin
+        workers = args.workers
+    else:
+        if not args.expressions:
+            parser.error("give expressions or use --stream")
+        source = args.expressions
+        workers = 0 if args.workers is None else args.workers
+
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        if args.stream and args.input != "-":
+            source = open(args.input, "r", encoding="utf-8", errors="replace")
+        reporter = stream_evaluate(
+            source,
+            sink,
+            mode=args.mode,
+            jsonl=args.jsonl,
+            workers=workers,
+            chunk_size=max(1, args.chunk_size),
+            max_in_flight=args.max_in_flight,
+            cache_dir=args.cache_dir,
+            use_cache=(args.cache or bool(args.cache_dir)) and not args.no_cache,
+            progress_interval=args.progress_interval if args.stream else None,
+        )
+    except BrokenPipeError:
+        # Downstream closed early (e.g. piped into head)
+        return 1
+    finally:
+        if source is not sys.stdin and hasattr(source, "close"):
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 1 if reporter.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""
+UML Result Cache - Persistent on-disk cache for UML evaluation results.
+
+Results of ``eval_uml`` / ``eval_recursive_compress`` are stored in a SQLite
+database keyed by a BLAKE2 hash of the canonical parsed tree plus an
+engine-version salt. The salt includes a hash of the evaluating module's
+source and of every calculator module it uses (core.ris, core.division,
+...), so editing the engine automatically invalidates old entries.
+
+The database runs in WAL mode with a busy timeout, so any number of worker
+processes can share one cache directory. Entries are evicted least recently
+used first once the cache grows beyond its size budget.
+
+The cache is opt-in: nothing is cached unless a ResultCache is passed in.
+
+Author: Travis Miner
+Date: June 23, 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("UMLCache")
+
+# Bump when the key or value encoding changes
+CACHE_FORMAT = "uml-cache-1"
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".uml_calculator_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Check the total cache size every N inserts
+_EVICTION_CHECK_INTERVAL = 64
+# Only refresh an entry's access time if it is older than this (seconds)
+_ACCESS_REFRESH_INTERVAL = 300.0
+
+_salts: Dict[Any, str] = {}
+
+# Modules under this directory count as engine source
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _engine_modules(module_name: str) -> Dict[str, str]:
+    """
+    Source files of a module and of the calculator modules it uses, by name
+
+    Follows the modules, functions and classes each module's globals refer
+    to, transitively, keeping those whose file is inside the calculator.
+    """
+    files: Dict[str, str] = {}
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if name in files or not path:
+            continue
+        path = os.path.abspath(path)
+        if name != module_name and not path.startswith(_PROJECT_DIR + os.sep):
+            continue
+        files[name] = path
+        for value in vars(sys.modules[name]).values():
+            used = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, "__module__", None)
+            if isinstance(used, str) and used not in files:
+                pending.append(used)
+    return files
+
+
+def engine_salt(evaluator: Callable) -> str:
+    """
+    Return the engine-version salt for an evaluator function.
+
+    The salt combines the cache format, the evaluator's qualified name and a
+    hash of the source files of its module and every calculator module that
+    module uses, so a change to core.ris invalidates eval_uml's results too.
+    """
+    salt = _salts.get(evaluator)
+    if salt is None:
+        module = getattr(evaluator, "__module__", "")
+        source_hash = ""
+        try:
+            files = _engine_modules(module)
+            if files:
+                digest = hashlib.blake2b(digest_size=8)
+                for name, path in sorted(files.items()):
+                    with open(path, "rb") as f:
+                        digest.update(name.encode() + b"\0" + f.read())
+                source_hash = digest.hexdigest()
+        except OSError:
+            pass
+        salt = f"{CACHE_FORMAT}:{module}.{getattr(evaluator, '__qualname__', '')}:{source_hash}"
+        _salts[evaluator] = salt
+    return salt
+
+
+def canonical_form(tree: Any) -> str:
+    """
+    Serialize a parsed UML tree to a canonical string.
+
+    Dict keys are sorted and every scalar is type-tagged, so equal trees give
+    equal strings (1 and 1.0 and True stay distinct). Iterative, so deep
+    trees do not hit the recursion limit.
+
+    Raises:
+        TypeError: If the tree contains a value that cannot be canonicalized
+    """
+    out = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node is _END_DICT:
+            out.append("}")
+        elif node is _END_LIST:
+            out.append("]")
+        elif type(node) is _DictKey:
+            out.append("k" + json.dumps(node.name) + ":")
+        elif isinstance(node, dict):
+            out.append("{")
+            stack.append(_END_DICT)
+            for key in sorted(node, key=str, reverse=True):
+                stack.append(node[key])
+                stack.append(_DictKey(str(key)))
+        elif isinstance(node, (list, tuple)):
+            out.append("[")
+            stack.append(_END_LIST)
+            stack.extend(reversed(node))
+        elif isinstance(node, bool):
+            out.append("b1," if node else "b0,")
+        elif isinstance(node, int):
+            out.append(f"i{node},")
+        elif isinstance(node, float):
+            out.append(f"f{node!r},")
+        elif isinstance(node, complex):
+            out.append(f"c{node.real!r}:{node.imag!r},")
+        elif isinstance(node, str):
+            out.append("s" + json.dumps(node) + ",")
+        elif node is None:
+            out.append("n,")
+        else:
+            raise TypeError(f"Cannot canonicalize {type(node).__name__}")
+    return "".join(out)
+
+
+class _DictKey:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+_END_DICT = object()
+_END_LIST = object()
+
+
+def cache_key(tree: Any, salt: str) -> str:
+    """Return the BLAKE2 content hash of a parsed tree under an engine salt."""
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(salt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(canonical_form(tree).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _encode_value(value: Any) -> Optional[str]:
+    """Encode a result for storage, or None if the type is not cacheable."""
+    if isinstance(value, bool) or value is None:
+        payload = ["b", value]
+    elif isinstance(value, int):
+        payload = ["i", str(value)]
+    elif isinstance(value, float):
+        payload = ["f", repr(value)]
+    elif isinstance(value, complex):
+        payload = ["c", repr(value.real), repr(value.imag)]
+    elif isinstance(value, str):
+        payload = ["s", value]
+    elif isinstance(value, (dict, list)):
+        # Parse trees, e.g. optimizer output
+        try:
+            return json.dumps(["t", value], default=_encode_tree_leaf)
+        except (TypeError, ValueError, RecursionError):
+            return None
+    else:
+        return None
+    return json.dumps(payload)
+
+
+def _encode_tree_leaf(value: Any) -> Any:
+    if isinstance(value, complex):
+        return {"__complex__": [value.real, value.imag]}
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+def _decode_tree_leaf(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__complex__" in obj:
+        return complex(*obj["__complex__"])
+    return obj
+
+
+def _decode_value(text: str) -> Any:
+    if text.startswith('["t"'):
+        return json.loads(text, object_hook=_decode_tree_leaf)[1]
+    payload = json.loads(text)
+    tag = payload[0]
+    if tag == "i":
+        return int(payload[1])
+    if tag == "f":
+        return float(payload[1])
+    if tag == "c":
+        return complex(float(payload[1]), float(payload[2]))
+    return payload[1]
+
+
+class ResultCache:
+    """SQLite-backed result cache shared safely between processes."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        stats: Any = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+                       (defaults to ~/.uml_calculator_cache)
+            max_bytes: Size budget for cached entries; least recently used
+                       entries are evicted beyond it
+            stats: Optional EngineStats that receives hit/miss counts
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.path = os.path.join(self.cache_dir, "uml_results.sqlite3")
+        self.max_bytes = max_bytes
+        self.engine_stats = stats
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._puts_since_check = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this process's connection, reconnecting after a fork."""
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_access ON results(last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.engine_stats is not None:
+            self.engine_stats.cache_lookup("uml_results", hit)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Tuple of (found, value)
+        """
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value, last_access FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    if now - row[1] > _ACCESS_REFRESH_INTERVAL:
+                        conn.execute(
+                            "UPDATE results SET last_access = ? WHERE key = ?", (now, key)
+                        )
+                        conn.commit()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Result cache lookup failed: {e}")
+            row = None
+        if row is None:
+            self._record(False)
+            return False, None
+        self._record(True)
+        return True, _decode_value(row[0])
+
+    def put(self, key: str, value: Any) -> bool:
+        """Store a result; returns False if the value type is not cacheable."""
+        encoded = _encode_value(value)
+        if encoded is None:
+            return False
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, encoded, len(key) + len(encoded), time.time()),
+                )
+                conn.commit()
+                self.stores += 1
+                self._puts_since_check += 1
+                if self._puts_since_check >= _EVICTION_CHECK_INTERVAL:
+                    self._puts_since_check = 0
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Result cache store failed: {e}")
+            return False
+        return True
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Evict least recently used entries until under 90% of the budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        while total > target:
+            rows = conn.execute(
+                "SELECT key, size FROM results ORDER BY last_access LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k, _ in rows])
+            total -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+        conn.commit()
+
+    def evaluate(self, parsed: Any, evaluator: Callable[[Any], Any], salt: str = None) -> Any:
+        """
+        Evaluate a parsed tree through the cache.
+
+        Args:
+            parsed: Parsed UML tree
+            evaluator: Evaluation function, e.g. uml_core.eval_uml
+            salt: Optional salt override (defaults to engine_salt(evaluator))
+
+        Returns:
+            The (possibly cached) evaluation result
+        """
+        try:
+            key = cache_key(parsed, salt or engine_salt(evaluator))
+        except TypeError:
+            return evaluator(parsed)
+        found, value = self.get(key)
+        if found:
+            return value
+        value = evaluator(parsed)
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM results")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss statistics and the current cache size."""
+        lookups = self.hits + self.misses
+        info = {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "max_bytes": self.max_bytes,
+        }
+        try:
+            with self._lock:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+                ).fetchone()
+            info["entries"] = entries
+            info["bytes"] = size
+        except sqlite3.Error:
+            pass
+        return info
+
+    def close(self) -> None:
+        """Close this process's database connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def cached_eval_uml(parsed: Any, cache: Optional[ResultCache] = None) -> Any:
+    """
+    Evaluate a parsed tree with uml_core.eval_uml, after the uml_optimizer
+    pass, using the cache if given.
+    """
+    from uml_optimizer import eval_optimized
+
+    if cache is None:
+        return eval_optimized(parsed)
+    return cache.evaluate(parsed, eval_optimized)
+
+
+def cached_eval_recursive_compress(expr_str: str, cache: Optional[ResultCache] = None) -> Any:
+    """
+    Cached uml_core.eval_recursive_compress.
+
+    The key is built from the parsed tree, so equivalent spellings of an
+    expression (e.g. extra whitespace) share one entry.
+    """
+    from uml_core import eval_recursive_compress, parse_uml
+
+    if cache is None:
+        return eval_recursive_compress(expr_str)
+    try:
+        parsed = parse_uml(expr_str)
+    except Exception:
+        return eval_recursive_compress(expr_str)
+    salt = engine_salt(eval_recursive_compress)
+    return cache.evaluate(parsed, lambda _: eval_recursive_compress(expr_str), salt=salt)
@@ -24,6 +24,276 @@ from enhanced_convert_standard_to_uml import convert_standard_to_uml
 # Only import what is used from symbolic_extensions
 from symbolic_extensions import base52_encode, fibonacci, is_prime, gcd, lcm
 
+# Evaluations run off the Tk event loop
+from ui.background_eval import BackgroundEvaluator, looks_expensive
+
+# Per-evaluation size and time limits
+from core.evaluation_budget import budget_scope
+
+def evaluate_calculation(expression, mode, timestamp):
+    """
+    Evaluate an expression for the calculator display
+    
+    Runs without touching Tk, so the GUI can call it from a worker thread
+    or process, under the GUI's evaluation budget.
+    
+    Returns:
+        (display text, history entry); the entry is None when nothing
+        should be added to the history
+    """
+    with budget_scope(frontend="gui"):
+        return _evaluate_in_mode(expression, mode, timestamp)
+
+def _evaluate_in_mode(expression, mode, timestamp):
+    """evaluate_calculation without the budget scope"""
+    # UML Mode
+    if mode == "uml":
+        # Try direct UML parsing first
+        try:
+            parsed = parse_uml(expression)
+            result = eval_uml(parsed)
+            display = f"UML: {result}"
+            history_entry = f"[{timestamp}] UML: {expression} = {result}"
+        except Exception:
+            # Try to convert standard arithmetic to UML notation
+            try:
+                converted = convert_standard_to_uml(expression)
+                parsed = parse_uml(converted)
+                result = eval_uml(parsed)
+                display = f"UML: {result}"
+                history_entry = f"[{timestamp}] Converted: {expression} → {converted} = {result}"
+            except (ValueError, ZeroDivisionError, OverflowError):
+                display = "Error"
+                history_entry = f"[{timestamp}] Error: {expression}"
+    # RIS Mode
+    elif mode == "ris":
+        # Try RIS notation like @(a,b) first
+        if expression.startswith('@(') and expression.endswith(')'):
+            try:
+                # Extract values from @(a,b) notation
+                inner = expression[2:-1]
+                parts = inner.split(',')
+                if len(parts) == 2:
+                    a, b = float(parts[0].strip()), float(parts[1].strip())
+                    result, operation = ris_meta_operator(a, b)
+                    display = f"RIS: {result} via {operation}"
+                    history_entry = f"[{timestamp}] {expression} = {result} via {operation}"
+                else:
+                    return "RIS Error: Format should be @(a,b)", None
+            except Exception:
+                return f"RIS Error: Cannot parse {expression}", None
+        # Try comma-separated values
+        elif ',' in expression:
+            parts = expression.replace('(', '').replace(')', '').split(',')
+            if len(parts) == 2:
+                try:
+                    a, b = float(parts[0].strip()), float(parts[1].strip())
+                    result, operation = ris_meta_operator(a, b)
+                    display = f"RIS: {result} via {operation}"
+                    history_entry = f"[{timestamp}] RIS({a},{b}) = {result} via {operation}"
+                except Exception:
+                    return "RIS Error: Invalid numbers", None
+            else:
+                return "RIS Error: Format should be a,b", None
+        else:
+            # Try to intelligently parse arithmetic expressions
+            import re
+            arithmetic_pattern = r'^(\d+(?:\.\d+)?)([+\-*/])(\d+(?:\.\d+)?)$'
+            match = re.match(arithmetic_pattern, expression.replace(' ', ''))
+            if match:
+                a, op, b = match.groups()
+                a, b = float(a), float(b)
+                result, operation = ris_meta_operator(a, b)
+                display = f"RIS: {result} via {operation} (parsed {a}{op}{b})"
+                history_entry = f"[{timestamp}] RIS({a},{b}) = {result} via {operation}"
+            else:
+                return "RIS Error: Use format a,b or simple arithmetic", None
+    else:
+        # Standard mode with extended operators
+        try:
+            # Check for special function patterns
+            if expression.startswith('F[') and expression.endswith(']'):
+                # Fibonacci: F[n]
+                n = int(expression[2:-1])
+                result = fibonacci(n)
+                display = f"F({n}) = {result}"
+                history_entry = f"[{timestamp}] Fibonacci {expression} = {result}"
+            elif expression.startswith('P[') and expression.endswith(']'):
+                # Prime check: P[n]
+                n = int(expression[2:-1])
+                result = 1 if is_prime(n) else 0
+                status = "prime" if result else "composite"
+                display = f"{n} is {status}"
+                history_entry = f"[{timestamp}] Prime check {expression} = {status}"
+            elif expression.startswith('&[') and expression.endswith(']'):
+                # GCD: &[a,b]
+                parts = expression[2:-1].split(',')
+                if len(parts) == 2:
+                    a, b = int(parts[0]), int(parts[1])
+                    result = gcd(a, b)
+                    display = f"GCD({a},{b}) = {result}"
+                    history_entry = f"[{timestamp}] {expression} = {result}"
+                else:
+                    return "GCD Error: Use &[a,b]", None
+            elif expression.startswith('|[') and expression.endswith(']'):
+                # LCM: |[a,b]
+                parts = expression[2:-1].split(',')
+                if len(parts) == 2:
+                    a, b = int(parts[0]), int(parts[1])
+                    result = lcm(a, b)
+                    display = f"LCM({a},{b}) = {result}"
+                    history_entry = f"[{timestamp}] {expression} = {result}"
+                else:
+                    return "LCM Error: Use |[a,b]", None
+            elif expression.startswith('%[') and expression.endswith(']'):
+                # Modulo: %[a,b]
+                parts = expression[2:-1].split(',')
+                if len(parts) == 2:
+                    a, b = float(parts[0]), float(parts[1])
+                    if b == 0:
+                        return "Modulo Error: Division by zero", None
+                    else:
+                        result = a % b
+                        display = f"{a} mod {b} = {result}"
+                        history_entry = f"[{timestamp}] {expression} = {result}"
+                else:
+                    return "Modulo Error: Use %[a,b]", None
+            else:
+                # Try standard evaluation first
+                try:
+                    result = safe_eval(expression)
+                    display = str(result)
+                    history_entry = f"[{timestamp}] {expression} = {result}"
+                except:
+                    # Fall back to UML parsing
+                    parsed = parse_uml(expression)
+                    result = eval_uml(parsed)
+                    display = str(result)
+                    history_entry = f"[{timestamp}] {expression} = {result}"
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
+            return f"Error: {str(e)}", None
+    return display, history_entry
+
+def uml_steps_report(expression):
+    """Step-by-step standard, UML and recursive compression evaluation as text"""
+    steps = []
+    steps.append(f"Original expression: {expression}")
+    
+    # Try standard evaluation first
+    try:
+        result = safe_eval(expression)
+        steps.append(f"Standard evaluation: {result}")
+    except:
+        steps.append("Standard evaluation failed")
+    
+    # Try UML parsing
+    try:
+        parsed = parse_uml(expression)
+        steps.append(f"UML parsed: {parsed}")
+        
+        uml_result = eval_uml(parsed)
+        steps.append(f"UML evaluation: {uml_result}")
+    except Exception as e:
+        steps.append(f"UML parsing failed: {e}")
+    
+    # Try recursive compression
+    try:
+        compressed = eval_recursive_compress(expression)
+        steps.append(f"Recursive compression: {compressed}")
+    except Exception as e:
+        steps.append(f"Recursive compression failed: {e}")
+    
+    return "\n".join(steps)
+
+def arithmetic_test_report():
+    """Run the arithmetic tests across all modes and return the report"""
+    test_cases = [
+        "7+7", "1+1", "2*3", "10-4", "15/3",
+        "2+3*4", "(5+3)*2", "100/10+5",
+        "7*7", "9-5", "20/4", "3*3*3"
+    ]
+    
+    results = []
+    results.append("=== ARITHMETIC TEST SUITE ===\n")
+    
+    for expr in test_cases:
+        results.append(f"Testing: {expr}")
+        
+        # Standard mode
+        try:
+            std_result = safe_eval(expr)
+            results.append(f"  Standard: {std_result}")
+        except Exception as e:
+            results.append(f"  Standard: Error - {e}")
+        
+        # UML mode
+        try:
+            uml_result = eval_recursive_compress(expr)
+            results.append(f"  UML: {uml_result}")
+        except Exception as e:
+            results.append(f"  UML: Error - {e}")
+        
+        # RIS mode (for 2-number expressions)
+        import re
+        match = re.match(r'^(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)$', expr)
+        if match:
+            try:
+                a, op, b = match.groups()
+                a, b = float(a), float(b)
+                ris_result, operation = ris_meta_operator(a, b)
+                results.append(f"  RIS: {ris_result} via {operation}")
+            except Exception as e:
+                results.append(f"  RIS: Error - {e}")
+        else:
+            results.append(f"  RIS: Not applicable")
+        
+        results.append("")  # Empty line
+    
+    return "\n".join(results)
+
+def random_test_report():
+    """Run randomized test cases and return the report"""
+    import random
+    
+    results = []
+    results.append("=== RANDOM TEST SUITE ===\n")
+    
+    # Generate random test cases
+    for i in range(10):
+        a = random.randint(1, 20)
+        b = random.randint(1, 20)
+        op = random.choice(['+', '-', '*', '/'])
+        
+        if op == '/' and b == 0:
+            b = 1  # Avoid division by zero
+        
+        expr = f"{a}{op}{b}"
+        results.append(f"Test {i+1}: {expr}")
+        
+        # Test all modes
+        try:
+            std_result = safe_eval(expr)
+            results.append(f"  Standard: {std_result}")
+            
+            uml_result = eval_recursive_compress(expr)
+            results.append(f"  UML: {uml_result}")
+            
+            ris_result, operation = ris_meta_operator(float(a), float(b))
+            results.append(f"  RIS: {ris_result} via {operation}")
+            
+            # Base52 conversion
+            base52_a = base52_encode(a)
+            base52_b = base52_encode(b)
+            base52_result = base52_encode(int(std_result)) if isinstance(std_result, (int, float)) and std_result > 0 else str(std_result)
+            results.append(f"  Base52: [{base52_a},{base52_b}] = {base52_result}")
+            
+        except Exception as e:
+            results.append(f"  Error: {e}")
+        
+        results.append("")  # Empty line
+    
+    return "\n".join(results)
+
 class UMLCalculatorGUI:
     """Enhanced Tkinter GUI for UML Calculator with modern styling"""
     
@@ -38,10 +308,26 @@ class UMLCalculatorGUI:
         self.current_expression = tk.StringVar()
         self.result_var = tk.StringVar(value="0")
         self.mode_var = tk.StringVar(value="standard")
+        self.status_var = tk.StringVar(value="")
+        
+        # Background evaluation; editing the expression drops pending results
+        self.evaluator = BackgroundEvaluator(self.root, on_status=self.status_var.set)
+        self.current_expression.trace_add("write", self.on_expression_edit)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         self.setup_styles()
         self.create_widgets()
         self.bind_keyboard()
+    
+    def on_expression_edit(self, *args):
+        """Cancel evaluations of the previous expression"""
+        self.evaluator.cancel("calculate")
+        self.evaluator.cancel("steps")
+    
+    def close(self):
+        """Stop background evaluations and close the window"""
+        self.evaluator.shutdown()
+        self.root.destroy()
         
     def setup_styles(self):
         """Configure modern, friendly styling with dynamic scaling"""
@@ -115,7 +401,8 @@ class UMLCalculatorGUI:
         primary_bg = '#232946'
         accent = '#eebbc3'
         text_color = '#f4f4f4'
-          # Title
+
+        # Title
         title_frame = tk.Frame(self.root, bg=primary_bg)
         title_frame.pack(fill='x', padx=10, pady=5)
         tk.Label(title_frame, text="UML Calculator", font="Arial 20 bold", bg=primary_bg, fg=accent).pack()
@@ -143,12 +430,18 @@ class UMLCalculatorGUI:
         entry = ttk.Entry(display_frame, textvariable=self.current_expression, font=('Segoe UI', 18),
                          justify='right')
         entry.grid(row=0, column=0, sticky='ew', padx=5, pady=5)
+        self.expression_entry = entry
         entry.insert(0, "Type an expression (e.g. 2+3*4 or [2,3])")
         entry.bind('<FocusIn>', lambda e: entry.delete(0, 'end') if entry.get().startswith('Type an') else None)
 
         result_label = tk.Label(display_frame, textvariable=self.result_var, anchor='e',
                                 font=('Segoe UI', 16, 'bold'), bg='#393e46', fg='#eebbc3')
         result_label.grid(row=1, column=0, sticky='ew', padx=5, pady=(0, 5))
+        
+        # Spinner while an evaluation runs in the background
+        status_label = tk.Label(display_frame, textvariable=self.status_var, anchor='e',
+                                font=('Segoe UI', 10), bg='#393e46', fg='#f4f4f4')
+        status_label.grid(row=2, column=0, sticky='ew', padx=5)
 
         # Mode selection
         mode_frame = ttk.Frame(calc_frame)
@@ -158,7 +451,9 @@ class UMLCalculatorGUI:
             ttk.Radiobutton(mode_frame, text=label, variable=self.mode_var, value=mode).pack(side='left', padx=2)
 
         # Calculator buttons
-        self.create_button_grid(calc_frame)        # Control buttons
+        self.create_button_grid(calc_frame)
+
+        # Control buttons
         control_frame = ttk.Frame(calc_frame)
         control_frame.grid(row=3, column=0, sticky='ew', pady=5)
         control_frame.columnconfigure((0,1,2,3,4), weight=1)
@@ -173,7 +468,8 @@ class UMLCalculatorGUI:
                   font="Arial 13", bg='#393e46', fg='#f4f4f4',
                   relief='flat', bd=0, padx=10, pady=10,
                   activebackground=accent, activeforeground=primary_bg).grid(row=0, column=1, padx=2, sticky='ew')
-          tk.Button(control_frame, text="Clear", command=self.clear,
+        
+        tk.Button(control_frame, text="Clear", command=self.clear,
                   font="Arial 13", bg='#393e46', fg='#f4f4f4',
                   relief='flat', bd=0, padx=10, pady=10,
                   activebackground=accent, activeforeground=primary_bg).grid(row=0, column=2, padx=2, sticky='ew')
@@ -198,7 +494,7 @@ class UMLCalculatorGUI:
         # History
         history_frame = ttk.LabelFrame(right_frame, text="History", padding=5)
         history_frame.grid(row=0, column=0, sticky='nsew', pady=(0, 5))
-          self.history_text = scrolledtext.ScrolledText(history_frame, height=15, 
+        self.history_text = scrolledtext.ScrolledText(history_frame, height=15, 
             font="Arial 12", wrap='word', bg='#f4f4f4', fg='#232946', borderwidth=0)
         self.history_text.pack(fill='both', expand=True)
         self.history_text.insert('end', "Your calculation history will appear here.\n")
@@ -223,7 +519,7 @@ class UMLCalculatorGUI:
     def create_button_grid(self, parent):
         """Create calculator button grid"""
         button_frame = ttk.Frame(parent)
-        button_frame.pack(pady=10)
+        button_frame.grid(row=2, column=0, pady=10)
         
         # Basic calculator buttons
         buttons = [
@@ -255,7 +551,7 @@ class UMLCalculatorGUI:
         
         # Add conversion buttons
         conversion_frame = ttk.LabelFrame(button_frame.master, text="Conversion Tools", padding=5)
-        conversion_frame.pack(fill='x', pady=(10, 0))
+        conversion_frame.grid(row=4, column=0, sticky='ew', pady=(10, 0))
         
         conversion_buttons = [
             ("Convert to UML", self.convert_to_uml),
@@ -279,7 +575,8 @@ class UMLCalculatorGUI:
     def add_to_expression(self, text):
         """Add text to current expression"""
         current = self.current_expression.get()
-        self.current_expression.set(current + text)    
+        self.current_expression.set(current + text)
+    
     def clear(self):
         """Clear the calculator"""
         self.current_expression.set("")
@@ -291,162 +588,36 @@ class UMLCalculatorGUI:
         self.current_expression.set(current[:-1])
         
     def calculate(self):
-        """Calculate the current expression"""
+        """Calculate the current expression in the background"""
         expression = self.current_expression.get().strip()
         if not expression:
             return
-            
-        try:
-            mode = self.mode_var.get()
-            timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-            
-            # UML Mode
-            if mode == "uml":
-                # Try direct UML parsing first
-                try:
-                    parsed = parse_uml(expression)
-                    result = eval_uml(parsed)
-                    self.result_var.set(f"UML: {result}")
-                    history_entry = f"[{timestamp}] UML: {expression} = {result}"
-                except Exception:
-                    # Try to convert standard arithmetic to UML notation
-                    try:
-                        converted = convert_standard_to_uml(expression)
-                        parsed = parse_uml(converted)
-                        result = eval_uml(parsed)
-                        self.result_var.set(f"UML: {result}")
-                        history_entry = f"[{timestamp}] Converted: {expression} → {converted} = {result}"
-                    except (ValueError, ZeroDivisionError, OverflowError):
-                        self.result_var.set("Error")
-                        history_entry = f"[{timestamp}] Error: {expression}"
-            # RIS Mode
-            elif mode == "ris":
-                # Try RIS notation like @(a,b) first
-                if expression.startswith('@(') and expression.endswith(')'):
-                    try:
-                        # Extract values from @(a,b) notation
-                        inner = expression[2:-1]
-                        parts = inner.split(',')
-                        if len(parts) == 2:
-                            a, b = float(parts[0].strip()), float(parts[1].strip())
-                            result, operation = ris_meta_operator(a, b)
-                            self.result_var.set(f"RIS: {result} via {operation}")
-                            history_entry = f"[{timestamp}] {expression} = {result} via {operation}"
-                        else:
-                            self.result_var.set("RIS Error: Format should be @(a,b)")
-                            return
-                    except Exception:
-                        self.result_var.set(f"RIS Error: Cannot parse {expression}")
-                        return
-                # Try comma-separated values
-                elif ',' in expression:
-                    parts = expression.replace('(', '').replace(')', '').split(',')
-                    if len(parts) == 2:
-                        try:
-                            a, b = float(parts[0].strip()), float(parts[1].strip())
-                            result, operation = ris_meta_operator(a, b)
-                            self.result_var.set(f"RIS: {result} via {operation}")
-                            history_entry = f"[{timestamp}] RIS({a},{b}) = {result} via {operation}"
-                        except Exception:
-                            self.result_var.set("RIS Error: Invalid numbers")
-                            return
-                    else:
-                        self.result_var.set("RIS Error: Format should be a,b")
-                        return
-                else:
-                    # Try to intelligently parse arithmetic expressions
-                    import re
-                    arithmetic_pattern = r'^(\d+(?:\.\d+)?)([+\-*/])(\d+(?:\.\d+)?)$'
-                    match = re.match(arithmetic_pattern, expression.replace(' ', ''))
-                    if match:
-                        a, op, b = match.groups()
-                        a, b = float(a), float(b)
-                        result, operation = ris_meta_operator(a, b)
-                        self.result_var.set(f"RIS: {result} via {operation} (parsed {a}{op}{b})")
-                        history_entry = f"[{timestamp}] RIS({a},{b}) = {result} via {operation}"
-                    else:
-                        self.result_var.set("RIS Error: Use format a,b or simple arithmetic")
-                        return
-            else:
-                # Standard mode with extended operators
-                try:
-                    # Check for special function patterns
-                    if expression.startswith('F[') and expression.endswith(']'):
-                        # Fibonacci: F[n]
-                        n = int(expression[2:-1])
-                        result = fibonacci(n)
-                        self.result_var.set(f"F({n}) = {result}")
-                        history_entry = f"[{timestamp}] Fibonacci {expression} = {result}"
-                    elif expression.startswith('P[') and expression.endswith(']'):
-                        # Prime check: P[n]
-                        n = int(expression[2:-1])
-                        result = 1 if is_prime(n) else 0
-                        status = "prime" if result else "composite"
-                        self.result_var.set(f"{n} is {status}")
-                        history_entry = f"[{timestamp}] Prime check {expression} = {status}"
-                    elif expression.startswith('&[') and expression.endswith(']'):
-                        # GCD: &[a,b]
-                        parts = expression[2:-1].split(',')
-                        if len(parts) == 2:
-                            a, b = int(parts[0]), int(parts[1])
-                            result = gcd(a, b)
-                            self.result_var.set(f"GCD({a},{b}) = {result}")
-                            history_entry = f"[{timestamp}] {expression} = {result}"
-                        else:
-                            self.result_var.set("GCD Error: Use &[a,b]")
-                            return
-                    elif expression.startswith('|[') and expression.endswith(']'):
-                        # LCM: |[a,b]
-                        parts = expression[2:-1].split(',')
-                        if len(parts) == 2:
-                            a, b = int(parts[0]), int(parts[1])
-                            result = lcm(a, b)
-                            self.result_var.set(f"LCM({a},{b}) = {result}")
-                            history_entry = f"[{timestamp}] {expression} = {result}"
-                        else:
-                            self.result_var.set("LCM Error: Use |[a,b]")
-                            return
-                    elif expression.startswith('%[') and expression.endswith(']'):
-                        # Modulo: %[a,b]
-                        parts = expression[2:-1].split(',')
-                        if len(parts) == 2:
-                            a, b = float(parts[0]), float(parts[1])
-                            if b == 0:
-                                self.result_var.set("Modulo Error: Division by zero")
-                                return
-                            else:
-                                result = a % b
-                                self.result_var.set(f"{a} mod {b} = {result}")
-                                history_entry = f"[{timestamp}] {expression} = {result}"
-                        else:
-                            self.result_var.set("Modulo Error: Use %[a,b]")
-                            return
-                    else:
-                        # Try standard evaluation first
-                        try:
-                            result = safe_eval(expression)
-                            self.result_var.set(str(result))
-                            history_entry = f"[{timestamp}] {expression} = {result}"
-                        except:
-                            # Fall back to UML parsing
-                            parsed = parse_uml(expression)
-                            result = eval_uml(parsed)
-                            self.result_var.set(str(result))
-                            history_entry = f"[{timestamp}] {expression} = {result}"
-                except (ValueError, ZeroDivisionError, OverflowError) as e:
-                    self.result_var.set(f"Error: {str(e)}")
-                    return
-            # Add to history
+        
+        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+        self.evaluator.submit(
+            "calculate",
+            evaluate_calculation,
+            (expression, self.mode_var.get(), timestamp),
+            on_done=self.show_calculation,
+            on_error=lambda e: self.result_var.set(f"Error: {str(e)}"),
+            use_process=looks_expensive(expression),
+        )
+    
+    def show_calculation(self, outcome):
+        """Display a finished calculation and record it in the history"""
+        display, history_entry = outcome
+        self.result_var.set(display)
+        if history_entry is not None:
             self.history.append(history_entry)
             self.update_history_display()
-        except Exception as e:
-            self.result_var.set(f"Error: {str(e)}")
             
     def update_history_display(self):
         """Update the history text widget"""
+        self.history_text.config(state='normal')
         self.history_text.delete(1.0, tk.END)
         for entry in self.history[-20:]:  # Show last 20 entries
             self.history_text.insert(tk.END, entry + "\n")
+        self.history_text.config(state='disabled')
         self.history_text.see(tk.END)
     
     # === CONVERSION METHODS ===
@@ -545,129 +716,32 @@ class UMLCalculatorGUI:
         if not expression:
             return
         
-        try:
-            steps = []
-            steps.append(f"Original expression: {expression}")
-            
-            # Try standard evaluation first
-            try:
-                result = safe_eval(expression)
-                steps.append(f"Standard evaluation: {result}")
-            except:
-                steps.append("Standard evaluation failed")
-            
-            # Try UML parsing
-            try:
-                parsed = parse_uml(expression)
-                steps.append(f"UML parsed: {parsed}")
-                
-                uml_result = eval_uml(parsed)
-                steps.append(f"UML evaluation: {uml_result}")
-            except Exception as e:
-                steps.append(f"UML parsing failed: {e}")
-            
-            # Try recursive compression
-            try:
-                compressed = eval_recursive_compress(expression)
-                steps.append(f"Recursive compression: {compressed}")
-            except Exception as e:
-                steps.append(f"Recursive compression failed: {e}")
-            
-            # Show steps in a new window
-            steps_text = "\n".join(steps)
-            self.show_text_window("UML Processing Steps", steps_text)
-            
-        except Exception as e:
-            self.result_var.set(f"Steps Error: {str(e)}")
+        self.evaluator.submit(
+            "steps",
+            uml_steps_report,
+            (expression,),
+            on_done=lambda steps_text: self.show_text_window("UML Processing Steps", steps_text),
+            on_error=lambda e: self.result_var.set(f"Steps Error: {str(e)}"),
+            use_process=looks_expensive(expression),
+        )
     
     def run_arithmetic_tests(self):
         """Run comprehensive arithmetic tests across all modes"""
-        test_cases = [
-            "7+7", "1+1", "2*3", "10-4", "15/3",
-            "2+3*4", "(5+3)*2", "100/10+5",
-            "7*7", "9-5", "20/4", "3*3*3"
-        ]
-        
-        results = []
-        results.append("=== ARITHMETIC TEST SUITE ===\n")
-        
-        for expr in test_cases:
-            results.append(f"Testing: {expr}")
-            
-            # Standard mode
-            try:
-                std_result = safe_eval(expr)
-                results.append(f"  Standard: {std_result}")
-            except Exception as e:
-                results.append(f"  Standard: Error - {e}")
-            
-            # UML mode
-            try:
-                uml_result = eval_recursive_compress(expr)
-                results.append(f"  UML: {uml_result}")
-            except Exception as e:
-                results.append(f"  UML: Error - {e}")
-            
-            # RIS mode (for 2-number expressions)
-            import re
-            match = re.match(r'^(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)$', expr)
-            if match:
-                try:
-                    a, op, b = match.groups()
-                    a, b = float(a), float(b)
-                    ris_result, operation = ris_meta_operator(a, b)
-                    results.append(f"  RIS: {ris_result} via {operation}")
-                except Exception as e:
-                    results.append(f"  RIS: Error - {e}")
-            else:
-                results.append(f"  RIS: Not applicable")
-            
-            results.append("")  # Empty line
-        
-        # Show results
-        self.show_text_window("Arithmetic Test Results", "\n".join(results))
+        self.evaluator.submit(
+            "tests",
+            arithmetic_test_report,
+            on_done=lambda report: self.show_text_window("Arithmetic Test Results", report),
+            on_error=lambda e: self.result_var.set(f"Test Error: {str(e)}"),
+        )
     
     def random_test_suite(self):
         """Run randomized test cases"""
-        import random
-        
-        results = []
-        results.append("=== RANDOM TEST SUITE ===\n")
-        
-        # Generate random test cases
-        for i in range(10):
-            a = random.randint(1, 20)
-            b = random.randint(1, 20)
-            op = random.choice(['+', '-', '*', '/'])
-            
-            if op == '/' and b == 0:
-                b = 1  # Avoid division by zero
-            
-            expr = f"{a}{op}{b}"
-            results.append(f"Test {i+1}: {expr}")
-            
-            # Test all modes
-            try:
-                std_result = safe_eval(expr)
-                results.append(f"  Standard: {std_result}")
-                
-                uml_result = eval_recursive_compress(expr)
-                results.append(f"  UML: {uml_result}")
-                
-                ris_result, operation = ris_meta_operator(float(a), float(b))
-                results.append(f"  RIS: {ris_result} via {operation}")
-                
-                # Base52 conversion
-                base52_a = base52_encode(a)
-                base52_b = base52_encode(b)
-                base52_result = base52_encode(int(std_result)) if isinstance(std_result, (int, float)) and std_result > 0 else str(std_result)
-                results.append(f"  Base52: [{base52_a},{base52_b}] = {base52_result}")
-                
-            except Exception as e:
-                results.append(f"  Error: {e}")
-            
-            results.append("")  # Empty line        # Show results
-        self.show_text_window("Random Test Results", "\n".join(results))
+        self.evaluator.submit(
+            "tests",
+            random_test_report,
+            on_done=lambda report: self.show_text_window("Random Test Results", report),
+            on_error=lambda e: self.result_var.set(f"Test Error: {str(e)}"),
+        )
     
     def show_demo(self):
         """Show demo information"""
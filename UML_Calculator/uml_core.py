@@ -8,11 +8,16 @@ Enhanced with empirical evidence from 189 conversation insights spanning May 202
 Implements T.R.E.E.S. (The Recursive Entropy Engine System) principles in practical UML Calculator.
 """
 
+import cmath
 import math
 import time
 import re  # Added import for regex pattern matching
+from bisect import bisect_left
+from collections import namedtuple
 from typing import Any, Dict, List, Tuple, Optional, Union
 
+from core.evaluation_budget import CHECK_INTERVAL, EvaluationBudget, call_scope, check_deadline, check_nesting, check_tree
+
 # Letter-to-number mapping (A=1..Z=26, a=27..z=52)
 def letter_to_number(s: str) -> int:
     if s.isupper():
@@ -284,6 +289,10 @@ def superposition_collapse(values: List[Union[float, complex]], entropy_threshol
     avg = sum(values) / len(values)
     return recursive_compress(avg)
 
+# Characters split_args tracks; "<>" is one token and opens two levels
+_ARG_TOKENS = re.compile(r"<>|[\[\]{}()<>,]")
+_ARG_DEPTH = {'<>': 2, '[': 1, '{': 1, '(': 1, '<': 1, ']': -1, '}': -1, ')': -1, '>': -1, ',': 0}
+
 def split_args(argstr: str) -> list:
     """
     Split arguments by commas, ignoring nested brackets and complex structures.
@@ -292,34 +301,12 @@ def split_args(argstr: str) -> list:
     args = []
     depth = 0
     last = 0
-    bracket_pairs = {
-        '[': ']',
-        '{': '}',
-        '(': ')',
-        '<': '>'
-    }
-    
-    i = 0
-    while i < len(argstr):
-        c = argstr[i]
-        if c in bracket_pairs.keys():
-            depth += 1
-        elif c in bracket_pairs.values():
-            depth -= 1
-        elif c == ',' and depth == 0:
-            args.append(argstr[last:i])
-            last = i + 1
-            
-        # Handle special case for division <>...<> 
-        if i < len(argstr) - 1 and c == '<' and argstr[i + 1] == '>':
-            depth += 1
-            i += 1  # Skip the next character
-            
-        # Handle special case for division close <> 
-        if i > 0 and c == '>' and argstr[i - 1] == '<':
-            depth -= 1
-            
-        i += 1
+    for match in _ARG_TOKENS.finditer(argstr):
+        token = match.group()
+        if token == ',' and depth == 0:
+            args.append(argstr[last:match.start()])
+            last = match.end()
+        depth += _ARG_DEPTH[token]
         
     if last < len(argstr):
         args.append(argstr[last:])
@@ -334,163 +321,315 @@ def parse_uml(expr: str) -> Any:
     - Supports superposition logic and entropy-based collapse
     - Improved handling of complex expressions and nested structures
     - Now supports hybrid expressions: 2+<3,4>, [1,2]+3, 2*(3+4), etc.
+
+    Sub-expressions are parsed from an explicit stack rather than by
+    recursion, so nesting of any depth cannot hit the recursion limit, and
+    as offsets into one indexed copy of the text, so parsing takes time
+    linear in its length. The active evaluation budget's max_depth is
+    checked on the raw text first.
     """
-    expr = expr.replace(' ', '')
+    check_nesting(expr)
+    source = _ParseText(expr.replace(' ', ''))
+    results: List[Any] = []
+    # ((text, start, end), None) to parse; (None, (count, build)) to combine
+    # the last count results once they are parsed
+    stack: List[Tuple] = [((source, 0, len(source.text)), None)]
+    while stack:
+        span, pending = stack.pop()
+        if pending is None:
+            step = _parse_uml_step(*span)
+        else:
+            count, build = pending
+            parsed = results[len(results) - count:]
+            del results[len(results) - count:]
+            step = build(parsed)
+        if not isinstance(step, _ParseStep):
+            results.append(step)
+            continue
+        stack.append((None, (len(step.children), step.build)))
+        stack.extend((child, None) for child in reversed(step.children))
+    return results[0]
+
+# Sub-expressions still to parse, as (text, start, end), and how to build
+# the result from them
+_ParseStep = namedtuple('_ParseStep', ['children', 'build'])
+
+# Brackets and the hybrid infix operators, grouped by precedence
+_INFIX_TOKENS = re.compile(r"[(\[{<)\]}>+\-*/^]")
+_INFIX_DEPTH = {'(': 1, '[': 1, '{': 1, '<': 1, ')': -1, ']': -1, '}': -1, '>': -1}
+_INFIX_GROUP = {'+': 0, '-': 0, '*': 1, '/': 1, '^': 2}
+
+class _ParseText:
+    """
+    Space-free text being parsed by parse_uml, indexed once
+
+    The checks made on each sub-expression (its top-level infix operators
+    and commas, whether it holds '<>', '%' or '(') are answered by bisecting
+    position lists instead of scanning the sub-expression, so each level of
+    nesting costs only what it parses.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.divisions = [match.start() for match in re.finditer(r'(?=<>)', text)]
+        self.percents = [match.start() for match in re.finditer('%', text)]
+        self.opening = [match.start() for match in re.finditer(r'\(', text)]
+        self.closing = [match.start() for match in re.finditer(r'\)', text)]
+
+        # Depth before each position as _split_top_level-style scanning
+        # counts it, and the infix operators by (depth, precedence group)
+        self.infix_depth = [0] * (len(text) + 1)
+        self.infix: Dict[Tuple[int, int], List[int]] = {}
+        depth = 0
+        previous = 0
+        for match in _INFIX_TOKENS.finditer(text):
+            position, token = match.start(), match.group()
+            self.infix_depth[previous:position + 1] = [depth] * (position + 1 - previous)
+            previous = position + 1
+            if token in _INFIX_DEPTH:
+                depth += _INFIX_DEPTH[token]
+            else:
+                self.infix.setdefault((depth, _INFIX_GROUP[token]), []).append(position)
+        self.infix_depth[previous:] = [depth] * (len(text) + 1 - previous)
+
+        # The same for split_args: its depth before each token, and the commas by depth
+        self.arg_depth = [0] * (len(text) + 1)
+        self.commas: Dict[int, List[int]] = {}
+        depth = 0
+        previous = 0
+        for match in _ARG_TOKENS.finditer(text):
+            position, token = match.start(), match.group()
+            self.arg_depth[previous:position + 1] = [depth] * (position + 1 - previous)
+            previous = position + 1
+            if token == ',':
+                self.commas.setdefault(depth, []).append(position)
+            depth += _ARG_DEPTH[token]
+        self.arg_depth[previous:] = [depth] * (len(text) + 1 - previous)
+
+    @staticmethod
+    def within(positions: List[int], start: int, end: int) -> Tuple[int, int]:
+        """The index range of positions lying in [start, end)"""
+        return bisect_left(positions, start), bisect_left(positions, end)
+
+    def contains(self, positions: List[int], start: int, end: int) -> bool:
+        """Whether any of positions lies in [start, end)"""
+        i, j = self.within(positions, start, end)
+        return i < j
+
+    def infix_split(self, start: int, end: int) -> Optional[Tuple[int, str]]:
+        """(position, operator) _parse_uml_step splits text[start:end] at, if any"""
+        depth = self.infix_depth[start]
+        for group in range(3):
+            positions = self.infix.get((depth, group))
+            if positions is None:
+                continue
+            i, j = bisect_left(positions, start), bisect_left(positions, end)
+            if i < j:
+                # Left-associative ops (+, -, *, /) apply their rightmost
+                # occurrence last: 10-3-2 is (10-3)-2. ^ is right-associative,
+                # as in every UML engine (UML_Spec.md 2.4): 2^3^2 is 2^(3^2)
+                position = positions[j - 1] if group != 2 else positions[i]
+                return position, self.text[position]
+        return None
+
+    def split(self, start: int, end: int) -> List[Tuple['_ParseText', int, int]]:
+        """Spans of split_args(text[start:end])"""
+        text = self.text
+        if start > 0 and text.startswith('<>', start - 1):
+            # Scanned on its own, the slice starts with a lone '>'
+            spans = []
+            for arg in split_args(text[start:end]):
+                spans.append((self, start, start + len(arg)))
+                start += len(arg) + 1
+            return spans
+        spans = []
+        last = start
+        commas = self.commas.get(self.arg_depth[start], [])
+        i, j = self.within(commas, start, end)
+        for comma in commas[i:j]:
+            spans.append((self, last, comma))
+            last = comma + 1
+        if last < end:
+            spans.append((self, last, end))
+        return spans
+
+def _hybrid(op, left_parsed, right_parsed):
+    """
+    The node for left op right, flattening chains of + and *
+
+    A chain's left operand is the node just parsed for it, which nothing
+    else refers to, so its args are extended in place rather than copied:
+    copying made a long chain quadratic to parse.
+    """
+    if op == '+':
+        # Flatten nested additions for n-ary support
+        if isinstance(left_parsed, dict) and left_parsed.get('op') == 'add':
+            left_parsed['args'].append(right_parsed)
+            return {'op': 'add', 'args': left_parsed['args'], 'type': 'hybrid'}
+        if isinstance(right_parsed, dict) and right_parsed.get('op') == 'add':
+            return {'op': 'add', 'args': [left_parsed] + right_parsed['args'], 'type': 'hybrid'}
+        return {'op': 'add', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
+    elif op == '-':
+        return {'op': 'sub', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
+    elif op == '*':
+        if isinstance(left_parsed, dict) and left_parsed.get('op') == 'mul':
+            left_parsed['args'].append(right_parsed)
+            return {'op': 'mul', 'args': left_parsed['args'], 'type': 'hybrid'}
+        if isinstance(right_parsed, dict) and right_parsed.get('op') == 'mul':
+            return {'op': 'mul', 'args': [left_parsed] + right_parsed['args'], 'type': 'hybrid'}
+        return {'op': 'mul', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
+    elif op == '/':
+        return {'op': 'div', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
+    return {'op': 'ris', 'args': [left_parsed, right_parsed], 'operation': 'pow', 'type': 'hybrid'}
+
+def _parse_uml_step(source: _ParseText, start: int, end: int) -> Any:
+    """
+    One level of parse_uml on source.text[start:end]: the parsed value, or a
+    _ParseStep whose build turns the parsed sub-expressions into the value
+    (or into another step, when one sub-expression can only be chosen after
+    another is parsed).
+    """
+    text = source.text
+
+    def encloses(opening, closing):
+        return text.startswith(opening, start, end) and text.endswith(closing, start, end)
 
     # --- Hybrid infix operator parsing (IMPROVED) ---
     # Operator precedence: ^, *, /, +, -
-    # We parse from lowest to highest precedence (rightmost lowest binds last)
-    def split_top_level(expr, ops):
-        depth = 0
-        result = []
-        for i, c in enumerate(expr):
-            if c in '([{<':
-                depth += 1
-            elif c in ')]}>':
-                depth -= 1
-            elif depth == 0 and c in ops:
-                result.append((i, c))
-        return result
-
-    # Try each operator in order of precedence (lowest first)
-    for ops, op_name in [
-        ('+-', None),
-        ('*/', None),
-        ('^', None)
-    ]:
-        splits = split_top_level(expr, ops)
-        if splits:
-            # For left-associative ops (+, -, *, /), split at the leftmost
-            idx, op = splits[0] if ops != '^' else splits[-1]  # ^ is right-associative
-            left = expr[:idx]
-            right = expr[idx+1:]
-            left_parsed = parse_uml(left)
-            right_parsed = parse_uml(right)
-            if op == '+':
-                # Flatten nested additions for n-ary support
-                if isinstance(left_parsed, dict) and left_parsed.get('op') == 'add':
-                    return {'op': 'add', 'args': left_parsed['args'] + [right_parsed], 'type': 'hybrid'}
-                if isinstance(right_parsed, dict) and right_parsed.get('op') == 'add':
-                    return {'op': 'add', 'args': [left_parsed] + right_parsed['args'], 'type': 'hybrid'}
-                return {'op': 'add', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
-            elif op == '-':
-                return {'op': 'sub', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
-            elif op == '*':
-                if isinstance(left_parsed, dict) and left_parsed.get('op') == 'mul':
-                    return {'op': 'mul', 'args': left_parsed['args'] + [right_parsed], 'type': 'hybrid'}
-                if isinstance(right_parsed, dict) and right_parsed.get('op') == 'mul':
-                    return {'op': 'mul', 'args': [left_parsed] + right_parsed['args'], 'type': 'hybrid'}
-                return {'op': 'mul', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
-            elif op == '/':
-                return {'op': 'div', 'args': [left_parsed, right_parsed], 'type': 'hybrid'}
-            elif op == '^':
-                return {'op': 'ris', 'args': [left_parsed, right_parsed], 'operation': 'pow', 'type': 'hybrid'}
+    # We parse from lowest to highest precedence (the operator applied last)
+    split = source.infix_split(start, end)
+    if split is not None:
+        idx, op = split
+        return _ParseStep([(source, start, idx), (source, idx + 1, end)], lambda parsed, op=op: _hybrid(op, *parsed))
 
     # --- Existing parsing logic ---
     # Handle priority nest (parentheses) - recursive evaluation
-    if expr.startswith('(') and expr.endswith(')'):
-        return parse_uml(expr[1:-1])
+    if encloses('(', ')'):
+        return _ParseStep([(source, start + 1, end - 1)], lambda parsed: parsed[0])
     
     # Addition nest: [ ... ] - 1D forward motion, growth, time steps
-    if expr.startswith('[') and expr.endswith(']'):
-        args = [parse_uml(x) for x in split_args(expr[1:-1])]
-        return {'op': 'add', 'args': args, 'dimension': '1D', 'type': 'expansion'}
+    if encloses('[', ']'):
+        return _ParseStep(source.split(start + 1, end - 1), lambda args: {'op': 'add', 'args': args, 'dimension': '1D', 'type': 'expansion'})
     
     # Subtraction nest: { ... } - 1D reverse motion, negation, backtracking
-    if expr.startswith('{') and expr.endswith('}'):
-        args = [parse_uml(x) for x in split_args(expr[1:-1])]
-        return {'op': 'sub', 'args': args, 'dimension': '1D', 'type': 'collapse'}
+    if encloses('{', '}'):
+        return _ParseStep(source.split(start + 1, end - 1), lambda args: {'op': 'sub', 'args': args, 'dimension': '1D', 'type': 'collapse'})
     
     # Multiplication nest: < ... > - 2D expansion, scaling, tessellation
-    if expr.startswith('<') and expr.endswith('>') and not (expr.startswith('<>') and expr.endswith('<>')):
-        args = [parse_uml(x) for x in split_args(expr[1:-1])]
-        return {'op': 'mul', 'args': args, 'dimension': '2D', 'type': 'tessellation'}
+    if encloses('<', '>') and not encloses('<>', '<>'):
+        return _ParseStep(source.split(start + 1, end - 1), lambda args: {'op': 'mul', 'args': args, 'dimension': '2D', 'type': 'tessellation'})
     
     # Division nest: <>...< > - 4D recursion, folding, superposition
-    if '<>' in expr:
+    if source.contains(source.divisions, start, end - 1):
         # Enhanced division handling to properly match <>x,y<> pattern
-        if expr.startswith('<>') and expr.endswith('<>'):
-            content = expr[2:-2]
-            if not content:
-                raise ValueError(f"Empty division expression: {expr}")
+        if encloses('<>', '<>'):
+            if end - start <= 4:
+                raise ValueError(f"Empty division expression: {text[start:end]}")
                 
             # Use the enhanced split_args to properly handle nested expressions
-            args = [parse_uml(x) for x in split_args(content)]
+            vals = source.split(start + 2, end - 2)
             
-            if not args:
-                raise ValueError(f"Invalid division expression: {expr}")
+            if not vals:
+                raise ValueError(f"Invalid division expression: {text[start:end]}")
             
-            return {'op': 'div', 'args': args, 'dimension': '4D', 'type': 'recursion'}
+            return _ParseStep(vals, lambda args: {'op': 'div', 'args': args, 'dimension': '4D', 'type': 'recursion'})
         
         # Handle complex nested divisions like {10,<>5,2<>}
         # Look for a complete <>x,y<> pattern inside the expression
+        expr = text[start:end]
         match = re.search(r'<>([^<>]+)<>', expr)
         if match:
             # Process the non-division parts first
             inner_expr = match.group(1)
-            inner_args = [parse_uml(x) for x in split_args(inner_expr)]
-            div_expr = {'op': 'div', 'args': inner_args, 'dimension': '4D', 'type': 'recursion'}
-            
-            # Replace the division part with a placeholder for further parsing
-            placeholder = "DIV_PLACEHOLDER"
-            new_expr = expr.replace(f"<>{inner_expr}<>", placeholder)
-            
-            # If the placeholder is the entire expression, return the division
-            if new_expr == placeholder:
-                return div_expr
-            
-            # Otherwise, we need to parse the outer expression and substitute the division
-            outer_parse = parse_uml(new_expr)
-            
-            if isinstance(outer_parse, dict) and 'args' in outer_parse:
-                # Find and replace the placeholder in args
-                for i, arg in enumerate(outer_parse['args']):
-                    if arg == placeholder:
-                        outer_parse['args'][i] = div_expr
-                return outer_parse
+            return _ParseStep(source.split(start + match.start(1), start + match.end(1)),
+                              lambda inner_args: _substitute_division(expr, inner_expr, inner_args))
+
+    return _parse_uml_tail(source, start, end)
+
+def _substitute_division(expr: str, inner_expr: str, inner_args: List[Any]) -> Any:
+    """Parse expr with its <>inner_expr<> division, already parsed as inner_args, substituted in"""
+    div_expr = {'op': 'div', 'args': inner_args, 'dimension': '4D', 'type': 'recursion'}
+    
+    # Replace the division part with a placeholder for further parsing
+    placeholder = "DIV_PLACEHOLDER"
+    new_expr = expr.replace(f"<>{inner_expr}<>", placeholder)
     
+    # If the placeholder is the entire expression, return the division
+    if new_expr == placeholder:
+        return div_expr
+    
+    # Otherwise, we need to parse the outer expression and substitute the division
+    def substitute(parsed):
+        outer_parse = parsed[0]
+        if isinstance(outer_parse, dict) and 'args' in outer_parse:
+            # Find and replace the placeholder in args
+            for i, arg in enumerate(outer_parse['args']):
+                if arg == placeholder:
+                    outer_parse['args'][i] = div_expr
+            return outer_parse
+        return _parse_uml_tail(_ParseText(expr), 0, len(expr))
+    return _ParseStep([(_ParseText(new_expr), 0, len(new_expr))], substitute)
+
+def _parse_uml_tail(source: _ParseText, start: int, end: int) -> Any:
+    """The rest of _parse_uml_step, for forms without a division nest"""
+    text = source.text
+
+    def encloses(opening, closing):
+        return text.startswith(opening, start, end) and text.endswith(closing, start, end)
+
     # Root: /x< - recursive collapse or expansion in non-integer domains
-    if expr.startswith('/') and expr.endswith('<'):
-        val = parse_uml(expr[1:-1])
-        return {'op': 'root', 'args': [val], 'type': 'recursive_collapse'}
+    if encloses('/', '<'):
+        return _ParseStep([(source, start + 1, end - 1)], lambda parsed: {'op': 'root', 'args': parsed, 'type': 'recursive_collapse'})
     
     # Logarithm: ?(a,b) - recursive compression and expansion
-    if expr.startswith('?(') and expr.endswith(')'):
-        vals = split_args(expr[2:-1])
-        args = [parse_uml(x) for x in vals]
-        return {'op': 'log', 'args': args, 'type': 'recursive_compression'}
+    if encloses('?(', ')'):
+        return _ParseStep(source.split(start + 2, end - 1), lambda args: {'op': 'log', 'args': args, 'type': 'recursive_compression'})
     
     # RIS Meta-operator: @(a,b[,operation]) - superposition and entropy collapse
-    if expr.startswith('@(') and expr.endswith(')'):
-        vals = split_args(expr[2:-1])
+    if encloses('@(', ')'):
+        vals = source.split(start + 2, end - 1)
         if len(vals) >= 2:
-            args = [parse_uml(x) for x in vals[:2]]  # First two arguments are always the operands
             # Check for an explicit operation parameter
             operation = 'pow'  # Default operation
             if len(vals) > 2:
                 # Remove quotes if present
-                op_str = vals[2].strip("'\"")
+                op_str = text[vals[2][1]:vals[2][2]].strip("'\"")
                 if op_str in ['pow', 'root', 'log', 'mod', 'add', 'sub', 'mul', 'div']:
                     operation = op_str
-            
-            return {'op': 'ris', 'args': args, 'operation': operation, 'type': 'meta_operator'}
+            # First two arguments are always the operands
+            return _ParseStep(vals[:2], lambda args: {'op': 'ris', 'args': args, 'operation': operation, 'type': 'meta_operator'})
     
     # Handle complex numbers: !(real,imag) - complex number representation
-    if expr.startswith('!(') and expr.endswith(')'):
-        vals = split_args(expr[2:-1])
+    if encloses('!(', ')'):
+        vals = source.split(start + 2, end - 1)
         if len(vals) == 2:
-            real = parse_uml(vals[0])
-            imag = parse_uml(vals[1])
-            return complex(real, imag)
+            return _ParseStep(vals, lambda parsed: complex(*parsed))
     
     # Handle modulo operations like 10%3
-    if '%' in expr and not (expr.startswith('[') or expr.startswith('{') or expr.startswith('<')):
-        parts = expr.split('%')
-        if len(parts) == 2:
-            a = parse_uml(parts[0])
-            b = parse_uml(parts[1])
-            return a % b
-    
+    i, j = source.within(source.percents, start, end)
+    if i < j and not text.startswith(('[', '{', '<'), start, end):
+        if j - i == 1:
+            percent = source.percents[i]
+            return _ParseStep([(source, start, percent), (source, percent + 1, end)], lambda parsed: parsed[0] % parsed[1])
+
+    # A constant, number or name never holds '(' (nor does Python's
+    # complex() accept one unless it is wrapped in parentheses), so longer
+    # text is only copied when it can be a function call
+    i, j = source.within(source.opening, start, end)
+    if i < j:
+        first_opening = source.opening[i]
+        i, j = source.within(source.closing, start, end)
+        if i < j and first_opening < source.closing[i]:
+            func_name = text[start:first_opening].strip()
+            args_start, args_end = first_opening + 1, source.closing[j - 1]
+            while args_start < args_end and text[args_start].isspace():
+                args_start += 1
+            while args_end > args_start and text[args_end - 1].isspace():
+                args_end -= 1
+            return _ParseStep(source.split(args_start, args_end), lambda args: _call_function(func_name, args))
+        raise ValueError(f"Unsupported or invalid UML expression: {text[start:end]}")
+    expr = text[start:end]
+
     # Handle special constants
     if expr.lower() == 'pi':
         return math.pi
@@ -526,210 +665,250 @@ def parse_uml(expr: str) -> Any:
                 return complex(expr.replace('i', 'j'))
             except ValueError:
                 pass
-        # If not a simple expression, try to handle function calls
-        if '(' in expr and ')' in expr and expr.index('(') < expr.index(')'):
-            func_name = expr[:expr.index('(')].strip()
-            args_str = expr[expr.index('(')+1:expr.rindex(')')].strip()
-            args = [parse_uml(x) for x in split_args(args_str)]
-            
-            # Handle RIS function call syntax explicitly
-            if func_name.upper() == 'RIS':
-                if len(args) < 2:
-                    raise ValueError(f"RIS requires at least 2 arguments, got {len(args)}")
-                    
-                operation = 'auto'  # Default to auto operation selection
-                if len(args) > 2:
-                    operation_arg = args[2]
-                    if isinstance(operation_arg, str) and operation_arg in ['add', 'sub', 'mul', 'div', 'pow', 'root', 'log', 'mod']:
-                        operation = operation_arg
-                
-                return {'op': 'ris', 'args': args[:2], 'operation': operation, 'type': 'meta_operator'}
+        raise ValueError(f"Unsupported or invalid UML expression: {expr}")
+
+def _call_function(func_name: str, args: List[Any]) -> Any:
+    """A function call once its arguments are parsed"""
+    # Handle RIS function call syntax explicitly
+    if func_name.upper() == 'RIS':
+        if len(args) < 2:
+            raise ValueError(f"RIS requires at least 2 arguments, got {len(args)}")
             
-            # Handle common math functions
-            if func_name == 'sin':
-                return math.sin(args[0])
-            elif func_name == 'cos':
-                return math.cos(args[0])
-            elif func_name == 'tan':
-                return math.tan(args[0])
-            elif func_name == 'sqrt':
-                return math.sqrt(args[0]) if args[0] >= 0 else complex(0, math.sqrt(abs(args[0])))
-            elif func_name == 'abs':
-                return abs(args[0])
-            elif func_name == 'log':
-                if len(args) == 2:
-                    return math.log(args[0], args[1])
-                return math.log(args[0])
-            else:
-                raise ValueError(f"Unknown function: {func_name}")
+        operation = 'auto'  # Default to auto operation selection
+        if len(args) > 2:
+            operation_arg = args[2]
+            if isinstance(operation_arg, str) and operation_arg in ['add', 'sub', 'mul', 'div', 'pow', 'root', 'log', 'mod']:
+                operation = operation_arg
         
-        raise ValueError(f"Unsupported or invalid UML expression: {expr}")
+        return {'op': 'ris', 'args': args[:2], 'operation': operation, 'type': 'meta_operator'}
+    
+    # Handle common math functions
+    if func_name == 'sin':
+        return math.sin(args[0])
+    elif func_name == 'cos':
+        return math.cos(args[0])
+    elif func_name == 'tan':
+        return math.tan(args[0])
+    elif func_name == 'sqrt':
+        return math.sqrt(args[0]) if args[0] >= 0 else complex(0, math.sqrt(abs(args[0])))
+    elif func_name == 'abs':
+        return abs(args[0])
+    elif func_name == 'log':
+        if len(args) == 2:
+            return math.log(args[0], args[1])
+        return math.log(args[0])
+    else:
+        raise ValueError(f"Unknown function: {func_name}")
 
-# Enhanced UML evaluation with RIS meta-operator and recursive compression
-def eval_uml(parsed_val: Any) -> Union[float, complex, str]:
-    """
-    Enhanced UML evaluation with RIS meta-operator, recursive compression, and symbolic preservation.
-    Refactored for clarity and maintainability.
-    """
-    import cmath
+# --- UML evaluation operators (applied to already-evaluated arguments) ---
+def _eval_add(args):
+    result = sum(args)
+    return recursive_compress(result) if len(args) > 3 else result
 
-    def eval_add(args):
-        result = sum(args)
-        return recursive_compress(result) if len(args) > 3 else result
-
-    def eval_sub(args):
-        return args[0] - sum(args[1:])
-
-    def eval_mul(args):
-        result = 1.0
-        for a in args:
-            result *= a
-        return result
-
-    def eval_div(args):
-        result = args[0]
-        for a in args[1:]:
-            if a == 0:
-                if args[0] == 0:
-                    return float('nan')
-                return float('inf')
-            result /= a
-        return result
-
-    def eval_root(args):
-        if len(args) == 1:
-            val = args[0]
-            if isinstance(val, complex) or (isinstance(val, (int, float)) and val < 0):
-                return cmath.sqrt(val)
-            return math.sqrt(val)
-        elif len(args) == 2:
-            base, index = args
-            if index == 0:
-                return float('inf')
-            if isinstance(base, complex) or isinstance(index, complex):
-                return base ** (1 / index)
+def _eval_sub(args):
+    return args[0] - sum(args[1:])
+
+def _eval_mul(args):
+    result = 1.0
+    for a in args:
+        result *= a
+    return result
+
+def _eval_div(args):
+    result = args[0]
+    for a in args[1:]:
+        if a == 0:
+            if args[0] == 0:
+                return float('nan')
+            return float('inf')
+        result /= a
+    return result
+
+def _eval_root(args):
+    if len(args) == 1:
+        val = args[0]
+        if isinstance(val, complex) or (isinstance(val, (int, float)) and val < 0):
+            return cmath.sqrt(val)
+        return math.sqrt(val)
+    elif len(args) == 2:
+        base, index = args
+        if index == 0:
+            return float('inf')
+        if isinstance(base, complex) or isinstance(index, complex):
             return base ** (1 / index)
-        else:
-            val = args[0]
-            if isinstance(val, complex) or (isinstance(val, (int, float)) and val < 0):
-                return cmath.sqrt(val)
-            return math.sqrt(val)
+        return base ** (1 / index)
+    else:
+        val = args[0]
+        if isinstance(val, complex) or (isinstance(val, (int, float)) and val < 0):
+            return cmath.sqrt(val)
+        return math.sqrt(val)
 
-    def eval_log(args):
-        if len(args) == 2:
-            base, value = args
-            if isinstance(base, complex) or isinstance(value, complex) or base <= 0 or value <= 0:
-                return cmath.log(value, base)
-            return math.log(value, base)
-        else:
-            val = args[0]
-            if isinstance(val, complex) or val <= 0:
-                return cmath.log(val)
-            return math.log(val)
-
-    def eval_ris(parsed_val, args):
-        a, b = args
-        op = parsed_val.get('operation')
-        if op == 'symbolic':
-            return f"RIS({a}, {b})"
-        if op == 'auto':
-            try:
-                operations = {
-                    'add': a + b,
-                    'mul': a * b,
-                    'sub': a - b,
-                    'div': a / b if b != 0 else float('inf')
-                }
-                def entropy_score(n):
-                    if isinstance(n, complex):
-                        real_entropy = abs(n.real - round(n.real)) + abs(n.real) / 100
-                        imag_entropy = abs(n.imag - round(n.imag)) + abs(n.imag) / 100
-                        if n.imag == 0:
-                            return abs(n.real - round(n.real)) + abs(n.real) / 100
-                        if n.real == 0:
-                            return 5 + abs(n.imag - round(n.imag)) + abs(n.imag) / 100
-                        return 10 + real_entropy + imag_entropy
-                    if isinstance(n, (int, float)):
-                        if math.isnan(n) or math.isinf(n):
-                            return float('inf')
-                        integer_part = abs(n - round(n))
-                        magnitude_part = abs(n) / 100
-                        digits = len(str(abs(int(n)))) if n != 0 else 0
-                        bonus = 0
-                        if n > 0 and n == int(n) and math.sqrt(n).is_integer():
-                            bonus -= 0.5
-                        if n > 0 and n == int(n) and round(n**(1/3))**3 == n:
-                            bonus -= 0.3
-                        if n > 0 and n == int(n) and n & (n-1) == 0:
-                            bonus -= 0.4
-                        if n > 0 and n == int(n) and math.log10(n).is_integer():
-                            bonus -= 0.35
-                        if n in (1,2,3,4,5,6,7,8,9,10):
-                            bonus -= 0.6
-                        fibonacci = {1,2,3,5,8,13,21,34,55,89,144}
-                        if n == int(n) and int(n) in fibonacci:
-                            bonus -= 0.25
-                        return integer_part + magnitude_part + 0.05 * digits + bonus
-                    return 100
-                return min(operations.items(), key=lambda x: entropy_score(x[1]))[1]
-            except Exception:
-                return a + b
+def _eval_log(args):
+    if len(args) == 2:
+        base, value = args
+        if isinstance(base, complex) or isinstance(value, complex) or base <= 0 or value <= 0:
+            return cmath.log(value, base)
+        return math.log(value, base)
+    else:
+        val = args[0]
+        if isinstance(val, complex) or val <= 0:
+            return cmath.log(val)
+        return math.log(val)
+
+def entropy_score(n):
+    """Entropy score the RIS meta-operator minimizes; lower means simpler."""
+    if isinstance(n, complex):
+        real_entropy = abs(n.real - round(n.real)) + abs(n.real) / 100
+        imag_entropy = abs(n.imag - round(n.imag)) + abs(n.imag) / 100
+        if n.imag == 0:
+            return abs(n.real - round(n.real)) + abs(n.real) / 100
+        if n.real == 0:
+            return 5 + abs(n.imag - round(n.imag)) + abs(n.imag) / 100
+        return 10 + real_entropy + imag_entropy
+    if isinstance(n, (int, float)):
+        if math.isnan(n) or math.isinf(n):
+            return float('inf')
+        integer_part = abs(n - round(n))
+        magnitude_part = abs(n) / 100
+        digits = len(str(abs(int(n)))) if n != 0 else 0
+        bonus = 0
+        if n > 0 and n == int(n) and math.sqrt(n).is_integer():
+            bonus -= 0.5
+        if n > 0 and n == int(n) and round(n**(1/3))**3 == n:
+            bonus -= 0.3
+        if n > 0 and n == int(n) and n & (n-1) == 0:
+            bonus -= 0.4
+        if n > 0 and n == int(n) and math.log10(n).is_integer():
+            bonus -= 0.35
+        if n in (1,2,3,4,5,6,7,8,9,10):
+            bonus -= 0.6
+        fibonacci = {1,2,3,5,8,13,21,34,55,89,144}
+        if n == int(n) and int(n) in fibonacci:
+            bonus -= 0.25
+        return integer_part + magnitude_part + 0.05 * digits + bonus
+    return 100
+
+def _eval_ris(parsed_val, args):
+    a, b = args
+    op = parsed_val.get('operation')
+    if op == 'symbolic':
+        return f"RIS({a}, {b})"
+    if op == 'auto':
         try:
-            if op == 'pow':
-                return a ** b
-            elif op == 'root':
-                if b == 0:
-                    return float('inf')
-                if isinstance(a, (int, float)) and a < 0 and isinstance(b, (int, float)) and b % 2 == 0:
-                    return complex(0, abs(a) ** (1/b))
-                return a ** (1/b)
-            elif op == 'log':
-                if (isinstance(a, complex) or isinstance(b, complex) or (isinstance(a, (int, float)) and a <= 0) or (isinstance(b, (int, float)) and b <= 0)):
-                    return cmath.log(b) / cmath.log(a) if a != 1 else float('inf')
-                return math.log(b, a)
-            elif op == 'mod':
-                if isinstance(a, complex) and isinstance(b, complex):
-                    return complex(a.real % b.real, a.imag % b.imag) if b != 0 else float('nan')
-                elif isinstance(a, complex):
-                    return complex(a.real % b, a.imag) if b != 0 else float('nan')
-                elif isinstance(b, complex):
-                    return complex(a % b.real, 0) if b.real != 0 else float('nan')
-                return a % b if b != 0 else float('nan')
-            elif op == 'add':
-                return a + b
-            elif op == 'sub':
-                return a - b
-            elif op == 'mul':
-                return a * b
-            elif op == 'div':
-                return a / b if b != 0 else float('inf')
-            else:
-                return a + b
+            operations = {
+                'add': a + b,
+                'mul': a * b,
+                'sub': a - b,
+                'div': a / b if b != 0 else float('inf')
+            }
+            return min(operations.items(), key=lambda x: entropy_score(x[1]))[1]
         except Exception:
-            return float('nan')
-
-    if isinstance(parsed_val, dict):
-        op = parsed_val['op']
-        args = [eval_uml(a) for a in parsed_val['args']]
-        if op == 'add':
-            return eval_add(args)
-        if op == 'sub':
-            return eval_sub(args)
-        if op == 'mul':
-            return eval_mul(args)
-        if op == 'div':
-            return eval_div(args)
-        if op == 'root':
-            return eval_root(args)
-        if op == 'log':
-            return eval_log(args)
-        if op == 'ris':
-            return eval_ris(parsed_val, args)
-        # fallback for unknown op
+            return a + b
+    try:
+        if op == 'pow':
+            return a ** b
+        elif op == 'root':
+            if b == 0:
+                return float('inf')
+            if isinstance(a, (int, float)) and a < 0 and isinstance(b, (int, float)) and b % 2 == 0:
+                return complex(0, abs(a) ** (1/b))
+            return a ** (1/b)
+        elif op == 'log':
+            if (isinstance(a, complex) or isinstance(b, complex) or (isinstance(a, (int, float)) and a <= 0) or (isinstance(b, (int, float)) and b <= 0)):
+                return cmath.log(b) / cmath.log(a) if a != 1 else float('inf')
+            return math.log(b, a)
+        elif op == 'mod':
+            if isinstance(a, complex) and isinstance(b, complex):
+                return complex(a.real % b.real, a.imag % b.imag) if b != 0 else float('nan')
+            elif isinstance(a, complex):
+                return complex(a.real % b, a.imag) if b != 0 else float('nan')
+            elif isinstance(b, complex):
+                return complex(a % b.real, 0) if b.real != 0 else float('nan')
+            return a % b if b != 0 else float('nan')
+        elif op == 'add':
+            return a + b
+        elif op == 'sub':
+            return a - b
+        elif op == 'mul':
+            return a * b
+        elif op == 'div':
+            return a / b if b != 0 else float('inf')
+        else:
+            return a + b
+    except Exception:
         return float('nan')
+
+_UML_OPERATORS = {
+    'add': _eval_add,
+    'sub': _eval_sub,
+    'mul': _eval_mul,
+    'div': _eval_div,
+    'root': _eval_root,
+    'log': _eval_log,
+}
+
+def _eval_leaf(parsed_val):
     if isinstance(parsed_val, (int, float, complex)):
         return parsed_val
     return float('nan')
+
+def apply_uml_operator(node: Dict[str, Any], args: List[Any]) -> Union[float, complex, str]:
+    """Apply a parsed UML operator node to its already-evaluated arguments."""
+    op = node['op']
+    if op == 'ris':
+        return _eval_ris(node, args)
+    func = _UML_OPERATORS.get(op)
+    if func is None:
+        # fallback for unknown op
+        return float('nan')
+    return func(args)
+
+# Enhanced UML evaluation with RIS meta-operator and recursive compression
+def _uml_args(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Operator nodes among a node's arguments."""
+    return [arg for arg in node['args'] if isinstance(arg, dict)]
+
+def eval_uml(parsed_val: Any, budget: Optional[EvaluationBudget] = None) -> Union[float, complex, str]:
+    """
+    Enhanced UML evaluation with RIS meta-operator, recursive compression, and symbolic preservation.
+    Evaluates the tree post-order with an explicit stack, so arbitrarily deep
+    (machine-generated) nesting cannot overflow the Python call stack.
+
+    The tree's size and depth are checked against the evaluation budget
+    (budget, else the active one) first, and its deadline while evaluating.
+    """
+    if budget is not None:
+        with call_scope(budget):
+            return eval_uml(parsed_val)
+    if not isinstance(parsed_val, dict):
+        return _eval_leaf(parsed_val)
+    check_tree(parsed_val, _uml_args)
+
+    # Each suspended node keeps its argument iterator and the values so far
+    suspended = []
+    node = parsed_val
+    args = iter(node['args'])
+    values = []
+    applied = 0
+    while True:
+        for arg in args:
+            if isinstance(arg, dict):
+                suspended.append((node, args, values))
+                node = arg
+                args = iter(node['args'])
+                values = []
+                break
+            values.append(_eval_leaf(arg))
+        else:
+            result = apply_uml_operator(node, values)
+            if not suspended:
+                return result
+            applied += 1
+            if applied % CHECK_INTERVAL == 0:
+                check_deadline()
+            node, args, values = suspended.pop()
+            values.append(result)
+
 def eval_recursive_compress(expr_str: str) -> Union[float, complex, str]:
     """
     Evaluate UML expression and apply recursive compression.
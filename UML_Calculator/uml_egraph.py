@@ -0,0 +1,511 @@
+"""
+UML E-Graph - Equality saturation over parsed UML trees.
+
+Where the RIS meta-operator greedily picks the lowest-entropy result for a
+single pair of operands, this module searches whole expression spaces: a
+parsed tree is loaded into an e-graph, rewrite rules add equivalent forms
+until the graph saturates (or a limit is hit), and the form with the lowest
+entropy cost is extracted.
+
+Cost model (the existing entropy scores):
+    operator node  base entropy weight of the matching SymbolicOperationType
+    numeric leaf   uml_core.entropy_score(value) + _LEAF_COST_OFFSET
+Constant subtrees are folded by an e-class analysis, so fully numeric
+expressions collapse to their value.
+
+The default rules are commutativity and associativity of [..] and <..>,
+division/multiplication duality, the +0 / *1 identities and RIS alternatives
+(RIS with an explicit operation equals that operation). They are algebraic identities: like any
+reassociation they may change floating-point rounding and the sign of an
+infinity produced by division by zero.
+
+Every search is bounded by max_nodes, max_iterations and time_limit.
+
+Author: Travis Miner
+Date: June 23, 2025
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from symbolic_engine import _BASE_ENTROPY_WEIGHTS, SymbolicOperationType
+from uml_core import apply_uml_operator, entropy_score
+from uml_optimizer import count_nodes
+
+# Added to leaf entropy scores so every cost is positive (the score bonuses
+# sum to -2.4); positive costs keep extraction well-founded
+_LEAF_COST_OFFSET = 2.5
+
+_OP_TYPES = {
+    "add": SymbolicOperationType.ADDITION,
+    "sub": SymbolicOperationType.SUBTRACTION,
+    "mul": SymbolicOperationType.MULTIPLICATION,
+    "div": SymbolicOperationType.DIVISION,
+    "root": SymbolicOperationType.ROOT,
+    "log": SymbolicOperationType.LOGARITHM,
+}
+_RIS_OP_TYPES = {
+    "pow": SymbolicOperationType.EXPONENTIATION,
+    "mod": SymbolicOperationType.MODULO,
+}
+# RIS operations that are exactly a plain UML operator on the same operands
+_RIS_EQUIVALENTS = ("add", "sub", "mul", "div", "log")
+
+# E-node: (op, attr, children). Leaves use op "num" (attr is a type-tagged
+# repr of the value) or "sym" (attr is the symbol); RIS nodes carry their
+# operation as attr.
+ENode = Tuple[str, Any, Tuple[int, ...]]
+# Rule output: a class id, a ("num", value) leaf or an (op, attr, children)
+# tuple whose children are templates
+Template = Any
+Rule = Callable[["EGraph", ENode], Iterable[Template]]
+
+
+def op_weight(op: str, attr: Any = None) -> float:
+    """Base entropy weight of a UML operator."""
+    if op == "ris":
+        op_type = _RIS_OP_TYPES.get(attr, SymbolicOperationType.RIS)
+    else:
+        op_type = _OP_TYPES.get(op)
+    return _BASE_ENTROPY_WEIGHTS.get(op_type, 1.0)
+
+
+def leaf_cost(value: Any) -> float:
+    """Entropy cost of a leaf value or symbol."""
+    if isinstance(value, float) and value.is_integer():
+        # entropy_score's power-of-two test needs an int
+        value = int(value)
+    return entropy_score(value) + _LEAF_COST_OFFSET
+
+
+def tree_cost(tree: Any) -> float:
+    """Entropy cost of a parsed UML tree under the e-graph cost model."""
+    total = 0.0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            total += op_weight(node["op"], node.get("operation"))
+            stack.extend(node["args"])
+        else:
+            total += leaf_cost(node)
+    return total
+
+
+class EGraph:
+    """E-graph with union-find, hash-consing and constant folding."""
+
+    def __init__(self):
+        self._parent: List[int] = []
+        self._nodes: Dict[int, List[ENode]] = {}
+        self._hashcons: Dict[ENode, int] = {}
+        self._const: Dict[int, Any] = {}
+        self._values: Dict[Any, Any] = {}
+        self._added = 0
+
+    @property
+    def node_count(self) -> int:
+        return len(self._hashcons)
+
+    @property
+    def class_count(self) -> int:
+        return len(self._nodes)
+
+    def find(self, cid: int) -> int:
+        """Return the canonical id of an e-class (with path halving)."""
+        parent = self._parent
+        while parent[cid] != cid:
+            parent[cid] = parent[parent[cid]]
+            cid = parent[cid]
+        return cid
+
+    def nodes(self, cid: int) -> List[ENode]:
+        """Return the e-nodes of a class."""
+        return self._nodes[self.find(cid)]
+
+    def constant(self, cid: int) -> Optional[Any]:
+        """Return the folded constant of a class, if any."""
+        return self._const.get(self.find(cid))
+
+    def add(self, op: str, attr: Any, children: Sequence[int]) -> int:
+        """Add an e-node and return its class id."""
+        key = (op, attr, tuple(self.find(c) for c in children))
+        cid = self._hashcons.get(key)
+        if cid is not None:
+            return self.find(cid)
+        cid = len(self._parent)
+        self._parent.append(cid)
+        self._nodes[cid] = [key]
+        self._hashcons[key] = cid
+        self._added += 1
+        if op == "num":
+            self._const[cid] = self._values[attr]
+        else:
+            value = self._fold(key)
+            if value is not None:
+                self._const[cid] = value
+                self.union(cid, self.add_leaf(value))
+        return self.find(cid)
+
+    def add_leaf(self, value: Any) -> int:
+        """Add a numeric leaf or a symbol; other leaves evaluate to NaN."""
+        if isinstance(value, str):
+            return self.add("sym", value, ())
+        if not isinstance(value, (int, float, complex)):
+            value = float("nan")
+        attr = (type(value).__name__, repr(value))
+        self._values.setdefault(attr, value)
+        return self.add("num", attr, ())
+
+    def add_tree(self, tree: Any) -> int:
+        """Load a parsed UML tree and return the class id of its root."""
+        if not isinstance(tree, dict):
+            return self.add_leaf(tree)
+        suspended = []
+        node = tree
+        args = iter(node["args"])
+        ids: List[int] = []
+        while True:
+            for arg in args:
+                if isinstance(arg, dict):
+                    suspended.append((node, args, ids))
+                    node = arg
+                    args = iter(node["args"])
+                    ids = []
+                    break
+                ids.append(self.add_leaf(arg))
+            else:
+                cid = self._add_operator(node, ids)
+                if not suspended:
+                    return cid
+                node, args, ids = suspended.pop()
+                ids.append(cid)
+
+    def _add_operator(self, node: Dict[str, Any], ids: List[int]) -> int:
+        """Add one parsed operator, expanding n-ary nests into binary chains."""
+        op = node["op"]
+        if op == "ris":
+            return self.add(op, node.get("operation"), ids)
+        # Adds of 4+ operands apply recursive compression and stay n-ary
+        if (op == "add" and 2 <= len(ids) <= 3) or (op == "mul" and len(ids) >= 2):
+            return self._chain(op, ids)
+        if op == "sub" and len(ids) >= 3:
+            # a - sum(rest)
+            return self.add(op, None, (ids[0], self._chain("add", ids[1:])))
+        return self.add(op, None, ids)
+
+    def _chain(self, op: str, ids: List[int]) -> int:
+        cid = ids[0]
+        for other in ids[1:]:
+            cid = self.add(op, None, (cid, other))
+        return cid
+
+    def _fold(self, key: ENode) -> Optional[Any]:
+        """Evaluate a node whose children are all constant classes."""
+        op, attr, children = key
+        if op == "sym":
+            return None
+        values = []
+        for child in children:
+            value = self._const.get(self.find(child))
+            if value is None:
+                return None
+            values.append(value)
+        operator = {"op": op, "operation": attr} if op == "ris" else {"op": op}
+        try:
+            value = apply_uml_operator(operator, values)
+        except Exception:
+            return None
+        return value if isinstance(value, (int, float, complex)) else None
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge two classes; returns False if they were already equal."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if len(self._nodes[ra]) < len(self._nodes[rb]):
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._nodes[ra].extend(self._nodes.pop(rb))
+        const = self._const.pop(rb, None)
+        if const is not None and ra not in self._const:
+            self._const[ra] = const
+        return True
+
+    def rebuild(self) -> None:
+        """Restore the hash-cons and congruence invariants after unions."""
+        while True:
+            self._hashcons = {}
+            merges = []
+            for cid, nodes in self._nodes.items():
+                canonical = []
+                for op, attr, children in nodes:
+                    key = (op, attr, tuple(self.find(c) for c in children))
+                    other = self._hashcons.get(key)
+                    if other is None:
+                        self._hashcons[key] = cid
+                        canonical.append(key)
+                    elif other != cid:
+                        merges.append((other, cid))
+                self._nodes[cid] = canonical
+            for cid, nodes in list(self._nodes.items()):
+                if cid in self._const:
+                    continue
+                for key in nodes:
+                    value = self._fold(key)
+                    if value is not None:
+                        self._const[cid] = value
+                        merges.append((cid, self.add_leaf(value)))
+                        break
+            if not merges:
+                return
+            for a, b in merges:
+                self.union(a, b)
+
+    def _instantiate(self, template: Template) -> int:
+        """Add a rule template and return its class id."""
+        if isinstance(template, int):
+            return self.find(template)
+        if template[0] == "num":
+            return self.add_leaf(template[1])
+        op, attr, children = template
+        return self.add(op, attr, [self._instantiate(c) for c in children])
+
+    def saturate(
+        self,
+        rules: Sequence[Rule],
+        max_iterations: int = 20,
+        max_nodes: int = 10_000,
+        time_limit: float = 0.5,
+    ) -> Tuple[str, int]:
+        """
+        Apply rules until nothing changes or a limit is reached.
+
+        Returns:
+            Tuple of (stop reason, iterations run); the reason is one of
+            "saturated", "node_limit", "time_limit" or "iteration_limit"
+        """
+        deadline = time.monotonic() + time_limit
+        for iteration in range(1, max_iterations + 1):
+            matches = []
+            for cid, nodes in self._nodes.items():
+                # Constant classes already hold their folded leaf
+                if cid in self._const:
+                    continue
+                for key in nodes:
+                    for rule in rules:
+                        for template in rule(self, key):
+                            matches.append((cid, template))
+                if time.monotonic() > deadline:
+                    return "time_limit", iteration
+
+            added = self._added
+            changed = False
+            for cid, template in matches:
+                if self.node_count >= max_nodes:
+                    self.rebuild()
+                    return "node_limit", iteration
+                if time.monotonic() > deadline:
+                    self.rebuild()
+                    return "time_limit", iteration
+                changed |= self.union(cid, self._instantiate(template))
+            self.rebuild()
+            if not changed and self._added == added:
+                return "saturated", iteration
+        return "iteration_limit", max_iterations
+
+    def _node_cost(self, key: ENode, best: Dict[int, Tuple[float, ENode]]) -> Optional[float]:
+        op, attr, children = key
+        if op == "num":
+            return leaf_cost(self._values[attr])
+        if op == "sym":
+            return leaf_cost(attr)
+        cost = op_weight(op, attr)
+        for child in children:
+            entry = best.get(self.find(child))
+            if entry is None:
+                return None
+            cost += entry[0]
+        return cost
+
+    def extract(self, root: int) -> Tuple[Any, float]:
+        """Return the lowest-cost tree of a class and its cost."""
+        best: Dict[int, Tuple[float, ENode]] = {}
+        changed = True
+        while changed:
+            changed = False
+            for cid, nodes in self._nodes.items():
+                for key in nodes:
+                    cost = self._node_cost(key, best)
+                    if cost is None:
+                        continue
+                    current = best.get(cid)
+                    if current is None or cost < current[0]:
+                        best[cid] = (cost, key)
+                        changed = True
+
+        root = self.find(root)
+        built: Dict[int, Any] = {}
+        stack = [(root, False)]
+        while stack:
+            cid, ready = stack.pop()
+            if cid in built:
+                continue
+            op, attr, children = best[cid][1]
+            if op == "num":
+                built[cid] = self._values[attr]
+            elif op == "sym":
+                built[cid] = attr
+            elif not ready:
+                stack.append((cid, True))
+                stack.extend((self.find(c), False) for c in children)
+            else:
+                built[cid] = _build_operator(op, attr, [built[self.find(c)] for c in children])
+        return built[root], best[root][0]
+
+
+def _build_operator(op: str, attr: Any, args: List[Any]) -> Dict[str, Any]:
+    """Emit a parse-tree node, re-flattening binary add/mul chains."""
+    first = args[0] if args else None
+    if op in ("add", "mul") and isinstance(first, dict) and first["op"] == op:
+        merged = first["args"] + args[1:]
+        if op == "mul" or len(merged) <= 3:
+            args = merged
+    node = {"op": op, "args": args}
+    if op == "ris":
+        node["operation"] = attr
+    return node
+
+
+# --- Rewrite rules ---
+
+def commute(egraph: EGraph, key: ENode) -> List[Template]:
+    """[a,b] = [b,a] and <a,b> = <b,a>."""
+    op, _, children = key
+    if op in ("add", "mul") and len(children) == 2:
+        return [(op, None, (children[1], children[0]))]
+    return []
+
+
+def associate(egraph: EGraph, key: ENode) -> List[Template]:
+    """[[a,b],c] = [a,[b,c]] and the same for <..>, in both directions."""
+    op, _, children = key
+    if op not in ("add", "mul") or len(children) != 2:
+        return []
+    a, b = children
+    out = []
+    for inner_op, _, inner in egraph.nodes(a):
+        if inner_op == op and len(inner) == 2:
+            out.append((op, None, (inner[0], (op, None, (inner[1], b)))))
+    for inner_op, _, inner in egraph.nodes(b):
+        if inner_op == op and len(inner) == 2:
+            out.append((op, None, ((op, None, (a, inner[0])), inner[1])))
+    return out
+
+
+def div_mul_duality(egraph: EGraph, key: ENode) -> List[Template]:
+    """<>a,b<> = <a,<>1,b<>> and <><>a,b<>,c<> = <>a,<b,c><>."""
+    op, _, children = key
+    if len(children) != 2:
+        return []
+    a, b = children
+    out = []
+    if op == "div":
+        out.append(("mul", None, (a, ("div", None, (("num", 1.0), b)))))
+        for inner_op, _, inner in egraph.nodes(a):
+            if inner_op == "div" and len(inner) == 2:
+                out.append(("div", None, (inner[0], ("mul", None, (inner[1], b)))))
+    elif op == "mul":
+        for inner_op, _, inner in egraph.nodes(b):
+            if inner_op == "div" and len(inner) == 2 and egraph.constant(inner[0]) == 1:
+                out.append(("div", None, (a, inner[1])))
+    return out
+
+
+def drop_identities(egraph: EGraph, key: ENode) -> List[Template]:
+    """[a,0] = a and <a,1> = a."""
+    op, _, children = key
+    if op not in ("add", "mul") or len(children) != 2:
+        return []
+    identity = 0 if op == "add" else 1
+    out = []
+    for keep, other in (children, children[::-1]):
+        value = egraph.constant(other)
+        if value is not None and value == identity:
+            out.append(keep)
+    return out
+
+
+def ris_alternatives(egraph: EGraph, key: ENode) -> List[Template]:
+    """RIS with an explicit operation equals that plain operator."""
+    op, attr, children = key
+    if op == "ris" and attr in _RIS_EQUIVALENTS and len(children) == 2:
+        return [(attr, None, children)]
+    return []
+
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    commute,
+    associate,
+    div_mul_duality,
+    drop_identities,
+    ris_alternatives,
+)
+
+
+def simplify_uml(
+    tree: Any,
+    rules: Sequence[Rule] = DEFAULT_RULES,
+    max_nodes: int = 10_000,
+    max_iterations: int = 20,
+    time_limit: float = 0.5,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Rewrite a parsed UML tree to its lowest-entropy equivalent form.
+
+    Args:
+        tree: Tree returned by uml_core.parse_uml
+        rules: Rewrite rules (defaults to DEFAULT_RULES)
+        max_nodes: Hard limit on e-nodes; inputs larger than this are
+                   returned unchanged
+        max_iterations: Maximum rule application rounds
+        time_limit: Wall-clock budget in seconds for saturation; the final
+                    rebuild and extraction are bounded by max_nodes instead
+
+    Returns:
+        Tuple of (tree, report) with stop reason, iterations, e-graph size,
+        entropy cost before and after, and elapsed seconds
+    """
+    start = time.perf_counter()
+    cost_before = tree_cost(tree)
+    report = {
+        "stop_reason": "node_limit",
+        "iterations": 0,
+        "enodes": 0,
+        "eclasses": 0,
+        "cost_before": cost_before,
+        "cost_after": cost_before,
+    }
+    if count_nodes(tree) > max_nodes:
+        report["elapsed_s"] = time.perf_counter() - start
+        return tree, report
+
+    egraph = EGraph()
+    root = egraph.add_tree(tree)
+    egraph.rebuild()
+    stop_reason, iterations = egraph.saturate(rules, max_iterations, max_nodes, time_limit)
+    best, _ = egraph.extract(root)
+
+    # Never return a form the cost model rates worse than the input
+    cost_after = tree_cost(best)
+    if not cost_after < cost_before:
+        best, cost_after = tree, cost_before
+    report.update(
+        stop_reason=stop_reason,
+        iterations=iterations,
+        enodes=egraph.node_count,
+        eclasses=egraph.class_count,
+        cost_after=cost_after,
+        elapsed_s=time.perf_counter() - start,
+    )
+    return best, report
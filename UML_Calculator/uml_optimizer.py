@@ -0,0 +1,269 @@
+"""
+UML Optimizer - Constant folding and algebraic simplification for parsed
+UML trees.
+
+Runs between ``uml_core.parse_uml`` and ``uml_core.eval_uml``. The pass:
+
+- folds constant subtrees to their value (only when the value is a number,
+  so symbolic RIS results are never folded into strings)
+- flattens left-nested add/mul nests ([[a,b],c] -> [a,b,c]); add nests are
+  only merged while the result keeps at most 3 operands, since wider adds
+  trigger recursive compression
+- removes identity elements (+0, *1, -0, /1) and unwraps single-operand
+  nests around a symbol ([x], <1,x>, {x,0} -> x)
+
+Every rewrite evaluates to the same result as the original tree, including
+NaN, inf and complex values. Optimized trees are plain parse trees, so they
+can be stored in the same ResultCache as evaluation results.
+
+eval_optimized runs the pass between parsing and evaluation.
+core.optimizer is the same pass for core.uml_core trees, which the
+calculator front ends evaluate.
+
+Author: Travis Miner
+Date: June 23, 2025
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.evaluation_budget import EvaluationBudget, call_scope, check_tree
+from uml_core import apply_uml_operator, eval_uml, parse_uml
+from uml_cache import ResultCache, cache_key, engine_salt
+
+# Operators that reduce to their single remaining operand once identities go
+_UNWRAPPABLE_OPS = ("add", "sub", "mul", "div")
+# Adds wider than this apply recursive_compress to their sum
+_MAX_PLAIN_ADD_ARITY = 3
+
+
+def _is_constant(value: Any) -> bool:
+    return isinstance(value, (int, float, complex))
+
+
+def _is_real(value: Any, target: int) -> bool:
+    """True for a real int/float constant equal to target."""
+    return type(value) in (int, float) and value == target
+
+
+def _args(node: Any) -> List[Any]:
+    return node.get("args", ()) if isinstance(node, dict) else ()
+
+
+def _is_plain(value: Any) -> bool:
+    """
+    True for a symbol or a real int/float constant.
+
+    Multiplying or dividing a complex infinity by 1 is not a no-op
+    ((inf+1j) * 1 is (inf+nanj)), so * 1 and / 1 are only dropped next to
+    operands that cannot evaluate to a complex number.
+    """
+    return isinstance(value, str) or type(value) in (int, float)
+
+
+def count_nodes(tree: Any) -> int:
+    """Count operator nodes and leaves in a parsed UML tree."""
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, dict):
+            stack.extend(node.get("args", ()))
+    return count
+
+
+def _fold(node: Dict[str, Any], args: List[Any], report: Dict[str, int]) -> Any:
+    """Replace an all-constant node with its value if that value is a number."""
+    if not all(_is_constant(a) for a in args):
+        return None
+    try:
+        value = apply_uml_operator(node, args)
+    except Exception:
+        return None
+    if not _is_constant(value):
+        return None
+    report["folded"] += 1
+    return value
+
+
+def _flatten(op: str, args: List[Any], report: Dict[str, int]) -> List[Any]:
+    """Merge a left-nested child of the same associative operator."""
+    first = args[0] if args else None
+    if not isinstance(first, dict) or first.get("op") != op:
+        return args
+    merged = list(first["args"]) + args[1:]
+    if op == "add" and (
+        len(first["args"]) > _MAX_PLAIN_ADD_ARITY
+        or len(args) > _MAX_PLAIN_ADD_ARITY
+        or len(merged) > _MAX_PLAIN_ADD_ARITY
+    ):
+        return args
+    report["flattened"] += 1
+    return merged
+
+
+def _drop_identities(op: str, args: List[Any], report: Dict[str, int]) -> List[Any]:
+    """Remove identity elements that cannot change the result."""
+    if op == "add":
+        kept = [a for a in args if not _is_real(a, 0)]
+        # The compression threshold must not move, and at least one operand stays
+        if not kept or (len(kept) > _MAX_PLAIN_ADD_ARITY) != (len(args) > _MAX_PLAIN_ADD_ARITY):
+            return args
+    elif op == "mul":
+        kept = [a for a in args if not _is_real(a, 1)]
+        if not kept or not all(_is_plain(a) for a in kept):
+            return args
+    elif op == "sub":
+        kept = args[:1] + [a for a in args[1:] if not _is_real(a, 0)]
+    elif op == "div":
+        if not all(_is_plain(a) for a in args):
+            return args
+        kept = args[:1] + [a for a in args[1:] if not _is_real(a, 1)]
+        # Keep one divisor so an int dividend still becomes a float
+        if len(kept) == 1 and len(args) > 1:
+            kept.append(args[1])
+    else:
+        return args
+    report["identities_removed"] += len(args) - len(kept)
+    return kept
+
+
+def _simplify(node: Dict[str, Any], args: List[Any], report: Dict[str, int]) -> Any:
+    """Simplify one node whose operands are already simplified."""
+    value = _fold(node, args, report)
+    if value is not None:
+        return value
+
+    op = node["op"]
+    if op in ("add", "mul"):
+        args = _flatten(op, args, report)
+    args = _drop_identities(op, args, report)
+
+    # A lone symbol evaluates to NaN with or without the wrapping nest
+    if op in _UNWRAPPABLE_OPS and len(args) == 1 and isinstance(args[0], str):
+        report["identities_removed"] += 1
+        return args[0]
+
+    simplified = dict(node)
+    simplified["args"] = args
+    return simplified
+
+
+def optimize_uml(tree: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Optimize a parsed UML tree.
+
+    The input tree is not modified. Runs post-order with an explicit stack,
+    like eval_uml, so deep trees are safe.
+
+    Args:
+        tree: Tree returned by uml_core.parse_uml
+
+    Returns:
+        Tuple of (optimized tree, report) where the report holds node counts
+        before and after, the fractional reduction and per-rewrite counts
+    """
+    report = {"folded": 0, "flattened": 0, "identities_removed": 0}
+    nodes_before = count_nodes(tree)
+
+    if isinstance(tree, dict):
+        suspended = []
+        node = tree
+        args = iter(node["args"])
+        values = []
+        while True:
+            for arg in args:
+                if isinstance(arg, dict):
+                    suspended.append((node, args, values))
+                    node = arg
+                    args = iter(node["args"])
+                    values = []
+                    break
+                values.append(arg)
+            else:
+                result = _simplify(node, values, report)
+                if not suspended:
+                    break
+                node, args, values = suspended.pop()
+                values.append(result)
+    else:
+        result = tree
+
+    nodes_after = count_nodes(result)
+    report.update(
+        nodes_before=nodes_before,
+        nodes_after=nodes_after,
+        reduction=1 - nodes_after / nodes_before,
+    )
+    return result, report
+
+
+def eval_optimized(parsed: Any, budget: Optional[EvaluationBudget] = None) -> Any:
+    """
+    Optimize a parsed UML tree, then evaluate it with uml_core.eval_uml.
+
+    The tree's size and depth are checked against the evaluation budget
+    (budget, else the active one) as parsed, before it is optimized.
+    """
+    if budget is not None:
+        with call_scope(budget):
+            return eval_optimized(parsed)
+    check_tree(parsed, _args)
+    return eval_uml(optimize_uml(parsed)[0])
+
+
+def optimize_expression(
+    expr_str: str, cache: Optional[ResultCache] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Parse and optimize a UML expression, through the result cache if given.
+
+    Optimized trees are keyed on the parsed tree, like evaluation results,
+    under the optimizer's own engine salt.
+
+    Returns:
+        Tuple of (optimized tree, report); the report's "cached" flag tells
+        whether the tree came from the cache
+    """
+    parsed = parse_uml(expr_str)
+    if cache is None:
+        optimized, report = optimize_uml(parsed)
+        report["cached"] = False
+        return optimized, report
+
+    key = cache_key(parsed, engine_salt(optimize_uml))
+    found, optimized = cache.get(key)
+    if found:
+        nodes_before, nodes_after = count_nodes(parsed), count_nodes(optimized)
+        return optimized, {
+            "nodes_before": nodes_before,
+            "nodes_after": nodes_after,
+            "reduction": 1 - nodes_after / nodes_before,
+            "cached": True,
+        }
+    optimized, report = optimize_uml(parsed)
+    cache.put(key, optimized)
+    report["cached"] = False
+    return optimized, report
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Optimize UML expressions")
+    parser.add_argument("expressions", nargs="*", help="Expressions (default: one per stdin line)")
+    args = parser.parse_args()
+
+    exprs = args.expressions or [line.strip() for line in sys.stdin if line.strip()]
+    total_before = total_after = 0
+    for expr in exprs:
+        optimized, report = optimize_expression(expr)
+        total_before += report["nodes_before"]
+        total_after += report["nodes_after"]
+        print(
+            f"{expr}: {report['nodes_before']} -> {report['nodes_after']} nodes "
+            f"({report['reduction']:.0%}), value {eval_uml(optimized)}"
+        )
+    if total_before:
+        print(f"Total: {total_before} -> {total_after} nodes ({1 - total_after / total_before:.0%})")
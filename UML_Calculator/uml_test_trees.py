@@ -0,0 +1,64 @@
+"""
+Random uml_core trees and result comparison for the property tests
+
+Shared by test_uml_optimizer and test_uml_egraph, which check that a
+rewritten tree evaluates to the same result as the original.
+"""
+
+import cmath
+
+
+def random_tree(rng, operators, leaves, ops, ris_operations, fixed_widths):
+    """
+    A random uml_core tree with the given operator count
+
+    Args:
+        rng: random.Random to draw from
+        operators: Operator nodes in the tree
+        leaves: Leaf values to choose from
+        ops: Operators to choose from (repeat one to weight it)
+        ris_operations: "operation" values for ris nodes
+        fixed_widths: Argument count of operators that do not take 2 or 3
+    """
+    nodes = [rng.choice(leaves) for _ in range(operators + 1)]
+    while len(nodes) > 1:
+        i = rng.randrange(len(nodes) - 1)
+        op = rng.choice(ops)
+        width = fixed_widths.get(op) or rng.choice([2, 2, 2, 3])
+        node = {"op": op, "args": nodes[i:i + width]}
+        if op == "ris":
+            node["operation"] = rng.choice(ris_operations)
+        nodes[i:i + width] = [node]
+    return nodes[0]
+
+
+def outcome(evaluate, tree):
+    """evaluate(tree), or ("error", exception type) if it raises."""
+    try:
+        return evaluate(tree)
+    except Exception as e:
+        return ("error", type(e))
+
+
+def same_result(x, y, rel_tol=None):
+    """
+    Whether two outcomes agree
+
+    A tree that fails must still fail, possibly with another exception type.
+    Without rel_tol results must be equal and of the same type, NaN matching
+    only a NaN of the same repr. With rel_tol, for rewrites that may
+    reassociate, finite numbers need only be that close, and a non-finite
+    result (such as a division by zero moved next to a NaN symbol) matches
+    any other non-finite one.
+    """
+    if isinstance(x, tuple) or isinstance(y, tuple):
+        return isinstance(x, tuple) and isinstance(y, tuple)
+    if isinstance(x, (int, float, complex)) and isinstance(y, (int, float, complex)):
+        if rel_tol is not None:
+            if not cmath.isfinite(x) or not cmath.isfinite(y):
+                return not cmath.isfinite(x) and not cmath.isfinite(y)
+            return cmath.isclose(x, y, rel_tol=rel_tol, abs_tol=rel_tol)
+        if cmath.isnan(x) or cmath.isnan(y):
+            return repr(x) == repr(y)
+        return x == y and type(x) is type(y)
+    return x == y
@@ -23,6 +23,7 @@ setup(
     entry_points={
         "console_scripts": [
             "uml-calculator=UML_Calculator.uml_calculator:main",
+            "uml=UML_Calculator.ui.calculator_cli:main",
         ],
     },
     classifiers=[